@@ -0,0 +1,312 @@
+# -*- coding: utf-8 -*-
+# (c) Copyright 2020 Sensirion AG, Switzerland
+"""
+Benchmark of the command encoding/decoding and of complete device round
+trips against the simulator (no hardware required).
+
+Usage (with the package installed, e.g. by ``pip install -e .``)::
+
+    python benchmarks/benchmark_commands.py --output results.json
+    python benchmarks/benchmark_commands.py --hot
+    python benchmarks/benchmark_commands.py --filter ReadMeasuredValue
+    python benchmarks/benchmark_commands.py --compare old.json
+
+The JSON output contains the environment and, for every benchmark, the
+minimum, median and mean time per call in seconds. Pass a previous output
+file with ``--compare`` to print the relative change of every benchmark.
+"""
+
+from __future__ import absolute_import, division, print_function
+from sensirion_shdlc_driver import ShdlcConnection
+from sensirion_shdlc_sfc5xxx import Sfc5xxxShdlcDevice, Sfc5xxxScaling, \
+    Sfc5xxxSimulatedDevice, Sfc5xxxSimulatorPort, Sfc5xxxBatchExecutor, \
+    Sfc5xxxMetrics, Sfc5xxxRecordingPort, Sfc5xxxReplayPort, __version__
+from sensirion_shdlc_sfc5xxx import commands
+from sensirion_shdlc_sfc5xxx.array_commands import \
+    Sfc5xxxCmdReadMeasuredValueBufferArray
+from datetime import datetime
+import argparse
+import atexit
+import inspect
+import json
+import os
+import platform
+import re
+import shutil
+import sys
+import tempfile
+import timeit
+
+
+# Sample arguments for the command constructors, by parameter name.
+SAMPLE_ARGUMENTS = {
+    'address': 0,
+    'baudrate': 115200,
+    'clear': False,
+    'enable': True,
+    'gain': 1.0,
+    'index': 0,
+    'input_source': 0,
+    'length': 16,
+    'persist': False,
+    'prefix': -3,
+    'pressure': 1.0,
+    'reply_delay': 50,
+    'scaling': int(Sfc5xxxScaling.PHYSICAL),
+    'setpoint': 10.0,
+    'slave_address': 0,
+    'temperature': 20.0,
+    'timebase': 4,
+    'unit': 1,
+    'use_temperature_compensation': True,
+    'value': 0.5,
+    'write_data': b"\x55" * 16,
+}
+
+# Commands which are especially relevant for the performance.
+HOT_COMMANDS = (
+    'Sfc5xxxCmdReadMeasuredValue',
+    'Sfc5xxxCmdSetSetpointAndReadMeasuredValue',
+    'Sfc5xxxCmdReadMeasuredValueBuffer',
+    'Sfc5xxxCmdReadMeasuredValueBufferArray',
+)
+
+
+class SteppingClock(object):
+    """
+    Virtual clock which advances by a fixed step on every call, so every
+    "read buffer" command of the simulator returns a full frame.
+    """
+
+    def __init__(self, step):
+        self._now = 0.0
+        self._step = step
+
+    def __call__(self):
+        self._now += self._step
+        return self._now
+
+
+def get_command_classes():
+    """
+    Get all command classes which can be sent to a device.
+
+    :return: List of (name, class) tuples.
+    :rtype: list
+    """
+    classes = [(name, cls) for name, cls in inspect.getmembers(
+        commands, inspect.isclass)
+        if name.startswith('Sfc5xxxCmd') and not name.endswith('Base')]
+    try:
+        import numpy  # noqa: F401
+        classes.append(('Sfc5xxxCmdReadMeasuredValueBufferArray',
+                        Sfc5xxxCmdReadMeasuredValueBufferArray))
+    except ImportError:
+        pass
+    return classes
+
+
+def get_sample_arguments(cls):
+    """
+    Get sample arguments for a command constructor.
+
+    :param type cls: The command class.
+    :return: The keyword arguments.
+    :rtype: dict
+    """
+    if sys.version_info >= (3, 0):
+        names = list(inspect.signature(cls.__init__).parameters)[1:]
+    else:
+        names = inspect.getargspec(cls.__init__).args[1:]
+    return {name: SAMPLE_ARGUMENTS[name] for name in names}
+
+
+def get_response(command):
+    """
+    Get a realistic response of a command by sending it to a simulated
+    device.
+
+    :param command: The command object.
+    :return: The response data, or ``None`` if the command failed.
+    :rtype: bytes/None
+    """
+    device = Sfc5xxxSimulatedDevice(seed=0, clock=SteppingClock(0.6))
+    state, data = device.handle(command.id, command.data)
+    return data if state == 0 else None
+
+
+def measure(function, repeat, min_time):
+    """
+    Measure the execution time of a function.
+
+    :param callable function: The function to measure.
+    :param int repeat: Number of measurement repetitions.
+    :param float min_time: Minimum duration of each repetition [s].
+    :return: Measurement results.
+    :rtype: dict
+    """
+    timer = timeit.Timer(function)
+    number = 1
+    while timer.timeit(number) < min_time:
+        number *= 2
+    times = sorted(t / number for t in timer.repeat(repeat, number))
+    return {
+        'number': number,
+        'repeat': repeat,
+        'min': times[0],
+        'median': times[len(times) // 2],
+        'mean': sum(times) / len(times),
+    }
+
+
+def record_buffer_stream(reads):
+    """
+    Record reading the flow value buffer of a simulated device.
+
+    :param int reads: Number of buffer reads to record.
+    :return: The path to the recording (deleted at exit).
+    :rtype: str
+    """
+    directory = tempfile.mkdtemp()
+    atexit.register(shutil.rmtree, directory, True)
+    file_path = os.path.join(directory, 'buffer.shdlc')
+    simulator = Sfc5xxxSimulatorPort()
+    simulator.add_device(Sfc5xxxSimulatedDevice(
+        slave_address=0, noise=0.0, clock=SteppingClock(0.6)))
+    with Sfc5xxxRecordingPort(simulator, file_path) as port:
+        device = Sfc5xxxShdlcDevice(ShdlcConnection(port), 0)
+        for _ in range(reads):
+            device.read_measured_value_buffer(Sfc5xxxScaling.PHYSICAL,
+                                              max_reads=1)
+    return file_path
+
+
+def get_benchmarks():
+    """
+    Get all benchmarks.
+
+    :return: List of (group, name, function) tuples.
+    :rtype: list
+    """
+    benchmarks = []
+    for name, cls in get_command_classes():
+        kwargs = get_sample_arguments(cls)
+        command = cls(**kwargs)
+        benchmarks.append(('encode', name,
+                           lambda cls=cls, kwargs=kwargs: cls(**kwargs)))
+        response = get_response(command)
+        if response is not None:
+            benchmarks.append(
+                ('decode', name, lambda command=command, response=response:
+                 command.interpret_response(response)))
+
+    # The device with the frozen clock does not spend time on simulating
+    # samples, the other one returns a full buffer frame on every read.
+    port = Sfc5xxxSimulatorPort()
+    port.add_device(Sfc5xxxSimulatedDevice(
+        slave_address=0, noise=0.0, clock=lambda: 0.0))
+    port.add_device(Sfc5xxxSimulatedDevice(
+        slave_address=1, noise=0.0, clock=SteppingClock(0.6)))
+    connection = ShdlcConnection(port)
+    device = Sfc5xxxShdlcDevice(connection, 0)
+    buffer_device = Sfc5xxxShdlcDevice(connection, 1)
+    metrics_device = Sfc5xxxShdlcDevice(connection, 0)
+    metrics_device.metrics = Sfc5xxxMetrics()
+    scaling = Sfc5xxxScaling.PHYSICAL
+    batch = Sfc5xxxBatchExecutor(connection)
+    read_command = commands.Sfc5xxxCmdReadMeasuredValue(int(scaling))
+
+    def read_batch():
+        for _ in range(10):
+            batch.add(device, read_command)
+        return batch.execute()
+
+    # Decoding a recorded buffer stream, without any simulation overhead
+    replay_port = Sfc5xxxReplayPort(record_buffer_stream(10))
+    replay_device = Sfc5xxxShdlcDevice(ShdlcConnection(replay_port), 0)
+
+    def replay_buffer():
+        replay_port.rewind()
+        for _ in range(10):
+            replay_device.read_measured_value_buffer(scaling, max_reads=1)
+
+    benchmarks.extend([
+        ('roundtrip', 'read_measured_value',
+         lambda: device.read_measured_value(scaling)),
+        ('roundtrip', 'set_setpoint_and_read_measured_value',
+         lambda: device.set_setpoint_and_read_measured_value(10.0, scaling)),
+        ('roundtrip', 'read_measured_value_buffer',
+         lambda: buffer_device.read_measured_value_buffer(scaling,
+                                                          max_reads=1)),
+        ('roundtrip', 'get_serial_number',
+         lambda: device.get_serial_number()),
+        ('roundtrip', 'batch_read_measured_value_x10', read_batch),
+        ('roundtrip', 'read_measured_value_with_metrics',
+         lambda: metrics_device.read_measured_value(scaling)),
+        ('replay', 'read_measured_value_buffer_x10', replay_buffer),
+    ])
+    return benchmarks
+
+
+def compare(results, reference):
+    """
+    Print the relative change of every benchmark compared to a previous run.
+
+    :param list results: The current results.
+    :param list reference: The results of the previous run.
+    """
+    old = {(r['group'], r['name']): r for r in reference}
+    for result in results:
+        key = (result['group'], result['name'])
+        if key in old:
+            change = result['min'] / old[key]['min'] - 1.0
+            print("{:<10} {:<56} {:+7.1%}".format(key[0], key[1], change))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--output', '-o', help="write results to JSON file")
+    parser.add_argument('--compare', '-c', help="compare with JSON file")
+    parser.add_argument('--filter', '-f', default='',
+                        help="only run benchmarks matching this regex")
+    parser.add_argument('--repeat', '-r', type=int, default=5,
+                        help="number of repetitions (default: 5)")
+    parser.add_argument('--min-time', type=float, default=0.05,
+                        help="minimum time per repetition (default: 0.05)")
+    parser.add_argument('--hot', action='store_true',
+                        help="only run benchmarks of the hot commands")
+    args = parser.parse_args(argv)
+
+    pattern = re.compile(args.filter)
+    results = []
+    for group, name, function in get_benchmarks():
+        if args.hot and group in ('encode', 'decode') and \
+                name not in HOT_COMMANDS:
+            continue
+        if not pattern.search(group + '.' + name):
+            continue
+        result = dict(group=group, name=name)
+        result.update(measure(function, args.repeat, args.min_time))
+        results.append(result)
+        print("{:<10} {:<56} {:10.2f} us".format(
+            group, name, result['min'] * 1e6))
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({
+                'environment': {
+                    'package_version': __version__,
+                    'python_version': platform.python_version(),
+                    'python_implementation': platform.python_implementation(),
+                    'platform': platform.platform(),
+                    'date': datetime.utcnow().isoformat(),
+                },
+                'results': results,
+            }, f, indent=2, sort_keys=True)
+    if args.compare:
+        with open(args.compare) as f:
+            compare(results, json.load(f)['results'])
+
+
+if __name__ == '__main__':
+    main()
@@ -2,6 +2,7 @@
 # (c) Copyright 2020 Sensirion AG, Switzerland
 
 from __future__ import absolute_import, division, print_function
+import sys
 from .version import version as __version__  # noqa: F401
 from .definitions import Sfc5xxxScaling, Sfc5xxxValveInputSource  # noqa: F401
 from .units import (  # noqa: F401
@@ -9,5 +10,26 @@ from .units import (  # noqa: F401
 )
 from .device import Sfc5xxxShdlcDevice  # noqa: F401
 from .firmware_image import Sfc5xxxFirmwareImage  # noqa: F401
+from .poll_scheduler import Sfc5xxxPollScheduler  # noqa: F401
+from .buffer_reader import Sfc5xxxBufferReader  # noqa: F401
+from .bus_scheduler import Sfc5xxxBusScheduler, Sfc5xxxJobPriority  # noqa
+from .simulator import Sfc5xxxSimulatedDevice, Sfc5xxxSimulatorPort  # noqa
+from .calibration_cache import Sfc5xxxCalibrationCache  # noqa: F401
+from .cached_device import Sfc5xxxCachedShdlcDevice  # noqa: F401
+from .configuration import Sfc5xxxConfiguration  # noqa: F401
+from .batch_executor import Sfc5xxxBatchExecutor  # noqa: F401
+from .latency_model import Sfc5xxxLatencyModel, Sfc5xxxAdaptiveConnection  # noqa
+from .metrics import Sfc5xxxMetrics  # noqa: F401
+from .exporter import Sfc5xxxMetricsExporter  # noqa: F401
+from .recording import Sfc5xxxRecordingPort, Sfc5xxxReplayPort  # noqa: F401
+from .flow_log import Sfc5xxxFlowLogWriter, Sfc5xxxFlowLogReader, \
+    Sfc5xxxFlowLogger  # noqa: F401
+from .flow_pyramid import Sfc5xxxFlowLogPyramid  # noqa: F401
+from .flow_statistics import Sfc5xxxRunningStatistics, Sfc5xxxFlowSummary, \
+    Sfc5xxxFlowStatistics  # noqa: F401
+from .setpoint_profile import Sfc5xxxSetpointProfile, \
+    Sfc5xxxProfileExecutor  # noqa: F401
+if sys.version_info >= (3, 5):
+    from .async_device import AsyncSfc5xxxShdlcDevice  # noqa: F401
 
 __copyright__ = '(c) Copyright 2020 Sensirion AG, Switzerland'
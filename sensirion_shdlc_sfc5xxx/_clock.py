@@ -0,0 +1,21 @@
+# -*- coding: utf-8 -*-
+# (c) Copyright 2020 Sensirion AG, Switzerland
+
+"""
+Clock used to measure durations and to schedule actions.
+
+:py:func:`monotonic_time` returns :py:func:`time.perf_counter`, which is
+monotonic and has the highest available resolution, so it is not affected by
+changes of the system time. Only the differences between its values are
+meaningful, so it must not be used for timestamps.
+
+.. note:: Python 2 has no monotonic clock in its standard library, so there
+          it falls back to :py:func:`time.time`. Durations and schedules are
+          then affected by changes of the system time.
+"""
+
+from __future__ import absolute_import, division, print_function
+import time
+
+#: Get the current time [s] of the monotonic clock.
+monotonic_time = getattr(time, 'perf_counter', time.time)
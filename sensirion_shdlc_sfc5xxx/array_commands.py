@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+# (c) Copyright 2020 Sensirion AG, Switzerland
+
+from __future__ import absolute_import, division, print_function
+from struct import Struct
+from .commands import Sfc5xxxCmdReadMeasuredValueBuffer
+
+import logging
+log = logging.getLogger(__name__)
+
+# Header of the "read buffer" response (lost values, remaining values,
+# sampling time).
+_BUFFER_HEADER = Struct(">IIf")
+
+
+def import_numpy():
+    """
+    Import the optional dependency `NumPy <https://numpy.org/>`_.
+
+    :raises ImportError:
+        If NumPy is not installed.
+    :return:
+        The ``numpy`` module.
+    """
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError(
+            "NumPy is required for array support. Install it with "
+            "'pip install sensirion-shdlc-sfc5xxx[numpy]'.")
+    return numpy
+
+
+class Sfc5xxxCmdReadMeasuredValueBufferArray(
+        Sfc5xxxCmdReadMeasuredValueBuffer):
+    """
+    Read Measured Value Buffer Command with NumPy array response.
+
+    Same as
+    :py:class:`~sensirion_shdlc_sfc5xxx.commands.read_measured_value_buffer.Sfc5xxxCmdReadMeasuredValueBuffer`,
+    but the measured values are returned as a NumPy array instead of a list
+    of floats. The array is a read-only big-endian float32 view on the
+    received payload, i.e. the values are not copied nor converted.
+
+    .. note:: This command requires `NumPy <https://numpy.org/>`_ to be
+              installed.
+    """  # noqa: E501
+
+    @staticmethod
+    def interpret_response(data):
+        """
+        :return:
+            - lost_value_count (int) -
+              Number of values lost due to buffer overrun.
+            - remaining_value_count (int) -
+              The number of values which remains in the buffer after this
+              command call.
+            - sampling_time (float) -
+              Time between the measured values in Seconds.
+            - measured_values (numpy.ndarray) -
+              The measured values read from the ring buffer (0...60 values)
+              with the specified scaling, as big-endian float32 array.
+        :rtype: tuple
+        """
+        numpy = import_numpy()
+        lost_value_count, remaining_value_count, sampling_time = \
+            _BUFFER_HEADER.unpack_from(data)
+        measured_values = numpy.frombuffer(
+            data, dtype='>f4', count=(len(data) - 12) // 4, offset=12)
+        return lost_value_count, \
+            remaining_value_count, \
+            sampling_time, \
+            measured_values
@@ -0,0 +1,233 @@
+# -*- coding: utf-8 -*-
+# (c) Copyright 2020 Sensirion AG, Switzerland
+
+from __future__ import absolute_import, division, print_function
+from functools import partial
+from weakref import WeakKeyDictionary
+from .device import Sfc5xxxShdlcDevice
+import asyncio
+import inspect
+
+import logging
+log = logging.getLogger(__name__)
+
+
+# One lock per event loop and connection (i.e. per bus), shared by all
+# devices on that bus. Locks are bound to an event loop, so a connection used
+# from several loops (e.g. successive asyncio.run() calls) needs one per loop.
+_CONNECTION_LOCKS = WeakKeyDictionary()
+
+# Get the event loop running the current coroutine (Python >= 3.7)
+_get_running_loop = getattr(asyncio, 'get_running_loop',
+                            asyncio.get_event_loop)
+
+
+def _get_connection_lock(loop, connection):
+    """
+    Get the asyncio lock of a connection, creating it if needed. Must be
+    called from a coroutine running in the given loop.
+
+    :param asyncio.AbstractEventLoop loop:
+        The running event loop.
+    :param ~sensirion_shdlc_driver.connection.ShdlcConnection connection:
+        The connection.
+    :return: The lock of the connection.
+    :rtype: asyncio.Lock
+    """
+    locks = _CONNECTION_LOCKS.get(loop)
+    if locks is None:
+        locks = WeakKeyDictionary()
+        _CONNECTION_LOCKS[loop] = locks
+    lock = locks.get(connection)
+    if lock is None:
+        lock = asyncio.Lock()
+        locks[connection] = lock
+    return lock
+
+
+class AsyncSfc5xxxShdlcDevice(object):
+    """
+    Sfc5xxx device with an asyncio interface.
+
+    This class provides all methods of
+    :py:class:`~sensirion_shdlc_sfc5xxx.device.Sfc5xxxShdlcDevice` as
+    coroutines, so many devices on many ports can be used from a single event
+    loop:
+
+    .. sourcecode:: python
+
+        device = AsyncSfc5xxxShdlcDevice(ShdlcConnection(port), 0)
+        flow = await device.read_measured_value(Sfc5xxxScaling.PHYSICAL)
+
+    Since the serial port only supports blocking I/O, the commands are
+    executed in an executor (by default the default executor of the event
+    loop, which is shared by all devices). Commands of devices on the same
+    connection are serialized with an asyncio lock, so waiting for the bus
+    does not occupy a worker thread. Commands on different connections are
+    executed concurrently.
+
+    .. note:: Callbacks passed to
+              :py:meth:`~sensirion_shdlc_sfc5xxx.async_device.AsyncSfc5xxxShdlcDevice.update_firmware`
+              are called from the executor thread, not from the event loop.
+    """  # noqa: E501
+
+    def __init__(self, connection, slave_address, executor=None):
+        """
+        Create an asynchronous Sfc5xxx device instance on an SHDLC
+        connection.
+
+        .. note:: This constructor does not communicate with the device, so
+                  it's possible to instantiate an object even if the device is
+                  not connected or powered yet.
+
+        :param ~sensirion_shdlc_driver.connection.ShdlcConnection connection:
+            The connection used for the communication.
+        :param byte slave_address:
+            The address of the device. The default address of the SFC5xxx is 0.
+        :param ~concurrent.futures.Executor executor:
+            The executor used to execute the blocking commands. If ``None``,
+            the default executor of the event loop is used.
+        """
+        super(AsyncSfc5xxxShdlcDevice, self).__init__()
+        self._device = Sfc5xxxShdlcDevice(connection, slave_address)
+        self._executor = executor
+
+    @property
+    def device(self):
+        """
+        Get the underlying synchronous device.
+
+        :return: The synchronous device object.
+        :rtype: ~sensirion_shdlc_sfc5xxx.device.Sfc5xxxShdlcDevice
+        """
+        return self._device
+
+    @property
+    def connection(self):
+        """
+        Get the used SHDLC connection.
+
+        :return: The used SHDLC connection.
+        :rtype: :py:class:`~sensirion_shdlc_driver.connection.ShdlcConnection`
+        """
+        return self._device.connection
+
+    @property
+    def slave_address(self):
+        """
+        Get the slave address (not read from the device!).
+
+        :return: The slave address.
+        :rtype: byte
+        """
+        return self._device.slave_address
+
+    @property
+    def last_error_flag(self):
+        """
+        Get the error flag which was received with the last response of the
+        device.
+
+        :return: True if the device indicated an error, False otherwise.
+        :rtype: bool
+        """
+        return self._device.last_error_flag
+
+    async def _call(self, function, *args, **kwargs):
+        """
+        Call a blocking function in the executor while holding the lock of
+        the connection.
+
+        If the calling coroutine is cancelled, the lock is still held until
+        the blocking function has returned, since it cannot be interrupted.
+
+        :param callable function: The function to call.
+        :return: The return value of the function.
+        """
+        loop = _get_running_loop()
+        lock = _get_connection_lock(loop, self._device.connection)
+        await lock.acquire()
+        try:
+            future = loop.run_in_executor(
+                self._executor, partial(function, *args, **kwargs))
+        except BaseException:
+            lock.release()
+            raise
+
+        def release(future):
+            lock.release()
+            if not future.cancelled():
+                future.exception()  # Avoid warnings if nobody awaits it
+
+        future.add_done_callback(release)
+        return await asyncio.shield(future)
+
+    def stream_measured_value_buffer(self, scaling, max_reads=100,
+                                     as_array=False):
+        """
+        Read the measured flow value buffer frame by frame.
+
+        Asynchronous variant of
+        :py:meth:`~sensirion_shdlc_sfc5xxx.device.Sfc5xxxShdlcDevice.stream_measured_value_buffer`,
+        to be used with ``async for``. The connection is released between
+        the frames, so other devices on the same bus can communicate in the
+        meantime.
+
+        :return:
+            An asynchronous iterator yielding one object per received frame.
+            See
+            :py:class:`~sensirion_shdlc_sfc5xxx.types.Sfc5xxxReadBufferResponse`
+            for details.
+        """  # noqa: E501
+        generator = self._device.stream_measured_value_buffer(
+            scaling, max_reads, as_array)
+        return _AsyncFrameIterator(self, generator)
+
+
+class _AsyncFrameIterator(object):
+    """
+    Asynchronous iterator which fetches the items of a blocking generator in
+    the executor of an
+    :py:class:`~sensirion_shdlc_sfc5xxx.async_device.AsyncSfc5xxxShdlcDevice`.
+    """
+
+    def __init__(self, device, generator):
+        super(_AsyncFrameIterator, self).__init__()
+        self._device = device
+        self._generator = generator
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        # StopIteration cannot be passed through a future, thus use a default
+        # value to detect the end of the generator.
+        frame = await self._device._call(next, self._generator, None)
+        if frame is None:
+            raise StopAsyncIteration()
+        return frame
+
+
+def _make_coroutine(name, function):
+    """
+    Create a coroutine method which calls a method of the underlying
+    synchronous device.
+
+    :param str name: The method name.
+    :param callable function: The method of the synchronous device class.
+    :return: The coroutine method.
+    """
+    async def method(self, *args, **kwargs):
+        return await self._call(getattr(self._device, name), *args, **kwargs)
+    method.__name__ = name
+    method.__doc__ = function.__doc__
+    return method
+
+
+# Provide all public methods of the synchronous device as coroutines.
+for _name, _function in inspect.getmembers(Sfc5xxxShdlcDevice,
+                                           inspect.isfunction):
+    if not _name.startswith('_') and \
+            not hasattr(AsyncSfc5xxxShdlcDevice, _name):
+        setattr(AsyncSfc5xxxShdlcDevice, _name,
+                _make_coroutine(_name, _function))
@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+# (c) Copyright 2020 Sensirion AG, Switzerland
+
+from __future__ import absolute_import, division, print_function
+from ._clock import monotonic_time
+import time
+
+import logging
+log = logging.getLogger(__name__)
+
+
+class Sfc5xxxBatchExecutor(object):
+    """
+    Executes a batch of commands for (possibly many) devices on the same
+    connection with as little dead time between the frames as possible:
+
+      * The command objects (i.e. the encoded requests) are created before
+        the batch is executed.
+      * The port is locked during the whole batch, so frames of other
+        threads don't get in between.
+      * Commands which need post processing time in the device (e.g. a
+        device reset) don't block the bus. While a device is busy, the
+        commands for other devices are sent. The commands of each single
+        device are always sent in the order they were added.
+
+    .. sourcecode:: python
+
+        batch = Sfc5xxxBatchExecutor(connection)
+        for device in devices:
+            batch.add(device, Sfc5xxxCmdReadMeasuredValue(scaling))
+        flows = batch.execute()
+
+    .. note:: SHDLC is a master/slave protocol, typically on a half-duplex
+              bus (RS485). So a request can only be sent after the response
+              to the previous request was received, i.e. there is never
+              more than one request in flight.
+    """
+
+    def __init__(self, connection):
+        """
+        Constructor.
+
+        :param ~sensirion_shdlc_driver.connection.ShdlcConnection connection:
+            The connection used for the communication. All devices added to
+            the batch must use this connection.
+        """
+        super(Sfc5xxxBatchExecutor, self).__init__()
+        self._connection = connection
+        self._requests = []
+
+    def __len__(self):
+        return len(self._requests)
+
+    def add(self, device, command):
+        """
+        Add a command to the batch.
+
+        :param ~sensirion_shdlc_sfc5xxx.device.Sfc5xxxShdlcDevice device:
+            The device to send the command to.
+        :param ~sensirion_shdlc_driver.command.ShdlcCommand command:
+            The command to send.
+        :return: The index of the result returned by :py:meth:`execute`.
+        :rtype: int
+        """
+        if device.connection is not self._connection:
+            raise ValueError("The device uses another connection!")
+        self._requests.append((device, command))
+        return len(self._requests) - 1
+
+    def clear(self):
+        """
+        Remove all commands from the batch.
+        """
+        del self._requests[:]
+
+    def execute(self, raise_errors=True):
+        """
+        Execute all commands of the batch. The batch is cleared afterwards.
+
+        :param bool raise_errors:
+            If ``True``, the execution is stopped at the first failed
+            command and its exception is raised. If ``False``, all commands
+            are executed and the exceptions of failed commands are returned
+            in place of their results.
+        :return:
+            The interpreted responses of all commands, in the order the
+            commands were added.
+        :rtype:
+            list
+        """
+        requests, self._requests = list(enumerate(self._requests)), []
+        results = [None] * len(requests)
+        busy_until = dict()  # Post processing end time by slave address
+        with self._connection.port.lock:
+            try:
+                while requests:
+                    position, wait_time = self._get_next_request(requests,
+                                                                 busy_until)
+                    if position is None:
+                        time.sleep(wait_time)
+                        continue
+                    index, (device, command) = requests.pop(position)
+                    try:
+                        results[index] = device._execute_no_wait(command)
+                    except Exception as e:
+                        if raise_errors:
+                            raise
+                        results[index] = e
+                    finally:
+                        if command.post_processing_time > 0.0:
+                            busy_until[device.slave_address] = \
+                                monotonic_time() + command.post_processing_time
+            finally:
+                # Leave the bus in the same state as after sequential
+                # execution, also if a command failed.
+                if busy_until:
+                    remaining = max(busy_until.values()) - monotonic_time()
+                    if remaining > 0.0:
+                        time.sleep(remaining)
+        return results
+
+    @staticmethod
+    def _get_next_request(requests, busy_until):
+        """
+        Get the next request to send, i.e. the first request of the first
+        device which is not busy with post processing.
+
+        :param list requests: The pending requests.
+        :param dict busy_until: Post processing end time by slave address.
+        :return: The position of the request (or ``None`` if all devices
+                 with pending requests are busy) and the time to wait until
+                 the first of them is ready.
+        :rtype: int/None, float
+        """
+        now = monotonic_time()
+        wait_time = None
+        visited = set()
+        for position, (_, (device, _)) in enumerate(requests):
+            address = device.slave_address
+            if address in visited:
+                continue
+            visited.add(address)
+            remaining = busy_until.get(address, 0.0) - now
+            if remaining <= 0.0:
+                busy_until.pop(address, None)
+                return position, 0.0
+            wait_time = min(remaining, wait_time or remaining)
+        return None, wait_time
@@ -0,0 +1,325 @@
+# -*- coding: utf-8 -*-
+# (c) Copyright 2020 Sensirion AG, Switzerland
+
+from __future__ import absolute_import, division, print_function
+from array import array
+from threading import Event, Thread
+from .poll_scheduler import Sfc5xxxPollScheduler
+from ._clock import monotonic_time
+import time
+
+import logging
+log = logging.getLogger(__name__)
+
+
+class Sfc5xxxBufferReader(object):
+    """
+    Background reader for the measured flow value buffer of an SFC5xxx.
+
+    This class runs a thread which periodically drains the ring buffer of the
+    device by calling
+    :py:meth:`~sensirion_shdlc_sfc5xxx.device.Sfc5xxxShdlcDevice.read_measured_value_buffer`.
+    The read interval is determined by a
+    :py:class:`~sensirion_shdlc_sfc5xxx.poll_scheduler.Sfc5xxxPollScheduler`
+    from the sampling time and the number of remaining values reported by the
+    device, so the buffer is read often enough to avoid overruns, but not more
+    often than needed.
+
+    For every received value, a timestamp is reconstructed from the sampling
+    time and the time of reception. Values and timestamps are stored in a
+    fixed-size ring which can be read by any number of consumers without
+    blocking the reader thread (see
+    :py:meth:`~sensirion_shdlc_sfc5xxx.buffer_reader.Sfc5xxxBufferReader.read`).
+
+    .. note:: This class can be used in a "with"-statement, which starts the
+              thread on entering and stops it on leaving the statement.
+
+    .. warning:: While the reader is running, other threads may still
+                 communicate with the device since every SHDLC command is
+                 executed atomically. But do not read the measured value
+                 buffer from anywhere else, otherwise values are missing in
+                 the ring of this reader.
+    """  # noqa: E501
+
+    def __init__(self, device, scaling, capacity=65536, scheduler=None,
+                 callback=None):
+        """
+        Constructor.
+
+        .. note:: This constructor does not communicate with the device and
+                  does not start the thread, call
+                  :py:meth:`~sensirion_shdlc_sfc5xxx.buffer_reader.Sfc5xxxBufferReader.start`
+                  to start reading.
+
+        :param ~sensirion_shdlc_sfc5xxx.device.Sfc5xxxShdlcDevice device:
+            The device to read from.
+        :param ~sensirion_shdlc_sfc5xxx.definitions.Sfc5xxxScaling scaling:
+            Defines with which scale resp. unit the measured flow values should
+            be read.
+        :param int capacity:
+            Number of samples the ring can hold. If consumers read too
+            rarely, the oldest samples are overwritten.
+        :param ~sensirion_shdlc_sfc5xxx.poll_scheduler.Sfc5xxxPollScheduler scheduler:
+            The scheduler which determines when to read the buffer. If
+            ``None``, a scheduler with default parameters is used. Its maximum
+            interval is also used as retry interval after communication
+            errors.
+        :param callable callback:
+            Optional function called in the reader thread for every received
+            response, with the response and the reconstructed timestamp of
+            its first value (``None`` if it contains no values) as
+            parameters. It must return quickly, otherwise values are lost.
+        """  # noqa: E501
+        super(Sfc5xxxBufferReader, self).__init__()
+        if capacity < 1:
+            raise ValueError("Capacity must be at least 1!")
+        self._device = device
+        self._scaling = scaling
+        self._capacity = int(capacity)
+        self._scheduler = scheduler or Sfc5xxxPollScheduler()
+        self._callback = callback
+        self._timestamps = array('d', [0.0]) * self._capacity
+        self._values = array('d', [0.0]) * self._capacity
+        self._count = 0
+        self._read_count = 0
+        self._lost_values = 0
+        self._sampling_time = None
+        self._last_timestamp = None
+        self._last_error = None
+        self._stop_event = Event()
+        self._thread = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    @property
+    def capacity(self):
+        """
+        Get the number of samples the ring can hold.
+
+        :return: The ring capacity.
+        :rtype: int
+        """
+        return self._capacity
+
+    @property
+    def scheduler(self):
+        """
+        Get the scheduler which determines when to read the buffer.
+
+        :return: The used scheduler.
+        :rtype: ~sensirion_shdlc_sfc5xxx.poll_scheduler.Sfc5xxxPollScheduler
+        """
+        return self._scheduler
+
+    @property
+    def is_running(self):
+        """
+        Check whether the reader thread is running.
+
+        :return: ``True`` if the thread is running, ``False`` otherwise.
+        :rtype: bool
+        """
+        return self._thread is not None and self._thread.is_alive()
+
+    @property
+    def count(self):
+        """
+        Get the total number of samples received since the reader was created.
+        This is also the index which the next received sample will get.
+
+        :return: Total number of received samples.
+        :rtype: int
+        """
+        return self._count
+
+    @property
+    def read_count(self):
+        """
+        Get the total number of "read buffer" commands sent to the device.
+
+        :return: Number of sent commands.
+        :rtype: int
+        """
+        return self._read_count
+
+    @property
+    def lost_values(self):
+        """
+        Get the total number of values lost due to buffer overruns in the
+        device. This should stay zero in normal operation.
+
+        :return: Number of lost values.
+        :rtype: int
+        """
+        return self._lost_values
+
+    @property
+    def sampling_time(self):
+        """
+        Get the sampling time reported by the device.
+
+        :return: The sampling time [s], or ``None`` if not known yet.
+        :rtype: float/None
+        """
+        return self._sampling_time
+
+    @property
+    def last_error(self):
+        """
+        Get the last exception raised while reading the buffer.
+
+        :return: The last exception, or ``None`` if no error occurred.
+        :rtype: Exception/None
+        """
+        return self._last_error
+
+    def start(self):
+        """
+        Start the reader thread. Does nothing if it is already running.
+        """
+        if not self.is_running:
+            self._stop_event.clear()
+            self._thread = Thread(target=self._run,
+                                  name="Sfc5xxxBufferReader")
+            self._thread.daemon = True
+            self._thread.start()
+
+    def stop(self, timeout=None):
+        """
+        Stop the reader thread and wait until it has terminated.
+
+        :param float timeout:
+            Maximum time [s] to wait for the thread, or ``None`` to wait
+            forever.
+        """
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def read(self, start=None):
+        """
+        Read samples from the ring without blocking.
+
+        :param int start:
+            Index of the first sample to return, typically the index returned
+            by the previous call. If ``None``, all samples still contained in
+            the ring are returned. If the requested samples have already been
+            overwritten, only the still available samples are returned.
+        :return:
+            The timestamps (seconds since the epoch), the corresponding
+            measured values, and the index to pass to the next call.
+        :rtype:
+            list(float), list(float), int
+        """
+        end = self._count
+        first = max(end - self._capacity, 0 if start is None else start)
+        timestamps = self._copy(self._timestamps, first, end)
+        values = self._copy(self._values, first, end)
+        # If the reader thread has overwritten samples while copying, drop
+        # them since they may be inconsistent. The slot of the sample with
+        # index "count" might be written in this moment, thus the "+ 1".
+        overwritten = self._count + 1 - self._capacity - first
+        if overwritten > 0:
+            timestamps = timestamps[overwritten:]
+            values = values[overwritten:]
+        return timestamps, values, end
+
+    def _copy(self, ring, first, end):
+        """
+        Copy a range of samples out of a ring.
+
+        :param array ring: The ring to copy from.
+        :param int first: Index of the first sample to copy.
+        :param int end: Index after the last sample to copy.
+        :return: The copied samples.
+        :rtype: list(float)
+        """
+        if first >= end:
+            return []
+        begin = first % self._capacity
+        stop = begin + (end - first)
+        if stop <= self._capacity:
+            return ring[begin:stop].tolist()
+        return ring[begin:].tolist() + ring[:stop - self._capacity].tolist()
+
+    def _run(self):
+        """
+        Thread function.
+        """
+        while not self._stop_event.is_set():
+            start_time = monotonic_time()
+            try:
+                response = self._device.read_measured_value_buffer(
+                    self._scaling)
+                self._last_error = None
+            except Exception as e:
+                log.warning("Failed to read measured value buffer: {}"
+                            .format(e))
+                self._last_error = e
+                self._stop_event.wait(self._scheduler.max_interval)
+                continue
+            end_time = monotonic_time()
+            # Sample timestamps are wall clock times, only the scheduling is
+            # based on the monotonic clock
+            self._process(response, time.time())
+            self._stop_event.wait(self._scheduler.update(
+                response, end_time - start_time, end_time))
+
+    def _process(self, response, receive_time):
+        """
+        Reconstruct the timestamps of a buffer response and append the values
+        to the ring.
+
+        :param ~sensirion_shdlc_sfc5xxx.types.Sfc5xxxReadBufferResponse response:
+            The response to process.
+        :param float receive_time:
+            Time when the response was received.
+        """  # noqa: E501
+        self._read_count += response.read_count
+        self._lost_values += response.lost_values
+        self._sampling_time = response.sampling_time
+        if len(response.values) == 0:
+            self._notify(response, None)
+            return
+        period = response.sampling_time
+        # The newest received value was measured "remaining_values" periods
+        # before the response was received.
+        estimated = receive_time - \
+            (response.remaining_values + len(response.values) - 1) * period
+        if self._last_timestamp is not None:
+            # Continue the previous timestamps to avoid jitter, as long as
+            # they do not drift away too far from the host clock.
+            expected = self._last_timestamp + \
+                (response.lost_values + 1) * period
+            if abs(expected - estimated) <= max(2 * period, 0.05):
+                estimated = expected
+        for i, value in enumerate(response.values):
+            index = self._count % self._capacity
+            self._timestamps[index] = estimated + i * period
+            self._values[index] = value
+            self._count += 1
+        self._last_timestamp = estimated + (len(response.values) - 1) * period
+        self._notify(response, estimated)
+
+    def _notify(self, response, first_timestamp):
+        """
+        Call the callback (if any) with a processed response.
+
+        :param ~sensirion_shdlc_sfc5xxx.types.Sfc5xxxReadBufferResponse response:
+            The processed response.
+        :param float first_timestamp:
+            The timestamp of the first value, or ``None`` if there are no
+            values.
+        """  # noqa: E501
+        if self._callback is None:
+            return
+        try:
+            self._callback(response, first_timestamp)
+        except Exception as e:
+            log.error("Buffer reader callback failed: {}".format(e))
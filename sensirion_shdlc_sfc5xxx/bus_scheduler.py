@@ -0,0 +1,490 @@
+# -*- coding: utf-8 -*-
+# (c) Copyright 2020 Sensirion AG, Switzerland
+
+from __future__ import absolute_import, division, print_function
+from enum import IntEnum
+from threading import Condition, Thread
+from .poll_scheduler import Sfc5xxxPollScheduler
+from ._clock import monotonic_time
+
+import logging
+log = logging.getLogger(__name__)
+
+
+class Sfc5xxxJobPriority(IntEnum):
+    """
+    An enum containing the priorities of jobs executed by the
+    :py:class:`~sensirion_shdlc_sfc5xxx.bus_scheduler.Sfc5xxxBusScheduler`.
+    Jobs with a lower value are executed first.
+    """
+
+    HIGH = 0  #: E.g. setpoint changes which must be applied immediately.
+    NORMAL = 1  #: E.g. periodically reading the measured value.
+    LOW = 2  #: E.g. bulk transfers like reading the flow value buffer.
+
+
+class Sfc5xxxBusJob(object):
+    """
+    A job executed by the
+    :py:class:`~sensirion_shdlc_sfc5xxx.bus_scheduler.Sfc5xxxBusScheduler`.
+
+    Jobs are created by the scheduler, so you typically don't need to create
+    instances yourself. The returned objects can be used to retrieve the
+    achieved execution rate or to remove the job from the scheduler.
+    """
+
+    def __init__(self, device, function, period, priority, callback):
+        """
+        Constructor.
+
+        :param ~sensirion_shdlc_sfc5xxx.device.Sfc5xxxShdlcDevice device:
+            The device the job belongs to.
+        :param callable function:
+            The function to execute, taking the device as parameter.
+        :param float period:
+            The execution period [s], or ``None`` for one-shot jobs.
+        :param ~sensirion_shdlc_sfc5xxx.bus_scheduler.Sfc5xxxJobPriority priority:
+            The job priority.
+        :param callable callback:
+            Optional function called after every execution with the job, the
+            result and the raised exception (or ``None``) as parameters.
+        """  # noqa: E501
+        super(Sfc5xxxBusJob, self).__init__()
+        self._device = device
+        self._function = function
+        self._period = period
+        self._priority = Sfc5xxxJobPriority(priority)
+        self._callback = callback
+        self._due_time = 0.0
+        self._first_execution_time = None
+        self._last_execution_time = None
+        self._executions = 0
+        self._errors = 0
+
+    @property
+    def device(self):
+        """
+        Get the device the job belongs to.
+
+        :return: The device.
+        :rtype: ~sensirion_shdlc_sfc5xxx.device.Sfc5xxxShdlcDevice
+        """
+        return self._device
+
+    @property
+    def period(self):
+        """
+        Get the execution period.
+
+        :return: The period [s], or ``None`` for one-shot jobs.
+        :rtype: float/None
+        """
+        return self._period
+
+    @property
+    def priority(self):
+        """
+        Get the job priority.
+
+        :return: The priority.
+        :rtype: ~sensirion_shdlc_sfc5xxx.bus_scheduler.Sfc5xxxJobPriority
+        """
+        return self._priority
+
+    @property
+    def due_time(self):
+        """
+        Get the point in time when the job should be executed next time.
+
+        :return: Time [s] of the monotonic scheduling clock.
+        :rtype: float
+        """
+        return self._due_time
+
+    @property
+    def executions(self):
+        """
+        Get the number of executions.
+
+        :return: Number of executions (including failed ones).
+        :rtype: int
+        """
+        return self._executions
+
+    @property
+    def errors(self):
+        """
+        Get the number of failed executions.
+
+        :return: Number of executions which raised an exception.
+        :rtype: int
+        """
+        return self._errors
+
+    @property
+    def rate(self):
+        """
+        Get the achieved execution rate.
+
+        :return: Executions per second, or ``None`` if not executed at least
+                 twice yet.
+        :rtype: float/None
+        """
+        if self._executions < 2:
+            return None
+        elapsed = self._last_execution_time - self._first_execution_time
+        return (self._executions - 1) / elapsed if elapsed > 0 else None
+
+    def _execute(self, now):
+        """
+        Execute the job and call its callback.
+
+        :param float now: The current time.
+        :return: The exception raised by the job, or ``None``.
+        :rtype: Exception/None
+        """
+        result, error = None, None
+        start_time = monotonic_time()
+        try:
+            result = self._function(self._device)
+        except Exception as e:
+            log.warning("Bus job on device {} failed: {}".format(
+                self._device.slave_address, e))
+            error = e
+            self._errors += 1
+        end_time = monotonic_time()
+        self._executions += 1
+        if self._first_execution_time is None:
+            self._first_execution_time = now
+        self._last_execution_time = now
+        self._reschedule(result, error, end_time - start_time, end_time)
+        if self._callback is not None:
+            try:
+                self._callback(self, result, error)
+            except Exception as e:
+                log.error("Bus job callback failed: {}".format(e))
+        return error
+
+    def _reschedule(self, result, error, duration, now):
+        """
+        Calculate the next due time after an execution.
+
+        :param result: The result of the execution.
+        :param Exception error: The raised exception, or ``None``.
+        :param float duration: Execution duration [s].
+        :param float now: The current time.
+        """
+        if self._period is not None:
+            # Do not try to catch up missed executions to avoid bursts.
+            self._due_time = max(self._due_time + self._period, now)
+
+
+class _Sfc5xxxBufferJob(Sfc5xxxBusJob):
+    """
+    Job which reads the flow value buffer of a device, scheduled by a
+    :py:class:`~sensirion_shdlc_sfc5xxx.poll_scheduler.Sfc5xxxPollScheduler`.
+    """
+
+    def __init__(self, device, scaling, priority, callback, poll_scheduler):
+        super(_Sfc5xxxBufferJob, self).__init__(
+            device, lambda d: d.read_measured_value_buffer(scaling),
+            poll_scheduler.max_interval, priority, callback)
+        self._poll_scheduler = poll_scheduler
+
+    @property
+    def poll_scheduler(self):
+        """
+        Get the scheduler used to predict the fill level of the buffer.
+
+        :return: The poll scheduler.
+        :rtype: ~sensirion_shdlc_sfc5xxx.poll_scheduler.Sfc5xxxPollScheduler
+        """
+        return self._poll_scheduler
+
+    def _reschedule(self, result, error, duration, now):
+        if error is None:
+            self._poll_scheduler.update(result, duration, now)
+            self._due_time = self._poll_scheduler.next_poll_time
+        else:
+            self._due_time = now + self._poll_scheduler.max_interval
+
+
+class Sfc5xxxBusScheduler(object):
+    """
+    Scheduler for many SFC5xxx devices connected to the same bus.
+
+    Since SHDLC is a master/slave protocol, only one command can be executed
+    on a bus at the same time. This class executes jobs of all devices of a
+    bus from a single thread, in the following order:
+
+    1. Only jobs which are due are executed. If no job is due, the thread
+       sleeps until the next job gets due (or a new job is submitted).
+    2. Jobs with higher priority are executed first, e.g. setpoint changes
+       submitted with
+       :py:meth:`~sensirion_shdlc_sfc5xxx.bus_scheduler.Sfc5xxxBusScheduler.submit`
+       jump ahead of periodic buffer reads.
+    3. For jobs of the same priority, the device which was served least
+       recently is served first, so every device gets its fair share of the
+       bus time.
+
+    Jobs are executed back-to-back as long as there are due jobs, so there is
+    no idle time on the bus between them. The achieved execution rate of each
+    job and device can be retrieved at any time to check if the bus is able
+    to handle the load.
+
+    .. note:: This class can be used in a "with"-statement, which starts the
+              thread on entering and stops it on leaving the statement.
+    """  # noqa: E501
+
+    def __init__(self, lookahead=0.0):
+        """
+        Constructor.
+
+        :param float lookahead:
+            Jobs which get due within this time [s] are executed early if the
+            bus would be idle otherwise. This allows to pack jobs closer
+            together at the cost of slightly less regular periods.
+        """
+        super(Sfc5xxxBusScheduler, self).__init__()
+        self._lookahead = float(lookahead)
+        self._jobs = []
+        self._last_service_time = dict()
+        self._condition = Condition()
+        self._running = False
+        self._thread = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    @property
+    def jobs(self):
+        """
+        Get all currently scheduled jobs.
+
+        :return: List of jobs.
+        :rtype: list(~sensirion_shdlc_sfc5xxx.bus_scheduler.Sfc5xxxBusJob)
+        """
+        with self._condition:
+            return list(self._jobs)
+
+    @property
+    def is_running(self):
+        """
+        Check whether the scheduler thread is running.
+
+        :return: ``True`` if the thread is running, ``False`` otherwise.
+        :rtype: bool
+        """
+        return self._thread is not None and self._thread.is_alive()
+
+    def add_periodic(self, device, function, period,
+                     priority=Sfc5xxxJobPriority.NORMAL, callback=None):
+        """
+        Add a job which is executed periodically.
+
+        :param ~sensirion_shdlc_sfc5xxx.device.Sfc5xxxShdlcDevice device:
+            The device the job belongs to.
+        :param callable function:
+            The function to execute, taking the device as parameter. For
+            example ``lambda d: d.read_measured_value(scaling)``.
+        :param float period:
+            The execution period [s].
+        :param ~sensirion_shdlc_sfc5xxx.bus_scheduler.Sfc5xxxJobPriority priority:
+            The job priority.
+        :param callable callback:
+            Optional function called after every execution with the job, the
+            result and the raised exception (or ``None``) as parameters.
+        :return: The added job.
+        :rtype: ~sensirion_shdlc_sfc5xxx.bus_scheduler.Sfc5xxxBusJob
+        """  # noqa: E501
+        if period <= 0:
+            raise ValueError("Period must be greater than zero!")
+        return self._add(Sfc5xxxBusJob(device, function, float(period),
+                                       priority, callback))
+
+    def add_buffer_reader(self, device, scaling,
+                          priority=Sfc5xxxJobPriority.LOW, callback=None,
+                          poll_scheduler=None):
+        """
+        Add a job which periodically reads the flow value buffer with
+        :py:meth:`~sensirion_shdlc_sfc5xxx.device.Sfc5xxxShdlcDevice.read_measured_value_buffer`.
+        The period is determined dynamically by a
+        :py:class:`~sensirion_shdlc_sfc5xxx.poll_scheduler.Sfc5xxxPollScheduler`.
+
+        :param ~sensirion_shdlc_sfc5xxx.device.Sfc5xxxShdlcDevice device:
+            The device to read from.
+        :param ~sensirion_shdlc_sfc5xxx.definitions.Sfc5xxxScaling scaling:
+            Defines with which scale resp. unit the measured flow values should
+            be read.
+        :param ~sensirion_shdlc_sfc5xxx.bus_scheduler.Sfc5xxxJobPriority priority:
+            The job priority.
+        :param callable callback:
+            Function called after every execution with the job, the
+            :py:class:`~sensirion_shdlc_sfc5xxx.types.Sfc5xxxReadBufferResponse`
+            and the raised exception (or ``None``) as parameters.
+        :param ~sensirion_shdlc_sfc5xxx.poll_scheduler.Sfc5xxxPollScheduler poll_scheduler:
+            The poll scheduler to use. If ``None``, a scheduler with default
+            parameters is used.
+        :return: The added job.
+        :rtype: ~sensirion_shdlc_sfc5xxx.bus_scheduler.Sfc5xxxBusJob
+        """  # noqa: E501
+        return self._add(_Sfc5xxxBufferJob(
+            device, scaling, priority, callback,
+            poll_scheduler or Sfc5xxxPollScheduler()))
+
+    def submit(self, device, function, priority=Sfc5xxxJobPriority.HIGH,
+               callback=None):
+        """
+        Submit a job which is executed only once, as soon as possible
+        according to its priority. This method is thread-safe, so it can be
+        used to change setpoints from any thread while the scheduler is
+        running.
+
+        :param ~sensirion_shdlc_sfc5xxx.device.Sfc5xxxShdlcDevice device:
+            The device the job belongs to.
+        :param callable function:
+            The function to execute, taking the device as parameter. For
+            example ``lambda d: d.set_setpoint(1.0, scaling)``.
+        :param ~sensirion_shdlc_sfc5xxx.bus_scheduler.Sfc5xxxJobPriority priority:
+            The job priority.
+        :param callable callback:
+            Optional function called after the execution with the job, the
+            result and the raised exception (or ``None``) as parameters.
+        :return: The submitted job.
+        :rtype: ~sensirion_shdlc_sfc5xxx.bus_scheduler.Sfc5xxxBusJob
+        """  # noqa: E501
+        return self._add(Sfc5xxxBusJob(device, function, None, priority,
+                                       callback))
+
+    def remove(self, job):
+        """
+        Remove a job from the scheduler. Does nothing if the job was already
+        removed.
+
+        :param ~sensirion_shdlc_sfc5xxx.bus_scheduler.Sfc5xxxBusJob job:
+            The job to remove.
+        """
+        with self._condition:
+            if job in self._jobs:
+                self._jobs.remove(job)
+
+    def get_rates(self):
+        """
+        Get the achieved execution rate of each device, i.e. the sum of the
+        rates of all its periodic jobs.
+
+        :return: Dictionary with the slave address as key and the rate
+                 [executions per second] as value.
+        :rtype: dict
+        """
+        rates = dict()
+        for job in self.jobs:
+            if job.period is not None:
+                address = job.device.slave_address
+                rates[address] = rates.get(address, 0.0) + (job.rate or 0.0)
+        return rates
+
+    def run_once(self, timeout=0.0):
+        """
+        Execute the next due job, or wait until a job gets due.
+
+        This is called repeatedly by the scheduler thread, but can also be
+        called manually to run the scheduler in the current thread.
+
+        :param float timeout:
+            Maximum time [s] to wait for a job to get due.
+        :return: ``True`` if a job was executed, ``False`` otherwise.
+        :rtype: bool
+        """
+        with self._condition:
+            job, wait_time = self._get_next_job(monotonic_time())
+            if job is None and timeout > 0.0:
+                self._condition.wait(min(wait_time, timeout))
+                job, _ = self._get_next_job(monotonic_time())
+            if job is None:
+                return False
+            if job.period is None:
+                self._jobs.remove(job)
+        now = monotonic_time()
+        job._execute(now)
+        self._last_service_time[job.device] = now
+        return True
+
+    def start(self):
+        """
+        Start the scheduler thread. Does nothing if it is already running.
+        """
+        if not self.is_running:
+            self._running = True
+            self._thread = Thread(target=self._run,
+                                  name="Sfc5xxxBusScheduler")
+            self._thread.daemon = True
+            self._thread.start()
+
+    def stop(self, timeout=None):
+        """
+        Stop the scheduler thread and wait until it has terminated.
+
+        :param float timeout:
+            Maximum time [s] to wait for the thread, or ``None`` to wait
+            forever.
+        """
+        with self._condition:
+            self._running = False
+            self._condition.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _add(self, job):
+        """
+        Add a job and wake up the scheduler thread.
+
+        :param ~sensirion_shdlc_sfc5xxx.bus_scheduler.Sfc5xxxBusJob job:
+            The job to add.
+        :return: The added job.
+        :rtype: ~sensirion_shdlc_sfc5xxx.bus_scheduler.Sfc5xxxBusJob
+        """
+        with self._condition:
+            job._due_time = monotonic_time()
+            self._jobs.append(job)
+            self._condition.notify_all()
+        return job
+
+    def _get_next_job(self, now):
+        """
+        Determine the job to execute next. Must be called with the condition
+        locked.
+
+        :param float now: The current time.
+        :return: The job to execute (or ``None`` if no job is due), and the
+                 time [s] until the next job gets due.
+        :rtype: Sfc5xxxBusJob/None, float
+        """
+        best_job, best_key = None, None
+        next_due_time = None
+        for job in self._jobs:
+            if job.due_time <= now + self._lookahead:
+                key = (job.priority,
+                       self._last_service_time.get(job.device, 0.0),
+                       job.due_time)
+                if best_key is None or key < best_key:
+                    best_job, best_key = job, key
+            elif next_due_time is None or job.due_time < next_due_time:
+                next_due_time = job.due_time
+        if next_due_time is None:
+            wait_time = 1.0
+        else:
+            wait_time = max(next_due_time - self._lookahead - now, 0.0)
+        return best_job, wait_time
+
+    def _run(self):
+        """
+        Thread function.
+        """
+        while self._running:
+            self.run_once(timeout=1.0)
@@ -0,0 +1,297 @@
+# -*- coding: utf-8 -*-
+# (c) Copyright 2020 Sensirion AG, Switzerland
+
+from __future__ import absolute_import, division, print_function
+from sensirion_shdlc_driver.types import FirmwareVersion, HardwareVersion, \
+    ProtocolVersion, Version
+from .calibration_cache import _write_json
+from .device import Sfc5xxxShdlcDevice
+import json
+import os
+
+import logging
+log = logging.getLogger(__name__)
+
+
+# Version of the file format, files with another version are ignored.
+_FORMAT_VERSION = 1
+
+
+def _version_to_list(version):
+    return [version.firmware.major, version.firmware.minor,
+            version.firmware.debug, version.hardware.major,
+            version.hardware.minor, version.protocol.major,
+            version.protocol.minor]
+
+
+def _version_from_list(data):
+    fw_maj, fw_min, fw_dbg, hw_maj, hw_min, pc_maj, pc_min = data
+    return Version(
+        firmware=FirmwareVersion(major=fw_maj, minor=fw_min, debug=fw_dbg),
+        hardware=HardwareVersion(major=hw_maj, minor=hw_min),
+        protocol=ProtocolVersion(major=pc_maj, minor=pc_min)
+    )
+
+
+class Sfc5xxxCachedShdlcDevice(Sfc5xxxShdlcDevice):
+    """
+    Sfc5xxx device which caches values read from the device.
+
+    In contrast to the stateless
+    :py:class:`~sensirion_shdlc_sfc5xxx.device.Sfc5xxxShdlcDevice`, this
+    class remembers values which do not change (or only change through
+    methods of this class):
+
+      * Identity information (serial number, product type, subtype and name,
+        article code and version) is cached permanently and, if a cache file
+        is passed, also stored in that file.
+      * Information about the active calibration and the user defined medium
+        unit is cached until it is invalidated by
+        :py:meth:`~sensirion_shdlc_sfc5xxx.device.Sfc5xxxShdlcDevice.activate_calibration`,
+        :py:meth:`~sensirion_shdlc_sfc5xxx.device.Sfc5xxxShdlcDevice.set_user_defined_medium_unit`,
+        :py:meth:`~sensirion_shdlc_sfc5xxx.device.Sfc5xxxShdlcDevice.device_reset`
+        or
+        :py:meth:`~sensirion_shdlc_sfc5xxx.device.Sfc5xxxShdlcDevice.factory_reset`.
+
+    If the serial number of the device is already known, reconnecting to a
+    device which is contained in the cache file does not need any
+    communication to get its identity:
+
+    .. sourcecode:: python
+
+        device = Sfc5xxxCachedShdlcDevice(connection, 0,
+                                          cache_file='sfc5xxx.json',
+                                          serial_number='21100123')
+        print(device.get_product_name())  # no communication
+
+    .. warning:: The cache can't detect changes done by other hosts or by
+                 other device objects on the same device. Call
+                 :py:meth:`~sensirion_shdlc_sfc5xxx.cached_device.Sfc5xxxCachedShdlcDevice.invalidate`
+                 in that case. If a wrong serial number is passed, the
+                 identity of another device is returned.
+    """  # noqa: E501
+
+    def __init__(self, connection, slave_address, cache_file=None,
+                 serial_number=None):
+        """
+        Create a cached Sfc5xxx device instance on an SHDLC connection.
+
+        :param ~sensirion_shdlc_driver.connection.ShdlcConnection connection:
+            The connection used for the communication.
+        :param byte slave_address:
+            The address of the device. The default address of the SFC5xxx is 0.
+        :param str cache_file:
+            Optional path to a JSON file to load and store the identity
+            information. The file may contain many devices.
+        :param str serial_number:
+            Optional serial number of the device, if already known. If
+            passed, the identity information is loaded from the cache file
+            without any communication.
+        """
+        super(Sfc5xxxCachedShdlcDevice, self).__init__(connection,
+                                                       slave_address)
+        self._cache_file = os.path.expanduser(cache_file) \
+            if cache_file is not None else None
+        self._identity = dict()
+        self._state = dict()
+        if serial_number is not None:
+            self._identity['serial_number'] = serial_number
+            self._load_identity()
+
+    def _read_cache_file(self):
+        """
+        Read all entries of the cache file.
+
+        :return: The identity information of all devices by serial number.
+        :rtype: dict
+        """
+        if self._cache_file is None or not os.path.exists(self._cache_file):
+            return dict()
+        try:
+            with open(self._cache_file, 'r') as f:
+                data = json.load(f)
+            if data.get('version') == _FORMAT_VERSION:
+                return data['devices']
+            log.warning("Ignoring cache file '{}' with unexpected "
+                        "version.".format(self._cache_file))
+        except (IOError, OSError, ValueError, KeyError, AttributeError) as e:
+            log.warning("Ignoring invalid cache file '{}': {}".format(
+                self._cache_file, e))
+        return dict()
+
+    def _load_identity(self):
+        """
+        Load the identity information from the cache file, if available.
+        """
+        serial_number = self._identity['serial_number']
+        entry = self._read_cache_file().get(serial_number)
+        if entry is None:
+            return
+        try:
+            for key in ('product_type', 'product_name', 'article_code'):
+                if key in entry:
+                    self._identity[key] = str(entry[key])
+            if 'product_subtype' in entry:
+                self._identity['product_subtype'] = \
+                    int(entry['product_subtype'])
+            if 'version' in entry:
+                self._identity['version'] = \
+                    _version_from_list(entry['version'])
+        except (TypeError, ValueError) as e:
+            log.warning("Ignoring invalid cache entry of device {}: "
+                        "{}".format(serial_number, e))
+
+    def _store_identity(self):
+        """
+        Store the identity information in the cache file (if any).
+        """
+        if self._cache_file is None:
+            return
+        entry = dict(self._identity)
+        serial_number = entry.pop('serial_number')
+        if 'version' in entry:
+            entry['version'] = _version_to_list(entry['version'])
+        devices = self._read_cache_file()
+        devices[serial_number] = entry
+        _write_json(self._cache_file, {
+            'version': _FORMAT_VERSION,
+            'devices': devices,
+        })
+
+    def _get_identity(self, key, getter):
+        """
+        Get an identity value from the cache, reading it on first use.
+
+        :param str key: The name of the value.
+        :param callable getter: Function to read the value from the device.
+        :return: The value.
+        """
+        value = self._identity.get(key)
+        if value is None and key != 'serial_number' and \
+                self._cache_file is not None and \
+                'serial_number' not in self._identity:
+            # The serial number is the key of the cache file entry, so
+            # reading it may also load the requested value from the file.
+            self.get_serial_number()
+            value = self._identity.get(key)
+        if value is None:
+            value = getter()
+            self._identity[key] = value
+            if key == 'serial_number':
+                self._load_identity()
+            self._store_identity()
+        return value
+
+    def _get_state(self, key, getter):
+        """
+        Get a volatile value from the cache, reading it on first use.
+
+        :param key: The key of the value.
+        :param callable getter: Function to read the value from the device.
+        :return: The value.
+        """
+        value = self._state.get(key)
+        if value is None:
+            value = getter()
+            self._state[key] = value
+        return value
+
+    def invalidate(self, identity=False):
+        """
+        Clear the cached values, so they are read again from the device.
+
+        :param bool identity:
+            If ``True``, also the identity information is cleared (but not
+            removed from the cache file).
+        """
+        self._state.clear()
+        if identity:
+            self._identity.clear()
+
+    def get_product_type(self, as_int=False):
+        product_type = self._get_identity(
+            'product_type', super(Sfc5xxxCachedShdlcDevice,
+                                  self).get_product_type)
+        return int(product_type, 16) if as_int else product_type
+
+    def get_product_subtype(self):
+        return self._get_identity(
+            'product_subtype', super(Sfc5xxxCachedShdlcDevice,
+                                     self).get_product_subtype)
+
+    def get_product_name(self):
+        return self._get_identity(
+            'product_name', super(Sfc5xxxCachedShdlcDevice,
+                                  self).get_product_name)
+
+    def get_article_code(self):
+        return self._get_identity(
+            'article_code', super(Sfc5xxxCachedShdlcDevice,
+                                  self).get_article_code)
+
+    def get_serial_number(self):
+        return self._get_identity(
+            'serial_number', super(Sfc5xxxCachedShdlcDevice,
+                                   self).get_serial_number)
+
+    def get_version(self):
+        return self._get_identity(
+            'version', super(Sfc5xxxCachedShdlcDevice, self).get_version)
+
+    def get_user_defined_medium_unit(self, substitute_wildcards=False):
+        base = super(Sfc5xxxCachedShdlcDevice, self)
+        return self._get_state(
+            ('user_defined_medium_unit', bool(substitute_wildcards)),
+            lambda: base.get_user_defined_medium_unit(substitute_wildcards))
+
+    def set_user_defined_medium_unit(self, unit):
+        self._state.clear()  # affects the fullscale and the wildcards
+        super(Sfc5xxxCachedShdlcDevice, self).set_user_defined_medium_unit(
+            unit)
+
+    def get_user_defined_fullscale(self):
+        return self._get_state(
+            'user_defined_fullscale', super(Sfc5xxxCachedShdlcDevice,
+                                            self).get_user_defined_fullscale)
+
+    def get_current_gas_description(self):
+        return self._get_state(
+            'current_gas_description', super(
+                Sfc5xxxCachedShdlcDevice, self).get_current_gas_description)
+
+    def get_current_gas_id(self):
+        return self._get_state(
+            'current_gas_id', super(Sfc5xxxCachedShdlcDevice,
+                                    self).get_current_gas_id)
+
+    def get_current_gas_unit(self):
+        return self._get_state(
+            'current_gas_unit', super(Sfc5xxxCachedShdlcDevice,
+                                      self).get_current_gas_unit)
+
+    def get_current_fullscale(self):
+        return self._get_state(
+            'current_fullscale', super(Sfc5xxxCachedShdlcDevice,
+                                       self).get_current_fullscale)
+
+    def activate_calibration(self, index):
+        self._state.clear()
+        super(Sfc5xxxCachedShdlcDevice, self).activate_calibration(index)
+
+    def device_reset(self):
+        self._state.clear()
+        super(Sfc5xxxCachedShdlcDevice, self).device_reset()
+
+    def factory_reset(self):
+        self._state.clear()
+        super(Sfc5xxxCachedShdlcDevice, self).factory_reset()
+
+    def update_firmware(self, image, emergency=False, status_callback=None,
+                        progress_callback=None):
+        self._state.clear()
+        self._identity.pop('version', None)
+        if 'serial_number' in self._identity:
+            self._store_identity()  # remove the old version from the file
+        super(Sfc5xxxCachedShdlcDevice, self).update_firmware(
+            image, emergency=emergency, status_callback=status_callback,
+            progress_callback=progress_callback)
@@ -0,0 +1,228 @@
+# -*- coding: utf-8 -*-
+# (c) Copyright 2020 Sensirion AG, Switzerland
+
+from __future__ import absolute_import, division, print_function
+from datetime import datetime
+from .types import Sfc5xxxCalibration, Sfc5xxxCalibrationConditions
+from .units import Sfc5xxxMediumUnit
+import json
+import os
+import re
+import tempfile
+
+import logging
+log = logging.getLogger(__name__)
+
+
+# Version of the file format, files with another version are ignored.
+_FORMAT_VERSION = 1
+
+_DATETIME_FORMAT = '%Y-%m-%dT%H:%M'
+
+
+def _write_json(path, data):
+    """
+    Write a JSON file atomically, i.e. concurrent readers never see a
+    partially written file. The parent directory is created if needed.
+
+    :param str path: The file path.
+    :param data: The data to write.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(data, f, indent=2, sort_keys=True)
+        if os.path.exists(path) and not hasattr(os, 'replace'):
+            os.remove(path)  # Python 2 on Windows can't rename over it
+        getattr(os, 'replace', os.rename)(tmp_path, path)
+    except Exception:
+        os.remove(tmp_path)
+        raise
+
+
+def _conditions_to_dict(conditions):
+    return {
+        'company': conditions.company,
+        'operator': conditions.operator,
+        'datetime': conditions.datetime.strftime(_DATETIME_FORMAT),
+        'temperature': conditions.temperature,
+        'inlet_pressure': conditions.inlet_pressure,
+        'differential_pressure': conditions.differential_pressure,
+        'is_real_gas_calibration': conditions.is_real_gas_calibration,
+        'accuracy_setpoint': conditions.accuracy_setpoint,
+        'accuracy_fullscale': conditions.accuracy_fullscale,
+    }
+
+
+def _conditions_from_dict(data):
+    return Sfc5xxxCalibrationConditions(
+        company=str(data['company']),
+        operator=str(data['operator']),
+        datetime=datetime.strptime(data['datetime'], _DATETIME_FORMAT),
+        temperature=data['temperature'],
+        inlet_pressure=data['inlet_pressure'],
+        differential_pressure=data['differential_pressure'],
+        is_real_gas_calibration=data['is_real_gas_calibration'],
+        accuracy_setpoint=data['accuracy_setpoint'],
+        accuracy_fullscale=data['accuracy_fullscale'],
+    )
+
+
+def _calibration_to_dict(calibration):
+    return {
+        'index': calibration.index,
+        'gas_description': calibration.gas_description,
+        'gas_id': calibration.gas_id,
+        'unit': [calibration.unit.prefix.value, calibration.unit.unit.value,
+                 calibration.unit.timebase.value],
+        'fullscale': calibration.fullscale,
+        'initial_conditions': _conditions_to_dict(
+            calibration.initial_conditions),
+        'recalibration_conditions': _conditions_to_dict(
+            calibration.recalibration_conditions),
+        'thermal_conductivity_reference':
+            calibration.thermal_conductivity_reference,
+    }
+
+
+def _calibration_from_dict(data):
+    return Sfc5xxxCalibration(
+        index=data['index'],
+        gas_description=str(data['gas_description']),
+        gas_id=data['gas_id'],
+        unit=Sfc5xxxMediumUnit.from_int(*data['unit']),
+        fullscale=data['fullscale'],
+        initial_conditions=_conditions_from_dict(
+            data['initial_conditions']),
+        recalibration_conditions=_conditions_from_dict(
+            data['recalibration_conditions']),
+        thermal_conductivity_reference=data[
+            'thermal_conductivity_reference'],
+    )
+
+
+class Sfc5xxxCalibrationCache(object):
+    """
+    Disk cache for the calibration catalogs read by
+    :py:meth:`~sensirion_shdlc_sfc5xxx.device.Sfc5xxxShdlcDevice.read_calibration_catalog`.
+
+    The catalog of every device is stored as a JSON file named by the serial
+    number of the device, so a catalog needs to be read from a device only
+    once:
+
+    .. sourcecode:: python
+
+        cache = Sfc5xxxCalibrationCache('~/.cache/sfc5xxx')
+        calibrations = device.read_calibration_catalog(cache=cache)
+
+    .. note:: The cache is not invalidated automatically. If the
+              calibrations of a device are changed (e.g. by a
+              recalibration), pass ``refresh=True`` to
+              :py:meth:`~sensirion_shdlc_sfc5xxx.device.Sfc5xxxShdlcDevice.read_calibration_catalog`
+              or call
+              :py:meth:`~sensirion_shdlc_sfc5xxx.calibration_cache.Sfc5xxxCalibrationCache.clear`.
+    """  # noqa: E501
+
+    def __init__(self, directory):
+        """
+        Constructor.
+
+        :param str directory:
+            The directory where the catalogs are stored. It is created if it
+            does not exist yet.
+        """
+        super(Sfc5xxxCalibrationCache, self).__init__()
+        self._directory = os.path.expanduser(directory)
+
+    @property
+    def directory(self):
+        """
+        The directory where the catalogs are stored.
+
+        :type: str
+        """
+        return self._directory
+
+    def _get_path(self, serial_number):
+        """
+        Get the path of the cache file of a device.
+
+        :param str serial_number: The serial number of the device.
+        :return: The file path.
+        :rtype: str
+        """
+        name = re.sub(r'[^A-Za-z0-9_-]', '_', serial_number)
+        return os.path.join(self._directory, name + '.json')
+
+    def load(self, serial_number):
+        """
+        Load the calibration catalog of a device.
+
+        :param str serial_number:
+            The serial number of the device.
+        :return:
+            The calibrations, or ``None`` if the catalog is not cached (or
+            the cache file is invalid).
+        :rtype:
+            list(~sensirion_shdlc_sfc5xxx.types.Sfc5xxxCalibration)/None
+        """
+        path = self._get_path(serial_number)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'r') as f:
+                data = json.load(f)
+            if data.get('version') != _FORMAT_VERSION or \
+                    data.get('serial_number') != serial_number:
+                log.warning("Ignoring calibration cache file '{}' with "
+                            "unexpected content.".format(path))
+                return None
+            return [_calibration_from_dict(calibration)
+                    for calibration in data['calibrations']]
+        except (IOError, OSError, ValueError, KeyError, TypeError) as e:
+            log.warning("Ignoring invalid calibration cache file '{}': "
+                        "{}".format(path, e))
+            return None
+
+    def store(self, serial_number, calibrations):
+        """
+        Store the calibration catalog of a device.
+
+        The file is written atomically, so concurrent readers never see a
+        partially written catalog.
+
+        :param str serial_number:
+            The serial number of the device.
+        :param list(~sensirion_shdlc_sfc5xxx.types.Sfc5xxxCalibration) calibrations:
+            The calibrations to store.
+        """  # noqa: E501
+        data = {
+            'version': _FORMAT_VERSION,
+            'serial_number': serial_number,
+            'calibrations': [_calibration_to_dict(calibration)
+                             for calibration in calibrations],
+        }
+        _write_json(self._get_path(serial_number), data)
+
+    def clear(self, serial_number=None):
+        """
+        Remove cached catalogs.
+
+        :param str serial_number:
+            The serial number of the device to remove. If ``None``, the
+            catalogs of all devices are removed.
+        """
+        if serial_number is not None:
+            paths = [self._get_path(serial_number)]
+        elif os.path.isdir(self._directory):
+            paths = [os.path.join(self._directory, name)
+                     for name in os.listdir(self._directory)
+                     if name.endswith('.json')]
+        else:
+            paths = []
+        for path in paths:
+            if os.path.exists(path):
+                os.remove(path)
@@ -23,11 +23,14 @@
 
 from __future__ import absolute_import, division, print_function
 from sensirion_shdlc_driver.command import ShdlcCommand
-from struct import pack, unpack
+from struct import Struct
 
 import logging
 log = logging.getLogger(__name__)
 
+# Precompiled request and response codecs
+_ACTIVATE_CALIBRATION_REQUEST = Struct(">I")
+
 
 class Sfc5xxxCmdActivateCalibrationBase(ShdlcCommand):
     """
@@ -66,7 +69,7 @@ class Sfc5xxxCmdActivateCalibration(Sfc5xxxCmdActivateCalibrationBase):
             The index of the calibration to activate.
         """
         super(Sfc5xxxCmdActivateCalibration, self).__init__(
-            data=b"".join([pack(">I", index)]),
+            data=_ACTIVATE_CALIBRATION_REQUEST.pack(index),
             max_response_time=1.6,
             post_processing_time=0.0,
             min_response_length=0,
@@ -23,11 +23,23 @@
 
 from __future__ import absolute_import, division, print_function
 from sensirion_shdlc_driver.command import ShdlcCommand
-from struct import pack, unpack
+from struct import Struct
 
 import logging
 log = logging.getLogger(__name__)
 
+# Precompiled request and response codecs
+_MEASURE_RAW_FLOW_REQUEST = b"\x00"
+_MEASURE_RAW_FLOW_RESPONSE = Struct(">H")
+_MEASURE_RAW_THERMAL_CONDUCTIVITY_REQUEST = Struct(">BB")
+_MEASURE_RAW_THERMAL_CONDUCTIVITY_REQUEST_DEFAULT = b"\x01"
+_MEASURE_RAW_THERMAL_CONDUCTIVITY_RESPONSE = Struct(">H")
+_MEASURE_RAW_THERMAL_CONDUCTIVITY_WITH_CLOSED_VALVE_REQUEST = Struct(">BB")
+_MEASURE_RAW_THERMAL_CONDUCTIVITY_WITH_CLOSED_VALVE_REQUEST_DEFAULT = b"\x02"
+_MEASURE_RAW_THERMAL_CONDUCTIVITY_WITH_CLOSED_VALVE_RESPONSE = Struct(">H")
+_MEASURE_TEMPERATURE_REQUEST = b"\x10"
+_MEASURE_TEMPERATURE_RESPONSE = Struct(">f")
+
 
 class Sfc5xxxCmdAdvancedMeasurementsBase(ShdlcCommand):
     """
@@ -55,7 +67,7 @@ class Sfc5xxxCmdMeasureRawFlow(Sfc5xxxCmdAdvancedMeasurementsBase):
         Constructor.
         """
         super(Sfc5xxxCmdMeasureRawFlow, self).__init__(
-            data=b"".join([bytes(bytearray([0x00]))]),
+            data=_MEASURE_RAW_FLOW_REQUEST,
             max_response_time=0.05,
             post_processing_time=0.0,
             min_response_length=2,
@@ -68,7 +80,7 @@ class Sfc5xxxCmdMeasureRawFlow(Sfc5xxxCmdAdvancedMeasurementsBase):
         :return: Measured raw flow in ticks.
         :rtype: int
         """
-        flow = int(unpack(">H", data[0:2])[0])  # uint16
+        flow = _MEASURE_RAW_FLOW_RESPONSE.unpack_from(data)[0]  # uint16
         return flow
 
 
@@ -99,8 +111,7 @@ class Sfc5xxxCmdMeasureRawThermalConductivity(Sfc5xxxCmdAdvancedMeasurementsBase
             it is not sent to the device at all.
         """
         super(Sfc5xxxCmdMeasureRawThermalConductivity, self).__init__(
-            data=b"".join([bytes(bytearray([0x01])),
-                           pack(">B", use_temperature_compensation) if use_temperature_compensation is not None else b""]),
+            data=_MEASURE_RAW_THERMAL_CONDUCTIVITY_REQUEST.pack(0x01, use_temperature_compensation) if use_temperature_compensation is not None else _MEASURE_RAW_THERMAL_CONDUCTIVITY_REQUEST_DEFAULT,
             max_response_time=0.05,
             post_processing_time=0.0,
             min_response_length=2,
@@ -113,7 +124,7 @@ class Sfc5xxxCmdMeasureRawThermalConductivity(Sfc5xxxCmdAdvancedMeasurementsBase
         :return: Measured raw thermal conductivity in ticks.
         :rtype: int
         """
-        thermal_conductivity = int(unpack(">H", data[0:2])[0])  # uint16
+        thermal_conductivity = _MEASURE_RAW_THERMAL_CONDUCTIVITY_RESPONSE.unpack_from(data)[0]  # uint16
         return thermal_conductivity
 
 
@@ -141,8 +152,7 @@ class Sfc5xxxCmdMeasureRawThermalConductivityWithClosedValve(Sfc5xxxCmdAdvancedM
             it is not sent to the device at all.
         """
         super(Sfc5xxxCmdMeasureRawThermalConductivityWithClosedValve, self).__init__(
-            data=b"".join([bytes(bytearray([0x02])),
-                           pack(">B", use_temperature_compensation) if use_temperature_compensation is not None else b""]),
+            data=_MEASURE_RAW_THERMAL_CONDUCTIVITY_WITH_CLOSED_VALVE_REQUEST.pack(0x02, use_temperature_compensation) if use_temperature_compensation is not None else _MEASURE_RAW_THERMAL_CONDUCTIVITY_WITH_CLOSED_VALVE_REQUEST_DEFAULT,
             max_response_time=0.6,
             post_processing_time=0.0,
             min_response_length=2,
@@ -155,7 +165,7 @@ class Sfc5xxxCmdMeasureRawThermalConductivityWithClosedValve(Sfc5xxxCmdAdvancedM
         :return: Measured raw thermal conductivity in ticks.
         :rtype: int
         """
-        thermal_conductivity = int(unpack(">H", data[0:2])[0])  # uint16
+        thermal_conductivity = _MEASURE_RAW_THERMAL_CONDUCTIVITY_WITH_CLOSED_VALVE_RESPONSE.unpack_from(data)[0]  # uint16
         return thermal_conductivity
 
 
@@ -171,7 +181,7 @@ class Sfc5xxxCmdMeasureTemperature(Sfc5xxxCmdAdvancedMeasurementsBase):
         Constructor.
         """
         super(Sfc5xxxCmdMeasureTemperature, self).__init__(
-            data=b"".join([bytes(bytearray([0x10]))]),
+            data=_MEASURE_TEMPERATURE_REQUEST,
             max_response_time=0.05,
             post_processing_time=0.0,
             min_response_length=4,
@@ -184,5 +194,5 @@ class Sfc5xxxCmdMeasureTemperature(Sfc5xxxCmdAdvancedMeasurementsBase):
         :return: Measured temperature [°C].
         :rtype: float
         """
-        temperature = float(unpack(">f", data[0:4])[0])  # float
+        temperature = _MEASURE_TEMPERATURE_RESPONSE.unpack_from(data)[0]  # float
         return temperature
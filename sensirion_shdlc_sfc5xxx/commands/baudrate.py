@@ -23,11 +23,15 @@
 
 from __future__ import absolute_import, division, print_function
 from sensirion_shdlc_driver.command import ShdlcCommand
-from struct import pack, unpack
+from struct import Struct
 
 import logging
 log = logging.getLogger(__name__)
 
+# Precompiled request and response codecs
+_GET_BAUDRATE_RESPONSE = Struct(">I")
+_SET_BAUDRATE_REQUEST = Struct(">I")
+
 
 class Sfc5xxxCmdBaudrateBase(ShdlcCommand):
     """
@@ -54,7 +58,7 @@ class Sfc5xxxCmdGetBaudrate(Sfc5xxxCmdBaudrateBase):
         Constructor.
         """
         super(Sfc5xxxCmdGetBaudrate, self).__init__(
-            data=[],
+            data=b"",
             max_response_time=0.01,
             post_processing_time=0.0,
             min_response_length=4,
@@ -67,7 +71,7 @@ class Sfc5xxxCmdGetBaudrate(Sfc5xxxCmdBaudrateBase):
         :return: Current baudrate in bit/s.
         :rtype: int
         """
-        baudrate = int(unpack(">I", data[0:4])[0])  # uint32
+        baudrate = _GET_BAUDRATE_RESPONSE.unpack_from(data)[0]  # uint32
         return baudrate
 
 
@@ -91,7 +95,7 @@ class Sfc5xxxCmdSetBaudrate(Sfc5xxxCmdBaudrateBase):
             115200 (default), 230400 and 460800.
         """
         super(Sfc5xxxCmdSetBaudrate, self).__init__(
-            data=b"".join([pack(">I", baudrate)]),
+            data=_SET_BAUDRATE_REQUEST.pack(baudrate),
             max_response_time=0.01,
             post_processing_time=0.0,
             min_response_length=0,
@@ -23,11 +23,28 @@
 
 from __future__ import absolute_import, division, print_function
 from sensirion_shdlc_driver.command import ShdlcCommand
-from struct import pack, unpack
+from struct import Struct
 
 import logging
 log = logging.getLogger(__name__)
 
+# Precompiled request and response codecs
+_GET_USER_CONTROLLER_GAIN_REQUEST = b"\x00"
+_GET_USER_CONTROLLER_GAIN_RESPONSE = Struct(">f")
+_SET_USER_CONTROLLER_GAIN_REQUEST = Struct(">Bf")
+_GET_PRESSURE_DEPENDENT_GAIN_ENABLE_REQUEST = b"\x10"
+_GET_PRESSURE_DEPENDENT_GAIN_ENABLE_RESPONSE = Struct(">?")
+_SET_PRESSURE_DEPENDENT_GAIN_ENABLE_REQUEST = Struct(">B?")
+_GET_INLET_PRESSURE_FOR_GAIN_CORRECTION_REQUEST = b"\x11"
+_GET_INLET_PRESSURE_FOR_GAIN_CORRECTION_RESPONSE = Struct(">f")
+_SET_INLET_PRESSURE_FOR_GAIN_CORRECTION_REQUEST = Struct(">Bf")
+_GET_GAS_TEMPERATURE_COMPENSATION_ENABLE_REQUEST = b"\x20"
+_GET_GAS_TEMPERATURE_COMPENSATION_ENABLE_RESPONSE = Struct(">?")
+_SET_GAS_TEMPERATURE_COMPENSATION_ENABLE_REQUEST = Struct(">B?")
+_GET_INLET_GAS_TEMPERATURE_FOR_COMPENSATION_REQUEST = b"\x21"
+_GET_INLET_GAS_TEMPERATURE_FOR_COMPENSATION_RESPONSE = Struct(">f")
+_SET_INLET_GAS_TEMPERATURE_FOR_COMPENSATION_REQUEST = Struct(">Bf")
+
 
 class Sfc5xxxCmdControllerConfigurationBase(ShdlcCommand):
     """
@@ -54,7 +71,7 @@ class Sfc5xxxCmdGetUserControllerGain(Sfc5xxxCmdControllerConfigurationBase):
         Constructor.
         """
         super(Sfc5xxxCmdGetUserControllerGain, self).__init__(
-            data=b"".join([bytes(bytearray([0x00]))]),
+            data=_GET_USER_CONTROLLER_GAIN_REQUEST,
             max_response_time=0.005,
             post_processing_time=0.0,
             min_response_length=4,
@@ -67,7 +84,7 @@ class Sfc5xxxCmdGetUserControllerGain(Sfc5xxxCmdControllerConfigurationBase):
         :return: The current user controller gain.
         :rtype: float
         """
-        gain = float(unpack(">f", data[0:4])[0])  # float
+        gain = _GET_USER_CONTROLLER_GAIN_RESPONSE.unpack_from(data)[0]  # float
         return gain
 
 
@@ -89,8 +106,7 @@ class Sfc5xxxCmdSetUserControllerGain(Sfc5xxxCmdControllerConfigurationBase):
             The user controller gain to set.
         """
         super(Sfc5xxxCmdSetUserControllerGain, self).__init__(
-            data=b"".join([bytes(bytearray([0x00])),
-                           pack(">f", gain)]),
+            data=_SET_USER_CONTROLLER_GAIN_REQUEST.pack(0x00, gain),
             max_response_time=0.005,
             post_processing_time=0.0,
             min_response_length=0,
@@ -110,7 +126,7 @@ class Sfc5xxxCmdGetPressureDependentGainEnable(Sfc5xxxCmdControllerConfiguration
         Constructor.
         """
         super(Sfc5xxxCmdGetPressureDependentGainEnable, self).__init__(
-            data=b"".join([bytes(bytearray([0x10]))]),
+            data=_GET_PRESSURE_DEPENDENT_GAIN_ENABLE_REQUEST,
             max_response_time=0.005,
             post_processing_time=0.0,
             min_response_length=1,
@@ -123,7 +139,7 @@ class Sfc5xxxCmdGetPressureDependentGainEnable(Sfc5xxxCmdControllerConfiguration
         :return: The current state of the pressure dependent gain.
         :rtype: bool
         """
-        enable = bool(unpack(">?", data[0:1])[0])  # bool
+        enable = _GET_PRESSURE_DEPENDENT_GAIN_ENABLE_RESPONSE.unpack_from(data)[0]  # bool
         return enable
 
 
@@ -145,8 +161,7 @@ class Sfc5xxxCmdSetPressureDependentGainEnable(Sfc5xxxCmdControllerConfiguration
             The pressure dependent gain state to set.
         """
         super(Sfc5xxxCmdSetPressureDependentGainEnable, self).__init__(
-            data=b"".join([bytes(bytearray([0x10])),
-                           pack(">?", enable)]),
+            data=_SET_PRESSURE_DEPENDENT_GAIN_ENABLE_REQUEST.pack(0x10, enable),
             max_response_time=0.005,
             post_processing_time=0.0,
             min_response_length=0,
@@ -166,7 +181,7 @@ class Sfc5xxxCmdGetInletPressureForGainCorrection(Sfc5xxxCmdControllerConfigurat
         Constructor.
         """
         super(Sfc5xxxCmdGetInletPressureForGainCorrection, self).__init__(
-            data=b"".join([bytes(bytearray([0x11]))]),
+            data=_GET_INLET_PRESSURE_FOR_GAIN_CORRECTION_REQUEST,
             max_response_time=0.005,
             post_processing_time=0.0,
             min_response_length=4,
@@ -179,7 +194,7 @@ class Sfc5xxxCmdGetInletPressureForGainCorrection(Sfc5xxxCmdControllerConfigurat
         :return: The currently set inlet pressure [bar].
         :rtype: float
         """
-        pressure = float(unpack(">f", data[0:4])[0])  # float
+        pressure = _GET_INLET_PRESSURE_FOR_GAIN_CORRECTION_RESPONSE.unpack_from(data)[0]  # float
         return pressure
 
 
@@ -201,8 +216,7 @@ class Sfc5xxxCmdSetInletPressureForGainCorrection(Sfc5xxxCmdControllerConfigurat
             The inlet pressure to set [bar].
         """
         super(Sfc5xxxCmdSetInletPressureForGainCorrection, self).__init__(
-            data=b"".join([bytes(bytearray([0x11])),
-                           pack(">f", pressure)]),
+            data=_SET_INLET_PRESSURE_FOR_GAIN_CORRECTION_REQUEST.pack(0x11, pressure),
             max_response_time=0.005,
             post_processing_time=0.0,
             min_response_length=0,
@@ -222,7 +236,7 @@ class Sfc5xxxCmdGetGasTemperatureCompensationEnable(Sfc5xxxCmdControllerConfigur
         Constructor.
         """
         super(Sfc5xxxCmdGetGasTemperatureCompensationEnable, self).__init__(
-            data=b"".join([bytes(bytearray([0x20]))]),
+            data=_GET_GAS_TEMPERATURE_COMPENSATION_ENABLE_REQUEST,
             max_response_time=0.005,
             post_processing_time=0.0,
             min_response_length=1,
@@ -235,7 +249,7 @@ class Sfc5xxxCmdGetGasTemperatureCompensationEnable(Sfc5xxxCmdControllerConfigur
         :return: The current state of the temperature compensation.
         :rtype: bool
         """
-        enable = bool(unpack(">?", data[0:1])[0])  # bool
+        enable = _GET_GAS_TEMPERATURE_COMPENSATION_ENABLE_RESPONSE.unpack_from(data)[0]  # bool
         return enable
 
 
@@ -257,8 +271,7 @@ class Sfc5xxxCmdSetGasTemperatureCompensationEnable(Sfc5xxxCmdControllerConfigur
             The temperature compensation state to set.
         """
         super(Sfc5xxxCmdSetGasTemperatureCompensationEnable, self).__init__(
-            data=b"".join([bytes(bytearray([0x20])),
-                           pack(">?", enable)]),
+            data=_SET_GAS_TEMPERATURE_COMPENSATION_ENABLE_REQUEST.pack(0x20, enable),
             max_response_time=0.005,
             post_processing_time=0.0,
             min_response_length=0,
@@ -278,7 +291,7 @@ class Sfc5xxxCmdGetInletGasTemperatureForCompensation(Sfc5xxxCmdControllerConfig
         Constructor.
         """
         super(Sfc5xxxCmdGetInletGasTemperatureForCompensation, self).__init__(
-            data=b"".join([bytes(bytearray([0x21]))]),
+            data=_GET_INLET_GAS_TEMPERATURE_FOR_COMPENSATION_REQUEST,
             max_response_time=0.005,
             post_processing_time=0.0,
             min_response_length=4,
@@ -291,7 +304,7 @@ class Sfc5xxxCmdGetInletGasTemperatureForCompensation(Sfc5xxxCmdControllerConfig
         :return: The currently set inlet gas temperature [°C].
         :rtype: float
         """
-        temperature = float(unpack(">f", data[0:4])[0])  # float
+        temperature = _GET_INLET_GAS_TEMPERATURE_FOR_COMPENSATION_RESPONSE.unpack_from(data)[0]  # float
         return temperature
 
 
@@ -313,8 +326,7 @@ class Sfc5xxxCmdSetInletGasTemperatureForCompensation(Sfc5xxxCmdControllerConfig
             The inlet gas temperature to set [°C].
         """
         super(Sfc5xxxCmdSetInletGasTemperatureForCompensation, self).__init__(
-            data=b"".join([bytes(bytearray([0x21])),
-                           pack(">f", temperature)]),
+            data=_SET_INLET_GAS_TEMPERATURE_FOR_COMPENSATION_REQUEST.pack(0x21, temperature),
             max_response_time=0.005,
             post_processing_time=0.0,
             min_response_length=0,
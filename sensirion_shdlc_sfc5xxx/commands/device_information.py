@@ -23,11 +23,19 @@
 
 from __future__ import absolute_import, division, print_function
 from sensirion_shdlc_driver.command import ShdlcCommand
-from struct import pack, unpack
+from struct import Struct
 
 import logging
 log = logging.getLogger(__name__)
 
+# Precompiled request and response codecs
+_GET_PRODUCT_TYPE_REQUEST = b"\x00"
+_GET_PRODUCT_NAME_REQUEST = b"\x01"
+_GET_ARTICLE_CODE_REQUEST = b"\x02"
+_GET_SERIAL_NUMBER_REQUEST = b"\x03"
+_GET_PRODUCT_SUBTYPE_REQUEST = b"\x04"
+_GET_PRODUCT_SUBTYPE_RESPONSE = Struct(">B")
+
 
 class Sfc5xxxCmdDeviceInformationBase(ShdlcCommand):
     """
@@ -54,7 +62,7 @@ class Sfc5xxxCmdGetProductType(Sfc5xxxCmdDeviceInformationBase):
         Constructor.
         """
         super(Sfc5xxxCmdGetProductType, self).__init__(
-            data=b"".join([bytes(bytearray([0x00]))]),
+            data=_GET_PRODUCT_TYPE_REQUEST,
             max_response_time=0.01,
             post_processing_time=0.0,
             min_response_length=0,
@@ -84,7 +92,7 @@ class Sfc5xxxCmdGetProductName(Sfc5xxxCmdDeviceInformationBase):
         Constructor.
         """
         super(Sfc5xxxCmdGetProductName, self).__init__(
-            data=b"".join([bytes(bytearray([0x01]))]),
+            data=_GET_PRODUCT_NAME_REQUEST,
             max_response_time=0.01,
             post_processing_time=0.0,
             min_response_length=0,
@@ -114,7 +122,7 @@ class Sfc5xxxCmdGetArticleCode(Sfc5xxxCmdDeviceInformationBase):
         Constructor.
         """
         super(Sfc5xxxCmdGetArticleCode, self).__init__(
-            data=b"".join([bytes(bytearray([0x02]))]),
+            data=_GET_ARTICLE_CODE_REQUEST,
             max_response_time=0.01,
             post_processing_time=0.0,
             min_response_length=0,
@@ -144,7 +152,7 @@ class Sfc5xxxCmdGetSerialNumber(Sfc5xxxCmdDeviceInformationBase):
         Constructor.
         """
         super(Sfc5xxxCmdGetSerialNumber, self).__init__(
-            data=b"".join([bytes(bytearray([0x03]))]),
+            data=_GET_SERIAL_NUMBER_REQUEST,
             max_response_time=0.01,
             post_processing_time=0.0,
             min_response_length=0,
@@ -173,7 +181,7 @@ class Sfc5xxxCmdGetProductSubtype(Sfc5xxxCmdDeviceInformationBase):
         Constructor.
         """
         super(Sfc5xxxCmdGetProductSubtype, self).__init__(
-            data=b"".join([bytes(bytearray([0x04]))]),
+            data=_GET_PRODUCT_SUBTYPE_REQUEST,
             max_response_time=0.01,
             post_processing_time=0.0,
             min_response_length=1,
@@ -186,5 +194,5 @@ class Sfc5xxxCmdGetProductSubtype(Sfc5xxxCmdDeviceInformationBase):
         :return: Product subtype.
         :rtype: int
         """
-        product_subtype = int(unpack(">B", data[0:1])[0])  # uint8
+        product_subtype = _GET_PRODUCT_SUBTYPE_RESPONSE.unpack_from(data)[0]  # uint8
         return product_subtype
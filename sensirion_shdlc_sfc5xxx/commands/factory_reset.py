@@ -23,7 +23,6 @@
 
 from __future__ import absolute_import, division, print_function
 from sensirion_shdlc_driver.command import ShdlcCommand
-from struct import pack, unpack
 
 import logging
 log = logging.getLogger(__name__)
@@ -62,7 +61,7 @@ class Sfc5xxxCmdFactoryReset(Sfc5xxxCmdFactoryResetBase):
         Constructor.
         """
         super(Sfc5xxxCmdFactoryReset, self).__init__(
-            data=[],
+            data=b"",
             max_response_time=1.0,
             post_processing_time=0.5,
             min_response_length=0,
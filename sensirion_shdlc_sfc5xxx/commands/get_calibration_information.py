@@ -23,11 +23,30 @@
 
 from __future__ import absolute_import, division, print_function
 from sensirion_shdlc_driver.command import ShdlcCommand
-from struct import pack, unpack
+from struct import Struct
 
 import logging
 log = logging.getLogger(__name__)
 
+# Precompiled request and response codecs
+_GET_NUMBER_OF_CALIBRATIONS_REQUEST = b"\x00"
+_GET_NUMBER_OF_CALIBRATIONS_RESPONSE = Struct(">I")
+_GET_CALIBRATION_VALIDITY_REQUEST = Struct(">BI")
+_GET_CALIBRATION_VALIDITY_RESPONSE = Struct(">?")
+_GET_CALIBRATION_GAS_DESCRIPTION_REQUEST = Struct(">BI")
+_GET_CALIBRATION_GAS_ID_REQUEST = Struct(">BI")
+_GET_CALIBRATION_GAS_ID_RESPONSE = Struct(">I")
+_GET_CALIBRATION_GAS_UNIT_REQUEST = Struct(">BI")
+_GET_CALIBRATION_GAS_UNIT_RESPONSE = Struct(">bBB")
+_GET_CALIBRATION_FULLSCALE_REQUEST = Struct(">BI")
+_GET_CALIBRATION_FULLSCALE_RESPONSE = Struct(">f")
+_GET_CALIBRATION_INITIAL_CONDITIONS_REQUEST = Struct(">BI")
+_GET_CALIBRATION_INITIAL_CONDITIONS_RESPONSE = Struct(">50s50sHBBBBfff?ff")
+_GET_CALIBRATION_RECALIBRATION_CONDITIONS_REQUEST = Struct(">BI")
+_GET_CALIBRATION_RECALIBRATION_CONDITIONS_RESPONSE = Struct(">50s50sHBBBBfff?ff")
+_GET_CALIBRATION_THERMAL_CONDUCTIVITY_REFERENCE_REQUEST = Struct(">BI")
+_GET_CALIBRATION_THERMAL_CONDUCTIVITY_REFERENCE_RESPONSE = Struct(">H")
+
 
 class Sfc5xxxCmdGetCalibrationInformationBase(ShdlcCommand):
     """
@@ -59,7 +78,7 @@ class Sfc5xxxCmdGetNumberOfCalibrations(Sfc5xxxCmdGetCalibrationInformationBase)
         Constructor.
         """
         super(Sfc5xxxCmdGetNumberOfCalibrations, self).__init__(
-            data=b"".join([bytes(bytearray([0x00]))]),
+            data=_GET_NUMBER_OF_CALIBRATIONS_REQUEST,
             max_response_time=0.01,
             post_processing_time=0.0,
             min_response_length=4,
@@ -72,7 +91,7 @@ class Sfc5xxxCmdGetNumberOfCalibrations(Sfc5xxxCmdGetCalibrationInformationBase)
         :return: Number of calibrations.
         :rtype: int
         """
-        number_of_calibrations = int(unpack(">I", data[0:4])[0])  # uint32
+        number_of_calibrations = _GET_NUMBER_OF_CALIBRATIONS_RESPONSE.unpack_from(data)[0]  # uint32
         return number_of_calibrations
 
 
@@ -91,8 +110,7 @@ class Sfc5xxxCmdGetCalibrationValidity(Sfc5xxxCmdGetCalibrationInformationBase):
             The index to check whether there is a valid calibration or not.
         """
         super(Sfc5xxxCmdGetCalibrationValidity, self).__init__(
-            data=b"".join([bytes(bytearray([0x10])),
-                           pack(">I", index)]),
+            data=_GET_CALIBRATION_VALIDITY_REQUEST.pack(0x10, index),
             max_response_time=0.01,
             post_processing_time=0.0,
             min_response_length=1,
@@ -106,7 +124,7 @@ class Sfc5xxxCmdGetCalibrationValidity(Sfc5xxxCmdGetCalibrationInformationBase):
                  index or not.
         :rtype: bool
         """
-        validity = bool(unpack(">?", data[0:1])[0])  # bool
+        validity = _GET_CALIBRATION_VALIDITY_RESPONSE.unpack_from(data)[0]  # bool
         return validity
 
 
@@ -125,8 +143,7 @@ class Sfc5xxxCmdGetCalibrationGasDescription(Sfc5xxxCmdGetCalibrationInformation
             The calibration index to read the requested information from.
         """
         super(Sfc5xxxCmdGetCalibrationGasDescription, self).__init__(
-            data=b"".join([bytes(bytearray([0x11])),
-                           pack(">I", index)]),
+            data=_GET_CALIBRATION_GAS_DESCRIPTION_REQUEST.pack(0x11, index),
             max_response_time=0.01,
             post_processing_time=0.0,
             min_response_length=0,
@@ -158,8 +175,7 @@ class Sfc5xxxCmdGetCalibrationGasId(Sfc5xxxCmdGetCalibrationInformationBase):
             The calibration index to read the requested information from.
         """
         super(Sfc5xxxCmdGetCalibrationGasId, self).__init__(
-            data=b"".join([bytes(bytearray([0x12])),
-                           pack(">I", index)]),
+            data=_GET_CALIBRATION_GAS_ID_REQUEST.pack(0x12, index),
             max_response_time=0.01,
             post_processing_time=0.0,
             min_response_length=4,
@@ -172,7 +188,7 @@ class Sfc5xxxCmdGetCalibrationGasId(Sfc5xxxCmdGetCalibrationInformationBase):
         :return: The read gas ID.
         :rtype: int
         """
-        gas_id = int(unpack(">I", data[0:4])[0])  # uint32
+        gas_id = _GET_CALIBRATION_GAS_ID_RESPONSE.unpack_from(data)[0]  # uint32
         return gas_id
 
 
@@ -191,8 +207,7 @@ class Sfc5xxxCmdGetCalibrationGasUnit(Sfc5xxxCmdGetCalibrationInformationBase):
             The calibration index to read the requested information from.
         """
         super(Sfc5xxxCmdGetCalibrationGasUnit, self).__init__(
-            data=b"".join([bytes(bytearray([0x13])),
-                           pack(">I", index)]),
+            data=_GET_CALIBRATION_GAS_UNIT_REQUEST.pack(0x13, index),
             max_response_time=0.01,
             post_processing_time=0.0,
             min_response_length=3,
@@ -211,9 +226,10 @@ class Sfc5xxxCmdGetCalibrationGasUnit(Sfc5xxxCmdGetCalibrationInformationBase):
               Timebase, see appendix for encoding.
         :rtype: tuple
         """
-        prefix = int(unpack(">b", data[0:1])[0])  # int8
-        unit = int(unpack(">B", data[1:2])[0])  # uint8
-        timebase = int(unpack(">B", data[2:3])[0])  # uint8
+        (prefix,  # int8
+         unit,  # uint8
+         timebase,  # uint8
+         ) = _GET_CALIBRATION_GAS_UNIT_RESPONSE.unpack_from(data)
         return prefix,\
             unit,\
             timebase
@@ -234,8 +250,7 @@ class Sfc5xxxCmdGetCalibrationFullscale(Sfc5xxxCmdGetCalibrationInformationBase)
             The calibration index to read the requested information from.
         """
         super(Sfc5xxxCmdGetCalibrationFullscale, self).__init__(
-            data=b"".join([bytes(bytearray([0x14])),
-                           pack(">I", index)]),
+            data=_GET_CALIBRATION_FULLSCALE_REQUEST.pack(0x14, index),
             max_response_time=0.01,
             post_processing_time=0.0,
             min_response_length=4,
@@ -249,7 +264,7 @@ class Sfc5xxxCmdGetCalibrationFullscale(Sfc5xxxCmdGetCalibrationInformationBase)
                  calibration.
         :rtype: float
         """
-        fullscale = float(unpack(">f", data[0:4])[0])  # float
+        fullscale = _GET_CALIBRATION_FULLSCALE_RESPONSE.unpack_from(data)[0]  # float
         return fullscale
 
 
@@ -268,8 +283,7 @@ class Sfc5xxxCmdGetCalibrationInitialConditions(Sfc5xxxCmdGetCalibrationInformat
             The calibration index to read the requested information from.
         """
         super(Sfc5xxxCmdGetCalibrationInitialConditions, self).__init__(
-            data=b"".join([bytes(bytearray([0x15])),
-                           pack(">I", index)]),
+            data=_GET_CALIBRATION_INITIAL_CONDITIONS_REQUEST.pack(0x15, index),
             max_response_time=0.01,
             post_processing_time=0.0,
             min_response_length=127,
@@ -311,19 +325,22 @@ class Sfc5xxxCmdGetCalibrationInitialConditions(Sfc5xxxCmdGetCalibrationInformat
               if larger than the accuracy of the setpoint.
         :rtype: tuple
         """
-        company = str(data[0:50].decode('utf-8').rstrip('\0'))  # string<50>
-        operator = str(data[50:100].decode('utf-8').rstrip('\0'))  # string<50>
-        year = int(unpack(">H", data[100:102])[0])  # uint16
-        month = int(unpack(">B", data[102:103])[0])  # uint8
-        day = int(unpack(">B", data[103:104])[0])  # uint8
-        hour = int(unpack(">B", data[104:105])[0])  # uint8
-        minute = int(unpack(">B", data[105:106])[0])  # uint8
-        temperature = float(unpack(">f", data[106:110])[0])  # float
-        inlet_pressure = float(unpack(">f", data[110:114])[0])  # float
-        differential_pressure = float(unpack(">f", data[114:118])[0])  # float
-        is_real_gas_calibration = bool(unpack(">?", data[118:119])[0])  # bool
-        accuracy_setpoint = float(unpack(">f", data[119:123])[0])  # float
-        accuracy_fullscale = float(unpack(">f", data[123:127])[0])  # float
+        (company,  # string<50>
+         operator,  # string<50>
+         year,  # uint16
+         month,  # uint8
+         day,  # uint8
+         hour,  # uint8
+         minute,  # uint8
+         temperature,  # float
+         inlet_pressure,  # float
+         differential_pressure,  # float
+         is_real_gas_calibration,  # bool
+         accuracy_setpoint,  # float
+         accuracy_fullscale,  # float
+         ) = _GET_CALIBRATION_INITIAL_CONDITIONS_RESPONSE.unpack_from(data)
+        company = str(company.decode('utf-8').rstrip('\0'))
+        operator = str(operator.decode('utf-8').rstrip('\0'))
         return company,\
             operator,\
             year,\
@@ -354,8 +371,7 @@ class Sfc5xxxCmdGetCalibrationRecalibrationConditions(Sfc5xxxCmdGetCalibrationIn
             The calibration index to read the requested information from.
         """
         super(Sfc5xxxCmdGetCalibrationRecalibrationConditions, self).__init__(
-            data=b"".join([bytes(bytearray([0x16])),
-                           pack(">I", index)]),
+            data=_GET_CALIBRATION_RECALIBRATION_CONDITIONS_REQUEST.pack(0x16, index),
             max_response_time=0.01,
             post_processing_time=0.0,
             min_response_length=127,
@@ -397,19 +413,22 @@ class Sfc5xxxCmdGetCalibrationRecalibrationConditions(Sfc5xxxCmdGetCalibrationIn
               if larger than the accuracy of the setpoint.
         :rtype: tuple
         """
-        company = str(data[0:50].decode('utf-8').rstrip('\0'))  # string<50>
-        operator = str(data[50:100].decode('utf-8').rstrip('\0'))  # string<50>
-        year = int(unpack(">H", data[100:102])[0])  # uint16
-        month = int(unpack(">B", data[102:103])[0])  # uint8
-        day = int(unpack(">B", data[103:104])[0])  # uint8
-        hour = int(unpack(">B", data[104:105])[0])  # uint8
-        minute = int(unpack(">B", data[105:106])[0])  # uint8
-        temperature = float(unpack(">f", data[106:110])[0])  # float
-        inlet_pressure = float(unpack(">f", data[110:114])[0])  # float
-        differential_pressure = float(unpack(">f", data[114:118])[0])  # float
-        is_real_gas_calibration = bool(unpack(">?", data[118:119])[0])  # bool
-        accuracy_setpoint = float(unpack(">f", data[119:123])[0])  # float
-        accuracy_fullscale = float(unpack(">f", data[123:127])[0])  # float
+        (company,  # string<50>
+         operator,  # string<50>
+         year,  # uint16
+         month,  # uint8
+         day,  # uint8
+         hour,  # uint8
+         minute,  # uint8
+         temperature,  # float
+         inlet_pressure,  # float
+         differential_pressure,  # float
+         is_real_gas_calibration,  # bool
+         accuracy_setpoint,  # float
+         accuracy_fullscale,  # float
+         ) = _GET_CALIBRATION_RECALIBRATION_CONDITIONS_RESPONSE.unpack_from(data)
+        company = str(company.decode('utf-8').rstrip('\0'))
+        operator = str(operator.decode('utf-8').rstrip('\0'))
         return company,\
             operator,\
             year,\
@@ -441,8 +460,7 @@ class Sfc5xxxCmdGetCalibrationThermalConductivityReference(Sfc5xxxCmdGetCalibrat
             The calibration index to read the requested information from.
         """
         super(Sfc5xxxCmdGetCalibrationThermalConductivityReference, self).__init__(
-            data=b"".join([bytes(bytearray([0x17])),
-                           pack(">I", index)]),
+            data=_GET_CALIBRATION_THERMAL_CONDUCTIVITY_REFERENCE_REQUEST.pack(0x17, index),
             max_response_time=0.01,
             post_processing_time=0.0,
             min_response_length=2,
@@ -455,5 +473,5 @@ class Sfc5xxxCmdGetCalibrationThermalConductivityReference(Sfc5xxxCmdGetCalibrat
         :return: Thermal conductivity reference value for the gas.
         :rtype: int
         """
-        reference_value = int(unpack(">H", data[0:2])[0])  # uint16
+        reference_value = _GET_CALIBRATION_THERMAL_CONDUCTIVITY_REFERENCE_RESPONSE.unpack_from(data)[0]  # uint16
         return reference_value
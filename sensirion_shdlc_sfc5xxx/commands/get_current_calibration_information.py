@@ -23,11 +23,26 @@
 
 from __future__ import absolute_import, division, print_function
 from sensirion_shdlc_driver.command import ShdlcCommand
-from struct import pack, unpack
+from struct import Struct
 
 import logging
 log = logging.getLogger(__name__)
 
+# Precompiled request and response codecs
+_GET_CURRENT_GAS_DESCRIPTION_REQUEST = b"\x11"
+_GET_CURRENT_GAS_ID_REQUEST = b"\x12"
+_GET_CURRENT_GAS_ID_RESPONSE = Struct(">I")
+_GET_CURRENT_GAS_UNIT_REQUEST = b"\x13"
+_GET_CURRENT_GAS_UNIT_RESPONSE = Struct(">bBB")
+_GET_CURRENT_FULLSCALE_REQUEST = b"\x14"
+_GET_CURRENT_FULLSCALE_RESPONSE = Struct(">f")
+_GET_CURRENT_INITIAL_CALIBRATION_CONDITIONS_REQUEST = b"\x15"
+_GET_CURRENT_INITIAL_CALIBRATION_CONDITIONS_RESPONSE = Struct(">50s50sHBBBBfff?ff")
+_GET_CURRENT_RECALIBRATION_CONDITIONS_REQUEST = b"\x16"
+_GET_CURRENT_RECALIBRATION_CONDITIONS_RESPONSE = Struct(">50s50sHBBBBfff?ff")
+_GET_CURRENT_THERMAL_CONDUCTIVITY_REFERENCE_REQUEST = b"\x17"
+_GET_CURRENT_THERMAL_CONDUCTIVITY_REFERENCE_RESPONSE = Struct(">H")
+
 
 class Sfc5xxxCmdGetCurrentCalibrationInformationBase(ShdlcCommand):
     """
@@ -54,7 +69,7 @@ class Sfc5xxxCmdGetCurrentGasDescription(Sfc5xxxCmdGetCurrentCalibrationInformat
         Constructor.
         """
         super(Sfc5xxxCmdGetCurrentGasDescription, self).__init__(
-            data=b"".join([bytes(bytearray([0x11]))]),
+            data=_GET_CURRENT_GAS_DESCRIPTION_REQUEST,
             max_response_time=0.01,
             post_processing_time=0.0,
             min_response_length=0,
@@ -83,7 +98,7 @@ class Sfc5xxxCmdGetCurrentGasId(Sfc5xxxCmdGetCurrentCalibrationInformationBase):
         Constructor.
         """
         super(Sfc5xxxCmdGetCurrentGasId, self).__init__(
-            data=b"".join([bytes(bytearray([0x12]))]),
+            data=_GET_CURRENT_GAS_ID_REQUEST,
             max_response_time=0.01,
             post_processing_time=0.0,
             min_response_length=4,
@@ -96,7 +111,7 @@ class Sfc5xxxCmdGetCurrentGasId(Sfc5xxxCmdGetCurrentCalibrationInformationBase):
         :return: The read gas ID.
         :rtype: int
         """
-        gas_id = int(unpack(">I", data[0:4])[0])  # uint32
+        gas_id = _GET_CURRENT_GAS_ID_RESPONSE.unpack_from(data)[0]  # uint32
         return gas_id
 
 
@@ -112,7 +127,7 @@ class Sfc5xxxCmdGetCurrentGasUnit(Sfc5xxxCmdGetCurrentCalibrationInformationBase
         Constructor.
         """
         super(Sfc5xxxCmdGetCurrentGasUnit, self).__init__(
-            data=b"".join([bytes(bytearray([0x13]))]),
+            data=_GET_CURRENT_GAS_UNIT_REQUEST,
             max_response_time=0.01,
             post_processing_time=0.0,
             min_response_length=3,
@@ -131,9 +146,10 @@ class Sfc5xxxCmdGetCurrentGasUnit(Sfc5xxxCmdGetCurrentCalibrationInformationBase
               Timebase, see appendix for encoding.
         :rtype: tuple
         """
-        prefix = int(unpack(">b", data[0:1])[0])  # int8
-        unit = int(unpack(">B", data[1:2])[0])  # uint8
-        timebase = int(unpack(">B", data[2:3])[0])  # uint8
+        (prefix,  # int8
+         unit,  # uint8
+         timebase,  # uint8
+         ) = _GET_CURRENT_GAS_UNIT_RESPONSE.unpack_from(data)
         return prefix,\
             unit,\
             timebase
@@ -151,7 +167,7 @@ class Sfc5xxxCmdGetCurrentFullscale(Sfc5xxxCmdGetCurrentCalibrationInformationBa
         Constructor.
         """
         super(Sfc5xxxCmdGetCurrentFullscale, self).__init__(
-            data=b"".join([bytes(bytearray([0x14]))]),
+            data=_GET_CURRENT_FULLSCALE_REQUEST,
             max_response_time=0.01,
             post_processing_time=0.0,
             min_response_length=4,
@@ -165,7 +181,7 @@ class Sfc5xxxCmdGetCurrentFullscale(Sfc5xxxCmdGetCurrentCalibrationInformationBa
                  calibration.
         :rtype: float
         """
-        fullscale = float(unpack(">f", data[0:4])[0])  # float
+        fullscale = _GET_CURRENT_FULLSCALE_RESPONSE.unpack_from(data)[0]  # float
         return fullscale
 
 
@@ -181,7 +197,7 @@ class Sfc5xxxCmdGetCurrentInitialCalibrationConditions(Sfc5xxxCmdGetCurrentCalib
         Constructor.
         """
         super(Sfc5xxxCmdGetCurrentInitialCalibrationConditions, self).__init__(
-            data=b"".join([bytes(bytearray([0x15]))]),
+            data=_GET_CURRENT_INITIAL_CALIBRATION_CONDITIONS_REQUEST,
             max_response_time=0.01,
             post_processing_time=0.0,
             min_response_length=127,
@@ -223,19 +239,22 @@ class Sfc5xxxCmdGetCurrentInitialCalibrationConditions(Sfc5xxxCmdGetCurrentCalib
               if larger than the accuracy of the setpoint.
         :rtype: tuple
         """
-        company = str(data[0:50].decode('utf-8').rstrip('\0'))  # string<50>
-        operator = str(data[50:100].decode('utf-8').rstrip('\0'))  # string<50>
-        year = int(unpack(">H", data[100:102])[0])  # uint16
-        month = int(unpack(">B", data[102:103])[0])  # uint8
-        day = int(unpack(">B", data[103:104])[0])  # uint8
-        hour = int(unpack(">B", data[104:105])[0])  # uint8
-        minute = int(unpack(">B", data[105:106])[0])  # uint8
-        temperature = float(unpack(">f", data[106:110])[0])  # float
-        inlet_pressure = float(unpack(">f", data[110:114])[0])  # float
-        differential_pressure = float(unpack(">f", data[114:118])[0])  # float
-        is_real_gas_calibration = bool(unpack(">?", data[118:119])[0])  # bool
-        accuracy_setpoint = float(unpack(">f", data[119:123])[0])  # float
-        accuracy_fullscale = float(unpack(">f", data[123:127])[0])  # float
+        (company,  # string<50>
+         operator,  # string<50>
+         year,  # uint16
+         month,  # uint8
+         day,  # uint8
+         hour,  # uint8
+         minute,  # uint8
+         temperature,  # float
+         inlet_pressure,  # float
+         differential_pressure,  # float
+         is_real_gas_calibration,  # bool
+         accuracy_setpoint,  # float
+         accuracy_fullscale,  # float
+         ) = _GET_CURRENT_INITIAL_CALIBRATION_CONDITIONS_RESPONSE.unpack_from(data)
+        company = str(company.decode('utf-8').rstrip('\0'))
+        operator = str(operator.decode('utf-8').rstrip('\0'))
         return company,\
             operator,\
             year,\
@@ -263,7 +282,7 @@ class Sfc5xxxCmdGetCurrentRecalibrationConditions(Sfc5xxxCmdGetCurrentCalibratio
         Constructor.
         """
         super(Sfc5xxxCmdGetCurrentRecalibrationConditions, self).__init__(
-            data=b"".join([bytes(bytearray([0x16]))]),
+            data=_GET_CURRENT_RECALIBRATION_CONDITIONS_REQUEST,
             max_response_time=0.01,
             post_processing_time=0.0,
             min_response_length=127,
@@ -305,19 +324,22 @@ class Sfc5xxxCmdGetCurrentRecalibrationConditions(Sfc5xxxCmdGetCurrentCalibratio
               if larger than the accuracy of the setpoint.
         :rtype: tuple
         """
-        company = str(data[0:50].decode('utf-8').rstrip('\0'))  # string<50>
-        operator = str(data[50:100].decode('utf-8').rstrip('\0'))  # string<50>
-        year = int(unpack(">H", data[100:102])[0])  # uint16
-        month = int(unpack(">B", data[102:103])[0])  # uint8
-        day = int(unpack(">B", data[103:104])[0])  # uint8
-        hour = int(unpack(">B", data[104:105])[0])  # uint8
-        minute = int(unpack(">B", data[105:106])[0])  # uint8
-        temperature = float(unpack(">f", data[106:110])[0])  # float
-        inlet_pressure = float(unpack(">f", data[110:114])[0])  # float
-        differential_pressure = float(unpack(">f", data[114:118])[0])  # float
-        is_real_gas_calibration = bool(unpack(">?", data[118:119])[0])  # bool
-        accuracy_setpoint = float(unpack(">f", data[119:123])[0])  # float
-        accuracy_fullscale = float(unpack(">f", data[123:127])[0])  # float
+        (company,  # string<50>
+         operator,  # string<50>
+         year,  # uint16
+         month,  # uint8
+         day,  # uint8
+         hour,  # uint8
+         minute,  # uint8
+         temperature,  # float
+         inlet_pressure,  # float
+         differential_pressure,  # float
+         is_real_gas_calibration,  # bool
+         accuracy_setpoint,  # float
+         accuracy_fullscale,  # float
+         ) = _GET_CURRENT_RECALIBRATION_CONDITIONS_RESPONSE.unpack_from(data)
+        company = str(company.decode('utf-8').rstrip('\0'))
+        operator = str(operator.decode('utf-8').rstrip('\0'))
         return company,\
             operator,\
             year,\
@@ -346,7 +368,7 @@ class Sfc5xxxCmdGetCurrentThermalConductivityReference(Sfc5xxxCmdGetCurrentCalib
         Constructor.
         """
         super(Sfc5xxxCmdGetCurrentThermalConductivityReference, self).__init__(
-            data=b"".join([bytes(bytearray([0x17]))]),
+            data=_GET_CURRENT_THERMAL_CONDUCTIVITY_REFERENCE_REQUEST,
             max_response_time=0.01,
             post_processing_time=0.0,
             min_response_length=2,
@@ -359,5 +381,5 @@ class Sfc5xxxCmdGetCurrentThermalConductivityReference(Sfc5xxxCmdGetCurrentCalib
         :return: Thermal conductivity reference value for the gas.
         :rtype: int
         """
-        reference_value = int(unpack(">H", data[0:2])[0])  # uint16
+        reference_value = _GET_CURRENT_THERMAL_CONDUCTIVITY_REFERENCE_RESPONSE.unpack_from(data)[0]  # uint16
         return reference_value
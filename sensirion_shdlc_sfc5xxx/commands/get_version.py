@@ -23,11 +23,14 @@
 
 from __future__ import absolute_import, division, print_function
 from sensirion_shdlc_driver.command import ShdlcCommand
-from struct import pack, unpack
+from struct import Struct
 
 import logging
 log = logging.getLogger(__name__)
 
+# Precompiled request and response codecs
+_GET_VERSION_RESPONSE = Struct(">BB?BBBB")
+
 
 class Sfc5xxxCmdGetVersionBase(ShdlcCommand):
     """
@@ -54,7 +57,7 @@ class Sfc5xxxCmdGetVersion(Sfc5xxxCmdGetVersionBase):
         Constructor.
         """
         super(Sfc5xxxCmdGetVersion, self).__init__(
-            data=[],
+            data=b"",
             max_response_time=0.01,
             post_processing_time=0.0,
             min_response_length=7,
@@ -82,13 +85,14 @@ class Sfc5xxxCmdGetVersion(Sfc5xxxCmdGetVersionBase):
               Protocol minor version number.
         :rtype: tuple
         """
-        firmware_major = int(unpack(">B", data[0:1])[0])  # uint8
-        firmware_minor = int(unpack(">B", data[1:2])[0])  # uint8
-        firmware_debug = bool(unpack(">?", data[2:3])[0])  # bool
-        hardware_major = int(unpack(">B", data[3:4])[0])  # uint8
-        hardware_minor = int(unpack(">B", data[4:5])[0])  # uint8
-        protocol_major = int(unpack(">B", data[5:6])[0])  # uint8
-        protocol_minor = int(unpack(">B", data[6:7])[0])  # uint8
+        (firmware_major,  # uint8
+         firmware_minor,  # uint8
+         firmware_debug,  # bool
+         hardware_major,  # uint8
+         hardware_minor,  # uint8
+         protocol_major,  # uint8
+         protocol_minor,  # uint8
+         ) = _GET_VERSION_RESPONSE.unpack_from(data)
         return firmware_major,\
             firmware_minor,\
             firmware_debug,\
@@ -23,11 +23,20 @@
 
 from __future__ import absolute_import, division, print_function
 from sensirion_shdlc_driver.command import ShdlcCommand
-from struct import pack, unpack
+from struct import Struct
 
 import logging
 log = logging.getLogger(__name__)
 
+# Precompiled request and response codecs
+_GET_USER_DEFINED_MEDIUM_UNIT_REQUEST = b"\x00"
+_GET_USER_DEFINED_MEDIUM_UNIT_RESPONSE = Struct(">bBB")
+_SET_USER_DEFINED_MEDIUM_UNIT_REQUEST = Struct(">BbBB")
+_GET_USER_DEFINED_MEDIUM_UNIT_WITHOUT_WILDCARDS_REQUEST = b"\x01"
+_GET_USER_DEFINED_MEDIUM_UNIT_WITHOUT_WILDCARDS_RESPONSE = Struct(">bBB")
+_GET_USER_DEFINED_FULLSCALE_REQUEST = b"\x0A"
+_GET_USER_DEFINED_FULLSCALE_RESPONSE = Struct(">f")
+
 
 class Sfc5xxxCmdMediumUnitConfigurationBase(ShdlcCommand):
     """
@@ -54,7 +63,7 @@ class Sfc5xxxCmdGetUserDefinedMediumUnit(Sfc5xxxCmdMediumUnitConfigurationBase):
         Constructor.
         """
         super(Sfc5xxxCmdGetUserDefinedMediumUnit, self).__init__(
-            data=b"".join([bytes(bytearray([0x00]))]),
+            data=_GET_USER_DEFINED_MEDIUM_UNIT_REQUEST,
             max_response_time=0.005,
             post_processing_time=0.0,
             min_response_length=3,
@@ -76,9 +85,10 @@ class Sfc5xxxCmdGetUserDefinedMediumUnit(Sfc5xxxCmdMediumUnitConfigurationBase):
               calibration.
         :rtype: tuple
         """
-        prefix = int(unpack(">b", data[0:1])[0])  # int8
-        unit = int(unpack(">B", data[1:2])[0])  # uint8
-        timebase = int(unpack(">B", data[2:3])[0])  # uint8
+        (prefix,  # int8
+         unit,  # uint8
+         timebase,  # uint8
+         ) = _GET_USER_DEFINED_MEDIUM_UNIT_RESPONSE.unpack_from(data)
         return prefix,\
             unit,\
             timebase
@@ -109,10 +119,7 @@ class Sfc5xxxCmdSetUserDefinedMediumUnit(Sfc5xxxCmdMediumUnitConfigurationBase):
             calibration.
         """
         super(Sfc5xxxCmdSetUserDefinedMediumUnit, self).__init__(
-            data=b"".join([bytes(bytearray([0x00])),
-                           pack(">b", prefix),
-                           pack(">B", unit),
-                           pack(">B", timebase)]),
+            data=_SET_USER_DEFINED_MEDIUM_UNIT_REQUEST.pack(0x00, prefix, unit, timebase),
             max_response_time=0.005,
             post_processing_time=0.0,
             min_response_length=0,
@@ -133,7 +140,7 @@ class Sfc5xxxCmdGetUserDefinedMediumUnitWithoutWildcards(Sfc5xxxCmdMediumUnitCon
         Constructor.
         """
         super(Sfc5xxxCmdGetUserDefinedMediumUnitWithoutWildcards, self).__init__(
-            data=b"".join([bytes(bytearray([0x01]))]),
+            data=_GET_USER_DEFINED_MEDIUM_UNIT_WITHOUT_WILDCARDS_REQUEST,
             max_response_time=0.005,
             post_processing_time=0.0,
             min_response_length=3,
@@ -152,9 +159,10 @@ class Sfc5xxxCmdGetUserDefinedMediumUnitWithoutWildcards(Sfc5xxxCmdMediumUnitCon
               Timebase, see appendix for encoding.
         :rtype: tuple
         """
-        prefix = int(unpack(">b", data[0:1])[0])  # int8
-        unit = int(unpack(">B", data[1:2])[0])  # uint8
-        timebase = int(unpack(">B", data[2:3])[0])  # uint8
+        (prefix,  # int8
+         unit,  # uint8
+         timebase,  # uint8
+         ) = _GET_USER_DEFINED_MEDIUM_UNIT_WITHOUT_WILDCARDS_RESPONSE.unpack_from(data)
         return prefix,\
             unit,\
             timebase
@@ -172,7 +180,7 @@ class Sfc5xxxCmdGetUserDefinedFullscale(Sfc5xxxCmdMediumUnitConfigurationBase):
         Constructor.
         """
         super(Sfc5xxxCmdGetUserDefinedFullscale, self).__init__(
-            data=b"".join([bytes(bytearray([0x0A]))]),
+            data=_GET_USER_DEFINED_FULLSCALE_REQUEST,
             max_response_time=0.005,
             post_processing_time=0.0,
             min_response_length=4,
@@ -185,5 +193,5 @@ class Sfc5xxxCmdGetUserDefinedFullscale(Sfc5xxxCmdMediumUnitConfigurationBase):
         :return: Fullscale for user defined medium unit.
         :rtype: float
         """
-        fullscale = float(unpack(">f", data[0:4])[0])  # float
+        fullscale = _GET_USER_DEFINED_FULLSCALE_RESPONSE.unpack_from(data)[0]  # float
         return fullscale
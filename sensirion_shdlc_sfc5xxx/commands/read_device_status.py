@@ -23,11 +23,15 @@
 
 from __future__ import absolute_import, division, print_function
 from sensirion_shdlc_driver.command import ShdlcCommand
-from struct import pack, unpack
+from struct import Struct
 
 import logging
 log = logging.getLogger(__name__)
 
+# Precompiled request and response codecs
+_READ_DEVICE_STATUS_REQUEST = Struct(">?")
+_READ_DEVICE_STATUS_RESPONSE = Struct(">IB")
+
 
 class Sfc5xxxCmdReadDeviceStatusBase(ShdlcCommand):
     """
@@ -68,7 +72,7 @@ class Sfc5xxxCmdReadDeviceStatus(Sfc5xxxCmdReadDeviceStatusBase):
             (except the boot error flag #0).
         """
         super(Sfc5xxxCmdReadDeviceStatus, self).__init__(
-            data=b"".join([pack(">?", clear)]),
+            data=_READ_DEVICE_STATUS_REQUEST.pack(clear),
             max_response_time=0.01,
             post_processing_time=0.0,
             min_response_length=5,
@@ -88,7 +92,8 @@ class Sfc5xxxCmdReadDeviceStatus(Sfc5xxxCmdReadDeviceStatusBase):
               this error code defines what exactly went wrong.
         :rtype: tuple
         """
-        device_status = int(unpack(">I", data[0:4])[0])  # uint32
-        boot_error = int(unpack(">B", data[4:5])[0])  # uint8
+        (device_status,  # uint32
+         boot_error,  # uint8
+         ) = _READ_DEVICE_STATUS_RESPONSE.unpack_from(data)
         return device_status,\
             boot_error
@@ -23,11 +23,15 @@
 
 from __future__ import absolute_import, division, print_function
 from sensirion_shdlc_driver.command import ShdlcCommand
-from struct import pack, unpack
+from struct import Struct
 
 import logging
 log = logging.getLogger(__name__)
 
+# Precompiled request and response codecs
+_READ_MEASURED_VALUE_REQUEST = Struct(">B")
+_READ_MEASURED_VALUE_RESPONSE = Struct(">f")
+
 
 class Sfc5xxxCmdReadMeasuredValueBase(ShdlcCommand):
     """
@@ -65,7 +69,7 @@ class Sfc5xxxCmdReadMeasuredValue(Sfc5xxxCmdReadMeasuredValueBase):
                Requires at least firmware version 1.40.
         """
         super(Sfc5xxxCmdReadMeasuredValue, self).__init__(
-            data=b"".join([pack(">B", scaling)]),
+            data=_READ_MEASURED_VALUE_REQUEST.pack(scaling),
             max_response_time=0.005,
             post_processing_time=0.0,
             min_response_length=4,
@@ -78,5 +82,5 @@ class Sfc5xxxCmdReadMeasuredValue(Sfc5xxxCmdReadMeasuredValueBase):
         :return: The latest measured flow with the specified scaling.
         :rtype: float
         """
-        measured_value = float(unpack(">f", data[0:4])[0])  # float
+        measured_value = _READ_MEASURED_VALUE_RESPONSE.unpack_from(data)[0]  # float
         return measured_value
@@ -23,11 +23,16 @@
 
 from __future__ import absolute_import, division, print_function
 from sensirion_shdlc_driver.command import ShdlcCommand
-from struct import pack, unpack
+from struct import Struct
 
 import logging
 log = logging.getLogger(__name__)
 
+# Precompiled request and response codecs
+_READ_MEASURED_VALUE_BUFFER_REQUEST = Struct(">B")
+_READ_MEASURED_VALUE_BUFFER_RESPONSE = Struct(">IIf")
+_READ_MEASURED_VALUE_BUFFER_VALUES = [Struct(">{}f".format(i)) for i in range(61)]
+
 
 class Sfc5xxxCmdReadMeasuredValueBufferBase(ShdlcCommand):
     """
@@ -73,7 +78,7 @@ class Sfc5xxxCmdReadMeasuredValueBuffer(Sfc5xxxCmdReadMeasuredValueBufferBase):
                Requires at least firmware version 1.40.
         """
         super(Sfc5xxxCmdReadMeasuredValueBuffer, self).__init__(
-            data=b"".join([pack(">B", scaling)]),
+            data=_READ_MEASURED_VALUE_BUFFER_REQUEST.pack(scaling),
             max_response_time=0.005,
             post_processing_time=0.0,
             min_response_length=12,
@@ -103,10 +108,11 @@ class Sfc5xxxCmdReadMeasuredValueBuffer(Sfc5xxxCmdReadMeasuredValueBufferBase):
               with the specified scaling.
         :rtype: tuple
         """
-        lost_value_count = int(unpack(">I", data[0:4])[0])  # uint32
-        remaining_value_count = int(unpack(">I", data[4:8])[0])  # uint32
-        sampling_time = float(unpack(">f", data[8:12])[0])  # float
-        measured_values = [float(ii) for ii in unpack(">{}f".format(len(data[12:]) // 4), data[12:])]  # list(float)
+        (lost_value_count,  # uint32
+         remaining_value_count,  # uint32
+         sampling_time,  # float
+         ) = _READ_MEASURED_VALUE_BUFFER_RESPONSE.unpack_from(data)
+        measured_values = list(_READ_MEASURED_VALUE_BUFFER_VALUES[(len(data) - 12) // 4].unpack_from(data, 12))
         return lost_value_count,\
             remaining_value_count,\
             sampling_time,\
@@ -23,11 +23,15 @@
 
 from __future__ import absolute_import, division, print_function
 from sensirion_shdlc_driver.command import ShdlcCommand
-from struct import pack, unpack
+from struct import Struct
 
 import logging
 log = logging.getLogger(__name__)
 
+# Precompiled request and response codecs
+_GET_REPLY_DELAY_RESPONSE = Struct(">H")
+_SET_REPLY_DELAY_REQUEST = Struct(">H")
+
 
 class Sfc5xxxCmdReplyDelayBase(ShdlcCommand):
     """
@@ -54,7 +58,7 @@ class Sfc5xxxCmdGetReplyDelay(Sfc5xxxCmdReplyDelayBase):
         Constructor.
         """
         super(Sfc5xxxCmdGetReplyDelay, self).__init__(
-            data=[],
+            data=b"",
             max_response_time=0.01,
             post_processing_time=0.0,
             min_response_length=2,
@@ -67,7 +71,7 @@ class Sfc5xxxCmdGetReplyDelay(Sfc5xxxCmdReplyDelayBase):
         :return: The reply delay of the device in Microseconds.
         :rtype: int
         """
-        reply_delay = int(unpack(">H", data[0:2])[0])  # uint16
+        reply_delay = _GET_REPLY_DELAY_RESPONSE.unpack_from(data)[0]  # uint16
         return reply_delay
 
 
@@ -90,7 +94,7 @@ class Sfc5xxxCmdSetReplyDelay(Sfc5xxxCmdReplyDelayBase):
             The reply delay in Microseconds.
         """
         super(Sfc5xxxCmdSetReplyDelay, self).__init__(
-            data=b"".join([pack(">H", reply_delay)]),
+            data=_SET_REPLY_DELAY_REQUEST.pack(reply_delay),
             max_response_time=0.01,
             post_processing_time=0.0,
             min_response_length=0,
@@ -23,11 +23,15 @@
 
 from __future__ import absolute_import, division, print_function
 from sensirion_shdlc_driver.command import ShdlcCommand
-from struct import pack, unpack
+from struct import Struct
 
 import logging
 log = logging.getLogger(__name__)
 
+# Precompiled request and response codecs
+_SET_SETPOINT_AND_READ_MEASURED_VALUE_REQUEST = Struct(">Bf")
+_SET_SETPOINT_AND_READ_MEASURED_VALUE_RESPONSE = Struct(">f")
+
 
 class Sfc5xxxCmdSetSetpointAndReadMeasuredValueBase(ShdlcCommand):
     """
@@ -73,8 +77,7 @@ class Sfc5xxxCmdSetSetpointAndReadMeasuredValue(Sfc5xxxCmdSetSetpointAndReadMeas
             The new setpoint with the specified scaling.
         """
         super(Sfc5xxxCmdSetSetpointAndReadMeasuredValue, self).__init__(
-            data=b"".join([pack(">B", scaling),
-                           pack(">f", setpoint)]),
+            data=_SET_SETPOINT_AND_READ_MEASURED_VALUE_REQUEST.pack(scaling, setpoint),
             max_response_time=0.005,
             post_processing_time=0.0,
             min_response_length=4,
@@ -87,5 +90,5 @@ class Sfc5xxxCmdSetSetpointAndReadMeasuredValue(Sfc5xxxCmdSetSetpointAndReadMeas
         :return: The latest measured flow with the specified scaling.
         :rtype: float
         """
-        measured_value = float(unpack(">f", data[0:4])[0])  # float
+        measured_value = _SET_SETPOINT_AND_READ_MEASURED_VALUE_RESPONSE.unpack_from(data)[0]  # float
         return measured_value
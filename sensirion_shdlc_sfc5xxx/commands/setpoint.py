@@ -23,11 +23,16 @@
 
 from __future__ import absolute_import, division, print_function
 from sensirion_shdlc_driver.command import ShdlcCommand
-from struct import pack, unpack
+from struct import Struct
 
 import logging
 log = logging.getLogger(__name__)
 
+# Precompiled request and response codecs
+_GET_SETPOINT_REQUEST = Struct(">B")
+_GET_SETPOINT_RESPONSE = Struct(">f")
+_SET_SETPOINT_REQUEST = Struct(">Bf")
+
 
 class Sfc5xxxCmdSetpointBase(ShdlcCommand):
     """
@@ -64,7 +69,7 @@ class Sfc5xxxCmdGetSetpoint(Sfc5xxxCmdSetpointBase):
                unit. Requires at least firmware version 1.40.
         """
         super(Sfc5xxxCmdGetSetpoint, self).__init__(
-            data=b"".join([pack(">B", scaling)]),
+            data=_GET_SETPOINT_REQUEST.pack(scaling),
             max_response_time=0.005,
             post_processing_time=0.0,
             min_response_length=4,
@@ -77,7 +82,7 @@ class Sfc5xxxCmdGetSetpoint(Sfc5xxxCmdSetpointBase):
         :return: The current setpoint with the specified scaling.
         :rtype: float
         """
-        setpoint = float(unpack(">f", data[0:4])[0])  # float
+        setpoint = _GET_SETPOINT_RESPONSE.unpack_from(data)[0]  # float
         return setpoint
 
 
@@ -109,8 +114,7 @@ class Sfc5xxxCmdSetSetpoint(Sfc5xxxCmdSetpointBase):
             The new setpoint with the specified scaling.
         """
         super(Sfc5xxxCmdSetSetpoint, self).__init__(
-            data=b"".join([pack(">B", scaling),
-                           pack(">f", setpoint)]),
+            data=_SET_SETPOINT_REQUEST.pack(scaling, setpoint),
             max_response_time=0.005,
             post_processing_time=0.0,
             min_response_length=0,
@@ -23,11 +23,16 @@
 
 from __future__ import absolute_import, division, print_function
 from sensirion_shdlc_driver.command import ShdlcCommand
-from struct import pack, unpack
+from struct import Struct
 
 import logging
 log = logging.getLogger(__name__)
 
+# Precompiled request and response codecs
+_SET_SETPOINT_PERSIST_REQUEST = Struct(">B?")
+_GET_SETPOINT_PERSIST_REQUEST = b"\x80"
+_GET_SETPOINT_PERSIST_RESPONSE = Struct(">?")
+
 
 class Sfc5xxxCmdSetpointPersistBase(ShdlcCommand):
     """
@@ -61,8 +66,7 @@ class Sfc5xxxCmdSetSetpointPersist(Sfc5xxxCmdSetpointPersistBase):
             Whether the setpoint should persist after a reset or not.
         """
         super(Sfc5xxxCmdSetSetpointPersist, self).__init__(
-            data=b"".join([bytes(bytearray([0x00])),
-                           pack(">?", persist)]),
+            data=_SET_SETPOINT_PERSIST_REQUEST.pack(0x00, persist),
             max_response_time=0.01,
             post_processing_time=0.0,
             min_response_length=0,
@@ -82,7 +86,7 @@ class Sfc5xxxCmdGetSetpointPersist(Sfc5xxxCmdSetpointPersistBase):
         Constructor.
         """
         super(Sfc5xxxCmdGetSetpointPersist, self).__init__(
-            data=b"".join([bytes(bytearray([0x80]))]),
+            data=_GET_SETPOINT_PERSIST_REQUEST,
             max_response_time=0.01,
             post_processing_time=0.0,
             min_response_length=1,
@@ -95,5 +99,5 @@ class Sfc5xxxCmdGetSetpointPersist(Sfc5xxxCmdSetpointPersistBase):
         :return: Whether the setpoint should persist after a reset or not.
         :rtype: bool
         """
-        persist = bool(unpack(">?", data[0:1])[0])  # bool
+        persist = _GET_SETPOINT_PERSIST_RESPONSE.unpack_from(data)[0]  # bool
         return persist
@@ -23,11 +23,15 @@
 
 from __future__ import absolute_import, division, print_function
 from sensirion_shdlc_driver.command import ShdlcCommand
-from struct import pack, unpack
+from struct import Struct
 
 import logging
 log = logging.getLogger(__name__)
 
+# Precompiled request and response codecs
+_GET_SLAVE_ADDRESS_RESPONSE = Struct(">B")
+_SET_SLAVE_ADDRESS_REQUEST = Struct(">B")
+
 
 class Sfc5xxxCmdSlaveAddressBase(ShdlcCommand):
     """
@@ -54,7 +58,7 @@ class Sfc5xxxCmdGetSlaveAddress(Sfc5xxxCmdSlaveAddressBase):
         Constructor.
         """
         super(Sfc5xxxCmdGetSlaveAddress, self).__init__(
-            data=[],
+            data=b"",
             max_response_time=0.01,
             post_processing_time=0.0,
             min_response_length=1,
@@ -67,7 +71,7 @@ class Sfc5xxxCmdGetSlaveAddress(Sfc5xxxCmdSlaveAddressBase):
         :return: The current slave address of the device.
         :rtype: int
         """
-        slave_address = int(unpack(">B", data[0:1])[0])  # uint8
+        slave_address = _GET_SLAVE_ADDRESS_RESPONSE.unpack_from(data)[0]  # uint8
         return slave_address
 
 
@@ -94,7 +98,7 @@ class Sfc5xxxCmdSetSlaveAddress(Sfc5xxxCmdSlaveAddressBase):
             The new slave address to set.
         """
         super(Sfc5xxxCmdSetSlaveAddress, self).__init__(
-            data=b"".join([pack(">B", slave_address)]),
+            data=_SET_SLAVE_ADDRESS_REQUEST.pack(slave_address),
             max_response_time=0.01,
             post_processing_time=0.0,
             min_response_length=0,
@@ -23,11 +23,15 @@
 
 from __future__ import absolute_import, division, print_function
 from sensirion_shdlc_driver.command import ShdlcCommand
-from struct import pack, unpack
+from struct import Struct
 
 import logging
 log = logging.getLogger(__name__)
 
+# Precompiled request and response codecs
+_READ_USER_MEMORY_REQUEST = Struct(">BB")
+_WRITE_USER_MEMORY_REQUEST = Struct(">BB")
+
 
 class Sfc5xxxCmdUserMemoryAccessBase(ShdlcCommand):
     """
@@ -59,8 +63,7 @@ class Sfc5xxxCmdReadUserMemory(Sfc5xxxCmdUserMemoryAccessBase):
             Defines how many bytes should be read.
         """
         super(Sfc5xxxCmdReadUserMemory, self).__init__(
-            data=b"".join([pack(">B", address),
-                           pack(">B", length)]),
+            data=_READ_USER_MEMORY_REQUEST.pack(address, length),
             max_response_time=0.01,
             post_processing_time=0.0,
             min_response_length=0,
@@ -96,9 +99,7 @@ class Sfc5xxxCmdWriteUserMemory(Sfc5xxxCmdUserMemoryAccessBase):
             The data to be written.
         """
         super(Sfc5xxxCmdWriteUserMemory, self).__init__(
-            data=b"".join([pack(">B", address),
-                           pack(">B", length),
-                           bytes(bytearray(write_data))]),
+            data=_WRITE_USER_MEMORY_REQUEST.pack(address, length) + bytes(bytearray(write_data)),
             max_response_time=0.01,
             post_processing_time=0.0,
             min_response_length=0,
@@ -23,11 +23,19 @@
 
 from __future__ import absolute_import, division, print_function
 from sensirion_shdlc_driver.command import ShdlcCommand
-from struct import pack, unpack
+from struct import Struct
 
 import logging
 log = logging.getLogger(__name__)
 
+# Precompiled request and response codecs
+_GET_VALVE_INPUT_SOURCE_REQUEST = b"\x00"
+_GET_VALVE_INPUT_SOURCE_RESPONSE = Struct(">B")
+_SET_VALVE_INPUT_SOURCE_REQUEST = Struct(">BB")
+_GET_USER_DEFINED_VALVE_VALUE_REQUEST = b"\x01"
+_GET_USER_DEFINED_VALVE_VALUE_RESPONSE = Struct(">f")
+_SET_USER_DEFINED_VALVE_VALUE_REQUEST = Struct(">Bf")
+
 
 class Sfc5xxxCmdValveInputSourceConfigurationBase(ShdlcCommand):
     """
@@ -55,7 +63,7 @@ class Sfc5xxxCmdGetValveInputSource(Sfc5xxxCmdValveInputSourceConfigurationBase)
         Constructor.
         """
         super(Sfc5xxxCmdGetValveInputSource, self).__init__(
-            data=b"".join([bytes(bytearray([0x00]))]),
+            data=_GET_VALVE_INPUT_SOURCE_REQUEST,
             max_response_time=0.005,
             post_processing_time=0.0,
             min_response_length=1,
@@ -74,7 +82,7 @@ class Sfc5xxxCmdGetValveInputSource(Sfc5xxxCmdValveInputSourceConfigurationBase)
                  -  0x10: User defined, apply user defined value [0..1].
         :rtype: int
         """
-        input_source = int(unpack(">B", data[0:1])[0])  # uint8
+        input_source = _GET_VALVE_INPUT_SOURCE_RESPONSE.unpack_from(data)[0]  # uint8
         return input_source
 
 
@@ -102,8 +110,7 @@ class Sfc5xxxCmdSetValveInputSource(Sfc5xxxCmdValveInputSourceConfigurationBase)
             -  0x10: User defined, apply user defined value [0..1].
         """
         super(Sfc5xxxCmdSetValveInputSource, self).__init__(
-            data=b"".join([bytes(bytearray([0x00])),
-                           pack(">B", input_source)]),
+            data=_SET_VALVE_INPUT_SOURCE_REQUEST.pack(0x00, input_source),
             max_response_time=0.005,
             post_processing_time=0.0,
             min_response_length=0,
@@ -124,7 +131,7 @@ class Sfc5xxxCmdGetUserDefinedValveValue(Sfc5xxxCmdValveInputSourceConfiguration
         Constructor.
         """
         super(Sfc5xxxCmdGetUserDefinedValveValue, self).__init__(
-            data=b"".join([bytes(bytearray([0x01]))]),
+            data=_GET_USER_DEFINED_VALVE_VALUE_REQUEST,
             max_response_time=0.005,
             post_processing_time=0.0,
             min_response_length=4,
@@ -138,7 +145,7 @@ class Sfc5xxxCmdGetUserDefinedValveValue(Sfc5xxxCmdValveInputSourceConfiguration
                  closed, 1.0 means fully open.
         :rtype: float
         """
-        value = float(unpack(">f", data[0:4])[0])  # float
+        value = _GET_USER_DEFINED_VALVE_VALUE_RESPONSE.unpack_from(data)[0]  # float
         return value
 
 
@@ -161,8 +168,7 @@ class Sfc5xxxCmdSetUserDefinedValveValue(Sfc5xxxCmdValveInputSourceConfiguration
             1.0 means fully open.
         """
         super(Sfc5xxxCmdSetUserDefinedValveValue, self).__init__(
-            data=b"".join([bytes(bytearray([0x01])),
-                           pack(">f", value)]),
+            data=_SET_USER_DEFINED_VALVE_VALUE_REQUEST.pack(0x01, value),
             max_response_time=0.005,
             post_processing_time=0.0,
             min_response_length=0,
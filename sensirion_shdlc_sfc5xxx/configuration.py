@@ -0,0 +1,250 @@
+# -*- coding: utf-8 -*-
+# (c) Copyright 2020 Sensirion AG, Switzerland
+"""
+Snapshot of the persistent device configuration.
+
+A configuration can be read from a device, stored (e.g. as JSON), compared
+with another configuration and applied to a device. Only the settings which
+differ are written, so applying the same configuration again does not
+write anything to the non-volatile memory of the device:
+
+.. sourcecode:: python
+
+    configuration = old_device.get_configuration()
+    with open('mfc.json', 'w') as f:
+        json.dump(configuration.to_dict(), f)
+
+    # Later, on the replacement device:
+    with open('mfc.json') as f:
+        target = Sfc5xxxConfiguration.from_dict(json.load(f))
+    changed = new_device.apply_configuration(target)
+"""
+
+from __future__ import absolute_import, division, print_function
+from collections import OrderedDict
+from struct import Struct
+from .definitions import Sfc5xxxValveInputSource
+from .units import Sfc5xxxMediumUnit
+
+import logging
+log = logging.getLogger(__name__)
+
+
+_FLOAT32 = Struct(">f")
+
+
+def _to_float32(value):
+    """
+    Round a float to the precision transmitted over SHDLC, to compare values
+    read from the device with values of a target configuration.
+
+    :param float value: The value.
+    :return: The rounded value.
+    :rtype: float
+    """
+    return _FLOAT32.unpack(_FLOAT32.pack(value))[0]
+
+
+class Sfc5xxxConfiguration(object):
+    """
+    A class representing the persistent configuration of a device.
+
+    Every setting can be ``None``, which means it is unknown (when read from
+    a device) resp. should not be changed (when applied to a device). The
+    settings are listed in :py:attr:`SETTINGS` in the order they are
+    applied. The communication settings (slave address and baudrate) are
+    applied last, so all other settings are written with the old settings.
+
+    .. note:: The active calibration cannot be read from the device, so it
+              is always ``None`` in configurations returned by
+              :py:meth:`~sensirion_shdlc_sfc5xxx.device.Sfc5xxxShdlcDevice.get_configuration`.
+              If set in a target configuration, the calibration is always
+              activated when applying it.
+    """  # noqa: E501
+
+    #: Names of all settings, in the order they are applied.
+    SETTINGS = (
+        'active_calibration',
+        'user_defined_medium_unit',
+        'setpoint_persist',
+        'user_controller_gain',
+        'pressure_dependent_gain_enable',
+        'inlet_pressure_for_gain_correction',
+        'gas_temperature_compensation_enable',
+        'inlet_gas_temperature_for_compensation',
+        'valve_input_source',
+        'reply_delay',
+        'slave_address',
+        'baudrate',
+    )
+
+    __slots__ = SETTINGS
+
+    def __init__(self, active_calibration=None, user_defined_medium_unit=None,
+                 setpoint_persist=None, user_controller_gain=None,
+                 pressure_dependent_gain_enable=None,
+                 inlet_pressure_for_gain_correction=None,
+                 gas_temperature_compensation_enable=None,
+                 inlet_gas_temperature_for_compensation=None,
+                 valve_input_source=None, reply_delay=None,
+                 slave_address=None, baudrate=None):
+        """
+        Constructor.
+
+        :param int active_calibration:
+            Index of the active calibration.
+        :param ~sensirion_shdlc_sfc5xxx.units.Sfc5xxxMediumUnit user_defined_medium_unit:
+            The user defined medium unit.
+        :param bool setpoint_persist:
+            Whether the setpoint is stored in non-volatile memory.
+        :param float user_controller_gain:
+            The user controller gain.
+        :param bool pressure_dependent_gain_enable:
+            Whether the pressure dependent gain is enabled.
+        :param float inlet_pressure_for_gain_correction:
+            The inlet pressure [bar] for the gain correction.
+        :param bool gas_temperature_compensation_enable:
+            Whether the gas temperature compensation is enabled.
+        :param float inlet_gas_temperature_for_compensation:
+            The inlet gas temperature [°C] for the compensation.
+        :param ~sensirion_shdlc_sfc5xxx.definitions.Sfc5xxxValveInputSource valve_input_source:
+            The valve input source.
+        :param int reply_delay:
+            The SHDLC reply delay [μs].
+        :param byte slave_address:
+            The SHDLC slave address.
+        :param int baudrate:
+            The SHDLC baudrate [bit/s].
+        """  # noqa: E501
+        super(Sfc5xxxConfiguration, self).__init__()
+        self.active_calibration = active_calibration
+        self.user_defined_medium_unit = user_defined_medium_unit
+        self.setpoint_persist = setpoint_persist
+        self.user_controller_gain = user_controller_gain
+        self.pressure_dependent_gain_enable = pressure_dependent_gain_enable
+        self.inlet_pressure_for_gain_correction = \
+            inlet_pressure_for_gain_correction
+        self.gas_temperature_compensation_enable = \
+            gas_temperature_compensation_enable
+        self.inlet_gas_temperature_for_compensation = \
+            inlet_gas_temperature_for_compensation
+        self.valve_input_source = valve_input_source
+        self.reply_delay = reply_delay
+        self.slave_address = slave_address
+        self.baudrate = baudrate
+
+    def to_dict(self):
+        """
+        Convert the configuration to a dictionary which can be serialized
+        (e.g. as JSON). Settings which are ``None`` are omitted.
+
+        :return: The settings by name.
+        :rtype: dict
+        """
+        data = OrderedDict()
+        for name in self.SETTINGS:
+            value = getattr(self, name)
+            if value is None:
+                continue
+            if name == 'user_defined_medium_unit':
+                value = [value.prefix.value, value.unit.value,
+                         value.timebase.value]
+            elif name == 'valve_input_source':
+                value = int(value)
+            data[name] = value
+        return data
+
+    @staticmethod
+    def from_dict(data):
+        """
+        Create a configuration from a dictionary as returned by
+        :py:meth:`to_dict`.
+
+        :param dict data:
+            The settings by name. Missing settings are set to ``None``.
+        :raises ValueError:
+            If the dictionary contains unknown settings or invalid values.
+        :return: The configuration.
+        :rtype: ~sensirion_shdlc_sfc5xxx.configuration.Sfc5xxxConfiguration
+        """
+        unknown = set(data) - set(Sfc5xxxConfiguration.SETTINGS)
+        if unknown:
+            raise ValueError("Unknown settings: {}".format(
+                ", ".join(sorted(unknown))))
+        kwargs = dict(data)
+        if kwargs.get('user_defined_medium_unit') is not None:
+            kwargs['user_defined_medium_unit'] = \
+                Sfc5xxxMediumUnit.from_int(*kwargs['user_defined_medium_unit'])
+        if kwargs.get('valve_input_source') is not None:
+            kwargs['valve_input_source'] = \
+                Sfc5xxxValveInputSource(kwargs['valve_input_source'])
+        return Sfc5xxxConfiguration(**kwargs)
+
+    def diff(self, target):
+        """
+        Get the settings which need to be written to change this
+        configuration to a target configuration.
+
+        Settings which are ``None`` in the target are ignored. Floats are
+        compared with the precision transmitted over SHDLC.
+
+        :param ~sensirion_shdlc_sfc5xxx.configuration.Sfc5xxxConfiguration target:
+            The target configuration.
+        :return:
+            The differing settings in the order they need to be applied, with
+            a tuple of the current and the target value.
+        :rtype:
+            ~collections.OrderedDict
+        """  # noqa: E501
+        changes = OrderedDict()
+        for name in self.SETTINGS:
+            current = getattr(self, name)
+            value = getattr(target, name)
+            if value is None:
+                continue
+            if isinstance(value, float) and current is not None:
+                equal = _to_float32(value) == _to_float32(current)
+            else:
+                equal = value == current
+            if not equal:
+                changes[name] = (current, value)
+        return changes
+
+    def __eq__(self, other):
+        """
+        Equal-operator overload.
+
+        :param other:
+            The other object to compare with.
+        :return:
+            ``True`` if all settings of both objects are equal, ``False``
+            otherwise.
+        """
+        if not isinstance(other, Sfc5xxxConfiguration):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name)
+                   for name in self.SETTINGS)
+
+    def __ne__(self, other):
+        """
+        Not-equal-operator overload (required for Python 2).
+
+        :param other:
+            The other object to compare with.
+        :return:
+            ``True`` if any setting differs, ``False`` otherwise.
+        """
+        equal = self.__eq__(other)
+        return equal if equal is NotImplemented else not equal
+
+    __hash__ = None  # mutable
+
+    def __str__(self):
+        """
+        Pretty-print the configuration.
+
+        :return: Multiline string representation of the configuration.
+        :rtype: str
+        """
+        return "\n".join("{}: {}".format(name, getattr(self, name))
+                         for name in self.SETTINGS)
@@ -4,14 +4,18 @@
 from __future__ import absolute_import, division, print_function
 from datetime import datetime
 from sensirion_shdlc_driver import ShdlcDeviceBase, ShdlcFirmwareUpdate
+from sensirion_shdlc_driver.errors import ShdlcDeviceError
 from sensirion_shdlc_driver.types import FirmwareVersion, HardwareVersion, \
     ProtocolVersion, Version
 from .definitions import Sfc5xxxValveInputSource
-from .types import Sfc5xxxCalibrationConditions, Sfc5xxxReadBufferResponse
-from .units import Sfc5xxxUnitPrefix, Sfc5xxxUnit, Sfc5xxxUnitTimeBase, \
-    Sfc5xxxMediumUnit
+from .configuration import Sfc5xxxConfiguration
+from .types import Sfc5xxxCalibration, Sfc5xxxCalibrationConditions, \
+    Sfc5xxxReadBufferResponse
+from .units import Sfc5xxxMediumUnit
 from .device_errors import SFC5XXX_DEVICE_ERROR_LIST
 from .firmware_image import Sfc5xxxFirmwareImage
+from .array_commands import Sfc5xxxCmdReadMeasuredValueBufferArray, \
+    import_numpy
 from .commands import \
     Sfc5xxxCmdActivateCalibration, \
     Sfc5xxxCmdDeviceReset, \
@@ -81,6 +85,30 @@ import logging
 log = logging.getLogger(__name__)
 
 
+# Command objects shared by all devices, see _get_command().
+_COMMAND_CACHE = dict()
+
+
+def _get_command(command_type, *args):
+    """
+    Get a command object from the cache, creating it on first use.
+
+    Command objects are immutable and hold the already encoded request, so
+    commands without arguments or with only a few possible argument values
+    (e.g. a scaling) are created once and reused for every call.
+
+    :param type command_type: The command class.
+    :param args: Hashable arguments passed to the command constructor.
+    :return: The command object.
+    :rtype: ~sensirion_shdlc_driver.command.ShdlcCommand
+    """
+    key = (command_type,) + args
+    command = _COMMAND_CACHE.get(key)
+    if command is None:
+        command = _COMMAND_CACHE.setdefault(key, command_type(*args))
+    return command
+
+
 class Sfc5xxxShdlcDevice(ShdlcDeviceBase):
     """
     Sfc5xxx device.
@@ -112,6 +140,74 @@ class Sfc5xxxShdlcDevice(ShdlcDeviceBase):
         """
         super(Sfc5xxxShdlcDevice, self).__init__(connection, slave_address)
         self._register_device_errors(SFC5XXX_DEVICE_ERROR_LIST)
+        self._metrics = None
+
+    @property
+    def metrics(self):
+        """
+        Optional metrics object to record the executed commands (``None``
+        by default, i.e. nothing is recorded). The same object can be
+        assigned to many devices.
+
+        :type: ~sensirion_shdlc_sfc5xxx.metrics.Sfc5xxxMetrics
+        """
+        return self._metrics
+
+    @metrics.setter
+    def metrics(self, metrics):
+        self._metrics = metrics
+
+    def execute(self, command):
+        """
+        Execute an SHDLC command, recording it in :py:attr:`metrics` (if
+        set).
+
+        :param ~sensirion_shdlc_driver.command.ShdlcCommand command:
+            The command to execute.
+        :return:
+            The interpreted response of the executed command.
+        """
+        execute = super(Sfc5xxxShdlcDevice, self).execute
+        if self._metrics is None:
+            return execute(command)
+        return self._metrics.execute(execute, command)
+
+    def _execute_no_wait(self, command):
+        """
+        Execute an SHDLC command like :py:meth:`execute`, but without waiting
+        for the post processing time of the command. The caller is
+        responsible for not sending another command to this device before
+        the post processing time has elapsed (used by
+        :py:class:`~sensirion_shdlc_sfc5xxx.batch_executor.Sfc5xxxBatchExecutor`).
+
+        :param ~sensirion_shdlc_driver.command.ShdlcCommand command:
+            The command to execute.
+        :return:
+            The interpreted response of the executed command.
+        """  # noqa: E501
+        if self._metrics is None:
+            return self._execute_without_post_processing(command)
+        return self._metrics.execute(self._execute_without_post_processing,
+                                     command)
+
+    def _execute_without_post_processing(self, command):
+        """
+        Execute an SHDLC command without waiting for its post processing time
+        and without recording metrics.
+
+        :param ~sensirion_shdlc_driver.command.ShdlcCommand command:
+            The command to execute.
+        :return:
+            The interpreted response of the executed command.
+        """
+        # Same as ShdlcDeviceBase.execute(), except the post processing
+        try:
+            data, error = self._connection.execute(
+                self._slave_address, command, wait_post_process=False)
+            self._last_error_flag = error
+            return data
+        except ShdlcDeviceError as exc:
+            raise self._get_device_error(exc.error_code)
 
     def get_product_type(self, as_int=False):
         """
@@ -125,7 +221,7 @@ class Sfc5xxxShdlcDevice(ShdlcDeviceBase):
                  digits.
         :rtype: string/int
         """
-        product_type = self.execute(Sfc5xxxCmdGetProductType())
+        product_type = self.execute(_get_command(Sfc5xxxCmdGetProductType))
         if as_int:
             product_type = int(product_type, 16)
         return product_type
@@ -142,7 +238,7 @@ class Sfc5xxxShdlcDevice(ShdlcDeviceBase):
                  the connected product type).
         :rtype: byte
         """
-        return self.execute(Sfc5xxxCmdGetProductSubtype())
+        return self.execute(_get_command(Sfc5xxxCmdGetProductSubtype))
 
     def get_product_name(self):
         """
@@ -153,7 +249,7 @@ class Sfc5xxxShdlcDevice(ShdlcDeviceBase):
         :return: The product name as an ASCII string.
         :rtype: string
         """
-        return self.execute(Sfc5xxxCmdGetProductName())
+        return self.execute(_get_command(Sfc5xxxCmdGetProductName))
 
     def get_article_code(self):
         """
@@ -164,7 +260,7 @@ class Sfc5xxxShdlcDevice(ShdlcDeviceBase):
         :return: The article code as an ASCII string.
         :rtype: string
         """
-        return self.execute(Sfc5xxxCmdGetArticleCode())
+        return self.execute(_get_command(Sfc5xxxCmdGetArticleCode))
 
     def get_serial_number(self):
         """
@@ -173,7 +269,7 @@ class Sfc5xxxShdlcDevice(ShdlcDeviceBase):
         :return: The serial number as an ASCII string.
         :rtype: string
         """
-        return self.execute(Sfc5xxxCmdGetSerialNumber())
+        return self.execute(_get_command(Sfc5xxxCmdGetSerialNumber))
 
     def get_version(self):
         """
@@ -183,7 +279,7 @@ class Sfc5xxxShdlcDevice(ShdlcDeviceBase):
         :rtype: Version
         """
         fw_maj, fw_min, fw_dbg, hw_maj, hw_min, pc_maj, pc_min = \
-            self.execute(Sfc5xxxCmdGetVersion())
+            self.execute(_get_command(Sfc5xxxCmdGetVersion))
         return Version(
             firmware=FirmwareVersion(major=fw_maj, minor=fw_min, debug=fw_dbg),
             hardware=HardwareVersion(major=hw_maj, minor=hw_min),
@@ -209,7 +305,8 @@ class Sfc5xxxShdlcDevice(ShdlcDeviceBase):
                  object or ``None``, otherwise as a byte.
         :rtype: int, byte/ShdlcDeviceError/None
         """
-        state, error = self.execute(Sfc5xxxCmdReadDeviceStatus(clear=clear))
+        state, error = self.execute(
+            _get_command(Sfc5xxxCmdReadDeviceStatus, bool(clear)))
         if as_exception:
             error = self._get_device_error(error)
         return state, error
@@ -228,7 +325,7 @@ class Sfc5xxxShdlcDevice(ShdlcDeviceBase):
         :return: The slave address of the device.
         :rtype: byte
         """
-        return self.execute(Sfc5xxxCmdGetSlaveAddress())
+        return self.execute(_get_command(Sfc5xxxCmdGetSlaveAddress))
 
     def set_slave_address(self, slave_address, update_driver=True):
         """
@@ -269,7 +366,7 @@ class Sfc5xxxShdlcDevice(ShdlcDeviceBase):
         :return: The baudrate of the device [bit/s].
         :rtype: int
         """
-        return self.execute(Sfc5xxxCmdGetBaudrate())
+        return self.execute(_get_command(Sfc5xxxCmdGetBaudrate))
 
     def set_baudrate(self, baudrate, update_driver=True):
         """
@@ -314,7 +411,7 @@ class Sfc5xxxShdlcDevice(ShdlcDeviceBase):
         :return: The reply delay of the device [μs].
         :rtype: byte
         """
-        return self.execute(Sfc5xxxCmdGetReplyDelay())
+        return self.execute(_get_command(Sfc5xxxCmdGetReplyDelay))
 
     def set_reply_delay(self, reply_delay_us):
         """
@@ -339,7 +436,7 @@ class Sfc5xxxShdlcDevice(ShdlcDeviceBase):
         """
         Execute a device reset (reboot firmware, similar to power cycle).
         """
-        self.execute(Sfc5xxxCmdDeviceReset())
+        self.execute(_get_command(Sfc5xxxCmdDeviceReset))
 
     def factory_reset(self):
         """
@@ -352,7 +449,7 @@ class Sfc5xxxShdlcDevice(ShdlcDeviceBase):
                      and thus you might have to adjust the driver's parameters
                      to allow further communication with the device.
         """
-        self.execute(Sfc5xxxCmdFactoryReset())
+        self.execute(_get_command(Sfc5xxxCmdFactoryReset))
 
     def get_setpoint(self, scaling):
         """
@@ -366,7 +463,7 @@ class Sfc5xxxShdlcDevice(ShdlcDeviceBase):
         :rtype:
             float
         """
-        return self.execute(Sfc5xxxCmdGetSetpoint(int(scaling)))
+        return self.execute(_get_command(Sfc5xxxCmdGetSetpoint, int(scaling)))
 
     def set_setpoint(self, setpoint, scaling):
         """
@@ -389,7 +486,7 @@ class Sfc5xxxShdlcDevice(ShdlcDeviceBase):
         :rtype:
             bool
         """
-        return self.execute(Sfc5xxxCmdGetSetpointPersist())
+        return self.execute(_get_command(Sfc5xxxCmdGetSetpointPersist))
 
     def set_setpoint_persist(self, persist):
         """
@@ -440,9 +537,11 @@ class Sfc5xxxShdlcDevice(ShdlcDeviceBase):
         :rtype:
             float
         """
-        return self.execute(Sfc5xxxCmdReadMeasuredValue(int(scaling)))
+        return self.execute(
+            _get_command(Sfc5xxxCmdReadMeasuredValue, int(scaling)))
 
-    def read_measured_value_buffer(self, scaling, max_reads=100):
+    def read_measured_value_buffer(self, scaling, max_reads=100,
+                                   as_array=False):
         """
         Read the measured flow value buffer.
 
@@ -482,6 +581,12 @@ class Sfc5xxxShdlcDevice(ShdlcDeviceBase):
             read operation will be aborted. This abort condition is needed to
             avoid an infinite loop if the buffer gets filled faster than it
             can be read out.
+        :param bool as_array:
+            If ``True``, the measured values are returned as a contiguous
+            NumPy float32 array instead of a tuple of floats. This is much
+            faster for large amounts of values, but requires
+            `NumPy <https://numpy.org/>`_ to be installed. Default is
+            ``False``.
         :return:
             An object containing the buffered flow values and some metadata.
             See
@@ -491,19 +596,87 @@ class Sfc5xxxShdlcDevice(ShdlcDeviceBase):
             :py:class:`~sensirion_shdlc_sfc5xxx.types.Sfc5xxxReadBufferResponse`
         """
         read_count = 0
+        lost_values = 0
+        remaining_values = 0
+        sampling_time = 0.0
+        chunks = []
+        for frame in self.stream_measured_value_buffer(scaling, max_reads,
+                                                       as_array):
+            read_count = frame.read_count
+            lost_values = frame.lost_values
+            remaining_values = frame.remaining_values
+            sampling_time = frame.sampling_time
+            chunks.append(frame.values)
+        if as_array:
+            values = self._concatenate_arrays(chunks)
+        else:
+            values = tuple(value for chunk in chunks for value in chunk)
+        return Sfc5xxxReadBufferResponse(
+            scaling, read_count, lost_values, remaining_values,
+            sampling_time, values)
+
+    def stream_measured_value_buffer(self, scaling, max_reads=100,
+                                     as_array=False):
+        """
+        Read the measured flow value buffer frame by frame.
+
+        This is the streaming variant of
+        :py:meth:`~sensirion_shdlc_sfc5xxx.device.Sfc5xxxShdlcDevice.read_measured_value_buffer`.
+        Instead of collecting all values and returning them at the end, this
+        generator yields the values of every single "read buffer" command
+        (0..60 values) as soon as it has been received. This allows to
+        process (e.g. store) the values without keeping the whole buffer
+        content in memory, and the first values are available earlier.
+
+        The generator stops as soon as the whole buffer was read out (i.e.
+        ``remaining_values`` is zero) or after ``max_reads`` read commands.
+
+        .. note:: The properties
+                  :py:attr:`~sensirion_shdlc_sfc5xxx.types.Sfc5xxxReadBufferResponse.read_count`
+                  and
+                  :py:attr:`~sensirion_shdlc_sfc5xxx.types.Sfc5xxxReadBufferResponse.lost_values`
+                  of the yielded objects are running counters, i.e. they
+                  contain the totals since the generator was started. The
+                  property
+                  :py:attr:`~sensirion_shdlc_sfc5xxx.types.Sfc5xxxReadBufferResponse.values`
+                  only contains the values of the corresponding frame.
+
+        :param ~sensirion_shdlc_sfc5xxx.definitions.Sfc5xxxScaling scaling:
+            Defines with which scale resp. unit the measured flow values should
+            be returned.
+        :param int max_reads:
+            The maximum count of read commands which should be sent until the
+            read operation will be aborted. This abort condition is needed to
+            avoid an infinite loop if the buffer gets filled faster than it
+            can be read out.
+        :param bool as_array:
+            If ``True``, the measured values of each frame are returned as a
+            read-only NumPy array (big-endian float32 view on the received
+            data) instead of a tuple of floats. Requires
+            `NumPy <https://numpy.org/>`_ to be installed. Default is
+            ``False``.
+        :return:
+            A generator yielding one object per received frame. See
+            :py:class:`~sensirion_shdlc_sfc5xxx.types.Sfc5xxxReadBufferResponse`
+            for details.
+        :rtype:
+            generator
+        """
+        cmd_type = Sfc5xxxCmdReadMeasuredValueBufferArray if as_array \
+            else Sfc5xxxCmdReadMeasuredValueBuffer
+        cmd = _get_command(cmd_type, int(scaling))
+        read_count = 0
         total_lost_values = 0
-        total_measured_values = []
         for i in range(0, max_reads):
             lost_values, remaining_values, sampling_time, measured_values = \
-                self.execute(Sfc5xxxCmdReadMeasuredValueBuffer(int(scaling)))
+                self.execute(cmd)
             read_count += 1
             total_lost_values += lost_values
-            total_measured_values += measured_values
+            yield Sfc5xxxReadBufferResponse(
+                scaling, read_count, total_lost_values, remaining_values,
+                sampling_time, measured_values)
             if remaining_values == 0:
                 break
-        return Sfc5xxxReadBufferResponse(
-            scaling, read_count, total_lost_values, remaining_values,
-            sampling_time, total_measured_values)
 
     def get_valve_input_source(self):
         """
@@ -514,7 +687,7 @@ class Sfc5xxxShdlcDevice(ShdlcDeviceBase):
         :rtype:
             ~sensirion_shdlc_sfc5xxx.definitions.Sfc5xxxValveInputSource
         """
-        raw_value = self.execute(Sfc5xxxCmdGetValveInputSource())
+        raw_value = self.execute(_get_command(Sfc5xxxCmdGetValveInputSource))
         return Sfc5xxxValveInputSource(raw_value)
 
     def set_valve_input_source(self, source):
@@ -548,7 +721,7 @@ class Sfc5xxxShdlcDevice(ShdlcDeviceBase):
         :rtype:
             float
         """
-        return self.execute(Sfc5xxxCmdGetUserDefinedValveValue())
+        return self.execute(_get_command(Sfc5xxxCmdGetUserDefinedValveValue))
 
     def set_user_defined_valve_value(self, value):
         """
@@ -584,14 +757,12 @@ class Sfc5xxxShdlcDevice(ShdlcDeviceBase):
         :rtype:
             ~sensirion_shdlc_sfc5xxx.units.Sfc5xxxMediumUnit
         """
-        cmd = Sfc5xxxCmdGetUserDefinedMediumUnitWithoutWildcards() \
-            if substitute_wildcards else Sfc5xxxCmdGetUserDefinedMediumUnit()
+        cmd = _get_command(Sfc5xxxCmdGetUserDefinedMediumUnitWithoutWildcards
+                           if substitute_wildcards
+                           else Sfc5xxxCmdGetUserDefinedMediumUnit)
         raw_prefix, raw_unit, raw_timebase = self.execute(cmd)
-        return Sfc5xxxMediumUnit(
-            prefix=Sfc5xxxUnitPrefix.from_int(raw_prefix),
-            unit=Sfc5xxxUnit.from_int(raw_unit),
-            timebase=Sfc5xxxUnitTimeBase.from_int(raw_timebase),
-        )
+        return Sfc5xxxMediumUnit.from_int(raw_prefix, raw_unit,
+                                          raw_timebase)
 
     def set_user_defined_medium_unit(self, unit):
         """
@@ -624,7 +795,7 @@ class Sfc5xxxShdlcDevice(ShdlcDeviceBase):
         :rtype:
             float
         """
-        return self.execute(Sfc5xxxCmdGetUserDefinedFullscale())
+        return self.execute(_get_command(Sfc5xxxCmdGetUserDefinedFullscale))
 
     def get_user_controller_gain(self):
         """
@@ -635,7 +806,7 @@ class Sfc5xxxShdlcDevice(ShdlcDeviceBase):
         :rtype:
             float
         """
-        return self.execute(Sfc5xxxCmdGetUserControllerGain())
+        return self.execute(_get_command(Sfc5xxxCmdGetUserControllerGain))
 
     def set_user_controller_gain(self, gain):
         """
@@ -661,7 +832,8 @@ class Sfc5xxxShdlcDevice(ShdlcDeviceBase):
         :rtype:
             bool
         """
-        return self.execute(Sfc5xxxCmdGetPressureDependentGainEnable())
+        return self.execute(
+            _get_command(Sfc5xxxCmdGetPressureDependentGainEnable))
 
     def set_pressure_dependent_gain_enable(self, enable):
         """
@@ -689,7 +861,8 @@ class Sfc5xxxShdlcDevice(ShdlcDeviceBase):
         :rtype:
             float
         """
-        return self.execute(Sfc5xxxCmdGetInletPressureForGainCorrection())
+        return self.execute(
+            _get_command(Sfc5xxxCmdGetInletPressureForGainCorrection))
 
     def set_inlet_pressure_for_gain_correction(self, pressure):
         """
@@ -712,7 +885,8 @@ class Sfc5xxxShdlcDevice(ShdlcDeviceBase):
         :rtype:
             bool
         """
-        return self.execute(Sfc5xxxCmdGetGasTemperatureCompensationEnable())
+        return self.execute(
+            _get_command(Sfc5xxxCmdGetGasTemperatureCompensationEnable))
 
     def set_gas_temperature_compensation_enable(self, enable):
         """
@@ -740,7 +914,8 @@ class Sfc5xxxShdlcDevice(ShdlcDeviceBase):
         :rtype:
             float
         """
-        return self.execute(Sfc5xxxCmdGetInletGasTemperatureForCompensation())
+        return self.execute(
+            _get_command(Sfc5xxxCmdGetInletGasTemperatureForCompensation))
 
     def set_inlet_gas_temperature_for_compensation(self, temperature):
         """
@@ -765,7 +940,7 @@ class Sfc5xxxShdlcDevice(ShdlcDeviceBase):
         :rtype:
             int
         """
-        return self.execute(Sfc5xxxCmdMeasureRawFlow())
+        return self.execute(_get_command(Sfc5xxxCmdMeasureRawFlow))
 
     def measure_temperature(self):
         """
@@ -776,7 +951,7 @@ class Sfc5xxxShdlcDevice(ShdlcDeviceBase):
         :rtype:
             float
         """
-        return self.execute(Sfc5xxxCmdMeasureTemperature())
+        return self.execute(_get_command(Sfc5xxxCmdMeasureTemperature))
 
     def measure_raw_thermal_conductivity(self, close_valve=True):
         """
@@ -793,8 +968,9 @@ class Sfc5xxxShdlcDevice(ShdlcDeviceBase):
         :rtype:
             int
         """
-        cmd = Sfc5xxxCmdMeasureRawThermalConductivityWithClosedValve() \
-            if close_valve else Sfc5xxxCmdMeasureRawThermalConductivity()
+        cmd = _get_command(
+            Sfc5xxxCmdMeasureRawThermalConductivityWithClosedValve
+            if close_valve else Sfc5xxxCmdMeasureRawThermalConductivity)
         return self.execute(cmd)
 
     def get_number_of_calibrations(self):
@@ -809,7 +985,7 @@ class Sfc5xxxShdlcDevice(ShdlcDeviceBase):
         :rtype:
             int
         """
-        return self.execute(Sfc5xxxCmdGetNumberOfCalibrations())
+        return self.execute(_get_command(Sfc5xxxCmdGetNumberOfCalibrations))
 
     def get_calibration_validity(self, index):
         """
@@ -865,11 +1041,8 @@ class Sfc5xxxShdlcDevice(ShdlcDeviceBase):
         """
         raw_prefix, raw_unit, raw_timebase = \
             self.execute(Sfc5xxxCmdGetCalibrationGasUnit(index))
-        return Sfc5xxxMediumUnit(
-            prefix=Sfc5xxxUnitPrefix.from_int(raw_prefix),
-            unit=Sfc5xxxUnit.from_int(raw_unit),
-            timebase=Sfc5xxxUnitTimeBase.from_int(raw_timebase),
-        )
+        return Sfc5xxxMediumUnit.from_int(raw_prefix, raw_unit,
+                                          raw_timebase)
 
     def get_calibration_fullscale(self, index):
         """
@@ -953,6 +1126,57 @@ class Sfc5xxxShdlcDevice(ShdlcDeviceBase):
         return self.execute(
             Sfc5xxxCmdGetCalibrationThermalConductivityReference(index))
 
+    def read_calibration_catalog(self, cache=None, refresh=False):
+        """
+        Read all valid calibration blocks of the device.
+
+        First the validity of all calibration indices is checked, then all
+        information of the valid calibrations is read. If a cache is passed,
+        the catalog is stored in the cache and later calls only read the
+        serial number from the device.
+
+        .. sourcecode:: python
+
+            cache = Sfc5xxxCalibrationCache('~/.cache/sfc5xxx')
+            for calibration in device.read_calibration_catalog(cache=cache):
+                print(calibration)
+
+        :param ~sensirion_shdlc_sfc5xxx.calibration_cache.Sfc5xxxCalibrationCache cache:
+            Optional cache to load the catalog from resp. to store it into.
+        :param bool refresh:
+            If ``True``, the catalog is always read from the device (and the
+            cache is updated).
+        :return:
+            The valid calibrations, ordered by index.
+        :rtype:
+            list(~sensirion_shdlc_sfc5xxx.types.Sfc5xxxCalibration)
+        """  # noqa: E501
+        serial_number = None
+        if cache is not None:
+            serial_number = self.get_serial_number()
+            if not refresh:
+                calibrations = cache.load(serial_number)
+                if calibrations is not None:
+                    return calibrations
+        count = self.get_number_of_calibrations()
+        indices = [index for index in range(count)
+                   if self.get_calibration_validity(index)]
+        calibrations = [Sfc5xxxCalibration(
+            index=index,
+            gas_description=self.get_calibration_gas_description(index),
+            gas_id=self.get_calibration_gas_id(index),
+            unit=self.get_calibration_gas_unit(index),
+            fullscale=self.get_calibration_fullscale(index),
+            initial_conditions=self.get_calibration_initial_conditions(index),
+            recalibration_conditions=self.
+            get_calibration_recalibration_conditions(index),
+            thermal_conductivity_reference=self.
+            get_calibration_thermal_conductivity_reference(index),
+        ) for index in indices]
+        if cache is not None:
+            cache.store(serial_number, calibrations)
+        return calibrations
+
     def get_current_gas_description(self):
         """
         Get the gas description of the currently active calibration.
@@ -962,7 +1186,7 @@ class Sfc5xxxShdlcDevice(ShdlcDeviceBase):
         :rtype:
             str
         """
-        return self.execute(Sfc5xxxCmdGetCurrentGasDescription())
+        return self.execute(_get_command(Sfc5xxxCmdGetCurrentGasDescription))
 
     def get_current_gas_id(self):
         """
@@ -973,7 +1197,7 @@ class Sfc5xxxShdlcDevice(ShdlcDeviceBase):
         :rtype:
             int
         """
-        return self.execute(Sfc5xxxCmdGetCurrentGasId())
+        return self.execute(_get_command(Sfc5xxxCmdGetCurrentGasId))
 
     def get_current_gas_unit(self):
         """
@@ -985,12 +1209,9 @@ class Sfc5xxxShdlcDevice(ShdlcDeviceBase):
             ~sensirion_shdlc_sfc5xxx.units.Sfc5xxxMediumUnit
         """
         raw_prefix, raw_unit, raw_timebase = \
-            self.execute(Sfc5xxxCmdGetCurrentGasUnit())
-        return Sfc5xxxMediumUnit(
-            prefix=Sfc5xxxUnitPrefix.from_int(raw_prefix),
-            unit=Sfc5xxxUnit.from_int(raw_unit),
-            timebase=Sfc5xxxUnitTimeBase.from_int(raw_timebase),
-        )
+            self.execute(_get_command(Sfc5xxxCmdGetCurrentGasUnit))
+        return Sfc5xxxMediumUnit.from_int(raw_prefix, raw_unit,
+                                          raw_timebase)
 
     def get_current_fullscale(self):
         """
@@ -1001,7 +1222,7 @@ class Sfc5xxxShdlcDevice(ShdlcDeviceBase):
         :rtype:
             float
         """
-        return self.execute(Sfc5xxxCmdGetCurrentFullscale())
+        return self.execute(_get_command(Sfc5xxxCmdGetCurrentFullscale))
 
     def get_current_initial_calibration_conditions(self):
         """
@@ -1016,7 +1237,7 @@ class Sfc5xxxShdlcDevice(ShdlcDeviceBase):
         company, operator, year, month, day, hour, minute, temperature, \
             inlet_pressure, differential_pressure, is_real_gas_calibration, \
             accuracy_setpoint, accuracy_fullscale = self.execute(
-                Sfc5xxxCmdGetCurrentInitialCalibrationConditions())
+                _get_command(Sfc5xxxCmdGetCurrentInitialCalibrationConditions))
         return Sfc5xxxCalibrationConditions(
             company=company,
             operator=operator,
@@ -1041,7 +1262,7 @@ class Sfc5xxxShdlcDevice(ShdlcDeviceBase):
         company, operator, year, month, day, hour, minute, temperature, \
             inlet_pressure, differential_pressure, is_real_gas_calibration, \
             accuracy_setpoint, accuracy_fullscale = self.execute(
-                Sfc5xxxCmdGetCurrentRecalibrationConditions())
+                _get_command(Sfc5xxxCmdGetCurrentRecalibrationConditions))
         return Sfc5xxxCalibrationConditions(
             company=company,
             operator=operator,
@@ -1064,7 +1285,8 @@ class Sfc5xxxShdlcDevice(ShdlcDeviceBase):
         :rtype:
             int
         """
-        return self.execute(Sfc5xxxCmdGetCurrentThermalConductivityReference())
+        return self.execute(
+            _get_command(Sfc5xxxCmdGetCurrentThermalConductivityReference))
 
     def activate_calibration(self, index):
         """
@@ -1075,6 +1297,85 @@ class Sfc5xxxShdlcDevice(ShdlcDeviceBase):
         """
         self.execute(Sfc5xxxCmdActivateCalibration(index))
 
+    def get_configuration(self):
+        """
+        Read the persistent configuration of the device.
+
+        .. note:: The active calibration cannot be read from the device, thus
+                  it is ``None`` in the returned configuration.
+
+        :return:
+            The current configuration.
+        :rtype:
+            ~sensirion_shdlc_sfc5xxx.configuration.Sfc5xxxConfiguration
+        """
+        return Sfc5xxxConfiguration(
+            user_defined_medium_unit=self.get_user_defined_medium_unit(),
+            setpoint_persist=self.get_setpoint_persist(),
+            user_controller_gain=self.get_user_controller_gain(),
+            pressure_dependent_gain_enable=self.
+            get_pressure_dependent_gain_enable(),
+            inlet_pressure_for_gain_correction=self.
+            get_inlet_pressure_for_gain_correction(),
+            gas_temperature_compensation_enable=self.
+            get_gas_temperature_compensation_enable(),
+            inlet_gas_temperature_for_compensation=self.
+            get_inlet_gas_temperature_for_compensation(),
+            valve_input_source=self.get_valve_input_source(),
+            reply_delay=self.get_reply_delay(),
+            slave_address=self.get_slave_address(),
+            baudrate=self.get_baudrate(),
+        )
+
+    def apply_configuration(self, target, current=None, update_driver=True):
+        """
+        Apply a configuration to the device, writing only the settings which
+        differ from the current configuration.
+
+        The slave address and the baudrate are written last. See
+        :py:meth:`set_baudrate` about changing the baudrate of devices on a
+        bus with several devices.
+
+        :param ~sensirion_shdlc_sfc5xxx.configuration.Sfc5xxxConfiguration target:
+            The configuration to apply. Settings which are ``None`` are not
+            changed.
+        :param ~sensirion_shdlc_sfc5xxx.configuration.Sfc5xxxConfiguration current:
+            The current configuration of the device, if already known (e.g.
+            from a previous call to :py:meth:`get_configuration`). If
+            ``None``, it is read from the device.
+        :param bool update_driver:
+            Passed to :py:meth:`set_slave_address` and
+            :py:meth:`set_baudrate`. If ``False``, the slave address and the
+            baudrate cannot be changed at the same time since the device
+            would not be reachable anymore after the first of them.
+        :return:
+            The names of the written settings.
+        :rtype:
+            list(str)
+        :raises ValueError:
+            If both the slave address and the baudrate would be changed
+            without updating the driver. Nothing is written in this case.
+        """  # noqa: E501
+        if current is None:
+            current = self.get_configuration()
+        changes = current.diff(target)
+        if not update_driver and 'slave_address' in changes and \
+                'baudrate' in changes:
+            raise ValueError("Cannot change both slave address and baudrate "
+                             "without updating the driver!")
+        for name, (_, value) in changes.items():
+            log.debug("Changing setting {} to {}.".format(name, value))
+            if name == 'active_calibration':
+                self.activate_calibration(value)
+            elif name == 'reply_delay':
+                self.set_reply_delay(value)
+            elif name in ('slave_address', 'baudrate'):
+                getattr(self, 'set_' + name)(value,
+                                             update_driver=update_driver)
+            else:
+                getattr(self, 'set_' + name)(value)
+        return list(changes)
+
     def read_user_memory(self, address, length):
         """
         Read data from the user memory.
@@ -1146,3 +1447,25 @@ class Sfc5xxxShdlcDevice(ShdlcDeviceBase):
                                      status_callback=status_callback,
                                      progress_callback=progress_callback)
         update.execute(emergency=emergency)
+
+    @staticmethod
+    def _concatenate_arrays(chunks):
+        """
+        Concatenate the big-endian float32 arrays of several "read buffer"
+        frames into a single contiguous array in native byte order.
+
+        :param list chunks:
+            The arrays to concatenate.
+        :return:
+            The concatenated values.
+        :rtype:
+            numpy.ndarray
+        """
+        numpy = import_numpy()
+        values = numpy.empty(sum(len(chunk) for chunk in chunks),
+                             dtype=numpy.float32)
+        offset = 0
+        for chunk in chunks:
+            values[offset:offset + len(chunk)] = chunk
+            offset += len(chunk)
+        return values
@@ -0,0 +1,484 @@
+# -*- coding: utf-8 -*-
+# (c) Copyright 2020 Sensirion AG, Switzerland
+"""
+Exporter serving the values of many devices as OpenMetrics text (e.g. to be
+scraped by Prometheus).
+
+The devices are polled by background threads at a fixed rate. The values
+are stored in a cache, and scrapes are answered from that cache only, so
+scrapes never cause any communication with the devices, no matter how
+often they are done:
+
+.. sourcecode:: python
+
+    with ShdlcSerialPort(port='COM1', baudrate=115200) as port:
+        connection = ShdlcConnection(port)
+        devices = {
+            'n2': Sfc5xxxShdlcDevice(connection, slave_address=1),
+            'o2': Sfc5xxxShdlcDevice(connection, slave_address=2),
+        }
+        with Sfc5xxxMetricsExporter(devices, period=1.0, port=9747):
+            while True:
+                time.sleep(1.0)  # Values at http://127.0.0.1:9747/metrics
+"""
+
+from __future__ import absolute_import, division, print_function
+from threading import Event, Lock, Thread
+from .batch_executor import Sfc5xxxBatchExecutor
+from .commands import Sfc5xxxCmdReadMeasuredValue, \
+    Sfc5xxxCmdMeasureTemperature, Sfc5xxxCmdReadDeviceStatus, \
+    Sfc5xxxCmdGetSetpoint
+from .definitions import Sfc5xxxScaling
+from .metrics import Sfc5xxxMetrics
+import math
+import time
+
+try:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn
+except ImportError:  # Python 2
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from SocketServer import ThreadingMixIn
+
+import logging
+log = logging.getLogger(__name__)
+
+
+#: Content type of the served metrics.
+CONTENT_TYPE = 'application/openmetrics-text; version=1.0.0; charset=utf-8'
+
+# Polled values: (metric name, help text)
+_GAUGES = (
+    ('sfc5xxx_measured_value',
+     "Measured flow in the scaling of the exporter."),
+    ('sfc5xxx_setpoint',
+     "Flow setpoint in the scaling of the exporter."),
+    ('sfc5xxx_temperature_celsius',
+     "Temperature measured by the device."),
+    ('sfc5xxx_device_status',
+     "Device status flags (see interface specification)."),
+    ('sfc5xxx_last_error',
+     "Last error code of the device (0 = no error)."),
+)
+
+
+def _escape(value):
+    """
+    Escape a label value.
+
+    :param value: The label value.
+    :return: The escaped value.
+    :rtype: str
+    """
+    return str(value).replace('\\', '\\\\').replace('"', '\\"') \
+        .replace('\n', '\\n')
+
+
+def _format_labels(labels):
+    """
+    Format the labels of a sample.
+
+    :param list labels: List of (name, value) tuples.
+    :return: The formatted labels, including the braces.
+    :rtype: str
+    """
+    return '{' + ','.join('{}="{}"'.format(name, _escape(value))
+                          for name, value in labels) + '}'
+
+
+def _format_value(value):
+    """
+    Format the value of a sample.
+
+    :param value: The value (int, float or bool).
+    :return: The formatted value.
+    :rtype: str
+    """
+    if isinstance(value, float):
+        if math.isnan(value):
+            return 'NaN'
+        if math.isinf(value):
+            return '+Inf' if value > 0 else '-Inf'
+        return repr(value)
+    return str(int(value))
+
+
+class _DeviceState(object):
+    """
+    The cached values of one device, replaced as a whole by every poll.
+    """
+
+    __slots__ = ('info', 'values', 'up', 'timestamp', 'errors')
+
+    def __init__(self, info=None, values=None, up=False, timestamp=None,
+                 errors=0):
+        self.info = info  # List of info labels, or None if not read yet
+        self.values = values or dict()  # Values by metric name
+        self.up = up
+        self.timestamp = timestamp
+        self.errors = errors
+
+
+class Sfc5xxxMetricsExporter(object):
+    """
+    Polls devices at a fixed rate and serves their values, together with
+    the command metrics of the driver, as OpenMetrics text over HTTP.
+
+    Exported metrics (labelled with the device name):
+
+      * ``sfc5xxx_measured_value``, ``sfc5xxx_setpoint``,
+        ``sfc5xxx_temperature_celsius``, ``sfc5xxx_device_status`` and
+        ``sfc5xxx_last_error``: The polled values. Values of failed commands
+        are omitted.
+      * ``sfc5xxx_up``: Whether the last poll was successful.
+      * ``sfc5xxx_last_poll_timestamp_seconds``: Time of the last successful
+        poll.
+      * ``sfc5xxx_poll_errors_total``: Number of failed polls.
+      * ``sfc5xxx_device_info``: Serial number, gas and unit of the active
+        calibration.
+
+    And, labelled with the command class name, the content of the
+    :py:class:`~sensirion_shdlc_sfc5xxx.metrics.Sfc5xxxMetrics` snapshot:
+    ``sfc5xxx_command_total``, ``sfc5xxx_command_timeouts_total``,
+    ``sfc5xxx_command_errors_total``,
+    ``sfc5xxx_command_request_bytes_total``,
+    ``sfc5xxx_command_response_bytes_total`` and the histogram
+    ``sfc5xxx_command_latency_seconds``.
+
+    All devices on the same connection are polled with one
+    :py:class:`~sensirion_shdlc_sfc5xxx.batch_executor.Sfc5xxxBatchExecutor`
+    batch, so the application can still communicate with the devices
+    between the polls. Every connection is polled by its own thread.
+
+    .. note:: The device status is read without clearing it, so the
+              exporter does not interfere with the error handling of the
+              application.
+    """  # noqa: E501
+
+    def __init__(self, devices, period=1.0, scaling=Sfc5xxxScaling.PHYSICAL,
+                 metrics=None, host='127.0.0.1', port=9747):
+        """
+        Constructor.
+
+        :param devices:
+            The devices to poll, either as a dictionary of device name
+            (used as label) and device, or as a list of devices, which are
+            then named by their slave address.
+        :param float period:
+            The poll period [s].
+        :param ~sensirion_shdlc_sfc5xxx.definitions.Sfc5xxxScaling scaling:
+            The scaling of the measured value and the setpoint.
+        :param ~sensirion_shdlc_sfc5xxx.metrics.Sfc5xxxMetrics metrics:
+            The command metrics to export. If ``None``, a new object is
+            created and assigned to all devices which don't record metrics
+            yet.
+        :param str host:
+            The address the HTTP server listens on. The default only allows
+            connections from the local host.
+        :param int port:
+            The TCP port of the HTTP server (0 to use any free port, see
+            :py:attr:`server_address`).
+        """  # noqa: E501
+        super(Sfc5xxxMetricsExporter, self).__init__()
+        if not isinstance(devices, dict):
+            devices = dict((str(device.slave_address), device)
+                           for device in devices)
+        if period <= 0.0:
+            raise ValueError("The poll period must be positive!")
+        self._devices = sorted(devices.items())
+        self._period = float(period)
+        self._scaling = Sfc5xxxScaling(scaling)
+        if metrics is None:
+            metrics = Sfc5xxxMetrics()
+            for _, device in self._devices:
+                if device.metrics is None:
+                    device.metrics = metrics
+        self._metrics = metrics
+        self._host = host
+        self._port = port
+        self._lock = Lock()
+        self._states = dict((name, _DeviceState())
+                            for name, _ in self._devices)
+        self._stop_event = Event()
+        self._threads = []
+        self._server = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    @property
+    def period(self):
+        """
+        The poll period [s].
+
+        :type: float
+        """
+        return self._period
+
+    @property
+    def metrics(self):
+        """
+        The exported command metrics.
+
+        :type: ~sensirion_shdlc_sfc5xxx.metrics.Sfc5xxxMetrics
+        """
+        return self._metrics
+
+    @property
+    def server_address(self):
+        """
+        The address and port the HTTP server listens on, or ``None`` if not
+        started.
+
+        :type: tuple
+        """
+        return self._server.server_address if self._server else None
+
+    def start(self):
+        """
+        Start the HTTP server and the poll threads.
+        """
+        if self._server is not None:
+            raise RuntimeError("The exporter is already running!")
+        self._stop_event.clear()
+        self._server = _HttpServer((self._host, self._port), _RequestHandler)
+        self._server.exporter = self
+        connections = []
+        for _, device in self._devices:
+            if device.connection not in connections:
+                connections.append(device.connection)
+        self._threads = [Thread(target=self._server.serve_forever)]
+        for connection in connections:
+            devices = [(name, device) for name, device in self._devices
+                       if device.connection is connection]
+            self._threads.append(Thread(target=self._run, args=(devices,)))
+        for thread in self._threads:
+            thread.daemon = True
+            thread.start()
+        log.info("Serving metrics on http://{}:{}/metrics".format(
+            *self.server_address[:2]))
+
+    def stop(self):
+        """
+        Stop the HTTP server and the poll threads. Blocks until all threads
+        are stopped.
+        """
+        if self._server is None:
+            return
+        self._stop_event.set()
+        self._server.shutdown()
+        for thread in self._threads:
+            thread.join()
+        self._server.server_close()
+        self._server = None
+        self._threads = []
+
+    def poll(self, devices=None):
+        """
+        Poll devices once and update the cache. Called periodically by the
+        poll threads, but can also be called manually when the exporter is
+        not started.
+
+        :param list devices:
+            List of (name, device) tuples of devices on the same
+            connection. If ``None``, all devices are polled.
+        """
+        if devices is None:
+            for connection in set(d.connection for _, d in self._devices):
+                self.poll([(name, device) for name, device in self._devices
+                           if device.connection is connection])
+            return
+        if not devices:
+            return
+        # The identity is read only once, not on every poll
+        for name, device in devices:
+            if self._states[name].info is None:
+                self._read_info(name, device)
+        batch = Sfc5xxxBatchExecutor(devices[0][1].connection)
+        for name, device in devices:
+            batch.add(device, Sfc5xxxCmdReadMeasuredValue(self._scaling))
+            batch.add(device, Sfc5xxxCmdGetSetpoint(self._scaling))
+            batch.add(device, Sfc5xxxCmdMeasureTemperature())
+            batch.add(device, Sfc5xxxCmdReadDeviceStatus(False))
+        results = batch.execute(raise_errors=False)
+        timestamp = time.time()
+        for i, (name, _) in enumerate(devices):
+            flow, setpoint, temperature, status = results[4 * i:4 * i + 4]
+            values = dict()
+            for metric, value in (('sfc5xxx_measured_value', flow),
+                                  ('sfc5xxx_setpoint', setpoint),
+                                  ('sfc5xxx_temperature_celsius',
+                                   temperature)):
+                if not isinstance(value, Exception):
+                    values[metric] = value
+            if not isinstance(status, Exception):
+                values['sfc5xxx_device_status'] = status[0]
+                values['sfc5xxx_last_error'] = status[1]
+            with self._lock:
+                old = self._states[name]
+                up = len(values) == 5
+                self._states[name] = _DeviceState(
+                    info=old.info, values=values, up=up,
+                    timestamp=timestamp if up else old.timestamp,
+                    errors=old.errors if up else old.errors + 1)
+
+    def _read_info(self, name, device):
+        """
+        Read the identity of a device for the info metric.
+
+        :param str name: The device name.
+        :param ~sensirion_shdlc_sfc5xxx.device.Sfc5xxxShdlcDevice device:
+            The device.
+        """
+        try:
+            info = [('serial_number', device.get_serial_number()),
+                    ('gas', device.get_current_gas_description()),
+                    ('unit', device.get_current_gas_unit())]
+        except Exception as e:
+            log.warning("Failed to read identity of device '{}': {}".format(
+                name, e))
+            return
+        with self._lock:
+            self._states[name].info = info
+
+    def _run(self, devices):
+        """
+        Poll thread function.
+
+        :param list devices:
+            List of (name, device) tuples of devices on the same connection.
+        """
+        next_time = time.time()
+        while not self._stop_event.is_set():
+            try:
+                self.poll(devices)
+            except Exception as e:
+                log.error("Polling devices failed: {}".format(e))
+            # Fixed rate; polls which would be late anyway are skipped
+            now = time.time()
+            next_time += self._period
+            if next_time < now:
+                skipped = int((now - next_time) / self._period) + 1
+                log.warning("Poll took too long, skipping {} poll(s).".format(
+                    skipped))
+                next_time += skipped * self._period
+            self._stop_event.wait(next_time - now)
+
+    def render(self):
+        """
+        Render all metrics as OpenMetrics text, from the cached values only
+        (i.e. without communicating with the devices).
+
+        :return: The metrics in the OpenMetrics text format.
+        :rtype: str
+        """
+        with self._lock:
+            states = [(name, self._states[name]) for name, _ in self._devices]
+        lines = []
+
+        def family(name, metric_type, help_text, samples):
+            if not samples:
+                return
+            lines.append('# TYPE {} {}'.format(name, metric_type))
+            lines.append('# HELP {} {}'.format(name, help_text))
+            for suffix, labels, value in samples:
+                lines.append('{}{}{} {}'.format(name, suffix,
+                                                _format_labels(labels),
+                                                _format_value(value)))
+
+        for metric, help_text in _GAUGES:
+            family(metric, 'gauge', help_text, [
+                ('', [('device', name)], state.values[metric])
+                for name, state in states if metric in state.values])
+        family('sfc5xxx_up', 'gauge',
+               "Whether the last poll of the device was successful.",
+               [('', [('device', name)], state.up) for name, state in states])
+        family('sfc5xxx_last_poll_timestamp_seconds', 'gauge',
+               "Time of the last successful poll.",
+               [('', [('device', name)], state.timestamp)
+                for name, state in states if state.timestamp is not None])
+        family('sfc5xxx_poll_errors', 'counter',
+               "Number of failed polls of the device.",
+               [('_total', [('device', name)], state.errors)
+                for name, state in states])
+        family('sfc5xxx_device', 'info',
+               "Identity and active calibration of the device.",
+               [('_info', [('device', name)] + state.info, 1)
+                for name, state in states if state.info is not None])
+        self._render_command_metrics(family)
+        lines.append('# EOF')
+        return '\n'.join(lines) + '\n'
+
+    def _render_command_metrics(self, family):
+        """
+        Render the command metrics.
+
+        :param callable family: Function to render a metric family.
+        """
+        commands = sorted(self._metrics.snapshot()['commands'].items())
+        for key, name, help_text in (
+                ('count', 'sfc5xxx_command',
+                 "Number of executed commands."),
+                ('timeouts', 'sfc5xxx_command_timeouts',
+                 "Number of commands without response."),
+                ('request_bytes', 'sfc5xxx_command_request_bytes',
+                 "Bytes sent to the devices."),
+                ('response_bytes', 'sfc5xxx_command_response_bytes',
+                 "Bytes received from the devices.")):
+            family(name, 'counter', help_text, [
+                ('_total', [('command', command)], stats[key])
+                for command, stats in commands])
+        family('sfc5xxx_command_errors', 'counter',
+               "Number of commands failed with an error.", [
+                   ('_total', [('command', command), ('error', error)], count)
+                   for command, stats in commands
+                   for error, count in sorted(stats['errors'].items())])
+        samples = []
+        for command, stats in commands:
+            labels = [('command', command)]
+            cumulative = 0
+            for upper_bound, count in stats['histogram']:
+                cumulative += count
+                samples.append(('_bucket',
+                                labels + [('le', _format_value(upper_bound))],
+                                cumulative))
+            samples.append(('_bucket', labels + [('le', '+Inf')],
+                            stats['count']))
+            samples.append(('_count', labels, stats['count']))
+            samples.append(('_sum', labels,
+                            stats['latency']['mean'] * stats['count']))
+        family('sfc5xxx_command_latency_seconds', 'histogram',
+               "Latency of the executed commands.", samples)
+
+
+class _HttpServer(ThreadingMixIn, HTTPServer):
+    """
+    HTTP server handling every request in its own thread.
+    """
+
+    daemon_threads = True
+    exporter = None  # Set by the exporter
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    """
+    HTTP request handler serving the metrics.
+    """
+
+    def do_GET(self):
+        if self.path.split('?')[0] not in ('/', '/metrics'):
+            self.send_error(404)
+            return
+        body = self.server.exporter.render().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        log.debug("{} - {}".format(self.address_string(), format % args))
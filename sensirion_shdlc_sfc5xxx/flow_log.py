@@ -0,0 +1,955 @@
+# -*- coding: utf-8 -*-
+# (c) Copyright 2020 Sensirion AG, Switzerland
+"""
+Compact on-disk log of the measured flow values of many devices.
+
+A :py:class:`~sensirion_shdlc_sfc5xxx.flow_log.Sfc5xxxFlowLogger` reads the
+flow value buffers of the devices in the background (see
+:py:class:`~sensirion_shdlc_sfc5xxx.buffer_reader.Sfc5xxxBufferReader`) and
+writes the values with their reconstructed timestamps to a file:
+
+.. sourcecode:: python
+
+    with Sfc5xxxFlowLogger('flow.log', {'n2': device1, 'o2': device2}):
+        time.sleep(3600.0)
+
+    with Sfc5xxxFlowLogReader('flow.log') as log:
+        print(log.devices['n2'])  # Scaling and unit
+        timestamps, values, gaps = log.read('n2', start=t0, end=t0 + 60.0)
+
+The file is a sequence of blocks which are only appended, so a log which
+was not closed properly (e.g. after a power failure) can still be read up to
+the last completely written block. All numbers are stored little endian,
+with 8 byte alignment:
+
+  * File header: Magic ``SFC5FLOG``, format version (uint16) and creation
+    time (float64, UNIX timestamp).
+  * Every block starts with a tag (4 bytes) and the payload size (uint32):
+
+    * ``DEVC``: Device name, scaling and unit as UTF-8 encoded JSON.
+    * ``DATA``: A chunk of samples of one device: a header (device ID,
+      number of samples, number of gaps, first and last timestamp),
+      followed by the columns timestamps (int64, nanoseconds since the
+      epoch), values (float32) and gaps (pairs of int64: index of the
+      first sample after the gap, number of lost values).
+    * ``INDX``: Written when the log is closed: the devices (JSON) and the
+      location and time range of every chunk, followed by a trailer with
+      the offset of the index block, so readers don't need to scan the
+      file.
+"""
+
+from __future__ import absolute_import, division, print_function
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from functools import partial
+from struct import Struct, pack, unpack_from
+from threading import Lock, Thread
+from .array_commands import import_numpy
+from .buffer_reader import Sfc5xxxBufferReader
+from .definitions import Sfc5xxxScaling
+import json
+import mmap
+import time
+
+try:
+    from queue import Queue, Empty
+except ImportError:  # Python 2
+    from Queue import Queue, Empty
+
+import logging
+log = logging.getLogger(__name__)
+
+
+_MAGIC = b'SFC5FLOG'
+_VERSION = 1
+_FILE_HEADER = Struct('<8sH6xd')
+_BLOCK_HEADER = Struct('<4sI')
+_DEVICE_TAG = b'DEVC'
+_CHUNK_TAG = b'DATA'
+_INDEX_TAG = b'INDX'
+_CHUNK_HEADER = Struct('<HxxII4xqq')  # ID, count, gaps, first/last time
+_INDEX_HEADER = Struct('<II')  # Length of devices JSON, number of chunks
+_INDEX_ENTRY = Struct('<HxxIQqq')  # ID, count, offset, first/last time
+_TRAILER = Struct('<Q8s')  # Offset of the index block, end marker
+_END_MARKER = b'SFC5FEND'
+_FLUSH = 'flush'  # Queue item to flush the file
+
+
+def _padding(size):
+    """
+    Get the padding needed to align a size to 8 bytes.
+
+    :param int size: The size.
+    :return: The padding bytes.
+    :rtype: bytes
+    """
+    return b"\x00" * (-size % 8)
+
+
+class _Chunk(object):
+    """
+    Location of a chunk of samples in the log file.
+    """
+
+    __slots__ = ('device_id', 'count', 'offset', 'first_time', 'last_time')
+
+    def __init__(self, device_id, count, offset, first_time, last_time):
+        self.device_id = device_id
+        self.count = count
+        self.offset = offset  # Offset of the chunk header
+        self.first_time = first_time  # [ns]
+        self.last_time = last_time  # [ns]
+
+
+class _Int64Column(object):
+    """
+    Read-only sequence of the int64 values of a column in a memory-mapped
+    file, which decodes only the accessed values (e.g. for bisection).
+    """
+
+    __slots__ = ('_buffer', '_offset', '_count')
+
+    def __init__(self, buffer, offset, count):
+        self._buffer = buffer
+        self._offset = offset
+        self._count = count
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, index):
+        if not 0 <= index < self._count:
+            raise IndexError(index)
+        return unpack_from('<q', self._buffer, self._offset + 8 * index)[0]
+
+
+class _PendingSamples(object):
+    """
+    Samples of one device which are not written yet.
+    """
+
+    __slots__ = ('device_id', 'timestamps', 'values', 'gaps', 'lost_values',
+                 'last_timestamp')
+
+    def __init__(self, device_id):
+        self.device_id = device_id
+        self.timestamps = []  # [ns]
+        self.values = []
+        self.gaps = []
+        self.lost_values = 0  # Lost before the next sample
+        self.last_timestamp = None  # Of the last written sample [ns]
+
+
+class Sfc5xxxFlowLogWriter(object):
+    """
+    Writes flow values to a log file (see
+    :py:mod:`~sensirion_shdlc_sfc5xxx.flow_log` for the format).
+
+    The samples of every device are collected in memory and written as
+    chunks by a background thread, either when a chunk is full or
+    periodically. So :py:meth:`write` returns immediately and the file is
+    written with few, large writes.
+
+    .. note:: This class can be used in a "with"-statement.
+    """
+
+    def __init__(self, file_path, chunk_size=4096, flush_interval=5.0):
+        """
+        Constructor. Creates the log file and starts the writer thread.
+
+        :param str file_path:
+            The path to the log file. An existing file is overwritten.
+        :param int chunk_size:
+            Number of samples per device which are written as one chunk.
+        :param float flush_interval:
+            Maximum time [s] until written samples are stored in the file,
+            even if their chunk is not full. Smaller values lose less data
+            on a power failure, but lead to smaller chunks.
+        """
+        super(Sfc5xxxFlowLogWriter, self).__init__()
+        if chunk_size < 1:
+            raise ValueError("Chunk size must be at least 1!")
+        self._chunk_size = int(chunk_size)
+        self._flush_interval = float(flush_interval)
+        self._lock = Lock()
+        self._devices = OrderedDict()  # Pending samples by device name
+        self._device_info = []  # Device metadata, by device ID
+        self._chunks = []  # Written chunks, only used by the writer thread
+        self._queue = Queue()
+        self._error = None
+        self._file = open(file_path, 'wb')
+        self._file.write(_FILE_HEADER.pack(_MAGIC, _VERSION, time.time()))
+        self._thread = Thread(target=self._run, name="Sfc5xxxFlowLogWriter")
+        self._thread.daemon = True
+        self._thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    @property
+    def is_open(self):
+        """
+        Whether the log is open for writing.
+
+        :type: bool
+        """
+        return self._thread is not None
+
+    def add_device(self, name, scaling, unit):
+        """
+        Add a device to the log.
+
+        :param str name:
+            The device name, unique within the log.
+        :param ~sensirion_shdlc_sfc5xxx.definitions.Sfc5xxxScaling scaling:
+            The scaling of the values.
+        :param str unit:
+            The unit of the values (e.g. "sccm"), empty for normalized
+            values.
+        """
+        with self._lock:
+            if name in self._devices:
+                raise ValueError("Device '{}' already exists!".format(name))
+            info = OrderedDict([('id', len(self._device_info)),
+                                ('name', name),
+                                ('scaling', int(scaling)),
+                                ('unit', unit)])
+            self._device_info.append(info)
+            self._devices[name] = _PendingSamples(info['id'])
+            self._queue.put((_DEVICE_TAG, info))
+
+    def write(self, name, first_timestamp, sampling_time, values,
+              lost_values=0):
+        """
+        Write equidistant samples of a device.
+
+        The timestamps of a device never go backwards in the log, since the
+        reader relies on them being sorted. If the samples start before
+        the last written sample (e.g. after the system clock was set back),
+        they are shifted to continue one sampling time after it.
+
+        :param str name: The device name.
+        :param float first_timestamp: Timestamp of the first value [s].
+        :param float sampling_time: Time between the values [s].
+        :param values: The values (list of floats or NumPy array).
+        :param int lost_values: Number of values lost before the first value.
+        """
+        first = int(round(first_timestamp * 1e9))
+        period = sampling_time * 1e9
+        with self._lock:
+            if not self.is_open:
+                raise IOError("The flow log is closed.")
+            try:
+                pending = self._devices[name]
+            except KeyError:
+                raise ValueError("Unknown device '{}'!".format(name))
+            pending.lost_values += lost_values
+            if not len(values):
+                return
+            if pending.last_timestamp is not None and \
+                    first <= pending.last_timestamp:
+                log.debug("Timestamps of device '{}' went backwards by {} s."
+                          .format(name, (pending.last_timestamp - first) *
+                                  1e-9))
+                first = pending.last_timestamp + max(int(round(period)), 1)
+            timestamps = [first + int(round(i * period))
+                          for i in range(len(values))]
+            pending.last_timestamp = timestamps[-1]
+            if pending.lost_values:
+                pending.gaps.append((len(pending.values),
+                                     pending.lost_values))
+                pending.lost_values = 0
+            pending.timestamps.extend(timestamps)
+            pending.values.extend(values)
+            if len(pending.values) >= self._chunk_size:
+                self._seal(pending)
+
+    def write_response(self, name, response, first_timestamp):
+        """
+        Write the values of a "read buffer" response, e.g. as callback of a
+        :py:class:`~sensirion_shdlc_sfc5xxx.buffer_reader.Sfc5xxxBufferReader`.
+
+        :param str name:
+            The device name.
+        :param ~sensirion_shdlc_sfc5xxx.types.Sfc5xxxReadBufferResponse response:
+            The response.
+        :param float first_timestamp:
+            Timestamp of the first value [s] (ignored if the response
+            contains no values).
+        """  # noqa: E501
+        self.write(name, first_timestamp or 0.0, response.sampling_time,
+                   response.values, response.lost_values)
+
+    def flush(self):
+        """
+        Hand over all pending samples to the writer thread.
+        """
+        with self._lock:
+            for pending in self._devices.values():
+                if pending.values:
+                    self._seal(pending)
+
+    def close(self):
+        """
+        Write all pending samples and the index, and close the file.
+        Does nothing if already closed.
+
+        :raises IOError: If writing the file failed.
+        """
+        with self._lock:
+            if not self.is_open:
+                return
+        self.flush()
+        with self._lock:
+            self._queue.put(None)
+            thread, self._thread = self._thread, None
+        thread.join()
+        try:
+            if self._error is None:
+                self._write_index()
+        finally:
+            self._file.close()
+        if self._error is not None:
+            raise self._error
+
+    def _seal(self, pending):
+        """
+        Hand over the pending samples of a device to the writer thread.
+        Must be called with the lock held.
+
+        :param _PendingSamples pending: The pending samples.
+        """
+        self._queue.put((_CHUNK_TAG, (pending.device_id, pending.timestamps,
+                                      pending.values, pending.gaps)))
+        pending.timestamps = []
+        pending.values = []
+        pending.gaps = []
+
+    def _run(self):
+        """
+        Writer thread function.
+        """
+        next_flush = time.time() + self._flush_interval
+        while True:
+            try:
+                item = self._queue.get(
+                    timeout=max(next_flush - time.time(), 0.0))
+            except Empty:
+                # Flush the file after the pending samples are written
+                self.flush()
+                self._queue.put((_FLUSH, None))
+                next_flush = time.time() + self._flush_interval
+                continue
+            if item is None:
+                return
+            if self._error is not None:
+                continue  # Drop the data, the error is raised on close
+            try:
+                if item[0] == _FLUSH:
+                    self._file.flush()
+                elif item[0] == _DEVICE_TAG:
+                    self._write_block(_DEVICE_TAG,
+                                      json.dumps(item[1]).encode('utf-8'))
+                else:
+                    self._write_chunk(*item[1])
+            except Exception as e:
+                log.error("Failed to write flow log: {}".format(e))
+                self._error = e
+
+    def _write_block(self, tag, payload):
+        """
+        Write a block.
+
+        :param bytes tag: The block tag.
+        :param bytes payload: The payload.
+        :return: The offset of the payload.
+        :rtype: int
+        """
+        payload += _padding(len(payload))
+        self._file.write(_BLOCK_HEADER.pack(tag, len(payload)))
+        offset = self._file.tell()
+        self._file.write(payload)
+        return offset
+
+    def _write_chunk(self, device_id, timestamps, values, gaps):
+        """
+        Write a chunk of samples.
+
+        :param int device_id: The device ID.
+        :param list timestamps: The timestamps [ns].
+        :param list values: The values.
+        :param list gaps: The gaps as (index, lost values) tuples.
+        """
+        count = len(values)
+        data = _CHUNK_HEADER.pack(device_id, count, len(gaps),
+                                  timestamps[0], timestamps[-1])
+        data += pack('<{}q'.format(count), *timestamps)
+        data += pack('<{}f'.format(count), *values)
+        data += _padding(len(data))
+        data += pack('<{}q'.format(2 * len(gaps)),
+                     *[number for gap in gaps for number in gap])
+        offset = self._write_block(_CHUNK_TAG, data)
+        self._chunks.append(_Chunk(device_id, count, offset, timestamps[0],
+                                   timestamps[-1]))
+
+    def _write_index(self):
+        """
+        Write the index block and the trailer.
+        """
+        devices = json.dumps(self._device_info).encode('utf-8')
+        data = _INDEX_HEADER.pack(len(devices), len(self._chunks)) + \
+            devices + _padding(len(devices))
+        data += b"".join(_INDEX_ENTRY.pack(c.device_id, c.count, c.offset,
+                                           c.first_time, c.last_time)
+                         for c in self._chunks)
+        offset = self._write_block(_INDEX_TAG, data)
+        self._file.write(_TRAILER.pack(offset, _END_MARKER))
+
+
+class Sfc5xxxFlowLogReader(object):
+    """
+    Reads a log file written by a
+    :py:class:`~sensirion_shdlc_sfc5xxx.flow_log.Sfc5xxxFlowLogWriter`.
+
+    The file is memory-mapped and only the requested samples are decoded,
+    so even huge logs open quickly. A sparse index (the time range of every
+    chunk) is kept in memory, so the samples within a time range are found
+    in O(log n): the chunks are located by bisecting the index, the samples
+    within a chunk by bisecting its memory-mapped timestamps.
+
+    A log which is still being written (or was not closed properly) can be
+    read as well, up to the last completely written chunk at the time of
+    opening.
+
+    .. note:: This class can be used in a "with"-statement.
+    """
+
+    def __init__(self, file_path):
+        """
+        Constructor. Opens the file and reads the index.
+
+        :param str file_path:
+            The path to the log file.
+        :raises IOError:
+            If the file is not a flow log of a supported version.
+        """
+        super(Sfc5xxxFlowLogReader, self).__init__()
+        self._file_path = file_path
+        self._file = open(file_path, 'rb')
+        try:
+            header = self._file.read(_FILE_HEADER.size)
+            if len(header) != _FILE_HEADER.size or \
+                    _FILE_HEADER.unpack(header)[0] != _MAGIC:
+                raise IOError("Not a flow log.")
+            magic, version, self._creation_time = _FILE_HEADER.unpack(header)
+            if version != _VERSION:
+                raise IOError("Unsupported flow log version: {}"
+                              .format(version))
+            self._mmap = mmap.mmap(self._file.fileno(), 0,
+                                   access=mmap.ACCESS_READ)
+            self._devices = OrderedDict()  # Device info by name
+            self._names = dict()  # Device names by ID
+            self._chunks = dict()  # Chunks by device name
+            if not self._read_index():
+                self._scan()
+            self._build_index()
+        except Exception:
+            self._file.close()
+            raise
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    @property
+    def file_path(self):
+        """
+        The path to the log file.
+
+        :type: str
+        """
+        return self._file_path
+
+    @property
+    def size(self):
+        """
+        The size of the log file when it was opened [bytes].
+
+        :type: int
+        """
+        return len(self._mmap)
+
+    @property
+    def creation_time(self):
+        """
+        The time when the log was created.
+
+        :type: float (UNIX timestamp)
+        """
+        return self._creation_time
+
+    @property
+    def devices(self):
+        """
+        The logged devices, as dictionaries with the ``scaling`` (an
+        :py:class:`~sensirion_shdlc_sfc5xxx.definitions.Sfc5xxxScaling`)
+        and the ``unit`` (str) by device name.
+
+        :type: dict
+        """
+        return OrderedDict((name, dict(scaling=info['scaling'],
+                                       unit=info['unit']))
+                           for name, info in self._devices.items())
+
+    def get_count(self, name, start=None, end=None):
+        """
+        Get the number of samples of a device within a time range, without
+        reading the samples.
+
+        :param str name: The device name.
+        :param float start: See :py:meth:`read`.
+        :param float end: See :py:meth:`read`.
+        :return: Number of logged samples.
+        :rtype: int
+        """
+        first, last = self._to_ns(start, end)
+        chunks = self._get_chunks(name)
+        begin, stop = self._find_chunks(name, first, last)
+        if begin >= stop:
+            return 0
+        cumulative = self._cumulative_counts[name]
+        count = cumulative[stop] - cumulative[begin]
+        count -= self._get_range(chunks[begin], first, last)[0]
+        count -= chunks[stop - 1].count - \
+            self._get_range(chunks[stop - 1], first, last)[1]
+        return count
+
+    def get_time_range(self, name):
+        """
+        Get the time range of the samples of a device.
+
+        :param str name: The device name.
+        :return: Timestamps [s] of the first and the last sample, or
+                 ``None`` if there are no samples.
+        :rtype: tuple(float, float)/None
+        """
+        chunks = self._get_chunks(name)
+        if not chunks:
+            return None
+        return chunks[0].first_time * 1e-9, chunks[-1].last_time * 1e-9
+
+    def read(self, name, start=None, end=None, as_array=False):
+        """
+        Read the samples of a device within a time range.
+
+        :param str name:
+            The device name.
+        :param float start:
+            Timestamp [s] of the first sample to return (inclusive), or
+            ``None`` to start with the first logged sample.
+        :param float end:
+            Timestamp [s] where to stop (exclusive), or ``None`` to return
+            all samples up to the last logged sample.
+        :param bool as_array:
+            If ``True``, the timestamps (float64) and values (float32) are
+            returned as NumPy arrays instead of lists. This is much faster
+            for large amounts of samples, but requires
+            `NumPy <https://numpy.org/>`_ to be installed. The arrays are
+            copies, i.e. they stay valid after the reader is closed.
+        :return:
+            The timestamps [s], the values, and the gaps as list of
+            (timestamp of the first sample after the gap, number of lost
+            values) tuples.
+        :rtype:
+            list(float), list(float), list(tuple)
+        """
+        first, last = self._to_ns(start, end)
+        begin, stop = self._find_chunks(name, first, last)
+        chunks = self._get_chunks(name)[begin:stop]
+        if as_array:
+            return self._read_arrays(chunks, first, last)
+        timestamps, values, gaps = [], [], []
+        for chunk in chunks:
+            begin, stop = self._get_range(chunk, first, last)
+            timestamps.extend(t * 1e-9 for t in unpack_from(
+                '<{}q'.format(stop - begin), self._mmap,
+                self._get_timestamps_offset(chunk) + 8 * begin))
+            values.extend(self._get_values(chunk, begin, stop))
+            gaps.extend(self._get_gaps(chunk, begin, stop))
+        return timestamps, values, gaps
+
+    def iter_chunks(self, name, start=None, end=None):
+        """
+        Iterate chunk by chunk over the samples of a device within a time
+        range, e.g. to process huge logs with constant memory. Requires
+        `NumPy <https://numpy.org/>`_ to be installed.
+
+        :param str name: The device name.
+        :param float start: See :py:meth:`read`.
+        :param float end: See :py:meth:`read`.
+        :return:
+            Generator yielding the timestamps [s], values and gaps of every
+            chunk, like :py:meth:`read` with ``as_array=True``.
+        :rtype:
+            generator
+        """
+        first, last = self._to_ns(start, end)
+        begin, stop = self._find_chunks(name, first, last)
+        for chunk in self._get_chunks(name)[begin:stop]:
+            yield self._read_arrays([chunk], first, last)
+
+    def close(self):
+        """
+        Close the file.
+        """
+        self._mmap.close()
+        self._file.close()
+
+    def _get_chunks(self, name):
+        """
+        Get the chunks of a device.
+
+        :param str name: The device name.
+        :return: The chunks, ordered by time.
+        :rtype: list
+        """
+        if name not in self._devices:
+            raise ValueError("Unknown device '{}'!".format(name))
+        return self._chunks[name]
+
+    @staticmethod
+    def _to_ns(start, end):
+        """
+        Convert a time range to nanoseconds.
+
+        :param float start: Start [s] or ``None``.
+        :param float end: End [s] or ``None``.
+        :return: Start and end [ns] or ``None``.
+        :rtype: tuple
+        """
+        return (None if start is None else int(round(start * 1e9)),
+                None if end is None else int(round(end * 1e9)))
+
+    def _find_chunks(self, name, first, last):
+        """
+        Find the chunks of a device which overlap a time range, by
+        bisecting the sparse index.
+
+        :param str name: The device name.
+        :param int first: First timestamp [ns] (inclusive) or ``None``.
+        :param int last: Last timestamp [ns] (exclusive) or ``None``.
+        :return: The index of the first overlapping chunk and the index after
+                 the last overlapping chunk.
+        :rtype: int, int
+        """
+        chunks = self._get_chunks(name)
+        begin, stop = 0, len(chunks)
+        if first is not None:
+            begin = bisect_right(self._first_times[name], first) - 1
+            if begin < 0 or chunks[begin].last_time < first:
+                begin += 1
+        if last is not None:
+            stop = bisect_left(self._first_times[name], last)
+        return begin, max(begin, stop)
+
+    def _get_range(self, chunk, first, last):
+        """
+        Get the range of samples of a chunk within a time range, by
+        bisecting its timestamps (without decoding all of them).
+
+        :param _Chunk chunk: The chunk.
+        :param int first: First timestamp [ns] (inclusive) or ``None``.
+        :param int last: Last timestamp [ns] (exclusive) or ``None``.
+        :return: The index of the first sample in the range and the index
+                 after the last sample in the range.
+        :rtype: int, int
+        """
+        timestamps = _Int64Column(self._mmap,
+                                  self._get_timestamps_offset(chunk),
+                                  chunk.count)
+        begin = 0
+        if first is not None and first > chunk.first_time:
+            begin = bisect_left(timestamps, first)
+        stop = chunk.count
+        if last is not None and last <= chunk.last_time:
+            stop = bisect_left(timestamps, last, begin)
+        return begin, stop
+
+    def _get_values(self, chunk, begin, stop):
+        """
+        Get a range of values of a chunk.
+
+        :param _Chunk chunk: The chunk.
+        :param int begin: Index of the first value.
+        :param int stop: Index after the last value.
+        :return: The values.
+        :rtype: tuple(float)
+        """
+        return unpack_from('<{}f'.format(stop - begin), self._mmap,
+                           self._get_values_offset(chunk) + 4 * begin)
+
+    def _get_gaps(self, chunk, begin, stop):
+        """
+        Get the gaps of a chunk within a range of samples.
+
+        :param _Chunk chunk: The chunk.
+        :param int begin: Index of the first sample.
+        :param int stop: Index after the last sample.
+        :return: The gaps as (timestamp [s], lost values) tuples.
+        :rtype: list(tuple)
+        """
+        count = _CHUNK_HEADER.unpack_from(self._mmap, chunk.offset)[2]
+        if count == 0:
+            return []
+        offset = self._get_values_offset(chunk) + 4 * chunk.count
+        offset += -offset % 8
+        numbers = unpack_from('<{}q'.format(2 * count), self._mmap, offset)
+        timestamps = _Int64Column(self._mmap,
+                                  self._get_timestamps_offset(chunk),
+                                  chunk.count)
+        return [(timestamps[index] * 1e-9, lost)
+                for index, lost in zip(numbers[0::2], numbers[1::2])
+                if begin <= index < stop]
+
+    @staticmethod
+    def _get_timestamps_offset(chunk):
+        """
+        Get the offset of the timestamps column of a chunk.
+
+        :param _Chunk chunk: The chunk.
+        :return: The offset.
+        :rtype: int
+        """
+        return chunk.offset + _CHUNK_HEADER.size
+
+    @staticmethod
+    def _get_values_offset(chunk):
+        """
+        Get the offset of the values column of a chunk.
+
+        :param _Chunk chunk: The chunk.
+        :return: The offset.
+        :rtype: int
+        """
+        return chunk.offset + _CHUNK_HEADER.size + 8 * chunk.count
+
+    def _read_arrays(self, chunks, first, last):
+        """
+        Read the samples of chunks as NumPy arrays.
+
+        :param list chunks: The chunks.
+        :param int first: First timestamp [ns] (inclusive) or ``None``.
+        :param int last: Last timestamp [ns] (exclusive) or ``None``.
+        :return: The timestamps [s], the values, and the gaps.
+        :rtype: numpy.ndarray, numpy.ndarray, list(tuple)
+        """
+        numpy = import_numpy()
+        timestamps, values, gaps = [], [], []
+        for chunk in chunks:
+            begin, stop = self._get_range(chunk, first, last)
+            timestamps.append(numpy.frombuffer(
+                self._mmap, dtype='<i8', count=stop - begin,
+                offset=self._get_timestamps_offset(chunk) + 8 * begin) * 1e-9)
+            values.append(numpy.frombuffer(
+                self._mmap, dtype='<f4', count=stop - begin,
+                offset=self._get_values_offset(chunk) + 4 * begin))
+            gaps.extend(self._get_gaps(chunk, begin, stop))
+        if not chunks:
+            return numpy.empty(0, numpy.float64), \
+                numpy.empty(0, numpy.float32), gaps
+        return numpy.concatenate(timestamps), numpy.concatenate(values), gaps
+
+    def _add_device(self, info):
+        """
+        Add a device read from the file.
+
+        :param dict info: The device info.
+        """
+        info['scaling'] = Sfc5xxxScaling(info['scaling'])
+        self._devices[info['name']] = info
+        self._names[info['id']] = info['name']
+        self._chunks[info['name']] = []
+
+    def _add_chunk(self, chunk):
+        """
+        Add a chunk read from the file.
+
+        :param _Chunk chunk: The chunk.
+        """
+        self._chunks[self._names[chunk.device_id]].append(chunk)
+
+    def _build_index(self):
+        """
+        Build the sparse index (start time and cumulative sample count of
+        every chunk) of all devices.
+        """
+        self._first_times = dict()
+        self._cumulative_counts = dict()
+        for name, chunks in self._chunks.items():
+            chunks.sort(key=lambda c: c.first_time)
+            self._first_times[name] = [c.first_time for c in chunks]
+            cumulative = [0]
+            for chunk in chunks:
+                cumulative.append(cumulative[-1] + chunk.count)
+            self._cumulative_counts[name] = cumulative
+
+    def _read_index(self):
+        """
+        Read the index block, if the file was closed properly.
+
+        :return: ``True`` if the index was read, ``False`` otherwise.
+        :rtype: bool
+        """
+        size = len(self._mmap)
+        if size < _FILE_HEADER.size + _TRAILER.size:
+            return False
+        offset, marker = _TRAILER.unpack_from(self._mmap,
+                                              size - _TRAILER.size)
+        if marker != _END_MARKER:
+            return False
+        devices_length, count = _INDEX_HEADER.unpack_from(self._mmap, offset)
+        offset += _INDEX_HEADER.size
+        for info in json.loads(self._mmap[offset:offset + devices_length]
+                               .decode('utf-8')):
+            self._add_device(info)
+        offset += devices_length + (-devices_length % 8)
+        for i in range(count):
+            self._add_chunk(_Chunk(*_INDEX_ENTRY.unpack_from(
+                self._mmap, offset + i * _INDEX_ENTRY.size)))
+        return True
+
+    def _scan(self):
+        """
+        Read all block headers, if the file was not closed properly.
+        """
+        size = len(self._mmap)
+        offset = _FILE_HEADER.size
+        while offset + _BLOCK_HEADER.size <= size:
+            tag, length = _BLOCK_HEADER.unpack_from(self._mmap, offset)
+            offset += _BLOCK_HEADER.size
+            if offset + length > size:
+                log.warning("Flow log is truncated.")
+                break
+            if tag == _DEVICE_TAG:
+                self._add_device(json.loads(
+                    self._mmap[offset:offset + length].rstrip(b"\x00")
+                    .decode('utf-8')))
+            elif tag == _CHUNK_TAG:
+                device_id, count, _, first_time, last_time = \
+                    _CHUNK_HEADER.unpack_from(self._mmap, offset)
+                self._add_chunk(_Chunk(device_id, count, offset, first_time,
+                                       last_time))
+            offset += length
+
+
+class Sfc5xxxFlowLogger(object):
+    """
+    Reads the flow value buffers of devices in the background and writes
+    the values to a flow log.
+
+    Every device is read by its own
+    :py:class:`~sensirion_shdlc_sfc5xxx.buffer_reader.Sfc5xxxBufferReader`,
+    the values are written by a
+    :py:class:`~sensirion_shdlc_sfc5xxx.flow_log.Sfc5xxxFlowLogWriter`.
+
+    .. note:: This class can be used in a "with"-statement, which starts
+              logging on entering and stops it on leaving the statement.
+    """
+
+    def __init__(self, file_path, devices, scaling=Sfc5xxxScaling.PHYSICAL,
+                 chunk_size=4096, flush_interval=5.0):
+        """
+        Constructor. Does not communicate with the devices, call
+        :py:meth:`start` to start logging.
+
+        :param str file_path:
+            The path to the log file. An existing file is overwritten.
+        :param devices:
+            The devices to log, either as a dictionary of device name and
+            device, or as a list of devices, which are then named by their
+            slave address.
+        :param ~sensirion_shdlc_sfc5xxx.definitions.Sfc5xxxScaling scaling:
+            The scaling of the logged values.
+        :param int chunk_size:
+            See :py:class:`~sensirion_shdlc_sfc5xxx.flow_log.Sfc5xxxFlowLogWriter`.
+        :param float flush_interval:
+            See :py:class:`~sensirion_shdlc_sfc5xxx.flow_log.Sfc5xxxFlowLogWriter`.
+        """  # noqa: E501
+        super(Sfc5xxxFlowLogger, self).__init__()
+        if not isinstance(devices, dict):
+            devices = dict((str(device.slave_address), device)
+                           for device in devices)
+        self._file_path = file_path
+        self._devices = sorted(devices.items())
+        self._scaling = Sfc5xxxScaling(scaling)
+        self._chunk_size = chunk_size
+        self._flush_interval = flush_interval
+        self._writer = None
+        self._readers = OrderedDict()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    @property
+    def readers(self):
+        """
+        The buffer readers by device name (e.g. to check for lost values or
+        errors), empty if not started.
+
+        :type: dict
+        """
+        return self._readers
+
+    def start(self):
+        """
+        Create the log file, read the units of the devices and start reading
+        the buffers.
+        """
+        if self._writer is not None:
+            raise RuntimeError("The flow logger is already running!")
+        units = [self._get_unit(device) for _, device in self._devices]
+        self._writer = Sfc5xxxFlowLogWriter(
+            self._file_path, self._chunk_size, self._flush_interval)
+        for (name, device), unit in zip(self._devices, units):
+            self._writer.add_device(name, self._scaling, unit)
+            self._readers[name] = Sfc5xxxBufferReader(
+                device, self._scaling, capacity=1024,
+                callback=partial(self._writer.write_response, name))
+        for reader in self._readers.values():
+            reader.start()
+
+    def stop(self):
+        """
+        Stop reading the buffers and close the log file.
+        """
+        if self._writer is None:
+            return
+        for reader in self._readers.values():
+            reader.stop()
+        self._readers = OrderedDict()
+        writer, self._writer = self._writer, None
+        writer.close()
+
+    def _get_unit(self, device):
+        """
+        Read the unit of the logged values from a device.
+
+        :param ~sensirion_shdlc_sfc5xxx.device.Sfc5xxxShdlcDevice device:
+            The device.
+        :return: The unit, or an empty string for normalized values.
+        :rtype: str
+        """
+        if self._scaling == Sfc5xxxScaling.PHYSICAL:
+            return str(device.get_current_gas_unit())
+        if self._scaling == Sfc5xxxScaling.USER_DEFINED:
+            return str(device.get_user_defined_medium_unit(True))
+        return ""
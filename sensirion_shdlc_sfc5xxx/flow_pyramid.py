@@ -0,0 +1,303 @@
+# -*- coding: utf-8 -*-
+# (c) Copyright 2020 Sensirion AG, Switzerland
+"""
+Decimated views of flow logs for zoomable plots.
+
+A :py:class:`~sensirion_shdlc_sfc5xxx.flow_pyramid.Sfc5xxxFlowLogPyramid`
+aggregates the samples of a
+:py:class:`~sensirion_shdlc_sfc5xxx.flow_log.Sfc5xxxFlowLogReader` into
+levels of buckets with minimum, maximum and mean. Every level combines
+``factor`` buckets of the level below, so a plot of any time range (from a
+week down to single samples) needs only a bounded number of points:
+
+.. sourcecode:: python
+
+    with Sfc5xxxFlowLogReader('flow.log') as reader:
+        pyramid = Sfc5xxxFlowLogPyramid(reader)
+        timestamps, minimums, maximums, means = pyramid.read(
+            'n2', start=t0, end=t0 + 7 * 86400.0, max_points=2000)
+
+The levels are built by scanning the log once, and are stored in a cache
+file next to the log (``<log file>.pyramid``) which is memory-mapped when
+the same log is opened again.
+
+.. note:: This module requires `NumPy <https://numpy.org/>`_ to be
+          installed.
+"""
+
+from __future__ import absolute_import, division, print_function
+from struct import Struct
+from .array_commands import import_numpy
+import json
+import mmap
+import os
+import tempfile
+
+import logging
+log = logging.getLogger(__name__)
+
+
+_MAGIC = b'SFC5PYRM'
+_VERSION = 1
+_HEADER = Struct('<8sHxxI')  # Magic, version, length of the JSON metadata
+
+# Bucket of a level: start time [s], minimum, maximum, sum and count
+_BUCKET_FIELDS = [('time', '<f8'), ('minimum', '<f4'), ('maximum', '<f4'),
+                  ('sum', '<f8'), ('count', '<i8')]
+
+
+class Sfc5xxxFlowLogPyramid(object):
+    """
+    Min/max/mean pyramid of all devices of a flow log.
+
+    Buckets never span chunks of the log, so the buckets of the lowest level
+    contain ``factor`` samples (or less at the end of a chunk).
+    """
+
+    def __init__(self, reader, factor=16, cache=True):
+        """
+        Constructor. Loads the levels from the cache file, or builds them
+        (which reads the whole log once).
+
+        :param ~sensirion_shdlc_sfc5xxx.flow_log.Sfc5xxxFlowLogReader reader:
+            The reader of the flow log.
+        :param int factor:
+            Number of buckets (resp. samples) combined into a bucket of the
+            next level.
+        :param bool cache:
+            Whether to load the levels from and store them to the cache
+            file.
+        """
+        super(Sfc5xxxFlowLogPyramid, self).__init__()
+        if factor < 2:
+            raise ValueError("Factor must be at least 2!")
+        self._numpy = import_numpy()
+        self._dtype = self._numpy.dtype(_BUCKET_FIELDS)
+        self._reader = reader
+        self._factor = int(factor)
+        self._mmap = None
+        self._levels = None  # Levels by device name, finest first
+        cache_path = reader.file_path + '.pyramid'
+        if cache:
+            self._levels = self._load(cache_path)
+        if self._levels is None:
+            self._levels = dict((name, self._build(name))
+                                for name in reader.devices)
+            if cache:
+                try:
+                    self._store(cache_path)
+                except (IOError, OSError) as e:
+                    log.warning("Failed to store pyramid cache: {}"
+                                .format(e))
+
+    @property
+    def factor(self):
+        """
+        Number of buckets combined into a bucket of the next level.
+
+        :type: int
+        """
+        return self._factor
+
+    def get_levels(self, name):
+        """
+        Get the number of levels of a device.
+
+        :param str name: The device name.
+        :return: The number of levels (without the raw samples).
+        :rtype: int
+        """
+        return len(self._get_levels(name))
+
+    def read(self, name, start=None, end=None, max_points=1000):
+        """
+        Read the samples of a device within a time range, decimated to at
+        most ``max_points`` points.
+
+        The raw samples are returned if there are not more than
+        ``max_points`` (then minimum, maximum and mean are equal). Otherwise
+        the buckets of the finest level with not more than ``max_points``
+        buckets within the time range are returned (or the coarsest level if
+        even that has more buckets). The bucket containing ``start`` is
+        included.
+
+        :param str name:
+            The device name.
+        :param float start:
+            Start of the time range [s], or ``None`` for the start of the log.
+        :param float end:
+            End of the time range [s] (exclusive), or ``None`` for the end of
+            the log.
+        :param int max_points:
+            Maximum number of returned points.
+        :return:
+            The start time of every bucket [s], and the minimum, maximum and
+            mean of every bucket.
+        :rtype:
+            numpy.ndarray, numpy.ndarray, numpy.ndarray, numpy.ndarray
+        """
+        numpy = self._numpy
+        levels = self._get_levels(name)
+        if self._reader.get_count(name, start, end) <= max_points or \
+                not levels:
+            timestamps, values, _ = self._reader.read(name, start, end,
+                                                      as_array=True)
+            return timestamps, values, values.copy(), \
+                values.astype(numpy.float64)
+        for level in levels:
+            times = level['time']
+            begin = 0 if start is None else \
+                max(int(numpy.searchsorted(times, start, 'right')) - 1, 0)
+            stop = len(level) if end is None else \
+                int(numpy.searchsorted(times, end, 'left'))
+            if stop - begin <= max_points:
+                break
+        buckets = level[begin:max(begin, stop)]
+        return buckets['time'].copy(), buckets['minimum'].copy(), \
+            buckets['maximum'].copy(), buckets['sum'] / buckets['count']
+
+    def close(self):
+        """
+        Release the memory-mapped cache file.
+        """
+        self._levels = None
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+    def _get_levels(self, name):
+        """
+        Get the levels of a device.
+
+        :param str name: The device name.
+        :return: The levels, finest first.
+        :rtype: list(numpy.ndarray)
+        """
+        if name not in self._levels:
+            raise ValueError("Unknown device '{}'!".format(name))
+        return self._levels[name]
+
+    def _build(self, name):
+        """
+        Build the levels of a device.
+
+        :param str name: The device name.
+        :return: The levels, finest first.
+        :rtype: list(numpy.ndarray)
+        """
+        numpy = self._numpy
+        parts = []
+        for timestamps, values, _ in self._reader.iter_chunks(name):
+            if len(values) == 0:
+                continue
+            indices = numpy.arange(0, len(values), self._factor)
+            part = numpy.empty(len(indices), self._dtype)
+            part['time'] = timestamps[indices]
+            part['minimum'] = numpy.minimum.reduceat(values, indices)
+            part['maximum'] = numpy.maximum.reduceat(values, indices)
+            part['sum'] = numpy.add.reduceat(values.astype(numpy.float64),
+                                             indices)
+            part['count'] = numpy.diff(numpy.append(indices, len(values)))
+            parts.append(part)
+        if not parts:
+            return []
+        levels = [numpy.concatenate(parts)]
+        while len(levels[-1]) > 1:
+            below = levels[-1]
+            indices = numpy.arange(0, len(below), self._factor)
+            level = numpy.empty(len(indices), self._dtype)
+            level['time'] = below['time'][indices]
+            level['minimum'] = numpy.minimum.reduceat(below['minimum'],
+                                                      indices)
+            level['maximum'] = numpy.maximum.reduceat(below['maximum'],
+                                                      indices)
+            level['sum'] = numpy.add.reduceat(below['sum'], indices)
+            level['count'] = numpy.add.reduceat(below['count'], indices)
+            levels.append(level)
+        return levels
+
+    def _get_source(self):
+        """
+        Get the properties of the log which must match the cache file.
+
+        :return: The properties.
+        :rtype: dict
+        """
+        return {
+            'size': self._reader.size,
+            'creation_time': self._reader.creation_time,
+            'factor': self._factor,
+        }
+
+    def _load(self, path):
+        """
+        Load the levels from a cache file.
+
+        :param str path: The path to the cache file.
+        :return: The levels by device name, or ``None`` if the file does not
+                 exist or does not match the log.
+        :rtype: dict/None
+        """
+        if not os.path.exists(path):
+            return None
+        mapped = None
+        try:
+            with open(path, 'rb') as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, version, length = _HEADER.unpack_from(mapped, 0)
+            if magic != _MAGIC or version != _VERSION:
+                raise ValueError("Not a pyramid cache file.")
+            metadata = json.loads(mapped[_HEADER.size:_HEADER.size + length]
+                                  .decode('utf-8'))
+            if metadata['source'] != self._get_source():
+                log.info("Pyramid cache is outdated, rebuilding it.")
+                mapped.close()
+                return None
+            data_offset = _HEADER.size + length
+            levels = dict()
+            for name, entries in metadata['devices'].items():
+                levels[name] = [self._numpy.frombuffer(
+                    mapped, self._dtype, count=count,
+                    offset=data_offset + offset)
+                    for offset, count in entries]
+        except Exception as e:
+            log.warning("Failed to load pyramid cache: {}".format(e))
+            if mapped is not None:
+                mapped.close()
+            return None
+        self._mmap = mapped
+        return levels
+
+    def _store(self, path):
+        """
+        Store the levels to a cache file, atomically.
+
+        :param str path: The path to the cache file.
+        """
+        devices = dict()
+        offset = 0
+        for name, levels in self._levels.items():
+            devices[name] = []
+            for level in levels:
+                devices[name].append((offset, len(level)))
+                offset += level.nbytes
+        # The offsets are relative to the data, which starts 8 byte aligned
+        # after the metadata.
+        metadata = json.dumps({'source': self._get_source(),
+                               'devices': devices}).encode('utf-8')
+        metadata += b" " * (-(_HEADER.size + len(metadata)) % 8)
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(_HEADER.pack(_MAGIC, _VERSION, len(metadata)))
+                f.write(metadata)
+                for levels in self._levels.values():
+                    for level in levels:
+                        f.write(level.tobytes())
+            if os.path.exists(path) and not hasattr(os, 'replace'):
+                os.remove(path)  # Python 2 on Windows can't rename over it
+            getattr(os, 'replace', os.rename)(tmp_path, path)
+        except Exception:
+            os.remove(tmp_path)
+            raise
@@ -0,0 +1,616 @@
+# -*- coding: utf-8 -*-
+# (c) Copyright 2020 Sensirion AG, Switzerland
+"""
+Online statistics of measured flow values.
+
+An :py:class:`~sensirion_shdlc_sfc5xxx.flow_statistics.Sfc5xxxFlowStatistics`
+object is a processing stage for the responses of
+:py:meth:`~sensirion_shdlc_sfc5xxx.device.Sfc5xxxShdlcDevice.read_measured_value_buffer`.
+It keeps running statistics over all values with constant memory, aggregates
+every ``decimation`` values into a compact
+:py:class:`~sensirion_shdlc_sfc5xxx.flow_statistics.Sfc5xxxFlowSummary`, and
+detects when the flow has settled. Consumers which do not need every raw
+value (e.g. dashboards or network uploads) can subscribe to the summaries
+instead. Its
+:py:meth:`~sensirion_shdlc_sfc5xxx.flow_statistics.Sfc5xxxFlowStatistics.process`
+method can directly be used as callback of a
+:py:class:`~sensirion_shdlc_sfc5xxx.buffer_reader.Sfc5xxxBufferReader`:
+
+.. sourcecode:: python
+
+    statistics = Sfc5xxxFlowStatistics(decimation=100,
+                                       settling_tolerance=0.5,
+                                       callback=publish)
+    with Sfc5xxxBufferReader(device, Sfc5xxxScaling.USER_DEFINED,
+                             callback=statistics.process):
+        ...
+
+Every device needs its own statistics object, so the decimation and the
+settling criteria can be configured per device.
+"""  # noqa: E501
+
+from __future__ import absolute_import, division, print_function
+from threading import Lock
+import math
+
+import logging
+log = logging.getLogger(__name__)
+
+
+class Sfc5xxxRunningStatistics(object):
+    """
+    Running count, mean, variance, minimum and maximum of a series of values,
+    with constant memory.
+
+    The mean and variance are calculated with Welford's algorithm, which is
+    numerically stable also for many values with a large offset (e.g. a flow
+    of 1000 sccm with a noise of 0.01 sccm). Values added in batches are
+    combined with the parallel variant of the algorithm.
+    """
+
+    __slots__ = ('_count', '_mean', '_m2', '_minimum', '_maximum')
+
+    def __init__(self):
+        """
+        Constructor.
+        """
+        super(Sfc5xxxRunningStatistics, self).__init__()
+        self.reset()
+
+    def reset(self):
+        """
+        Remove all values.
+        """
+        self._count = 0
+        self._mean = 0.0
+        self._m2 = 0.0  # Sum of squared differences from the mean
+        self._minimum = None
+        self._maximum = None
+
+    @property
+    def count(self):
+        """
+        Number of added values.
+
+        :type: int
+        """
+        return self._count
+
+    @property
+    def mean(self):
+        """
+        Mean of the added values, or ``None`` if there are none.
+
+        :type: float/None
+        """
+        return self._mean if self._count else None
+
+    @property
+    def variance(self):
+        """
+        Sample variance of the added values (0.0 if there are less than two).
+
+        :type: float
+        """
+        return self._m2 / (self._count - 1) if self._count > 1 else 0.0
+
+    @property
+    def std(self):
+        """
+        Sample standard deviation of the added values (0.0 if there are less
+        than two).
+
+        :type: float
+        """
+        return math.sqrt(self.variance)
+
+    @property
+    def minimum(self):
+        """
+        Smallest added value, or ``None`` if there are none.
+
+        :type: float/None
+        """
+        return self._minimum
+
+    @property
+    def maximum(self):
+        """
+        Largest added value, or ``None`` if there are none.
+
+        :type: float/None
+        """
+        return self._maximum
+
+    def add(self, value):
+        """
+        Add a single value.
+
+        :param float value: The value to add.
+        """
+        self._count += 1
+        delta = value - self._mean
+        self._mean += delta / self._count
+        self._m2 += delta * (value - self._mean)
+        if self._minimum is None or value < self._minimum:
+            self._minimum = value
+        if self._maximum is None or value > self._maximum:
+            self._maximum = value
+
+    def add_values(self, values):
+        """
+        Add many values at once, which is faster than adding them one by one.
+
+        :param list(float) values: The values to add.
+        """
+        count = len(values)
+        if count == 0:
+            return
+        mean = sum(values) / count
+        m2 = sum([(value - mean) ** 2 for value in values])
+        self._merge(count, mean, m2, min(values), max(values))
+
+    def merge(self, other):
+        """
+        Add all values of another statistics object.
+
+        :param Sfc5xxxRunningStatistics other: The statistics to add.
+        """
+        if other._count:
+            self._merge(other._count, other._mean, other._m2,
+                        other._minimum, other._maximum)
+
+    def _merge(self, count, mean, m2, minimum, maximum):
+        """
+        Combine the statistics with those of other values.
+
+        :param int count: Number of the other values (at least 1).
+        :param float mean: Mean of the other values.
+        :param float m2: Sum of squared differences from their mean.
+        :param float minimum: Smallest of the other values.
+        :param float maximum: Largest of the other values.
+        """
+        total = self._count + count
+        delta = mean - self._mean
+        self._m2 += m2 + delta * delta * self._count * count / total
+        self._mean += delta * count / total
+        self._count = total
+        if self._minimum is None or minimum < self._minimum:
+            self._minimum = float(minimum)
+        if self._maximum is None or maximum > self._maximum:
+            self._maximum = float(maximum)
+
+
+class Sfc5xxxFlowSummary(object):
+    """
+    Summary of consecutive measured flow values of a device, as published by
+    :py:class:`~sensirion_shdlc_sfc5xxx.flow_statistics.Sfc5xxxFlowStatistics`.
+
+    Objects of this class are immutable.
+    """
+
+    __slots__ = ('_name', '_start_time', '_end_time', '_count',
+                 '_lost_values', '_mean', '_std', '_minimum', '_maximum',
+                 '_settled')
+
+    def __init__(self, name, start_time, end_time, statistics, lost_values,
+                 settled):
+        """
+        Constructor.
+
+        :param str name:
+            The device name.
+        :param float start_time:
+            Timestamp of the first value [s].
+        :param float end_time:
+            Timestamp of the last value [s].
+        :param Sfc5xxxRunningStatistics statistics:
+            The statistics of the values.
+        :param int lost_values:
+            Number of values lost due to buffer overruns in the device.
+        :param bool settled:
+            Whether the flow was settled at the last value, or ``None`` if
+            settling detection is disabled.
+        """
+        super(Sfc5xxxFlowSummary, self).__init__()
+        self._name = name
+        self._start_time = start_time
+        self._end_time = end_time
+        self._count = statistics.count
+        self._lost_values = lost_values
+        self._mean = statistics.mean
+        self._std = statistics.std
+        self._minimum = statistics.minimum
+        self._maximum = statistics.maximum
+        self._settled = settled
+
+    @property
+    def name(self):
+        """
+        The device name.
+
+        :type: str
+        """
+        return self._name
+
+    @property
+    def start_time(self):
+        """
+        Timestamp of the first value [s].
+
+        :type: float
+        """
+        return self._start_time
+
+    @property
+    def end_time(self):
+        """
+        Timestamp of the last value [s].
+
+        :type: float
+        """
+        return self._end_time
+
+    @property
+    def count(self):
+        """
+        Number of summarized values.
+
+        :type: int
+        """
+        return self._count
+
+    @property
+    def lost_values(self):
+        """
+        Number of values lost due to buffer overruns in the device.
+
+        :type: int
+        """
+        return self._lost_values
+
+    @property
+    def mean(self):
+        """
+        Mean of the values.
+
+        :type: float
+        """
+        return self._mean
+
+    @property
+    def std(self):
+        """
+        Sample standard deviation of the values.
+
+        :type: float
+        """
+        return self._std
+
+    @property
+    def minimum(self):
+        """
+        Smallest value.
+
+        :type: float
+        """
+        return self._minimum
+
+    @property
+    def maximum(self):
+        """
+        Largest value.
+
+        :type: float
+        """
+        return self._maximum
+
+    @property
+    def settled(self):
+        """
+        Whether the flow was settled at the last value, or ``None`` if
+        settling detection is disabled.
+
+        :type: bool/None
+        """
+        return self._settled
+
+    def to_dict(self):
+        """
+        Convert the summary to a dictionary, e.g. to publish it as JSON.
+
+        :return: All properties by name.
+        :rtype: dict
+        """
+        return dict((slot[1:], getattr(self, slot))
+                    for slot in self.__slots__)
+
+    def __str__(self):
+        return "Sfc5xxxFlowSummary({}: {} values, mean={}, std={}, " \
+               "min={}, max={}, settled={})".format(
+                   self._name, self._count, self._mean, self._std,
+                   self._minimum, self._maximum, self._settled)
+
+
+class Sfc5xxxFlowStatistics(object):
+    """
+    Processing stage for measured flow value buffers of one device, which
+    keeps running statistics, publishes a summary every ``decimation``
+    values and detects settling.
+
+    The flow is considered as settled when all values of the last
+    ``settling_time`` seconds are within ``settling_tolerance``: either
+    around the target value (if set, e.g. the setpoint), or otherwise within
+    a band of twice the tolerance.
+
+    The values are usually passed by
+    :py:meth:`~sensirion_shdlc_sfc5xxx.flow_statistics.Sfc5xxxFlowStatistics.process`
+    from the thread reading the buffer, while the statistics may be read
+    from any other thread.
+    """  # noqa: E501
+
+    def __init__(self, name=None, decimation=100, settling_tolerance=None,
+                 settling_time=1.0, target=None, callback=None):
+        """
+        Constructor.
+
+        :param str name:
+            The device name written to the summaries.
+        :param int decimation:
+            Number of values aggregated into one summary.
+        :param float settling_tolerance:
+            Maximum deviation of settled values, in the unit of the values.
+            If ``None``, settling detection is disabled.
+        :param float settling_time:
+            Time [s] the values need to stay within the tolerance until the
+            flow is considered as settled.
+        :param float target:
+            The value the flow should settle at, or ``None`` to detect
+            settling at any value. See :py:meth:`set_target`.
+        :param callable callback:
+            Optional function called with every
+            :py:class:`~sensirion_shdlc_sfc5xxx.flow_statistics.Sfc5xxxFlowSummary`
+            as parameter (in the thread calling :py:meth:`process`).
+        """  # noqa: E501
+        super(Sfc5xxxFlowStatistics, self).__init__()
+        if decimation < 1:
+            raise ValueError("Decimation must be at least 1!")
+        self._name = name
+        self._decimation = int(decimation)
+        self._settling_tolerance = settling_tolerance
+        self._settling_time = settling_time
+        self._callback = callback
+        self._lock = Lock()
+        self._total = Sfc5xxxRunningStatistics()
+        self._window = Sfc5xxxRunningStatistics()
+        self._window_start_time = None
+        self._window_lost_values = 0
+        self._total_lost_values = 0
+        self._last_summary = None
+        self._target = target
+        self._settling_start_time = None  # Start of the values within band
+        self._band_minimum = None
+        self._band_maximum = None
+        self._settled = None if settling_tolerance is None else False
+
+    @property
+    def name(self):
+        """
+        The device name written to the summaries.
+
+        :type: str
+        """
+        return self._name
+
+    @property
+    def decimation(self):
+        """
+        Number of values aggregated into one summary.
+
+        :type: int
+        """
+        return self._decimation
+
+    @property
+    def target(self):
+        """
+        The value the flow should settle at, or ``None``.
+
+        :type: float/None
+        """
+        return self._target
+
+    @property
+    def is_settled(self):
+        """
+        Whether the flow is settled, or ``None`` if settling detection is
+        disabled.
+
+        :type: bool/None
+        """
+        return self._settled
+
+    @property
+    def lost_values(self):
+        """
+        Total number of values lost due to buffer overruns in the device.
+
+        :type: int
+        """
+        return self._total_lost_values
+
+    @property
+    def last_summary(self):
+        """
+        The most recently published summary, or ``None``.
+
+        :type: ~sensirion_shdlc_sfc5xxx.flow_statistics.Sfc5xxxFlowSummary
+        """
+        return self._last_summary
+
+    def get_statistics(self):
+        """
+        Get a copy of the running statistics of all values since the object
+        was created or reset.
+
+        :return: The running statistics.
+        :rtype: ~sensirion_shdlc_sfc5xxx.flow_statistics.Sfc5xxxRunningStatistics
+        """  # noqa: E501
+        statistics = Sfc5xxxRunningStatistics()
+        with self._lock:
+            statistics.merge(self._total)
+        return statistics
+
+    def set_target(self, target):
+        """
+        Set the value the flow should settle at, and restart settling
+        detection. Call this after changing the setpoint of the device.
+
+        :param float target:
+            The target value, or ``None`` to detect settling at any value.
+        """
+        with self._lock:
+            self._target = target
+            self._restart_settling()
+
+    def reset(self):
+        """
+        Reset all statistics, the current summary window and settling
+        detection.
+        """
+        with self._lock:
+            self._total.reset()
+            self._window.reset()
+            self._window_start_time = None
+            self._window_lost_values = 0
+            self._total_lost_values = 0
+            self._last_summary = None
+            self._restart_settling()
+
+    def process(self, response, first_timestamp):
+        """
+        Process a response of
+        :py:meth:`~sensirion_shdlc_sfc5xxx.device.Sfc5xxxShdlcDevice.read_measured_value_buffer`.
+        The signature matches the callback of
+        :py:class:`~sensirion_shdlc_sfc5xxx.buffer_reader.Sfc5xxxBufferReader`.
+
+        :param ~sensirion_shdlc_sfc5xxx.types.Sfc5xxxReadBufferResponse response:
+            The response to process.
+        :param float first_timestamp:
+            Timestamp of the first value [s]. Ignored if there are no
+            values.
+        """  # noqa: E501
+        self.add(first_timestamp, response.sampling_time, response.values,
+                 response.lost_values)
+
+    def add(self, first_timestamp, period, values, lost_values=0):
+        """
+        Add equidistant values.
+
+        :param float first_timestamp:
+            Timestamp of the first value [s].
+        :param float period:
+            Time between two values [s].
+        :param list(float) values:
+            The values to add.
+        :param int lost_values:
+            Number of values lost before the first value.
+        """
+        summaries = []
+        with self._lock:
+            self._total_lost_values += lost_values
+            self._window_lost_values += lost_values
+            if lost_values and self._settling_start_time is not None:
+                self._restart_settling()
+            values = list(values)
+            self._total.add_values(values)
+            begin = 0
+            while begin < len(values):
+                start_time = first_timestamp + begin * period
+                if self._window_start_time is None:
+                    self._window_start_time = start_time
+                stop = min(begin + self._decimation - self._window.count,
+                           len(values))
+                self._window.add_values(values[begin:stop])
+                if self._settling_tolerance is not None:
+                    self._detect_settling(start_time, period,
+                                          values[begin:stop])
+                if self._window.count >= self._decimation:
+                    summaries.append(self._summarize(
+                        first_timestamp + (stop - 1) * period))
+                begin = stop
+        for summary in summaries:
+            self._publish(summary)
+
+    def _restart_settling(self):
+        """
+        Restart settling detection.
+        """
+        self._settling_start_time = None
+        self._band_minimum = None
+        self._band_maximum = None
+        if self._settled is not None:
+            self._settled = False
+
+    def _detect_settling(self, first_timestamp, period, values):
+        """
+        Update the settling state with new values.
+
+        :param float first_timestamp: Timestamp of the first value [s].
+        :param float period: Time between two values [s].
+        :param list(float) values: The new values.
+        """
+        tolerance = self._settling_tolerance
+        for i, value in enumerate(values):
+            timestamp = first_timestamp + i * period
+            if self._target is not None:
+                if abs(value - self._target) > tolerance:
+                    self._settling_start_time = None
+                    continue
+            elif self._settling_start_time is not None:
+                minimum = min(self._band_minimum, value)
+                maximum = max(self._band_maximum, value)
+                if maximum - minimum > 2 * tolerance:
+                    # Start a new band at the current value
+                    self._settling_start_time = None
+                else:
+                    self._band_minimum = minimum
+                    self._band_maximum = maximum
+            if self._settling_start_time is None:
+                self._settling_start_time = timestamp
+                self._band_minimum = value
+                self._band_maximum = value
+        self._settled = self._settling_start_time is not None and \
+            first_timestamp + (len(values) - 1) * period - \
+            self._settling_start_time >= self._settling_time
+
+    def _summarize(self, end_time):
+        """
+        Create the summary of the current window and start the next one.
+
+        :param float end_time: Timestamp of the last value of the window.
+        :return: The summary.
+        :rtype: ~sensirion_shdlc_sfc5xxx.flow_statistics.Sfc5xxxFlowSummary
+        """
+        summary = Sfc5xxxFlowSummary(
+            self._name, self._window_start_time, end_time, self._window,
+            self._window_lost_values, self._settled)
+        self._window.reset()
+        self._window_start_time = None
+        self._window_lost_values = 0
+        self._last_summary = summary
+        return summary
+
+    def _publish(self, summary):
+        """
+        Call the callback (if any) with a summary.
+
+        :param ~sensirion_shdlc_sfc5xxx.flow_statistics.Sfc5xxxFlowSummary summary:
+            The summary to publish.
+        """  # noqa: E501
+        if self._callback is None:
+            return
+        try:
+            self._callback(summary)
+        except Exception as e:
+            log.error("Flow statistics callback failed: {}".format(e))
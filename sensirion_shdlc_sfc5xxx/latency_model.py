@@ -0,0 +1,251 @@
+# -*- coding: utf-8 -*-
+# (c) Copyright 2020 Sensirion AG, Switzerland
+
+from __future__ import absolute_import, division, print_function
+from sensirion_shdlc_driver import ShdlcConnection
+from sensirion_shdlc_driver.errors import ShdlcTimeoutError
+from collections import deque
+from threading import Lock
+from ._clock import monotonic_time
+import math
+import time
+
+import logging
+log = logging.getLogger(__name__)
+
+
+class Sfc5xxxLatencyModel(object):
+    """
+    Learns the response times of the commands of every device and derives
+    response timeouts from them.
+
+    The response times are kept per command class rather than per command
+    ID, since several subcommands with very different response times share
+    the same ID (e.g. "measure temperature" and "measure raw thermal
+    conductivity with closed valve" are both sent with ID 0x30).
+
+    The timeout of a command is the configured percentile of the observed
+    response times, multiplied by a safety factor. It is never larger than
+    the ``max_response_time`` specified by the command itself, and is only
+    used after enough response times have been observed. If a command times
+    out with a learned timeout, the observations of that command are
+    discarded, so it falls back to the specified timeout until it has been
+    learned again.
+
+    The model is typically used with an
+    :py:class:`~sensirion_shdlc_sfc5xxx.latency_model.Sfc5xxxAdaptiveConnection`.
+    """  # noqa: E501
+
+    def __init__(self, percentile=0.99, factor=1.5, minimum_timeout=0.002,
+                 window_size=256, minimum_samples=20):
+        """
+        Constructor.
+
+        :param float percentile:
+            The percentile [0..1] of the observed response times used for
+            the timeout.
+        :param float factor:
+            Safety factor the percentile is multiplied with.
+        :param float minimum_timeout:
+            Lower limit of the learned timeouts [s].
+        :param int window_size:
+            Number of response times kept per device and command.
+        :param int minimum_samples:
+            Number of response times needed before the learned timeout is
+            used.
+        """
+        super(Sfc5xxxLatencyModel, self).__init__()
+        if not 0.0 < percentile <= 1.0:
+            raise ValueError("Percentile must be in the range (0..1]!")
+        if minimum_samples > window_size:
+            raise ValueError("Minimum samples must not exceed the window "
+                             "size!")
+        self._percentile = float(percentile)
+        self._factor = float(factor)
+        self._minimum_timeout = float(minimum_timeout)
+        self._window_size = int(window_size)
+        self._minimum_samples = int(minimum_samples)
+        self._lock = Lock()
+        self._samples = dict()  # Response times by (slave address, cmd type)
+        self._timeouts = dict()  # Learned timeouts by (slave address, type)
+        self._pending = dict()  # Records since the last timeout update
+
+    def _calculate_timeout(self, samples):
+        """
+        Calculate the timeout from observed response times.
+
+        :param samples: The response times.
+        :return: The timeout [s].
+        :rtype: float
+        """
+        values = sorted(samples)
+        index = int(math.ceil(self._percentile * len(values))) - 1
+        return max(values[max(index, 0)] * self._factor,
+                   self._minimum_timeout)
+
+    def record(self, slave_address, command, response_time):
+        """
+        Record the response time of a successfully executed command.
+
+        :param byte slave_address:
+            The slave address of the device.
+        :param ~sensirion_shdlc_driver.command.ShdlcCommand command:
+            The executed command.
+        :param float response_time:
+            The observed response time [s].
+        """
+        key = (slave_address, type(command))
+        with self._lock:
+            samples = self._samples.get(key)
+            if samples is None:
+                samples = deque(maxlen=self._window_size)
+                self._samples[key] = samples
+            samples.append(response_time)
+            pending = self._pending.get(key, 0) + 1
+            # Sorting all samples is expensive, so the timeout is updated
+            # only every 16 records or if it was exceeded.
+            timeout = self._timeouts.get(key)
+            if len(samples) >= self._minimum_samples and (
+                    timeout is None or response_time > timeout or
+                    pending >= 16):
+                self._timeouts[key] = self._calculate_timeout(samples)
+                pending = 0
+            self._pending[key] = pending
+
+    def record_timeout(self, slave_address, command):
+        """
+        Record a timeout of a command. The observations of that command are
+        discarded.
+
+        :param byte slave_address:
+            The slave address of the device.
+        :param ~sensirion_shdlc_driver.command.ShdlcCommand command:
+            The command which timed out.
+        """
+        key = (slave_address, type(command))
+        with self._lock:
+            self._samples.pop(key, None)
+            self._timeouts.pop(key, None)
+            self._pending.pop(key, None)
+
+    def get_timeout(self, slave_address, command):
+        """
+        Get the response timeout for a command.
+
+        :param byte slave_address:
+            The slave address of the device.
+        :param ~sensirion_shdlc_driver.command.ShdlcCommand command:
+            The command.
+        :return:
+            The learned timeout, or the ``max_response_time`` of the command
+            if not learned yet [s].
+        :rtype:
+            float
+        """
+        timeout = self._timeouts.get((slave_address, type(command)))
+        if timeout is None or timeout > command.max_response_time:
+            return command.max_response_time
+        return timeout
+
+    def is_learned(self, slave_address, command):
+        """
+        Check whether the timeout of a command has been learned.
+
+        :param byte slave_address:
+            The slave address of the device.
+        :param ~sensirion_shdlc_driver.command.ShdlcCommand command:
+            The command.
+        :return:
+            Whether enough response times have been observed.
+        :rtype:
+            bool
+        """
+        return (slave_address, type(command)) in self._timeouts
+
+    def get_response_times(self, slave_address, command):
+        """
+        Get the observed response times of a command.
+
+        :param byte slave_address:
+            The slave address of the device.
+        :param ~sensirion_shdlc_driver.command.ShdlcCommand command:
+            The command.
+        :return:
+            The response times [s], oldest first.
+        :rtype:
+            list(float)
+        """
+        with self._lock:
+            return list(self._samples.get((slave_address, type(command)),
+                                          []))
+
+    def reset(self):
+        """
+        Discard all observations.
+        """
+        with self._lock:
+            self._samples.clear()
+            self._timeouts.clear()
+            self._pending.clear()
+
+
+class Sfc5xxxAdaptiveConnection(ShdlcConnection):
+    """
+    SHDLC connection which uses response timeouts learned by an
+    :py:class:`~sensirion_shdlc_sfc5xxx.latency_model.Sfc5xxxLatencyModel`
+    instead of the worst-case ``max_response_time`` of the commands, so a
+    lost frame is detected much earlier:
+
+    .. sourcecode:: python
+
+        port = ShdlcSerialPort('COM1', 115200, additional_response_time=0.0)
+        connection = Sfc5xxxAdaptiveConnection(port)
+        device = Sfc5xxxShdlcDevice(connection, 0)
+
+    .. note:: :py:class:`~sensirion_shdlc_driver.port.ShdlcSerialPort` adds
+              its ``additional_response_time`` (by default 100 ms) to every
+              timeout. Reduce it to benefit from the learned timeouts.
+    """  # noqa: E501
+
+    def __init__(self, port, latency_model=None):
+        """
+        Open an SHDLC connection on a specific port.
+
+        :param ~sensirion_shdlc_driver.port.ShdlcPort port:
+            The port used for communication.
+        :param ~sensirion_shdlc_sfc5xxx.latency_model.Sfc5xxxLatencyModel latency_model:
+            The latency model to use. If ``None``, a model with default
+            parameters is created.
+        """  # noqa: E501
+        super(Sfc5xxxAdaptiveConnection, self).__init__(port)
+        self._latency_model = latency_model or Sfc5xxxLatencyModel()
+
+    @property
+    def latency_model(self):
+        """
+        The used latency model.
+
+        :type: ~sensirion_shdlc_sfc5xxx.latency_model.Sfc5xxxLatencyModel
+        """
+        return self._latency_model
+
+    def execute(self, slave_address, command, wait_post_process=True):
+        # Same as ShdlcConnection.execute(), but with the learned timeout
+        timeout = self._latency_model.get_timeout(slave_address, command)
+        start = monotonic_time()
+        try:
+            data, error = self.transceive(slave_address, command.id,
+                                          command.data, timeout)
+        except ShdlcTimeoutError:
+            if timeout < command.max_response_time:
+                log.warning("Command 0x{:02X} timed out after learned "
+                            "timeout of {:.1f} ms.".format(
+                                command.id, timeout * 1000.0))
+                self._latency_model.record_timeout(slave_address, command)
+            raise
+        self._latency_model.record(slave_address, command,
+                                   monotonic_time() - start)
+        if wait_post_process and command.post_processing_time > 0.0:
+            time.sleep(command.post_processing_time)
+        command.check_response_length(data)
+        return command.interpret_response(data), error
@@ -0,0 +1,334 @@
+# -*- coding: utf-8 -*-
+# (c) Copyright 2020 Sensirion AG, Switzerland
+"""
+Opt-in instrumentation of the executed commands.
+
+Assign an :py:class:`~sensirion_shdlc_sfc5xxx.metrics.Sfc5xxxMetrics`
+object to one or more devices to record, for every command class, the
+number of calls, the bytes on the wire, a latency histogram, timeouts and
+device errors:
+
+.. sourcecode:: python
+
+    metrics = Sfc5xxxMetrics()
+    device.metrics = metrics
+    ...
+    for name, stats in metrics.snapshot()['commands'].items():
+        print(name, stats['count'], stats['latency']['p99'])
+
+Recording does not acquire any lock: every thread records into its own set
+of counters, which are only merged by
+:py:meth:`~sensirion_shdlc_sfc5xxx.metrics.Sfc5xxxMetrics.snapshot`. The
+counters of terminated threads are merged into a common set, so short-lived
+threads don't accumulate memory.
+"""
+
+from __future__ import absolute_import, division, print_function
+from sensirion_shdlc_driver.errors import ShdlcTimeoutError
+from threading import Lock, current_thread, local
+from ._clock import monotonic_time
+import math
+import time
+import weakref
+
+import logging
+log = logging.getLogger(__name__)
+
+
+# Size of SHDLC frames without payload (start, address, command, length,
+# checksum, stop; plus the state byte in responses), without byte-stuffing.
+_REQUEST_OVERHEAD = 6
+_RESPONSE_OVERHEAD = 7
+
+# The latency histogram has logarithmic buckets with 4 sub-buckets per
+# power of two (i.e. a relative resolution of about 19%), starting at 1 µs.
+_SUB_BUCKETS = 4
+_BUCKET_COUNT = 30 * _SUB_BUCKETS  # Up to about 1000 s
+
+
+def _get_bucket(latency):
+    """
+    Get the histogram bucket index of a latency.
+
+    :param float latency: The latency [s].
+    :return: The bucket index.
+    :rtype: int
+    """
+    mantissa, exponent = math.frexp(latency * 1e6)  # mantissa in [0.5, 1)
+    if exponent <= 0:
+        return 0
+    index = (exponent - 1) * _SUB_BUCKETS + \
+        int((mantissa - 0.5) * 2 * _SUB_BUCKETS)
+    return min(index, _BUCKET_COUNT - 1)
+
+
+def _get_bucket_upper_bound(index):
+    """
+    Get the upper bound of a histogram bucket.
+
+    :param int index: The bucket index.
+    :return: The upper bound [s].
+    :rtype: float
+    """
+    exponent, sub_bucket = divmod(index, _SUB_BUCKETS)
+    return 2.0 ** exponent * (1.0 + (sub_bucket + 1) / _SUB_BUCKETS) * 1e-6
+
+
+class _CommandCounters(object):
+    """
+    The counters of one command class, recorded by one thread.
+    """
+
+    __slots__ = ('count', 'request_bytes', 'response_bytes', 'timeouts',
+                 'errors', 'total_latency', 'max_latency', 'histogram')
+
+    def __init__(self):
+        self.count = 0
+        self.request_bytes = 0
+        self.response_bytes = 0
+        self.timeouts = 0
+        self.errors = dict()  # Count by exception class name
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+        self.histogram = [0] * _BUCKET_COUNT
+
+
+class _CommandProxy(object):
+    """
+    Proxy of a command which remembers the length of the raw response, as
+    the device only gets the interpreted response from the connection.
+    """
+
+    __slots__ = ('_command', 'id', 'data', 'max_response_time',
+                 'post_processing_time', 'response_length')
+
+    def __init__(self, command):
+        self._command = command
+        self.id = command.id
+        self.data = command.data
+        self.max_response_time = command.max_response_time
+        self.post_processing_time = command.post_processing_time
+        self.response_length = 0
+
+    def check_response_length(self, data):
+        self.response_length = len(data)
+        return self._command.check_response_length(data)
+
+    def interpret_response(self, data):
+        return self._command.interpret_response(data)
+
+
+class Sfc5xxxMetrics(object):
+    """
+    Collects metrics of the commands executed by devices.
+
+    A single object can be shared by many devices (e.g. all devices on a
+    bus), then the metrics of all these devices are accumulated.
+    """
+
+    def __init__(self):
+        """
+        Constructor.
+        """
+        super(Sfc5xxxMetrics, self).__init__()
+        self._local = local()
+        self._shards = []  # (Weak reference to thread, counters) per thread
+        self._retired = dict()  # Merged counters of terminated threads
+        self._generation = 0  # Incremented on reset
+        self._shards_lock = Lock()  # Only used when a thread records first
+        self._start_time = time.time()
+
+    def _get_counters(self, name):
+        """
+        Get the counters of a command class for the current thread.
+
+        :param str name: The name of the command class.
+        :return: The counters.
+        :rtype: _CommandCounters
+        """
+        shard = getattr(self._local, 'shard', None)
+        if shard is None or self._local.generation != self._generation:
+            shard = dict()
+            with self._shards_lock:
+                self._prune()
+                self._shards.append((weakref.ref(current_thread()), shard))
+                self._local.generation = self._generation
+            self._local.shard = shard
+        counters = shard.get(name)
+        if counters is None:
+            counters = _CommandCounters()
+            shard[name] = counters
+        return counters
+
+    def execute(self, device_execute, command):
+        """
+        Execute a command and record its metrics.
+
+        :param callable device_execute:
+            The function executing the command (i.e. the ``execute()``
+            method of the device base class).
+        :param ~sensirion_shdlc_driver.command.ShdlcCommand command:
+            The command to execute.
+        :return: The interpreted response of the command.
+        """
+        counters = self._get_counters(type(command).__name__)
+        proxy = _CommandProxy(command)
+        received = True
+        start = monotonic_time()
+        try:
+            return device_execute(proxy)
+        except ShdlcTimeoutError:
+            received = False
+            counters.timeouts += 1
+            raise
+        except Exception as e:
+            name = type(e).__name__
+            counters.errors[name] = counters.errors.get(name, 0) + 1
+            raise
+        finally:
+            latency = monotonic_time() - start
+            counters.count += 1
+            counters.request_bytes += _REQUEST_OVERHEAD + len(command.data)
+            if received:
+                counters.response_bytes += \
+                    _RESPONSE_OVERHEAD + proxy.response_length
+            counters.total_latency += latency
+            if latency > counters.max_latency:
+                counters.max_latency = latency
+            counters.histogram[_get_bucket(latency)] += 1
+
+    def reset(self):
+        """
+        Reset all metrics.
+        """
+        # The counters are replaced instead of cleared, since their threads
+        # might currently update them. Every thread creates new counters on
+        # its next record.
+        with self._shards_lock:
+            self._shards = []
+            self._retired = dict()
+            self._generation += 1
+            self._start_time = time.time()
+
+    def _prune(self):
+        """
+        Merge the counters of terminated threads into the retired counters.
+        Must be called with the shards lock acquired.
+        """
+        alive, dead = [], []
+        for thread_ref, shard in self._shards:
+            thread = thread_ref()
+            if thread is not None and thread.is_alive():
+                alive.append((thread_ref, shard))
+            else:
+                dead.append(shard)
+        if dead:
+            # Create new objects, as snapshot() merges without the lock
+            self._retired = self._merge([self._retired] + dead)
+            self._shards = alive
+
+    def snapshot(self):
+        """
+        Get a snapshot of the metrics of all command classes.
+
+        The returned dictionary contains the ``duration`` [s] since the
+        metrics were created or reset, and a dictionary ``commands`` which
+        contains for every executed command class (by class name) a
+        dictionary with the following items:
+
+          * ``count``: Number of executions (including failed ones).
+          * ``request_bytes`` and ``response_bytes``: Bytes on the wire
+            (without byte-stuffing).
+          * ``timeouts``: Number of timeouts.
+          * ``errors``: Number of other errors by exception class name (e.g.
+            ``Sfc5xxxInvalidCalibrationIndexError``).
+          * ``latency``: Dictionary with ``mean``, ``p50``, ``p90``,
+            ``p99`` and ``max`` latency [s]. The percentiles are upper
+            bounds of the histogram buckets.
+          * ``histogram``: List of (upper bound [s], count) tuples of all
+            non-empty histogram buckets.
+
+        :return: The duration and the metrics by command class name.
+        :rtype: dict
+        """
+        with self._shards_lock:
+            self._prune()
+            shards = [self._retired] + \
+                [dict(shard) for _, shard in self._shards]
+            duration = time.time() - self._start_time
+        merged = self._merge(shards)
+        return {
+            'duration': duration,
+            'commands': dict((name, self._to_dict(counters))
+                             for name, counters in merged.items()),
+        }
+
+    @staticmethod
+    def _merge(shards):
+        """
+        Merge the counters of several threads.
+
+        :param list shards: The counters by command class name of the
+                            threads.
+        :return: New counters by command class name.
+        :rtype: dict
+        """
+        merged = dict()
+        for shard in shards:
+            for name, counters in shard.items():
+                total = merged.get(name)
+                if total is None:
+                    total = _CommandCounters()
+                    merged[name] = total
+                total.count += counters.count
+                total.request_bytes += counters.request_bytes
+                total.response_bytes += counters.response_bytes
+                total.timeouts += counters.timeouts
+                for error, count in list(counters.errors.items()):
+                    total.errors[error] = total.errors.get(error, 0) + count
+                total.total_latency += counters.total_latency
+                total.max_latency = max(total.max_latency,
+                                        counters.max_latency)
+                for index, count in enumerate(counters.histogram):
+                    total.histogram[index] += count
+        return merged
+
+    @staticmethod
+    def _to_dict(counters):
+        """
+        Convert merged counters to the dictionary returned by
+        :py:meth:`snapshot`.
+
+        :param _CommandCounters counters: The counters.
+        :return: The metrics.
+        :rtype: dict
+        """
+        count = sum(counters.histogram)
+
+        def percentile(p):
+            threshold = p * count
+            cumulative = 0
+            for index, bucket_count in enumerate(counters.histogram):
+                cumulative += bucket_count
+                if cumulative >= threshold and bucket_count:
+                    return min(_get_bucket_upper_bound(index),
+                               counters.max_latency)
+            return 0.0
+
+        return {
+            'count': counters.count,
+            'request_bytes': counters.request_bytes,
+            'response_bytes': counters.response_bytes,
+            'timeouts': counters.timeouts,
+            'errors': counters.errors,
+            'latency': {
+                'mean': counters.total_latency / count if count else 0.0,
+                'p50': percentile(0.5),
+                'p90': percentile(0.9),
+                'p99': percentile(0.99),
+                'max': counters.max_latency,
+            },
+            'histogram': [(_get_bucket_upper_bound(index), bucket_count)
+                          for index, bucket_count
+                          in enumerate(counters.histogram) if bucket_count],
+        }
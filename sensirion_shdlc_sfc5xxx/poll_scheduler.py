@@ -0,0 +1,218 @@
+# -*- coding: utf-8 -*-
+# (c) Copyright 2020 Sensirion AG, Switzerland
+
+from __future__ import absolute_import, division, print_function
+from ._clock import monotonic_time
+
+import logging
+log = logging.getLogger(__name__)
+
+
+class Sfc5xxxPollScheduler(object):
+    """
+    Scheduler which predicts when the measured flow value buffer of an SFC5xxx
+    should be read the next time.
+
+    Every response of
+    :py:meth:`~sensirion_shdlc_sfc5xxx.device.Sfc5xxxShdlcDevice.read_measured_value_buffer`
+    contains the sampling time and the number of values remaining in the
+    buffer. From this information, the scheduler calculates the point in time
+    when the buffer will reach a certain fill level (by default 75% of its
+    size), rounded down to complete frames of 60 values. Polling at that
+    moment means every "read buffer" command returns a full frame, so no bus
+    time is wasted for nearly empty frames while there is still enough margin
+    to avoid buffer overruns.
+
+    Since the buffer size (85 to 256 values) cannot be read from the device,
+    it is estimated from the fill levels observed so far, starting with the
+    smallest buffer size of any SFC5xxx. When the buffer overran, the observed
+    fill level is the buffer size. Otherwise it is a lower bound of it.
+
+    Example:
+
+    .. sourcecode:: python
+
+        scheduler = Sfc5xxxPollScheduler()
+        while True:
+            time.sleep(scheduler.get_delay())
+            start = time.time()
+            response = device.read_measured_value_buffer(scaling)
+            scheduler.update(response, time.time() - start)
+    """  # noqa: E501
+
+    #: Smallest buffer size of any SFC5xxx.
+    MIN_BUFFER_SIZE = 85
+
+    #: Largest buffer size of any SFC5xxx.
+    MAX_BUFFER_SIZE = 256
+
+    #: Maximum number of values returned by a single "read buffer" command.
+    FRAME_SIZE = 60
+
+    def __init__(self, fill_ratio=0.75, min_interval=0.005, max_interval=1.0):
+        """
+        Constructor.
+
+        :param float fill_ratio:
+            The fill level of the device buffer at which it should be read,
+            relative to the (estimated) buffer size. Must be in the range
+            (0..1].
+        :param float min_interval:
+            Minimum time [s] between two polls.
+        :param float max_interval:
+            Maximum time [s] between two polls. Also used as long as the
+            sampling time is not known yet.
+        """
+        super(Sfc5xxxPollScheduler, self).__init__()
+        if not (0.0 < fill_ratio <= 1.0):
+            raise ValueError("Fill ratio must be in range (0..1]!")
+        self._fill_ratio = float(fill_ratio)
+        self._min_interval = float(min_interval)
+        self._max_interval = float(max_interval)
+        self._buffer_size = self.MIN_BUFFER_SIZE
+        self._sampling_time = None
+        self._duration = None
+        self._next_poll_time = 0.0
+
+    @property
+    def buffer_size(self):
+        """
+        Get the estimated size of the device buffer.
+
+        :return: Estimated buffer size [values].
+        :rtype: int
+        """
+        return self._buffer_size
+
+    @property
+    def min_interval(self):
+        """
+        Get the minimum time between two polls.
+
+        :return: Minimum interval [s].
+        :rtype: float
+        """
+        return self._min_interval
+
+    @property
+    def max_interval(self):
+        """
+        Get the maximum time between two polls.
+
+        :return: Maximum interval [s].
+        :rtype: float
+        """
+        return self._max_interval
+
+    @property
+    def sampling_time(self):
+        """
+        Get the last reported sampling time.
+
+        :return: The sampling time [s], or ``None`` if not known yet.
+        :rtype: float/None
+        """
+        return self._sampling_time
+
+    @property
+    def target_fill_level(self):
+        """
+        Get the number of values which should be in the device buffer when
+        polling it. This is the configured fill ratio of the estimated buffer
+        size, rounded down to complete frames if possible.
+
+        :return: Target fill level [values].
+        :rtype: int
+        """
+        target = int(self._fill_ratio * self._buffer_size)
+        if target >= self.FRAME_SIZE:
+            target -= target % self.FRAME_SIZE
+        return max(target, 1)
+
+    @property
+    def next_poll_time(self):
+        """
+        Get the point in time when the buffer should be read next time.
+
+        :return: Time [s] of the scheduling clock (see
+            :py:meth:`get_delay`).
+        :rtype: float
+        """
+        return self._next_poll_time
+
+    def get_delay(self, now=None):
+        """
+        Get the time to wait until the buffer should be read next time.
+
+        :param float now:
+            The current time [s] of the monotonic scheduling clock. If
+            ``None``, the current time is used.
+        :return: Time to wait [s], zero if the buffer should be read now.
+        :rtype: float
+        """
+        if now is None:
+            now = monotonic_time()
+        return max(self._next_poll_time - now, 0.0)
+
+    def update(self, response, duration=0.0, now=None):
+        """
+        Update the prediction with a received buffer response.
+
+        :param ~sensirion_shdlc_sfc5xxx.types.Sfc5xxxReadBufferResponse response:
+            The response received from the device (either from
+            :py:meth:`~sensirion_shdlc_sfc5xxx.device.Sfc5xxxShdlcDevice.read_measured_value_buffer`
+            or a single frame of
+            :py:meth:`~sensirion_shdlc_sfc5xxx.device.Sfc5xxxShdlcDevice.stream_measured_value_buffer`).
+        :param float duration:
+            How long [s] it took to read the buffer. Used to start the next
+            poll early enough to compensate the communication time.
+        :param float now:
+            The time [s] of the scheduling clock when the response was
+            received. If ``None``, the current time is used.
+        :return:
+            Time to wait [s] until the buffer should be read next time.
+        :rtype:
+            float
+        """  # noqa: E501
+        if now is None:
+            now = monotonic_time()
+        self._update_buffer_size(response, duration)
+        if self._duration is None:
+            self._duration = float(duration)
+        else:
+            self._duration = 0.8 * self._duration + 0.2 * float(duration)
+        if response.sampling_time > 0.0:
+            self._sampling_time = response.sampling_time
+        if self._sampling_time is None:
+            delay = self._max_interval
+        else:
+            missing = self.target_fill_level - response.remaining_values
+            delay = missing * self._sampling_time - self._duration
+            delay = min(max(delay, self._min_interval), self._max_interval)
+        self._next_poll_time = now + delay
+        return delay
+
+    def _update_buffer_size(self, response, duration):
+        """
+        Update the estimated buffer size from the observed fill level.
+
+        :param ~sensirion_shdlc_sfc5xxx.types.Sfc5xxxReadBufferResponse response:
+            The received response.
+        :param float duration:
+            How long [s] it took to read the buffer.
+        """  # noqa: E501
+        fill_level = len(response.values) + response.remaining_values
+        if response.sampling_time > 0.0:
+            # Values measured while reading the buffer were not yet in the
+            # buffer when the read started.
+            fill_level -= int(duration / response.sampling_time)
+        if response.lost_values > 0:
+            buffer_size = fill_level
+        else:
+            buffer_size = max(self._buffer_size, fill_level)
+        buffer_size = min(max(buffer_size, self.MIN_BUFFER_SIZE),
+                          self.MAX_BUFFER_SIZE)
+        if buffer_size != self._buffer_size:
+            log.debug("Estimated buffer size changed from {} to {}."
+                      .format(self._buffer_size, buffer_size))
+            self._buffer_size = buffer_size
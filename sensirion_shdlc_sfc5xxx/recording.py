@@ -0,0 +1,567 @@
+# -*- coding: utf-8 -*-
+# (c) Copyright 2020 Sensirion AG, Switzerland
+"""
+Recording and replay of the SHDLC communication.
+
+An :py:class:`~sensirion_shdlc_sfc5xxx.recording.Sfc5xxxRecordingPort` wraps
+the port of a connection and writes every transaction (request, response or
+error, and timing) to a binary file:
+
+.. sourcecode:: python
+
+    with ShdlcSerialPort(port='COM1', baudrate=115200) as serial_port:
+        port = Sfc5xxxRecordingPort(serial_port, 'session.shdlc')
+        device = Sfc5xxxShdlcDevice(ShdlcConnection(port), slave_address=0)
+        ...
+        port.close()
+
+A :py:class:`~sensirion_shdlc_sfc5xxx.recording.Sfc5xxxReplayPort` returns
+the recorded responses again, as fast as possible or with the recorded
+response times. The application has to send the same requests as during the
+recording:
+
+.. sourcecode:: python
+
+    port = Sfc5xxxReplayPort('session.shdlc')
+    device = Sfc5xxxShdlcDevice(ShdlcConnection(port), slave_address=0)
+    ...
+
+The file starts with a header (magic ``SFC5REC``, format version, recording
+start time as UNIX timestamp, and bitrate of the port), followed by one
+record per transaction. Each record consists of a fixed size header
+(``Sfc5xxxRecord.HEADER``, big endian) followed by the request payload and
+the response payload (resp. the error message). Use
+:py:func:`~sensirion_shdlc_sfc5xxx.recording.read_records` to analyze a
+recording.
+"""
+
+from __future__ import absolute_import, division, print_function
+from sensirion_shdlc_driver.errors import ShdlcTimeoutError, \
+    ShdlcResponseError
+from sensirion_shdlc_driver.port import ShdlcPort
+from struct import Struct
+from threading import RLock
+from ._clock import monotonic_time
+import time
+
+import logging
+log = logging.getLogger(__name__)
+
+_MAGIC = b'SFC5REC'
+_VERSION = 1
+_FILE_HEADER = Struct('>7sBdI')
+
+
+class Sfc5xxxReplayedResponseError(ShdlcResponseError):
+    """
+    Invalid response error raised by
+    :py:class:`~sensirion_shdlc_sfc5xxx.recording.Sfc5xxxReplayPort` for a
+    recorded :py:class:`~sensirion_shdlc_driver.errors.ShdlcResponseError`.
+    The message is exactly the recorded message, the received raw data is not
+    available.
+    """
+
+    def __init__(self, message):
+        """
+        Constructor.
+
+        :param str message: The recorded error message.
+        """
+        super(Sfc5xxxReplayedResponseError, self).__init__(message)
+        self.args = (message,)  # Without the prefix added by the base class
+
+
+class Sfc5xxxRecord(object):
+    """
+    A recorded transaction.
+
+    Attributes:
+
+      * ``kind``: :py:attr:`RESPONSE`, :py:attr:`TIMEOUT` or
+        :py:attr:`ERROR` (invalid response received).
+      * ``timestamp``: Time when the request was sent, relative to the start
+        of the recording [s].
+      * ``duration``: Time until the response was received resp. the error
+        was raised [s].
+      * ``slave_address``, ``command_id``, ``data`` and
+        ``response_timeout``: The request.
+      * ``response_address``, ``response_command_id``, ``response_state``
+        and ``response_data``: The response (only for :py:attr:`RESPONSE`).
+      * ``error_message``: The message of the raised error, unmodified
+        (only for :py:attr:`ERROR`).
+    """
+
+    RESPONSE = 0  #: A response was received.
+    TIMEOUT = 1  #: No response was received.
+    ERROR = 2  #: An invalid response was received.
+
+    #: Header of every record, followed by the request and response payload.
+    HEADER = Struct('>BdfBBfBBBBB')
+
+    __slots__ = ('kind', 'timestamp', 'duration', 'slave_address',
+                 'command_id', 'data', 'response_timeout', 'response_address',
+                 'response_command_id', 'response_state', 'response_data',
+                 'error_message')
+
+    def __init__(self, kind, timestamp, duration, slave_address, command_id,
+                 data, response_timeout, response_address=0,
+                 response_command_id=0, response_state=0, response_data=b"",
+                 error_message=None):
+        self.kind = kind
+        self.timestamp = timestamp
+        self.duration = duration
+        self.slave_address = slave_address
+        self.command_id = command_id
+        self.data = data
+        self.response_timeout = response_timeout
+        self.response_address = response_address
+        self.response_command_id = response_command_id
+        self.response_state = response_state
+        self.response_data = response_data
+        self.error_message = error_message
+
+    def to_bytes(self):
+        """
+        Encode the record.
+
+        :return: The encoded record.
+        :rtype: bytes
+        """
+        if self.kind == self.ERROR:
+            payload = self.error_message.encode('utf-8')[:255]
+        else:
+            payload = bytes(self.response_data)
+        return self.HEADER.pack(
+            self.kind, self.timestamp, self.duration, self.slave_address,
+            self.command_id, self.response_timeout, self.response_address,
+            self.response_command_id, self.response_state, len(self.data),
+            len(payload)) + bytes(self.data) + payload
+
+    @staticmethod
+    def read_from(f):
+        """
+        Read the next record from a file.
+
+        :param f: The file object, opened in binary mode.
+        :return: The record, or ``None`` at the end of the file.
+        :rtype: ~sensirion_shdlc_sfc5xxx.recording.Sfc5xxxRecord/None
+        :raises IOError: If the file ends within a record.
+        """
+        header = f.read(Sfc5xxxRecord.HEADER.size)
+        if not header:
+            return None
+        if len(header) != Sfc5xxxRecord.HEADER.size:
+            raise IOError("Truncated record in recording.")
+        kind, timestamp, duration, slave_address, command_id, \
+            response_timeout, response_address, response_command_id, \
+            response_state, data_length, payload_length = \
+            Sfc5xxxRecord.HEADER.unpack(header)
+        data = f.read(data_length)
+        payload = f.read(payload_length)
+        if len(data) != data_length or len(payload) != payload_length:
+            raise IOError("Truncated record in recording.")
+        record = Sfc5xxxRecord(kind, timestamp, duration, slave_address,
+                               command_id, data, response_timeout,
+                               response_address, response_command_id,
+                               response_state)
+        if kind == Sfc5xxxRecord.ERROR:
+            record.error_message = payload.decode('utf-8', 'replace')
+        else:
+            record.response_data = payload
+        return record
+
+
+def _read_file_header(f):
+    """
+    Read and check the header of a recording.
+
+    :param f: The file object, opened in binary mode.
+    :return: The start time (UNIX timestamp) and the bitrate.
+    :rtype: float, int
+    :raises IOError: If the file is not a recording of a supported version.
+    """
+    header = f.read(_FILE_HEADER.size)
+    if len(header) != _FILE_HEADER.size:
+        raise IOError("Not an SHDLC recording.")
+    magic, version, start_time, bitrate = _FILE_HEADER.unpack(header)
+    if magic != _MAGIC:
+        raise IOError("Not an SHDLC recording.")
+    if version != _VERSION:
+        raise IOError("Unsupported recording version: {}".format(version))
+    return start_time, bitrate
+
+
+def read_records(file_path):
+    """
+    Read all records of a recording.
+
+    :param str file_path: The path to the recording.
+    :return: Generator yielding all records in the recorded order.
+    :rtype: generator(~sensirion_shdlc_sfc5xxx.recording.Sfc5xxxRecord)
+    """
+    with open(file_path, 'rb') as f:
+        _read_file_header(f)
+        while True:
+            record = Sfc5xxxRecord.read_from(f)
+            if record is None:
+                return
+            yield record
+
+
+class Sfc5xxxRecordingPort(ShdlcPort):
+    """
+    SHDLC port which forwards all transactions to another port and records
+    them to a file.
+
+    .. note:: This class can be used in a "with"-statement.
+    """
+
+    def __init__(self, port, file_path):
+        """
+        Constructor.
+
+        :param ~sensirion_shdlc_driver.port.ShdlcPort port:
+            The port used for communication.
+        :param str file_path:
+            The path to the recording. An existing file is overwritten.
+        """
+        super(Sfc5xxxRecordingPort, self).__init__()
+        self._port = port
+        self._file = open(file_path, 'wb')
+        self._file.write(_FILE_HEADER.pack(_MAGIC, _VERSION, time.time(),
+                                           port.bitrate))
+        self._start_time = monotonic_time()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    @property
+    def port(self):
+        """
+        The port used for communication.
+
+        :type: ~sensirion_shdlc_driver.port.ShdlcPort
+        """
+        return self._port
+
+    @property
+    def description(self):
+        """
+        Get a description of the port.
+
+        :return: Description string.
+        :rtype: string
+        """
+        return "Recording of " + self._port.description
+
+    @property
+    def bitrate(self):
+        """
+        The current bitrate in bit/s.
+
+        :type: int
+        """
+        return self._port.bitrate
+
+    @bitrate.setter
+    def bitrate(self, bitrate):
+        self._port.bitrate = bitrate
+
+    @property
+    def lock(self):
+        """
+        Get the lock object of the port to allow locking it, i.e. to get
+        exclusive access across multiple method calls.
+
+        :return: The lock object.
+        :rtype: threading.RLock
+        """
+        return self._port.lock
+
+    @property
+    def is_open(self):
+        """
+        Indicates whether the port is open.
+
+        :return: If ``True`` the port is open, if ``False`` the port is closed.
+        :rtype: bool
+        """
+        return self._port.is_open
+
+    def open(self):
+        """
+        Open the port.
+        """
+        self._port.open()
+
+    def close(self):
+        """
+        Close the port and the recording.
+        """
+        with self._port.lock:
+            if not self._file.closed:
+                self._file.close()
+        self._port.close()
+
+    def flush(self):
+        """
+        Write all buffered records to the file.
+        """
+        with self._port.lock:
+            self._file.flush()
+
+    def transceive(self, slave_address, command_id, data, response_timeout):
+        """
+        Send SHDLC frame to port and return received response frame. The
+        transaction is recorded.
+
+        :param byte slave_address: Slave address.
+        :param byte command_id: SHDLC command ID.
+        :param bytes-like data: Payload.
+        :param float response_timeout: Response timeout in seconds (maximum
+                                       time until the first byte is received).
+        :return: Received address, command_id, state, and payload.
+        :rtype: byte, byte, byte, bytes
+        :raise ~sensirion_shdlc_driver.errors.ShdlcTimeoutError:
+            If no response received within timeout.
+        :raise ~sensirion_shdlc_driver.errors.ShdlcResponseError:
+            If the received response is invalid.
+        """
+        # Locked during the whole transaction to record in the sent order
+        with self._port.lock:
+            start = monotonic_time()
+            record = Sfc5xxxRecord(Sfc5xxxRecord.RESPONSE,
+                                   start - self._start_time, 0.0,
+                                   slave_address, command_id, bytes(data),
+                                   response_timeout)
+            try:
+                response = self._port.transceive(
+                    slave_address, command_id, data, response_timeout)
+                record.response_address, record.response_command_id, \
+                    record.response_state, record.response_data = response
+                return response
+            except ShdlcTimeoutError:
+                record.kind = Sfc5xxxRecord.TIMEOUT
+                raise
+            except ShdlcResponseError as e:
+                record.kind = Sfc5xxxRecord.ERROR
+                record.error_message = str(e)
+                raise
+            except Exception:
+                record = None  # E.g. port closed, nothing was transferred
+                raise
+            finally:
+                if record is not None and not self._file.closed:
+                    record.duration = monotonic_time() - start
+                    self._file.write(record.to_bytes())
+
+
+class Sfc5xxxReplayPort(ShdlcPort):
+    """
+    SHDLC port which replays a recording of an
+    :py:class:`~sensirion_shdlc_sfc5xxx.recording.Sfc5xxxRecordingPort`.
+
+    Every request returns the next recorded response (or raises the recorded
+    error). The records are read from the file on demand, so also very
+    long recordings can be replayed.
+
+    .. note:: This class can be used in a "with"-statement.
+    """
+
+    def __init__(self, file_path, realtime=False, check_requests=True):
+        """
+        Constructor.
+
+        :param str file_path:
+            The path to the recording.
+        :param bool realtime:
+            If ``True``, the recorded timing is reproduced, i.e. every
+            response is returned at the same time (relative to the first
+            replayed request) as it was received during the recording, so
+            also the gaps between the requests are replayed. Otherwise the
+            responses are returned immediately.
+        :param bool check_requests:
+            If ``True``, every request is compared with the recorded request
+            and a ``ValueError`` is raised if they differ.
+        :raises IOError:
+            If the file is not a recording of a supported version.
+        """
+        super(Sfc5xxxReplayPort, self).__init__()
+        self._file_path = file_path
+        self._realtime = realtime
+        self._check_requests = check_requests
+        self._lock = RLock()
+        self._file = open(file_path, 'rb')
+        try:
+            self._start_time, self._bitrate = _read_file_header(self._file)
+        except Exception:
+            self._file.close()
+            raise
+        self._first_record_position = self._file.tell()
+        self._replayed = 0
+        self._time_offset = None  # Timer value of the recording start
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    @property
+    def description(self):
+        """
+        Get a description of the port.
+
+        :return: Description string.
+        :rtype: string
+        """
+        return "Sfc5xxxReplayPort@{}".format(self._file_path)
+
+    @property
+    def start_time(self):
+        """
+        The time when the recording was started.
+
+        :type: float (UNIX timestamp)
+        """
+        return self._start_time
+
+    @property
+    def replayed(self):
+        """
+        The number of replayed records since opening resp. rewinding.
+
+        :type: int
+        """
+        return self._replayed
+
+    @property
+    def bitrate(self):
+        """
+        The current bitrate in bit/s. Initially the bitrate of the recorded
+        port.
+
+        :type: int
+        """
+        with self._lock:
+            return self._bitrate
+
+    @bitrate.setter
+    def bitrate(self, bitrate):
+        with self._lock:
+            self._bitrate = bitrate
+
+    @property
+    def lock(self):
+        """
+        Get the lock object of the port to allow locking it, i.e. to get
+        exclusive access across multiple method calls.
+
+        :return: The lock object.
+        :rtype: threading.RLock
+        """
+        return self._lock
+
+    @property
+    def is_open(self):
+        """
+        Indicates whether the port is open.
+
+        :return: If ``True`` the port is open, if ``False`` the port is closed.
+        :rtype: bool
+        """
+        return not self._file.closed
+
+    def open(self):
+        """
+        Open the port. Does nothing if the port is already opened, otherwise
+        the replay starts again from the beginning.
+        """
+        with self._lock:
+            if self._file.closed:
+                self._file = open(self._file_path, 'rb')
+                self.rewind()
+
+    def close(self):
+        """
+        Close the port.
+        """
+        with self._lock:
+            self._file.close()
+
+    def rewind(self):
+        """
+        Start the replay again from the first record, e.g. to repeat a
+        benchmark.
+        """
+        with self._lock:
+            self._file.seek(self._first_record_position)
+            self._replayed = 0
+            self._time_offset = None
+
+    def transceive(self, slave_address, command_id, data, response_timeout):
+        """
+        Return the next recorded response.
+
+        :param byte slave_address: Slave address.
+        :param byte command_id: SHDLC command ID.
+        :param bytes-like data: Payload.
+        :param float response_timeout: Response timeout in seconds (ignored,
+                                       the recorded outcome is replayed).
+        :return: Received address, command_id, state, and payload.
+        :rtype: byte, byte, byte, bytes
+        :raise ~sensirion_shdlc_driver.errors.ShdlcTimeoutError:
+            If a timeout was recorded.
+        :raise ~sensirion_shdlc_sfc5xxx.recording.Sfc5xxxReplayedResponseError:
+            If an invalid response was recorded.
+        :raise ValueError:
+            If the request differs from the recorded request. The record is
+            not consumed, so the replay can be continued with the correct
+            request.
+        :raise EOFError:
+            If all records have been replayed.
+        """
+        with self._lock:
+            if self._file.closed:
+                raise IOError("Port is closed.")
+            position = self._file.tell()
+            record = Sfc5xxxRecord.read_from(self._file)
+            if record is None:
+                raise EOFError("End of recording reached after {} records."
+                               .format(self._replayed))
+            if self._check_requests and (
+                    record.slave_address != slave_address or
+                    record.command_id != command_id or
+                    record.data != bytes(data)):
+                self._file.seek(position)
+                raise ValueError(
+                    "Request 0x{:02X} to slave {} does not match record {} "
+                    "(0x{:02X} to slave {}).".format(
+                        command_id, slave_address, self._replayed,
+                        record.command_id, record.slave_address))
+            self._replayed += 1
+            if self._realtime:
+                if self._time_offset is None:
+                    self._time_offset = monotonic_time() - record.timestamp
+                self._wait_until(record.timestamp + record.duration)
+            if record.kind == Sfc5xxxRecord.TIMEOUT:
+                raise ShdlcTimeoutError()
+            if record.kind == Sfc5xxxRecord.ERROR:
+                raise Sfc5xxxReplayedResponseError(record.error_message)
+            return record.response_address, record.response_command_id, \
+                record.response_state, record.response_data
+
+    def _wait_until(self, timestamp):
+        """
+        Block until the given time of the recording is reached, relative to
+        the first replayed request. Returns immediately if the replay is
+        behind the recording.
+
+        :param float timestamp: Time [s] relative to the recording start.
+        """
+        delay = self._time_offset + timestamp - monotonic_time()
+        if delay > 0.0:
+            time.sleep(delay)
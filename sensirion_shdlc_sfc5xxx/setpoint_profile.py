@@ -0,0 +1,496 @@
+# -*- coding: utf-8 -*-
+# (c) Copyright 2020 Sensirion AG, Switzerland
+"""
+Setpoint profiles (steps, ramps and waveforms) executed on one or more
+devices.
+
+A :py:class:`~sensirion_shdlc_sfc5xxx.setpoint_profile.Sfc5xxxSetpointProfile`
+describes the setpoint over time, built from consecutive segments. A
+:py:class:`~sensirion_shdlc_sfc5xxx.setpoint_profile.Sfc5xxxProfileExecutor`
+applies the profiles of all devices on the same connection in fixed
+periods, scheduled on a monotonic clock. Every period, the setpoints of all
+devices are sent as one batch with the "set setpoint and read measured
+value" command, so every step also returns the measured flow:
+
+.. sourcecode:: python
+
+    profile = Sfc5xxxSetpointProfile(start=0.0) \\
+        .step(10.0, duration=1.0) \\
+        .linear_ramp(50.0, duration=5.0) \\
+        .exponential_ramp(0.0, duration=2.0, time_constant=0.5)
+    executor = Sfc5xxxProfileExecutor(Sfc5xxxScaling.USER_DEFINED,
+                                      period=0.05)
+    executor.add(device1, profile)
+    executor.add(device2, profile.scaled(0.5))
+    results = executor.run()  # Blocks until the profiles are finished
+    for elapsed, setpoint, flow in results['1']:
+        print(elapsed, setpoint, flow)
+
+The execution time of the commands is measured continuously. The batches
+are sent early by the expected time until the requests arrive at the
+devices, and the setpoint of every device is evaluated at the time its own
+request is expected to arrive. Thus the profiles of all devices stay
+synchronized, even though the commands are sent one after the other.
+"""
+
+from __future__ import absolute_import, division, print_function
+from bisect import bisect_right
+from threading import Event, Thread
+from .batch_executor import Sfc5xxxBatchExecutor
+from .commands import Sfc5xxxCmdSetSetpointAndReadMeasuredValue
+from ._clock import monotonic_time
+import math
+
+import logging
+log = logging.getLogger(__name__)
+
+
+# How often the end value of a profile is sent until the executor gives up
+_END_VALUE_ATTEMPTS = 3
+
+
+class Sfc5xxxSetpointProfile(object):
+    """
+    The setpoint of a device over time, built from consecutive segments.
+
+    Every segment starts at the end value of the previous segment (resp.
+    the start value of the profile). The methods adding segments return the
+    profile itself, so the calls can be chained. Before the start and after
+    the end of the profile, its start resp. end value applies.
+    """
+
+    def __init__(self, start=0.0):
+        """
+        Constructor.
+
+        :param float start:
+            The setpoint at the start of the profile, i.e. the start value of
+            the first segment.
+        """
+        super(Sfc5xxxSetpointProfile, self).__init__()
+        self._start = float(start)
+        self._start_times = []  # Start time of every segment
+        self._segments = []  # (duration, function of the time in segment)
+        self._duration = 0.0
+        self._end = self._start
+
+    @property
+    def duration(self):
+        """
+        The total duration of all segments [s].
+
+        :type: float
+        """
+        return self._duration
+
+    @property
+    def start_value(self):
+        """
+        The setpoint at the start of the profile.
+
+        :type: float
+        """
+        return self._start
+
+    @property
+    def end_value(self):
+        """
+        The setpoint at the end of the profile.
+
+        :type: float
+        """
+        return self._end
+
+    def step(self, setpoint, duration):
+        """
+        Add a segment holding a constant setpoint.
+
+        :param float setpoint: The setpoint.
+        :param float duration: Duration of the segment [s].
+        :return: The profile itself.
+        :rtype: Sfc5xxxSetpointProfile
+        """
+        setpoint = float(setpoint)
+        return self._add(duration, lambda t: setpoint)
+
+    def linear_ramp(self, setpoint, duration):
+        """
+        Add a segment changing the setpoint linearly to a new value.
+
+        :param float setpoint: The setpoint at the end of the segment.
+        :param float duration: Duration of the segment [s].
+        :return: The profile itself.
+        :rtype: Sfc5xxxSetpointProfile
+        """
+        start, end = self._end, float(setpoint)
+        if duration <= 0.0:
+            return self._add(duration, lambda t: end)
+        return self._add(
+            duration, lambda t: start + (end - start) * t / duration)
+
+    def exponential_ramp(self, setpoint, duration, time_constant=None):
+        """
+        Add a segment approaching a new setpoint exponentially (like a
+        first-order lag), reaching it exactly at the end of the segment.
+
+        :param float setpoint:
+            The setpoint at the end of the segment.
+        :param float duration:
+            Duration of the segment [s].
+        :param float time_constant:
+            Time constant of the approach [s]. If ``None``, a fifth of the
+            duration is used.
+        :return: The profile itself.
+        :rtype: Sfc5xxxSetpointProfile
+        """
+        start, end = self._end, float(setpoint)
+        if duration <= 0.0:
+            return self._add(duration, lambda t: end)
+        tau = duration / 5.0 if time_constant is None else time_constant
+        if tau <= 0.0:
+            raise ValueError("Time constant must be positive!")
+        scale = (end - start) / (1.0 - math.exp(-duration / tau))
+        return self._add(
+            duration, lambda t: start + scale * (1.0 - math.exp(-t / tau)))
+
+    def waveform(self, function, duration):
+        """
+        Add a segment with an arbitrary waveform.
+
+        :param callable function:
+            Function returning the setpoint for a time [s] relative to the
+            start of the segment (from 0.0 to ``duration``).
+        :param float duration:
+            Duration of the segment [s].
+        :return: The profile itself.
+        :rtype: Sfc5xxxSetpointProfile
+        """
+        return self._add(duration, function)
+
+    def scaled(self, factor, offset=0.0):
+        """
+        Get a copy of the profile with all setpoints multiplied by a factor
+        and shifted by an offset, e.g. for devices with another fullscale.
+
+        :param float factor: The factor.
+        :param float offset: The offset added after the multiplication.
+        :return: The new profile.
+        :rtype: Sfc5xxxSetpointProfile
+        """
+        profile = Sfc5xxxSetpointProfile(self._start * factor + offset)
+        for duration, function in self._segments:
+            profile._add(duration, lambda t, f=function:
+                         f(t) * factor + offset)
+        return profile
+
+    def get_setpoint(self, elapsed):
+        """
+        Get the setpoint at a time.
+
+        :param float elapsed:
+            The time [s] relative to the start of the profile.
+        :return: The setpoint.
+        :rtype: float
+        """
+        if not self._segments or elapsed < 0.0:
+            return self._start
+        if elapsed >= self._duration:
+            return self._end
+        index = bisect_right(self._start_times, elapsed) - 1
+        duration, function = self._segments[index]
+        return float(function(min(elapsed - self._start_times[index],
+                                  duration)))
+
+    def _add(self, duration, function):
+        """
+        Add a segment.
+
+        :param float duration: Duration of the segment [s].
+        :param callable function: Setpoint by time in the segment.
+        :return: The profile itself.
+        :rtype: Sfc5xxxSetpointProfile
+        """
+        if duration < 0.0:
+            raise ValueError("Duration must not be negative!")
+        self._start_times.append(self._duration)
+        self._segments.append((float(duration), function))
+        self._duration += duration
+        self._end = float(function(duration))
+        return self
+
+
+class Sfc5xxxProfileExecutor(object):
+    """
+    Executes setpoint profiles on devices which share the same connection,
+    synchronized to each other.
+
+    Every ``period``, one "set setpoint and read measured value" command is
+    sent to every device with a running profile, as one
+    :py:class:`~sensirion_shdlc_sfc5xxx.batch_executor.Sfc5xxxBatchExecutor`
+    batch. If the execution falls behind (e.g. because the period is shorter
+    than the time the batch takes on the bus), the overdue steps are
+    skipped, so the profiles never lag behind the clock. The end value of
+    every profile is always sent, though. If sending it fails, it is sent
+    again in the next steps (up to three times in total).
+
+    .. note:: This class can be used in a "with"-statement, which starts the
+              execution in a background thread on entering and stops it on
+              leaving the statement.
+    """
+
+    def __init__(self, scaling, period=0.1, callback=None):
+        """
+        Constructor.
+
+        :param ~sensirion_shdlc_sfc5xxx.definitions.Sfc5xxxScaling scaling:
+            Defines with which scale resp. unit the setpoints of the profiles
+            are passed and the measured flows are returned.
+        :param float period:
+            Time between two setpoint updates [s].
+        :param callable callback:
+            Optional function called after every step with the device name,
+            the time [s] relative to the start, the setpoint and the measured
+            flow (``None`` if the command failed) as parameters.
+        """
+        super(Sfc5xxxProfileExecutor, self).__init__()
+        if period <= 0.0:
+            raise ValueError("Period must be positive!")
+        self._scaling = scaling
+        self._period = float(period)
+        self._callback = callback
+        self._profiles = []  # List of (name, device, profile) tuples
+        self._connection = None
+        self._results = dict()
+        self._finished = set()  # Names of the finished profiles
+        self._end_value_errors = dict()  # Failed end values by name
+        self._latency = None  # Estimated execution time of one command
+        self._skipped_steps = 0
+        self._errors = 0
+        self._stop_event = Event()
+        self._thread = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    @property
+    def period(self):
+        """
+        Time between two setpoint updates [s].
+
+        :type: float
+        """
+        return self._period
+
+    @property
+    def duration(self):
+        """
+        Duration of the longest profile [s].
+
+        :type: float
+        """
+        return max([profile.duration for _, _, profile in self._profiles] or
+                   [0.0])
+
+    @property
+    def latency(self):
+        """
+        The estimated execution time of one command [s], or ``None`` if no
+        command was executed yet.
+
+        :type: float/None
+        """
+        return self._latency
+
+    @property
+    def skipped_steps(self):
+        """
+        Number of steps skipped because the execution fell behind.
+
+        :type: int
+        """
+        return self._skipped_steps
+
+    @property
+    def errors(self):
+        """
+        Number of failed commands.
+
+        :type: int
+        """
+        return self._errors
+
+    @property
+    def results(self):
+        """
+        The executed steps by device name, as lists of (time [s] relative to
+        the start, setpoint, measured flow) tuples. The measured flow is
+        ``None`` if the command failed.
+
+        :type: dict
+        """
+        return self._results
+
+    @property
+    def is_running(self):
+        """
+        Whether the execution thread is running.
+
+        :type: bool
+        """
+        return self._thread is not None and self._thread.is_alive()
+
+    def add(self, device, profile, name=None):
+        """
+        Add a device and its profile.
+
+        :param ~sensirion_shdlc_sfc5xxx.device.Sfc5xxxShdlcDevice device:
+            The device. All devices must use the same connection.
+        :param ~sensirion_shdlc_sfc5xxx.setpoint_profile.Sfc5xxxSetpointProfile profile:
+            The profile to execute on the device.
+        :param str name:
+            The device name used in the results. If ``None``, the slave
+            address is used.
+        """  # noqa: E501
+        if self._connection is None:
+            self._connection = device.connection
+        elif device.connection is not self._connection:
+            raise ValueError("The device uses another connection!")
+        name = str(device.slave_address) if name is None else name
+        if name in [n for n, _, _ in self._profiles]:
+            raise ValueError("Device '{}' already added!".format(name))
+        self._profiles.append((name, device, profile))
+
+    def run(self):
+        """
+        Execute the profiles and block until they are finished (or
+        :py:meth:`stop` is called from another thread).
+
+        :return: The executed steps, see :py:attr:`results`.
+        :rtype: dict
+        """
+        self._stop_event.clear()
+        self._results = dict((name, []) for name, _, _ in self._profiles)
+        self._finished = set()
+        self._end_value_errors = dict()
+        self._skipped_steps = 0
+        self._errors = 0
+        duration = self.duration
+        steps = int(math.ceil(duration / self._period - 1e-9))
+        start_time = monotonic_time()
+        step = 0
+        while not self._stop_event.is_set():
+            count = len(self._profiles) - len(self._finished)
+            if count == 0:
+                break
+            step_time = min(step * self._period, duration)
+            # Send the batch early, so the middle of the batch (resp. the
+            # arrival of the single request) is at the step time.
+            lead = (self._latency or 0.0) * count / 2.0
+            remaining = start_time + step_time - lead - monotonic_time()
+            if remaining > 0.0:
+                self._stop_event.wait(remaining)
+                continue  # Check again, the wait might return early
+            self._execute_step(step_time, monotonic_time() - start_time)
+            # Skip the steps which are already overdue, but never the last
+            # one, which sends the end values of all remaining profiles.
+            next_step = max(step + 1, int(
+                (monotonic_time() - start_time) / self._period + 0.5))
+            if step < steps:
+                next_step = min(next_step, steps)
+            self._skipped_steps += next_step - step - 1
+            step = next_step
+        return self._results
+
+    def start(self):
+        """
+        Start executing the profiles in a background thread.
+        """
+        if self.is_running:
+            raise RuntimeError("The executor is already running!")
+        self._stop_event.clear()
+        self._thread = Thread(target=self.run, name="Sfc5xxxProfileExecutor")
+        self._thread.daemon = True
+        self._thread.start()
+
+    def wait(self, timeout=None):
+        """
+        Wait until the profiles are finished.
+
+        :param float timeout:
+            Maximum time [s] to wait, or ``None`` to wait forever.
+        :return: Whether the profiles are finished.
+        :rtype: bool
+        """
+        if self._thread is not None:
+            self._thread.join(timeout)
+        return not self.is_running
+
+    def stop(self, timeout=None):
+        """
+        Stop the execution (the devices keep their current setpoint) and
+        wait until the thread has terminated.
+
+        :param float timeout:
+            Maximum time [s] to wait for the thread, or ``None`` to wait
+            forever.
+        """
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _execute_step(self, step_time, send_time):
+        """
+        Send the setpoints of one step to all devices with a running profile.
+
+        :param float step_time: The scheduled time of the step [s].
+        :param float send_time: The actual time the batch is sent [s].
+        """
+        batch = Sfc5xxxBatchExecutor(self._connection)
+        latency = self._latency or 0.0
+        executed = []
+        for name, device, profile in self._profiles:
+            if name in self._finished:
+                continue  # The end value was already sent
+            # Setpoint at the expected arrival of this request. From the
+            # step at the end of the profile on, the end value is sent.
+            elapsed = send_time + latency * (len(executed) + 0.5)
+            is_end = step_time >= profile.duration or \
+                elapsed >= profile.duration
+            if is_end:
+                elapsed = profile.duration
+            setpoint = profile.get_setpoint(elapsed)
+            batch.add(device, Sfc5xxxCmdSetSetpointAndReadMeasuredValue(
+                int(self._scaling), setpoint))
+            executed.append((name, setpoint, is_end))
+        begin = monotonic_time()
+        flows = batch.execute(raise_errors=False)
+        measured = (monotonic_time() - begin) / max(len(executed), 1)
+        self._latency = measured if self._latency is None else \
+            0.8 * self._latency + 0.2 * measured
+        for (name, setpoint, is_end), flow in zip(executed, flows):
+            if isinstance(flow, Exception):
+                log.warning("Failed to set setpoint of device '{}': {}"
+                            .format(name, flow))
+                self._errors += 1
+                flow = None
+                if is_end:
+                    errors = self._end_value_errors.get(name, 0) + 1
+                    self._end_value_errors[name] = errors
+                    if errors >= _END_VALUE_ATTEMPTS:
+                        log.error("Giving up sending the end value to "
+                                  "device '{}'.".format(name))
+                        self._finished.add(name)
+            elif is_end:
+                self._finished.add(name)
+            self._results[name].append((step_time, setpoint, flow))
+            if self._callback is not None:
+                try:
+                    self._callback(name, step_time, setpoint, flow)
+                except Exception as e:
+                    log.error("Profile executor callback failed: {}"
+                              .format(e))
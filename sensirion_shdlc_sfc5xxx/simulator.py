@@ -0,0 +1,890 @@
+# -*- coding: utf-8 -*-
+# (c) Copyright 2020 Sensirion AG, Switzerland
+
+from __future__ import absolute_import, division, print_function
+from sensirion_shdlc_driver.port import ShdlcPort
+from sensirion_shdlc_driver.errors import ShdlcTimeoutError
+from collections import deque
+from datetime import datetime
+from struct import pack, unpack
+from threading import RLock
+from .definitions import Sfc5xxxScaling, Sfc5xxxValveInputSource
+from .units import Sfc5xxxUnitPrefix, Sfc5xxxUnit, Sfc5xxxUnitTimeBase, \
+    Sfc5xxxMediumUnit
+from .unit_conversion import get_conversion_factor
+import math
+import random
+import time
+
+import logging
+log = logging.getLogger(__name__)
+
+
+# Error codes as defined in sensirion_shdlc_driver.errors and device_errors.
+_ERROR_DATA_SIZE = 0x01
+_ERROR_UNKNOWN_COMMAND = 0x02
+_ERROR_PARAMETER = 0x04
+_ERROR_NVM_ADDRESS_OUT_OF_RANGE = 0x21
+_ERROR_INVALID_CALIBRATION_INDEX = 0x33
+_ERROR_FUNCTIONALITY_NOT_SUPPORTED = 0x44
+
+# Fullscale of units which are independent of the calibration unit.
+_FIXED_FULLSCALES = {
+    Sfc5xxxUnit.PERCENT: 100.0,
+    Sfc5xxxUnit.PERMIL: 1000.0,
+    Sfc5xxxUnit.INT8: 127.0,
+    Sfc5xxxUnit.INT16: 32767.0,
+    Sfc5xxxUnit.INT32: 2147483647.0,
+}
+
+
+class _Sfc5xxxSimulatorError(Exception):
+    """
+    Raised by command handlers to return an error code to the master.
+    """
+
+    def __init__(self, error_code):
+        super(_Sfc5xxxSimulatorError, self).__init__(error_code)
+        self.error_code = error_code
+
+
+class Sfc5xxxSimulatedCalibration(object):
+    """
+    A gas calibration block of a
+    :py:class:`~sensirion_shdlc_sfc5xxx.simulator.Sfc5xxxSimulatedDevice`.
+
+    The class provides some public members which you can access directly.
+    """
+
+    def __init__(self, gas_description, gas_id, unit, fullscale,
+                 thermal_conductivity_reference=30000, company="Sensirion",
+                 operator="Simulator", datetime=datetime(2020, 1, 1, 12, 0)):
+        """
+        Constructor.
+
+        :param str gas_description: The gas description.
+        :param int gas_id: The gas ID.
+        :param ~sensirion_shdlc_sfc5xxx.units.Sfc5xxxMediumUnit unit:
+            The calibration unit.
+        :param float fullscale: The fullscale flow in the calibration unit.
+        :param int thermal_conductivity_reference:
+            The thermal conductivity reference value [ticks].
+        :param str company: The company which has created the calibration.
+        :param str operator: The operator who has created the calibration.
+        :param ~datetime.datetime datetime: Date and time of the calibration.
+        """
+        super(Sfc5xxxSimulatedCalibration, self).__init__()
+        self.gas_description = gas_description  #: Gas description (str).
+        self.gas_id = gas_id  #: Gas ID (int).
+        self.unit = unit  #: Calibration unit (Sfc5xxxMediumUnit).
+        self.fullscale = fullscale  #: Fullscale flow (float).
+        #: Thermal conductivity reference value [ticks] (int).
+        self.thermal_conductivity_reference = thermal_conductivity_reference
+        self.company = company  #: Company (str).
+        self.operator = operator  #: Operator (str).
+        self.datetime = datetime  #: Date and time of calibration (datetime).
+
+    def conditions_to_bytes(self):
+        """
+        Encode the calibration conditions as transmitted over SHDLC.
+
+        :return: The encoded calibration conditions (127 bytes).
+        :rtype: bytes
+        """
+        return b"".join([
+            self.company.encode('utf-8')[0:50].ljust(50, b'\0'),
+            self.operator.encode('utf-8')[0:50].ljust(50, b'\0'),
+            pack(">HBBBB", self.datetime.year, self.datetime.month,
+                 self.datetime.day, self.datetime.hour, self.datetime.minute),
+            pack(">fff?ff", 20.0, 2.0, 1.0, True, 0.5, 0.1),
+        ])
+
+
+def _default_calibrations():
+    """
+    Create the calibration blocks of a default simulated device.
+
+    :return: Dictionary with the calibration index as key.
+    :rtype: dict
+    """
+    slm = Sfc5xxxMediumUnit(Sfc5xxxUnitPrefix.ONE,
+                            Sfc5xxxUnit.STANDARD_LITER,
+                            Sfc5xxxUnitTimeBase.MINUTE)
+    sccm = Sfc5xxxMediumUnit(Sfc5xxxUnitPrefix.MILLI,
+                             Sfc5xxxUnit.STANDARD_LITER,
+                             Sfc5xxxUnitTimeBase.MINUTE)
+    return {
+        0: Sfc5xxxSimulatedCalibration("N2", 1, slm, 20.0, 30000),
+        1: Sfc5xxxSimulatedCalibration("Air", 8, slm, 20.0, 30500),
+        2: Sfc5xxxSimulatedCalibration("Ar", 4, sccm, 5000.0, 20500),
+        3: Sfc5xxxSimulatedCalibration("CO2", 25, sccm, 2000.0, 19000),
+    }
+
+
+class Sfc5xxxSimulatedDevice(object):
+    """
+    Simulated SFC5xxx device.
+
+    This class simulates the behavior of a real SFC5xxx mass flow controller
+    on the level of SHDLC commands, i.e. it receives the command ID and data
+    of a request and returns the state and data of the response. It
+    implements every command of this driver, including calibration blocks,
+    user memory, the measured value buffer (sampled in real time with the
+    configured sampling time) and SHDLC error codes.
+
+    The flow follows the setpoint with a first-order lag and some noise,
+    depending on the valve input source configuration.
+
+    To communicate with simulated devices through
+    :py:class:`~sensirion_shdlc_sfc5xxx.device.Sfc5xxxShdlcDevice`, add them
+    to an
+    :py:class:`~sensirion_shdlc_sfc5xxx.simulator.Sfc5xxxSimulatorPort`.
+    """
+
+    #: Supported baudrates [bit/s].
+    BAUDRATES = (9600, 19200, 38400, 57600, 115200, 230400, 460800)
+
+    #: Size of the user memory [bytes].
+    USER_MEMORY_SIZE = 128
+
+    #: Number of calibration blocks.
+    NUMBER_OF_CALIBRATIONS = 20
+
+    def __init__(self, slave_address=0, baudrate=115200,
+                 serial_number="21100123", calibrations=None,
+                 buffer_size=100, sampling_time=0.01, time_constant=0.05,
+                 noise=0.0005, seed=None, clock=time.time):
+        """
+        Constructor.
+
+        :param byte slave_address: The slave address of the device.
+        :param int baudrate: The baudrate of the device [bit/s].
+        :param str serial_number: The serial number of the device.
+        :param dict calibrations:
+            The calibration blocks as a dictionary with the index as key and
+            :py:class:`~sensirion_shdlc_sfc5xxx.simulator.Sfc5xxxSimulatedCalibration`
+            objects as values. If ``None``, some default calibrations for N2,
+            Air, Ar and CO2 are used.
+        :param int buffer_size:
+            Size of the measured value buffer [values].
+        :param float sampling_time:
+            Sampling time of the measured value buffer [s].
+        :param float time_constant:
+            Time constant [s] with which the flow follows the setpoint.
+        :param float noise:
+            Standard deviation of the flow noise (normalized).
+        :param int seed:
+            Seed for the noise generator to get reproducible values.
+        :param callable clock:
+            Function returning the current time in seconds. Can be replaced
+            to simulate the device in virtual time.
+        """  # noqa: E501
+        super(Sfc5xxxSimulatedDevice, self).__init__()
+        self.slave_address = slave_address  #: Slave address (byte).
+        self.baudrate = baudrate  #: Baudrate [bit/s] (int).
+        self.serial_number = serial_number  #: Serial number (str).
+        self.product_type = "00020000"  #: Product type (str).
+        self.product_subtype = 1  #: Product subtype (int).
+        self.product_name = "SFC5400"  #: Product name (str).
+        self.article_code = "3.000.462"  #: Article code (str).
+        #: Firmware version as tuple (major, minor, debug).
+        self.firmware_version = (1, 70, False)
+        #: Hardware version as tuple (major, minor).
+        self.hardware_version = (1, 0)
+        #: Calibration blocks (dict).
+        self.calibrations = calibrations if calibrations is not None \
+            else _default_calibrations()
+        self._buffer_size = buffer_size
+        self._sampling_time = float(sampling_time)
+        self._time_constant = float(time_constant)
+        self._noise = float(noise)
+        self._random = random.Random(seed)
+        self._clock = clock
+        self._injected_errors = []
+        self._user_memory = bytearray(self.USER_MEMORY_SIZE)
+        self._load_factory_settings()
+        self._reset()
+
+    @property
+    def setpoint(self):
+        """
+        Get the current setpoint.
+
+        :return: The normalized setpoint.
+        :rtype: float
+        """
+        return self._setpoint
+
+    @property
+    def flow(self):
+        """
+        Get the current (noise-free) flow.
+
+        :return: The normalized flow.
+        :rtype: float
+        """
+        self._update(self._clock())
+        return self._flow
+
+    @property
+    def active_calibration(self):
+        """
+        Get the index of the active calibration.
+
+        :return: Calibration index.
+        :rtype: int
+        """
+        return self._active_calibration
+
+    def inject_error(self, error_code, command_id=None, count=1):
+        """
+        Let the next command(s) fail with an error code, e.g. to test error
+        handling.
+
+        :param byte error_code:
+            The error code to return, e.g. one of
+            :py:data:`~sensirion_shdlc_sfc5xxx.device_errors.SFC5XXX_DEVICE_ERROR_LIST`.
+        :param byte command_id:
+            Only fail commands with this ID. If ``None``, any command fails.
+        :param int count:
+            Number of commands which should fail.
+        """  # noqa: E501
+        for i in range(count):
+            self._injected_errors.append((error_code, command_id))
+
+    def handle(self, command_id, data):
+        """
+        Handle an SHDLC request.
+
+        :param byte command_id: The command ID of the request.
+        :param bytes data: The data of the request.
+        :return: The state byte and data of the response.
+        :rtype: byte, bytes
+        """
+        data = bytes(bytearray(data))
+        for i, (error_code, error_command) in \
+                enumerate(self._injected_errors):
+            if error_command is None or error_command == command_id:
+                del self._injected_errors[i]
+                self._last_error = error_code
+                return error_code, b""
+        handler = self._HANDLERS.get(command_id)
+        try:
+            if handler is None:
+                raise _Sfc5xxxSimulatorError(_ERROR_UNKNOWN_COMMAND)
+            response = handler(self, data)
+        except _Sfc5xxxSimulatorError as e:
+            self._last_error = e.error_code
+            return e.error_code, b""
+        except Exception:
+            # Malformed requests (e.g. wrong data length)
+            log.debug("Simulator failed to handle command 0x{:02X}."
+                      .format(command_id), exc_info=True)
+            self._last_error = _ERROR_DATA_SIZE
+            return _ERROR_DATA_SIZE, b""
+        return 0x00, response if response is not None else b""
+
+    def _load_factory_settings(self):
+        """
+        Initialize the non-volatile settings with factory defaults.
+        """
+        self._setpoint_persist = False
+        self._persisted_setpoint = 0.0
+        self._user_controller_gain = 1.0
+        self._pressure_dependent_gain_enable = False
+        self._inlet_pressure = 1.0
+        self._gas_temperature_compensation_enable = False
+        self._inlet_temperature = 20.0
+        self._user_unit = (Sfc5xxxUnitPrefix.UNDEFINED, Sfc5xxxUnit.UNDEFINED,
+                           Sfc5xxxUnitTimeBase.UNDEFINED)
+        self._reply_delay = 50
+        self._active_calibration = min(self.calibrations) \
+            if self.calibrations else 0
+
+    def _reset(self):
+        """
+        Reset the volatile state as after a power cycle.
+        """
+        self._setpoint = self._persisted_setpoint \
+            if self._setpoint_persist else 0.0
+        self._valve_input_source = Sfc5xxxValveInputSource.CONTROLLER
+        self._user_valve_value = 0.0
+        self._device_status = 0
+        self._last_error = 0
+        self._flow = 0.0
+        self._last_sample_time = self._clock()
+        self._buffer = deque()
+        self._lost_values = 0
+
+    def _update(self, now):
+        """
+        Advance the flow simulation and fill the measured value buffer up to
+        the given time.
+
+        :param float now: The current time [s].
+        """
+        samples = int((now - self._last_sample_time) / self._sampling_time)
+        if samples <= 0:
+            return
+        target = self._get_target_flow()
+        decay = math.exp(-self._sampling_time / self._time_constant)
+        if samples > self._buffer_size:
+            # Skip samples which would be overwritten anyway.
+            skipped = samples - self._buffer_size
+            self._flow = target + (self._flow - target) * decay ** skipped
+            self._lost_values += skipped
+            samples -= skipped
+            self._last_sample_time += skipped * self._sampling_time
+        for i in range(samples):
+            self._flow = target + (self._flow - target) * decay
+            if len(self._buffer) >= self._buffer_size:
+                self._buffer.popleft()
+                self._lost_values += 1
+            self._buffer.append(self._flow + self._get_noise())
+        self._last_sample_time += samples * self._sampling_time
+
+    def _get_target_flow(self):
+        """
+        Get the normalized flow the controller is settling to.
+
+        :return: Normalized flow.
+        :rtype: float
+        """
+        source = self._valve_input_source
+        if source == Sfc5xxxValveInputSource.CONTROLLER:
+            return self._setpoint
+        elif source == Sfc5xxxValveInputSource.FORCE_CLOSED:
+            return 0.0
+        elif source == Sfc5xxxValveInputSource.FORCE_OPEN:
+            return 1.2
+        elif source == Sfc5xxxValveInputSource.USER_DEFINED:
+            return 1.2 * self._user_valve_value
+        return self._flow  # HOLD
+
+    def _get_noise(self):
+        """
+        Get a random noise value.
+
+        :return: Normalized noise.
+        :rtype: float
+        """
+        return self._random.gauss(0.0, self._noise) if self._noise else 0.0
+
+    def _get_calibration(self, index):
+        """
+        Get a calibration block.
+
+        :param int index: The calibration index.
+        :return: The calibration block.
+        :rtype: Sfc5xxxSimulatedCalibration
+        """
+        calibration = self.calibrations.get(index)
+        if calibration is None:
+            raise _Sfc5xxxSimulatorError(_ERROR_INVALID_CALIBRATION_INDEX)
+        return calibration
+
+    def _get_user_unit(self):
+        """
+        Get the user defined medium unit with undefined parts substituted by
+        the calibration unit.
+
+        :return: The substituted user defined unit.
+        :rtype: tuple
+        """
+        calibration = self._get_calibration(self._active_calibration)
+        cal_unit = (calibration.unit.prefix, calibration.unit.unit,
+                    calibration.unit.timebase)
+        return tuple(cal if user.name == 'UNDEFINED' else user
+                     for user, cal in zip(self._user_unit, cal_unit))
+
+    def _get_fullscale(self, scaling):
+        """
+        Get the fullscale flow for a specific scaling, i.e. the factor to
+        convert normalized values to that scaling.
+
+        :param int scaling: The scaling.
+        :return: The fullscale flow.
+        :rtype: float
+        """
+        if scaling == Sfc5xxxScaling.NORMALIZED:
+            return 1.0
+        calibration = self._get_calibration(self._active_calibration)
+        if scaling == Sfc5xxxScaling.PHYSICAL:
+            return calibration.fullscale
+        elif scaling == Sfc5xxxScaling.USER_DEFINED:
+            prefix, unit, timebase = self._get_user_unit()
+            if unit in _FIXED_FULLSCALES:
+                return _FIXED_FULLSCALES[unit]
+            try:
+                return calibration.fullscale * get_conversion_factor(
+                    calibration.unit,
+                    Sfc5xxxMediumUnit(prefix, unit, timebase))
+            except ValueError:
+                raise _Sfc5xxxSimulatorError(
+                    _ERROR_FUNCTIONALITY_NOT_SUPPORTED)
+        raise _Sfc5xxxSimulatorError(_ERROR_PARAMETER)
+
+    def _measure(self):
+        """
+        Get the latest measured flow.
+
+        :return: Normalized flow including noise.
+        :rtype: float
+        """
+        self._update(self._clock())
+        return self._flow + self._get_noise()
+
+    def _setpoint_cmd(self, data):  # 0x00
+        if len(data) == 1:
+            scaling, = unpack(">B", data)
+            return pack(">f", self._setpoint * self._get_fullscale(scaling))
+        scaling, setpoint = unpack(">Bf", data)
+        self._update(self._clock())
+        self._setpoint = setpoint / self._get_fullscale(scaling)
+        if self._setpoint_persist:
+            self._persisted_setpoint = self._setpoint
+
+    def _setpoint_persist_cmd(self, data):  # 0x02
+        if data[0:1] == b"\x80":
+            return pack(">?", self._setpoint_persist)
+        self._setpoint_persist = unpack(">x?", data)[0]
+        self._persisted_setpoint = self._setpoint
+
+    def _set_setpoint_and_read_cmd(self, data):  # 0x03
+        scaling = bytearray(data)[0]
+        self._setpoint_cmd(data)
+        return pack(">f", self._measure() * self._get_fullscale(scaling))
+
+    def _read_measured_value_cmd(self, data):  # 0x08
+        scaling, = unpack(">B", data)
+        return pack(">f", self._measure() * self._get_fullscale(scaling))
+
+    def _read_measured_value_buffer_cmd(self, data):  # 0x09
+        scaling, = unpack(">B", data)
+        fullscale = self._get_fullscale(scaling)
+        self._update(self._clock())
+        count = min(len(self._buffer), 60)
+        values = [self._buffer.popleft() * fullscale for i in range(count)]
+        lost_values, self._lost_values = self._lost_values, 0
+        return pack(">IIf{}f".format(count), lost_values, len(self._buffer),
+                    self._sampling_time, *values)
+
+    def _valve_cmd(self, data):  # 0x20
+        if data == b"\x00":
+            return pack(">B", self._valve_input_source)
+        elif data == b"\x01":
+            return pack(">f", self._user_valve_value)
+        elif data[0:1] == b"\x00":
+            self._update(self._clock())
+            try:
+                self._valve_input_source = \
+                    Sfc5xxxValveInputSource(unpack(">xB", data)[0])
+            except ValueError:
+                raise _Sfc5xxxSimulatorError(_ERROR_PARAMETER)
+        elif data[0:1] == b"\x01":
+            self._update(self._clock())
+            self._user_valve_value = unpack(">xf", data)[0]
+        else:
+            raise _Sfc5xxxSimulatorError(_ERROR_PARAMETER)
+
+    def _medium_unit_cmd(self, data):  # 0x21
+        if data == b"\x00":
+            return pack(">bBB", *[item.value for item in self._user_unit])
+        elif data == b"\x01":
+            return pack(">bBB", *[item.value
+                                  for item in self._get_user_unit()])
+        elif data == b"\x0A":
+            return pack(">f", self._get_fullscale(
+                Sfc5xxxScaling.USER_DEFINED))
+        elif data[0:1] == b"\x00":
+            prefix, unit, timebase = unpack(">xbBB", data)
+            try:
+                self._user_unit = (Sfc5xxxUnitPrefix.from_int(prefix),
+                                   Sfc5xxxUnit.from_int(unit),
+                                   Sfc5xxxUnitTimeBase.from_int(timebase))
+            except ValueError:
+                raise _Sfc5xxxSimulatorError(_ERROR_PARAMETER)
+        else:
+            raise _Sfc5xxxSimulatorError(_ERROR_PARAMETER)
+
+    _CONTROLLER_SETTINGS = {
+        0x00: ('_user_controller_gain', 'f'),
+        0x10: ('_pressure_dependent_gain_enable', '?'),
+        0x11: ('_inlet_pressure', 'f'),
+        0x20: ('_gas_temperature_compensation_enable', '?'),
+        0x21: ('_inlet_temperature', 'f'),
+    }
+
+    def _controller_cmd(self, data):  # 0x22
+        setting = self._CONTROLLER_SETTINGS.get(bytearray(data)[0])
+        if setting is None:
+            raise _Sfc5xxxSimulatorError(_ERROR_PARAMETER)
+        attribute, fmt = setting
+        if len(data) == 1:
+            return pack(">" + fmt, getattr(self, attribute))
+        setattr(self, attribute, unpack(">x" + fmt, data)[0])
+
+    def _advanced_measurement_cmd(self, data):  # 0x30
+        subcommand = bytearray(data)[0]
+        if subcommand == 0x00:
+            flow = self._measure()
+            return pack(">H", int(min(max(flow * 20000 + 5000, 0), 65535)))
+        elif subcommand in (0x01, 0x02):
+            calibration = self._get_calibration(self._active_calibration)
+            ticks = calibration.thermal_conductivity_reference + \
+                int(self._get_noise() * 1000)
+            return pack(">H", min(max(ticks, 0), 65535))
+        elif subcommand == 0x10:
+            return pack(">f", 23.5 + self._get_noise() * 10)
+        raise _Sfc5xxxSimulatorError(_ERROR_PARAMETER)
+
+    def _calibration_info(self, calibration, subcommand):
+        """
+        Encode calibration information.
+
+        :param Sfc5xxxSimulatedCalibration calibration: The calibration.
+        :param byte subcommand: The requested information.
+        :return: The encoded information.
+        :rtype: bytes
+        """
+        if subcommand == 0x11:
+            return calibration.gas_description.encode('utf-8')
+        elif subcommand == 0x12:
+            return pack(">I", calibration.gas_id)
+        elif subcommand == 0x13:
+            return pack(">bBB", calibration.unit.prefix.value,
+                        calibration.unit.unit.value,
+                        calibration.unit.timebase.value)
+        elif subcommand == 0x14:
+            return pack(">f", calibration.fullscale)
+        elif subcommand in (0x15, 0x16):
+            return calibration.conditions_to_bytes()
+        elif subcommand == 0x17:
+            return pack(">H", calibration.thermal_conductivity_reference)
+        raise _Sfc5xxxSimulatorError(_ERROR_PARAMETER)
+
+    def _calibration_cmd(self, data):  # 0x40
+        subcommand = bytearray(data)[0]
+        if subcommand == 0x00:
+            return pack(">I", self.NUMBER_OF_CALIBRATIONS)
+        index, = unpack(">xI", data)
+        if index >= self.NUMBER_OF_CALIBRATIONS:
+            raise _Sfc5xxxSimulatorError(_ERROR_PARAMETER)
+        if subcommand == 0x10:
+            return pack(">?", index in self.calibrations)
+        return self._calibration_info(self._get_calibration(index),
+                                      subcommand)
+
+    def _current_calibration_cmd(self, data):  # 0x44
+        subcommand, = unpack(">B", data)
+        return self._calibration_info(
+            self._get_calibration(self._active_calibration), subcommand)
+
+    def _activate_calibration_cmd(self, data):  # 0x45
+        index, = unpack(">I", data)
+        self._get_calibration(index)  # raises if invalid
+        self._update(self._clock())
+        self._active_calibration = index
+
+    def _user_memory_cmd(self, data):  # 0x6E
+        address, length = unpack(">BB", data[0:2])
+        if address + length > self.USER_MEMORY_SIZE:
+            raise _Sfc5xxxSimulatorError(_ERROR_NVM_ADDRESS_OUT_OF_RANGE)
+        if len(data) == 2:
+            return bytes(self._user_memory[address:address + length])
+        if len(data) != 2 + length:
+            raise _Sfc5xxxSimulatorError(_ERROR_DATA_SIZE)
+        self._user_memory[address:address + length] = data[2:]
+
+    def _slave_address_cmd(self, data):  # 0x90
+        if len(data) == 0:
+            return pack(">B", self.slave_address)
+        address, = unpack(">B", data)
+        if address == 0xFF:
+            raise _Sfc5xxxSimulatorError(_ERROR_PARAMETER)
+        self.slave_address = address
+
+    def _baudrate_cmd(self, data):  # 0x91
+        if len(data) == 0:
+            return pack(">I", self.baudrate)
+        baudrate, = unpack(">I", data)
+        if baudrate not in self.BAUDRATES:
+            raise _Sfc5xxxSimulatorError(_ERROR_PARAMETER)
+        self.baudrate = baudrate
+
+    def _factory_reset_cmd(self, data):  # 0x92
+        # Note: Unlike some real devices, the communication parameters are
+        # kept to allow further communication with the simulator.
+        self._load_factory_settings()
+        self._reset()
+
+    def _reply_delay_cmd(self, data):  # 0x95
+        if len(data) == 0:
+            return pack(">H", self._reply_delay)
+        self._reply_delay, = unpack(">H", data)
+
+    def _device_information_cmd(self, data):  # 0xD0
+        subcommand, = unpack(">B", data)
+        if subcommand == 0x04:
+            return pack(">B", self.product_subtype)
+        strings = {
+            0x00: self.product_type,
+            0x01: self.product_name,
+            0x02: self.article_code,
+            0x03: self.serial_number,
+        }
+        if subcommand not in strings:
+            raise _Sfc5xxxSimulatorError(_ERROR_PARAMETER)
+        return strings[subcommand].encode('utf-8') + b"\0"
+
+    def _get_version_cmd(self, data):  # 0xD1
+        return pack(">BB?BBBB", self.firmware_version[0],
+                    self.firmware_version[1], self.firmware_version[2],
+                    self.hardware_version[0], self.hardware_version[1], 1, 0)
+
+    def _read_device_status_cmd(self, data):  # 0xD2
+        clear, = unpack(">?", data)
+        response = pack(">IB", self._device_status, self._last_error)
+        if clear:
+            self._device_status = 0
+            self._last_error = 0
+        return response
+
+    def _device_reset_cmd(self, data):  # 0xD3
+        self._reset()
+
+    _HANDLERS = {
+        0x00: _setpoint_cmd,
+        0x02: _setpoint_persist_cmd,
+        0x03: _set_setpoint_and_read_cmd,
+        0x08: _read_measured_value_cmd,
+        0x09: _read_measured_value_buffer_cmd,
+        0x20: _valve_cmd,
+        0x21: _medium_unit_cmd,
+        0x22: _controller_cmd,
+        0x30: _advanced_measurement_cmd,
+        0x40: _calibration_cmd,
+        0x44: _current_calibration_cmd,
+        0x45: _activate_calibration_cmd,
+        0x6E: _user_memory_cmd,
+        0x90: _slave_address_cmd,
+        0x91: _baudrate_cmd,
+        0x92: _factory_reset_cmd,
+        0x95: _reply_delay_cmd,
+        0xD0: _device_information_cmd,
+        0xD1: _get_version_cmd,
+        0xD2: _read_device_status_cmd,
+        0xD3: _device_reset_cmd,
+    }
+
+
+class Sfc5xxxSimulatorPort(ShdlcPort):
+    """
+    SHDLC port connected to simulated SFC5xxx devices.
+
+    This class implements the
+    :py:class:`~sensirion_shdlc_driver.port.ShdlcPort` interface, so it can
+    be used instead of a
+    :py:class:`~sensirion_shdlc_driver.port.ShdlcSerialPort` to communicate
+    with any number of
+    :py:class:`~sensirion_shdlc_sfc5xxx.simulator.Sfc5xxxSimulatedDevice`
+    objects, e.g. for testing without hardware:
+
+    .. sourcecode:: python
+
+        port = Sfc5xxxSimulatorPort()
+        port.add_device(Sfc5xxxSimulatedDevice(slave_address=0))
+        device = Sfc5xxxShdlcDevice(ShdlcConnection(port), slave_address=0)
+        print(device.get_serial_number())
+
+    Like on a real bus, only devices with the same baudrate as the port
+    respond, and requests to missing devices raise a timeout error.
+
+    .. note:: This class can be used in a "with"-statement.
+    """
+
+    def __init__(self, bitrate=115200, simulate_timing=False,
+                 record_requests=False):
+        """
+        Constructor.
+
+        :param int bitrate: The bitrate of the port [bit/s].
+        :param bool simulate_timing:
+            If ``True``, the time needed to transfer the frames at the
+            configured bitrate is simulated (blocking). Otherwise the
+            responses are returned immediately.
+        :param bool record_requests:
+            If ``True``, all transceived requests are recorded and can be
+            retrieved with :py:attr:`requests`, e.g. to check which commands
+            were sent to the bus.
+        """
+        super(Sfc5xxxSimulatorPort, self).__init__()
+        self._bitrate = bitrate
+        self._simulate_timing = simulate_timing
+        self._requests = [] if record_requests else None
+        self._lock = RLock()
+        self._devices = dict()
+        self._is_open = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    @property
+    def description(self):
+        """
+        Get a description of the port.
+
+        :return: Description string.
+        :rtype: string
+        """
+        return "Sfc5xxxSimulatorPort@{}".format(self._bitrate)
+
+    @property
+    def bitrate(self):
+        """
+        The current bitrate in bit/s.
+
+        :type: int
+        """
+        with self._lock:
+            return self._bitrate
+
+    @bitrate.setter
+    def bitrate(self, bitrate):
+        with self._lock:
+            self._bitrate = bitrate
+
+    @property
+    def lock(self):
+        """
+        Get the lock object of the port to allow locking it, i.e. to get
+        exclusive access across multiple method calls.
+
+        :return: The lock object.
+        :rtype: threading.RLock
+        """
+        return self._lock
+
+    @property
+    def is_open(self):
+        """
+        Indicates whether the port is open.
+
+        :return: If ``True`` the port is open, if ``False`` the port is closed.
+        :rtype: bool
+        """
+        return self._is_open
+
+    @property
+    def requests(self):
+        """
+        Get the recorded requests, if enabled in the constructor.
+
+        :return: Slave address and command ID of every transceived request
+                 (including requests to missing devices), in the order they
+                 were sent. Empty if recording is disabled.
+        :rtype: list(tuple(int, int))
+        """
+        with self._lock:
+            return list(self._requests or [])
+
+    @property
+    def devices(self):
+        """
+        Get all simulated devices connected to this port.
+
+        :return: List of devices.
+        :rtype: list(~sensirion_shdlc_sfc5xxx.simulator.Sfc5xxxSimulatedDevice)
+        """
+        with self._lock:
+            return list(self._devices.values())
+
+    def open(self):
+        """
+        Open the port. Does nothing if the port is already opened.
+        """
+        self._is_open = True
+
+    def close(self):
+        """
+        Close the port. Does nothing if the port is already closed.
+        """
+        self._is_open = False
+
+    def add_device(self, device):
+        """
+        Connect a simulated device to this port.
+
+        :param ~sensirion_shdlc_sfc5xxx.simulator.Sfc5xxxSimulatedDevice device:
+            The device to add.
+        :return: The added device.
+        :rtype: ~sensirion_shdlc_sfc5xxx.simulator.Sfc5xxxSimulatedDevice
+        """  # noqa: E501
+        with self._lock:
+            if device.slave_address in self._devices:
+                raise ValueError("There is already a device with address {}!"
+                                 .format(device.slave_address))
+            self._devices[device.slave_address] = device
+        return device
+
+    def remove_device(self, device):
+        """
+        Disconnect a simulated device from this port.
+
+        :param ~sensirion_shdlc_sfc5xxx.simulator.Sfc5xxxSimulatedDevice device:
+            The device to remove.
+        """  # noqa: E501
+        with self._lock:
+            if self._devices.get(device.slave_address) is device:
+                del self._devices[device.slave_address]
+
+    def clear_requests(self):
+        """
+        Clear the recorded requests.
+        """
+        with self._lock:
+            if self._requests is not None:
+                del self._requests[:]
+
+    def transceive(self, slave_address, command_id, data, response_timeout):
+        """
+        Send SHDLC frame to port and return received response frame.
+
+        :param byte slave_address: Slave address.
+        :param byte command_id: SHDLC command ID.
+        :param bytes-like data: Payload.
+        :param float response_timeout: Response timeout in seconds (maximum
+                                       time until the first byte is received).
+        :return: Received address, command_id, state, and payload.
+        :rtype: byte, byte, byte, bytes
+        :raise ~sensirion_shdlc_driver.errors.ShdlcTimeoutError:
+            If no response received within timeout.
+        """
+        with self._lock:
+            if not self._is_open:
+                raise IOError("Port is closed.")
+            if self._requests is not None:
+                self._requests.append((slave_address, command_id))
+            self._wait_frame_time(6 + len(data))
+            device = self._devices.get(slave_address)
+            if (device is None) or (device.baudrate != self._bitrate):
+                time.sleep(response_timeout)
+                raise ShdlcTimeoutError()
+            state, response = device.handle(command_id, data)
+            if device.slave_address != slave_address:
+                del self._devices[slave_address]
+                self._devices[device.slave_address] = device
+            self._wait_frame_time(7 + len(response))
+            return slave_address, command_id, state, response
+
+    def _wait_frame_time(self, length):
+        """
+        Simulate the time needed to transfer a frame, if enabled.
+
+        :param int length: The frame length [bytes].
+        """
+        if self._simulate_timing:
+            time.sleep(length * 10.0 / self._bitrate)
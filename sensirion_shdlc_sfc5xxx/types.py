@@ -13,9 +13,15 @@ class Sfc5xxxCalibrationConditions(object):
     the initial calibration conditions and recalibration conditions of
     gas calibration blocks.
 
-    The class provides some public members which you can access directly.
+    Objects of this class are immutable and hashable, i.e. they can be used
+    as dictionary keys. Two objects are equal if all their members are equal.
     """
 
+    __slots__ = ('_company', '_operator', '_datetime', '_temperature',
+                 '_inlet_pressure', '_differential_pressure',
+                 '_is_real_gas_calibration', '_accuracy_setpoint',
+                 '_accuracy_fullscale')
+
     def __init__(self, company, operator, datetime, temperature,
                  inlet_pressure, differential_pressure,
                  is_real_gas_calibration, accuracy_setpoint,
@@ -43,34 +49,138 @@ class Sfc5xxxCalibrationConditions(object):
             Calibration accuracy in percent of fullscale.
         """
         super(Sfc5xxxCalibrationConditions, self).__init__()
+        self._company = company
+        self._operator = operator
+        self._datetime = datetime
+        self._temperature = temperature
+        self._inlet_pressure = inlet_pressure
+        self._differential_pressure = differential_pressure
+        self._is_real_gas_calibration = is_real_gas_calibration
+        self._accuracy_setpoint = accuracy_setpoint
+        self._accuracy_fullscale = accuracy_fullscale
+
+    @property
+    def company(self):
+        """
+        The company which has created the calibration.
+
+        :type: str
+        """
+        return self._company
+
+    @property
+    def operator(self):
+        """
+        The operator who has created the calibration.
+
+        :type: str
+        """
+        return self._operator
+
+    @property
+    def datetime(self):
+        """
+        Date and time when the calibration was created.
+
+        :type: ~datetime.datetime
+        """
+        return self._datetime
+
+    @property
+    def temperature(self):
+        """
+        System/gas temperature [°C].
+
+        :type: float
+        """
+        return self._temperature
 
-        #: The company which has created the calibration (str).
-        self.company = company
+    @property
+    def inlet_pressure(self):
+        """
+        Absolute pressure [bar] of gas inlet.
 
-        #: The operator who has created the calibration (str).
-        self.operator = operator
+        :type: float
+        """
+        return self._inlet_pressure
 
-        #: Date and time when the calibration was created (datetime).
-        self.datetime = datetime
+    @property
+    def differential_pressure(self):
+        """
+        Pressure difference [bar] between inlet and outlet.
 
-        #: System/gas temperature [°C] (float).
-        self.temperature = temperature
+        :type: float
+        """
+        return self._differential_pressure
 
-        #: Absolute pressure [bar] of gas inlet (float).
-        self.inlet_pressure = inlet_pressure
+    @property
+    def is_real_gas_calibration(self):
+        """
+        Whether the calibration was performed with the real process gas
+        (true) or if it was calculated from a different gas (false).
 
-        #: Pressure difference [bar] between inlet and outlet (float).
-        self.differential_pressure = differential_pressure
+        :type: bool
+        """
+        return self._is_real_gas_calibration
 
-        #: Whether the calibration was performed with the real process gas
-        #: (true) or if it was calculated from a different gas (false).
-        self.is_real_gas_calibration = is_real_gas_calibration
+    @property
+    def accuracy_setpoint(self):
+        """
+        Calibration accuracy in percent of the setpoint.
 
-        #: Calibration accuracy in percent of the setpoint (float).
-        self.accuracy_setpoint = accuracy_setpoint
+        :type: float
+        """
+        return self._accuracy_setpoint
 
-        #: Calibration accuracy in percent of fullscale (float).
-        self.accuracy_fullscale = accuracy_fullscale
+    @property
+    def accuracy_fullscale(self):
+        """
+        Calibration accuracy in percent of fullscale.
+
+        :type: float
+        """
+        return self._accuracy_fullscale
+
+    def _key(self):
+        return (self._company, self._operator, self._datetime,
+                self._temperature, self._inlet_pressure,
+                self._differential_pressure, self._is_real_gas_calibration,
+                self._accuracy_setpoint, self._accuracy_fullscale)
+
+    def __eq__(self, other):
+        """
+        Equal-operator overload.
+
+        :param other:
+            The other object to compare with.
+        :return:
+            ``True`` if all members of both objects are equal, ``False``
+            otherwise.
+        """
+        if not isinstance(other, Sfc5xxxCalibrationConditions):
+            return NotImplemented
+        return self._key() == other._key()
+
+    def __ne__(self, other):
+        """
+        Not-equal-operator overload (required for Python 2).
+
+        :param other:
+            The other object to compare with.
+        :return:
+            ``True`` if any member differs, ``False`` otherwise.
+        """
+        equal = self.__eq__(other)
+        return equal if equal is NotImplemented else not equal
+
+    def __hash__(self):
+        """
+        Hash overload, consistent with the equal-operator.
+
+        :return: The hash value.
+        :rtype: int
+        """
+        return hash(self._key())
 
     def __str__(self):
         """
@@ -100,9 +210,15 @@ class Sfc5xxxReadBufferResponse(object):
     command, i.e. of the method
     :py:meth:`~sensirion_shdlc_sfc5xxx.device.Sfc5xxxShdlcDevice.read_measured_value_buffer`.
 
-    The class provides some public members which you can access directly.
+    Objects of this class are immutable and hashable. The values are stored
+    as tuple, resp. as read-only view of NumPy arrays. The hash does not
+    depend on the measured values, so it is cheap to compute also for large
+    buffers.
     """  # noqa: E501
 
+    __slots__ = ('_scaling', '_read_count', '_lost_values',
+                 '_remaining_values', '_sampling_time', '_values')
+
     def __init__(self, scaling, read_count, lost_values, remaining_values,
                  sampling_time, values):
         """
@@ -123,32 +239,120 @@ class Sfc5xxxReadBufferResponse(object):
         :param float sampling_time:
             The sampling time of the measured values in Seconds (received from
             the "read measured value buffer" command).
-        :param list(float) values:
+        :param list(float)/numpy.ndarray values:
             The measured values read from the buffer (received from the "read
-            measured value buffer" command).
+            measured value buffer" command). NumPy arrays are not copied, but
+            stored as read-only view (the passed array stays writable).
         """
         super(Sfc5xxxReadBufferResponse, self).__init__()
+        self._scaling = scaling
+        self._read_count = read_count
+        self._lost_values = lost_values
+        self._remaining_values = remaining_values
+        self._sampling_time = sampling_time
+        if hasattr(values, 'setflags'):  # NumPy array
+            values = values.view()
+            values.setflags(write=False)
+        else:
+            values = tuple(values)
+        self._values = values
 
-        #: The scaling of the measured values
-        #: (:py:class:`~sensirion_shdlc_sfc5xxx.definitions.Sfc5xxxScaling`).
-        self.scaling = scaling
+    @property
+    def scaling(self):
+        """
+        The scaling of the measured values.
 
-        #: How many times the "read measured value buffer" was executed
-        #: to fetch the values contained in this object (int).
-        self.read_count = read_count
+        :type: ~sensirion_shdlc_sfc5xxx.definitions.Sfc5xxxScaling
+        """
+        return self._scaling
+
+    @property
+    def read_count(self):
+        """
+        How many times the "read measured value buffer" was executed to fetch
+        the values contained in this object.
+
+        :type: int
+        """
+        return self._read_count
 
-        #: Number of lost values due to buffer overrun (int).
-        self.lost_values = lost_values
+    @property
+    def lost_values(self):
+        """
+        Number of lost values due to buffer overrun.
 
-        #: Number of values remaining in the buffer after reading it (int).
-        #: If the whole buffer was read out, this is zero.
-        self.remaining_values = remaining_values
+        :type: int
+        """
+        return self._lost_values
 
-        #: The sampling time of the measured values in Seconds (float).
-        self.sampling_time = sampling_time
+    @property
+    def remaining_values(self):
+        """
+        Number of values remaining in the buffer after reading it. If the
+        whole buffer was read out, this is zero.
 
-        #: The measured values read from the buffer (list of float).
-        self.values = values
+        :type: int
+        """
+        return self._remaining_values
+
+    @property
+    def sampling_time(self):
+        """
+        The sampling time of the measured values in Seconds.
+
+        :type: float
+        """
+        return self._sampling_time
+
+    @property
+    def values(self):
+        """
+        The measured values read from the buffer.
+
+        :type: tuple(float)/numpy.ndarray
+        """
+        return self._values
+
+    def _key(self):
+        return (self._scaling, self._read_count, self._lost_values,
+                self._remaining_values, self._sampling_time,
+                len(self._values))
+
+    def __eq__(self, other):
+        """
+        Equal-operator overload.
+
+        :param other:
+            The other object to compare with.
+        :return:
+            ``True`` if all members (including all measured values) of both
+            objects are equal, ``False`` otherwise.
+        """
+        if not isinstance(other, Sfc5xxxReadBufferResponse):
+            return NotImplemented
+        return self._key() == other._key() and \
+            all(a == b for a, b in zip(self._values, other._values))
+
+    def __ne__(self, other):
+        """
+        Not-equal-operator overload (required for Python 2).
+
+        :param other:
+            The other object to compare with.
+        :return:
+            ``True`` if any member differs, ``False`` otherwise.
+        """
+        equal = self.__eq__(other)
+        return equal if equal is NotImplemented else not equal
+
+    def __hash__(self):
+        """
+        Hash overload, consistent with the equal-operator.
+
+        :return: The hash value.
+        :rtype: int
+        """
+        return hash(self._key())
 
     def __str__(self):
         """
@@ -164,3 +368,175 @@ class Sfc5xxxReadBufferResponse(object):
         s += "Sampling Time: {} s\n".format(round(self.sampling_time, 3))
         s += "Measured Values ({}): {}".format(len(self.values), self.values)
         return s
+
+
+class Sfc5xxxCalibration(object):
+    """
+    A class representing all information of a valid calibration block, as
+    returned by
+    :py:meth:`~sensirion_shdlc_sfc5xxx.device.Sfc5xxxShdlcDevice.read_calibration_catalog`.
+
+    Objects of this class are immutable and hashable.
+    """  # noqa: E501
+
+    __slots__ = ('_index', '_gas_description', '_gas_id', '_unit',
+                 '_fullscale', '_initial_conditions',
+                 '_recalibration_conditions',
+                 '_thermal_conductivity_reference')
+
+    def __init__(self, index, gas_description, gas_id, unit, fullscale,
+                 initial_conditions, recalibration_conditions,
+                 thermal_conductivity_reference):
+        """
+        Constructor.
+
+        :param int index:
+            The index of the calibration block.
+        :param str gas_description:
+            The gas description.
+        :param int gas_id:
+            The gas ID.
+        :param ~sensirion_shdlc_sfc5xxx.units.Sfc5xxxMediumUnit unit:
+            The gas unit.
+        :param float fullscale:
+            The fullscale flow in the unit of the calibration.
+        :param ~sensirion_shdlc_sfc5xxx.types.Sfc5xxxCalibrationConditions initial_conditions:
+            The initial calibration conditions.
+        :param ~sensirion_shdlc_sfc5xxx.types.Sfc5xxxCalibrationConditions recalibration_conditions:
+            The recalibration conditions.
+        :param int thermal_conductivity_reference:
+            The thermal conductivity reference value ticks.
+        """  # noqa: E501
+        super(Sfc5xxxCalibration, self).__init__()
+        self._index = index
+        self._gas_description = gas_description
+        self._gas_id = gas_id
+        self._unit = unit
+        self._fullscale = fullscale
+        self._initial_conditions = initial_conditions
+        self._recalibration_conditions = recalibration_conditions
+        self._thermal_conductivity_reference = thermal_conductivity_reference
+
+    @property
+    def index(self):
+        """
+        The index of the calibration block.
+
+        :type: int
+        """
+        return self._index
+
+    @property
+    def gas_description(self):
+        """
+        The gas description.
+
+        :type: str
+        """
+        return self._gas_description
+
+    @property
+    def gas_id(self):
+        """
+        The gas ID.
+
+        :type: int
+        """
+        return self._gas_id
+
+    @property
+    def unit(self):
+        """
+        The gas unit.
+
+        :type: ~sensirion_shdlc_sfc5xxx.units.Sfc5xxxMediumUnit
+        """
+        return self._unit
+
+    @property
+    def fullscale(self):
+        """
+        The fullscale flow in the unit of the calibration.
+
+        :type: float
+        """
+        return self._fullscale
+
+    @property
+    def initial_conditions(self):
+        """
+        The initial calibration conditions.
+
+        :type: ~sensirion_shdlc_sfc5xxx.types.Sfc5xxxCalibrationConditions
+        """
+        return self._initial_conditions
+
+    @property
+    def recalibration_conditions(self):
+        """
+        The recalibration conditions.
+
+        :type: ~sensirion_shdlc_sfc5xxx.types.Sfc5xxxCalibrationConditions
+        """
+        return self._recalibration_conditions
+
+    @property
+    def thermal_conductivity_reference(self):
+        """
+        The thermal conductivity reference value ticks.
+
+        :type: int
+        """
+        return self._thermal_conductivity_reference
+
+    def _key(self):
+        return (self._index, self._gas_description, self._gas_id,
+                self._unit, self._fullscale, self._initial_conditions,
+                self._recalibration_conditions,
+                self._thermal_conductivity_reference)
+
+    def __eq__(self, other):
+        """
+        Equal-operator overload.
+
+        :param other:
+            The other object to compare with.
+        :return:
+            ``True`` if all members of both objects are equal, ``False``
+            otherwise.
+        """
+        if not isinstance(other, Sfc5xxxCalibration):
+            return NotImplemented
+        return self._key() == other._key()
+
+    def __ne__(self, other):
+        """
+        Not-equal-operator overload (required for Python 2).
+
+        :param other:
+            The other object to compare with.
+        :return:
+            ``True`` if any member differs, ``False`` otherwise.
+        """
+        equal = self.__eq__(other)
+        return equal if equal is NotImplemented else not equal
+
+    def __hash__(self):
+        """
+        Hash overload, consistent with the equal-operator.
+
+        :return: The hash value.
+        :rtype: int
+        """
+        return hash(self._key())
+
+    def __str__(self):
+        """
+        Pretty-print the calibration.
+
+        :return: Single line string representation of the calibration.
+        :rtype: str
+        """
+        return "{}: {} (ID {}), fullscale {} {}".format(
+            self.index, self.gas_description, self.gas_id, self.fullscale,
+            self.unit)
@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+# (c) Copyright 2020 Sensirion AG, Switzerland
+"""
+Host-side conversion of flow values between medium units.
+
+Instead of changing the user defined medium unit of the device (which is
+stored in non-volatile memory), values can be read with
+:py:attr:`~sensirion_shdlc_sfc5xxx.definitions.Sfc5xxxScaling.PHYSICAL`
+scaling and converted from the calibration unit to any other unit on the
+host:
+
+.. sourcecode:: python
+
+    unit = device.get_current_gas_unit()
+    response = device.read_measured_value_buffer(Sfc5xxxScaling.PHYSICAL,
+                                                 as_array=True)
+    sccm = Sfc5xxxMediumUnit.from_int(-3, 1, 4)
+    values = convert_medium_unit(response.values, unit, sccm)
+
+Gas volumes of the different standard liter units are converted with the
+ideal gas law, i.e. proportional to their reference temperature (all of
+them refer to 1013 hPa). Units which depend on the fullscale of the
+device (percent, permil and integer ticks) cannot be converted.
+"""
+
+from __future__ import absolute_import, division, print_function
+from numbers import Number
+from .units import Sfc5xxxUnit, Sfc5xxxUnitPrefix, Sfc5xxxUnitTimeBase
+
+import logging
+log = logging.getLogger(__name__)
+
+
+# Amount of gas of one liter in norm liters, based on the reference
+# temperatures [K] of the gas volume units.
+_GAS_VOLUMES = {
+    Sfc5xxxUnit.NORM_LITER: 1.0,
+    Sfc5xxxUnit.STANDARD_LITER: 273.15 / 293.15,  # 20°C
+    Sfc5xxxUnit.STANDARD_LITER_15C: 273.15 / 288.15,  # 15°C
+    Sfc5xxxUnit.STANDARD_LITER_25C: 273.15 / 298.15,  # 25°C
+    Sfc5xxxUnit.STANDARD_LITER_70F: 273.15 / 294.261,  # 70°F
+}
+
+# Quantity and factor to the base unit of that quantity for every unit
+# which can be converted.
+_BASE_UNITS = dict(
+    [(unit, ('gas volume', factor)) for unit, factor in _GAS_VOLUMES.items()]
+    + [
+        (Sfc5xxxUnit.LITER_LIQUI, ('liquid volume', 1.0)),
+        (Sfc5xxxUnit.GRAM, ('mass', 1.0)),
+        (Sfc5xxxUnit.PASCAL, ('pressure', 1.0)),
+        (Sfc5xxxUnit.BAR, ('pressure', 1e5)),
+        (Sfc5xxxUnit.METER_H2O, ('pressure', 9806.65)),
+        (Sfc5xxxUnit.INCH_H2O, ('pressure', 249.08891)),
+    ])
+
+# Duration [s] of the time bases.
+_TIMEBASES = {
+    Sfc5xxxUnitTimeBase.NONE: None,
+    Sfc5xxxUnitTimeBase.MICROSECOND: 1e-6,
+    Sfc5xxxUnitTimeBase.MILLISECOND: 1e-3,
+    Sfc5xxxUnitTimeBase.SECOND: 1.0,
+    Sfc5xxxUnitTimeBase.MINUTE: 60.0,
+    Sfc5xxxUnitTimeBase.HOUR: 3600.0,
+    Sfc5xxxUnitTimeBase.DAY: 86400.0,
+}
+
+# Cache for get_conversion_factor()
+_FACTORS = dict()
+
+
+def _get_base_factor(medium_unit):
+    """
+    Get the quantity of a medium unit and the factor to convert it to the
+    base unit of that quantity (e.g. norm liters per second).
+
+    :param ~sensirion_shdlc_sfc5xxx.units.Sfc5xxxMediumUnit medium_unit:
+        The medium unit.
+    :raises ValueError:
+        If the unit cannot be converted.
+    :return: The quantity and the factor.
+    :rtype: tuple, float
+    """
+    if medium_unit.prefix == Sfc5xxxUnitPrefix.UNDEFINED or \
+            medium_unit.unit not in _BASE_UNITS or \
+            medium_unit.timebase not in _TIMEBASES:
+        raise ValueError("Medium unit '{}' cannot be converted!".format(
+            medium_unit))
+    quantity, factor = _BASE_UNITS[medium_unit.unit]
+    factor *= 10.0 ** medium_unit.prefix.value
+    seconds = _TIMEBASES[medium_unit.timebase]
+    if seconds is not None:
+        factor /= seconds
+    return (quantity, seconds is not None), factor
+
+
+def get_conversion_factor(source, target):
+    """
+    Get the factor to convert values from one medium unit to another.
+
+    The factors are cached, so this function is cheap when called
+    repeatedly for the same units.
+
+    :param ~sensirion_shdlc_sfc5xxx.units.Sfc5xxxMediumUnit source:
+        The unit to convert from.
+    :param ~sensirion_shdlc_sfc5xxx.units.Sfc5xxxMediumUnit target:
+        The unit to convert to.
+    :raises ValueError:
+        If the units are undefined, depend on the device fullscale, or
+        describe different quantities (e.g. flow and volume).
+    :return: The factor to multiply values in the source unit with.
+    :rtype: float
+    """
+    key = (source.prefix, source.unit, source.timebase,
+           target.prefix, target.unit, target.timebase)
+    factor = _FACTORS.get(key)
+    if factor is None:
+        source_quantity, source_factor = _get_base_factor(source)
+        target_quantity, target_factor = _get_base_factor(target)
+        if source_quantity != target_quantity:
+            raise ValueError("Cannot convert '{}' to '{}'!".format(
+                source, target))
+        factor = _FACTORS.setdefault(key, source_factor / target_factor)
+    return factor
+
+
+def convert_medium_unit(values, source, target):
+    """
+    Convert values from one medium unit to another.
+
+    :param values:
+        The values to convert. Either a single number, a NumPy array (e.g.
+        from a buffer read with ``as_array=True``), or any other iterable of
+        numbers. NumPy arrays are converted with a single vectorized
+        multiplication.
+    :param ~sensirion_shdlc_sfc5xxx.units.Sfc5xxxMediumUnit source:
+        The unit of the passed values.
+    :param ~sensirion_shdlc_sfc5xxx.units.Sfc5xxxMediumUnit target:
+        The unit to convert to.
+    :raises ValueError:
+        If the units cannot be converted, see
+        :py:func:`~sensirion_shdlc_sfc5xxx.unit_conversion.get_conversion_factor`.
+    :return:
+        The converted values. A float for a single number, a new NumPy array
+        for a NumPy array, otherwise a list of floats.
+    :rtype:
+        float/numpy.ndarray/list(float)
+    """  # noqa: E501
+    factor = get_conversion_factor(source, target)
+    if isinstance(values, Number) or hasattr(values, '__array__'):
+        return values * factor
+    return [value * factor for value in values]
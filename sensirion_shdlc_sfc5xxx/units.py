@@ -66,10 +66,14 @@ class Sfc5xxxUnitPrefix(Enum):
         :rtype:
             ~sensirion_shdlc_sfc5xxx.units.Sfc5xxxUnitPrefix
         """
-        for item in Sfc5xxxUnitPrefix:
-            if item.value == value:
-                return item
-        raise ValueError("Invalid unit prefix value: {}!".format(value))
+        item = _UNIT_PREFIXES.get(value)
+        if item is None:
+            raise ValueError("Invalid unit prefix value: {}!".format(value))
+        return item
+
+
+# Lookup table for Sfc5xxxUnitPrefix.from_int()
+_UNIT_PREFIXES = dict((item.value, item) for item in Sfc5xxxUnitPrefix)
 
 
 class Sfc5xxxUnit(Enum):
@@ -142,10 +146,14 @@ class Sfc5xxxUnit(Enum):
         :rtype:
             ~sensirion_shdlc_sfc5xxx.units.Sfc5xxxUnit
         """
-        for item in Sfc5xxxUnit:
-            if item.value == value:
-                return item
-        raise ValueError("Invalid unit value: {}!".format(value))
+        item = _UNITS.get(value)
+        if item is None:
+            raise ValueError("Invalid unit value: {}!".format(value))
+        return item
+
+
+# Lookup table for Sfc5xxxUnit.from_int()
+_UNITS = dict((item.value, item) for item in Sfc5xxxUnit)
 
 
 class Sfc5xxxUnitTimeBase(Enum):
@@ -192,10 +200,14 @@ class Sfc5xxxUnitTimeBase(Enum):
         :rtype:
             ~sensirion_shdlc_sfc5xxx.units.Sfc5xxxUnitTimeBase
         """
-        for item in Sfc5xxxUnitTimeBase:
-            if item.value == value:
-                return item
-        raise ValueError("Invalid unit time base: {}!".format(value))
+        item = _UNIT_TIMEBASES.get(value)
+        if item is None:
+            raise ValueError("Invalid unit time base: {}!".format(value))
+        return item
+
+
+# Lookup table for Sfc5xxxUnitTimeBase.from_int()
+_UNIT_TIMEBASES = dict((item.value, item) for item in Sfc5xxxUnitTimeBase)
 
 
 class Sfc5xxxMediumUnit(object):
@@ -207,8 +219,16 @@ class Sfc5xxxMediumUnit(object):
       * Physical Unit (:py:class:`~sensirion_shdlc_sfc5xxx.units.Sfc5xxxUnit`)
       * Unit Timebase
         (:py:class:`~sensirion_shdlc_sfc5xxx.units.Sfc5xxxUnitTimeBase`)
+
+    Objects of this class are immutable. Units received from a device are
+    created with
+    :py:meth:`~sensirion_shdlc_sfc5xxx.units.Sfc5xxxMediumUnit.from_int`,
+    which returns the same object for the same unit every time. They are
+    hashable, so they can be used as dictionary keys.
     """
 
+    __slots__ = ('_prefix', '_unit', '_timebase')
+
     def __init__(self, prefix, unit, timebase):
         """
         Constructor.
@@ -221,15 +241,67 @@ class Sfc5xxxMediumUnit(object):
             The unit time base.
         """
         super(Sfc5xxxMediumUnit, self).__init__()
-        #: Unit prefix
-        #: (:py:class:`~sensirion_shdlc_sfc5xxx.units.Sfc5xxxUnitPrefix`).
-        self.prefix = prefix
-        #: Physical unit
-        #: (:py:class:`~sensirion_shdlc_sfc5xxx.units.Sfc5xxxUnit`).
-        self.unit = unit
-        #: Unit timebase
-        #: (:py:class:`~sensirion_shdlc_sfc5xxx.units.Sfc5xxxUnitTimeBase`).
-        self.timebase = timebase
+        self._prefix = prefix
+        self._unit = unit
+        self._timebase = timebase
+
+    @staticmethod
+    def from_int(prefix, unit, timebase):
+        """
+        Get the medium unit for given integer values as transmitted over
+        SHDLC.
+
+        The created objects are cached, so all calls with the same values
+        return the same (immutable) object.
+
+        :param int prefix:
+            The integer representation of the unit prefix.
+        :param int unit:
+            The integer representation of the unit.
+        :param int timebase:
+            The integer representation of the timebase.
+        :raises ValueError:
+            If any of the values is invalid.
+        :return:
+            The medium unit.
+        :rtype:
+            ~sensirion_shdlc_sfc5xxx.units.Sfc5xxxMediumUnit
+        """
+        key = (prefix, unit, timebase)
+        medium_unit = _MEDIUM_UNITS.get(key)
+        if medium_unit is None:
+            medium_unit = _MEDIUM_UNITS.setdefault(key, Sfc5xxxMediumUnit(
+                Sfc5xxxUnitPrefix.from_int(prefix),
+                Sfc5xxxUnit.from_int(unit),
+                Sfc5xxxUnitTimeBase.from_int(timebase)))
+        return medium_unit
+
+    @property
+    def prefix(self):
+        """
+        The unit prefix.
+
+        :type: ~sensirion_shdlc_sfc5xxx.units.Sfc5xxxUnitPrefix
+        """
+        return self._prefix
+
+    @property
+    def unit(self):
+        """
+        The physical unit.
+
+        :type: ~sensirion_shdlc_sfc5xxx.units.Sfc5xxxUnit
+        """
+        return self._unit
+
+    @property
+    def timebase(self):
+        """
+        The unit timebase.
+
+        :type: ~sensirion_shdlc_sfc5xxx.units.Sfc5xxxUnitTimeBase
+        """
+        return self._timebase
 
     def __str__(self):
         """
@@ -274,6 +346,34 @@ class Sfc5xxxMediumUnit(object):
         :return:
             ``True`` if both objects return the same unit, ``False`` otherwise.
         """
+        if not isinstance(other, Sfc5xxxMediumUnit):
+            return NotImplemented
         return (self.prefix == other.prefix) and \
                (self.unit == other.unit) and \
                (self.timebase == other.timebase)
+
+    def __ne__(self, other):
+        """
+        Not-equal-operator overload (required for Python 2).
+
+        :param other:
+            The other object to compare with.
+        :return:
+            ``True`` if both objects represent different units, ``False``
+            otherwise.
+        """
+        equal = self.__eq__(other)
+        return equal if equal is NotImplemented else not equal
+
+    def __hash__(self):
+        """
+        Hash overload, consistent with the equal-operator.
+
+        :return: The hash value.
+        :rtype: int
+        """
+        return hash((self._prefix, self._unit, self._timebase))
+
+
+# Cache for Sfc5xxxMediumUnit.from_int()
+_MEDIUM_UNITS = dict()
@@ -41,6 +41,9 @@ setup(
         'enum34;python_version<"3.4"',
     ],
     extras_require={
+        'numpy': [
+            'numpy',
+        ],
         'test': [
             'flake8~=3.6.0',
             'mock~=3.0.0',
@@ -0,0 +1,25 @@
+# -*- coding: utf-8 -*-
+# (c) Copyright 2020 Sensirion AG, Switzerland
+
+from __future__ import absolute_import, division, print_function
+from sensirion_shdlc_sfc5xxx import Sfc5xxxSimulatedDevice, \
+    Sfc5xxxSimulatorPort
+import pytest
+
+
+@pytest.fixture
+def simulator_port(request):
+    """
+    Fixture to get a simulator port which records the sent requests, with
+    one simulated device at slave address 0.
+
+    The number of devices can be changed by indirect parametrization, e.g.
+    ``@pytest.mark.parametrize('simulator_port', [2], indirect=True)``. The
+    devices get the slave addresses 0, 1, ... and the serial numbers
+    "21100123", "21100124", ...
+    """
+    port = Sfc5xxxSimulatorPort(record_requests=True)
+    for address in range(getattr(request, 'param', 1)):
+        port.add_device(Sfc5xxxSimulatedDevice(
+            slave_address=address, serial_number=str(21100123 + address)))
+    return port
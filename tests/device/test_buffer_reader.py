@@ -0,0 +1,32 @@
+# -*- coding: utf-8 -*-
+# (c) Copyright 2020 Sensirion AG, Switzerland
+
+from __future__ import absolute_import, division, print_function
+from sensirion_shdlc_sfc5xxx import Sfc5xxxScaling, Sfc5xxxBufferReader
+import pytest
+import time
+
+
+@pytest.mark.needs_device
+def test(device):
+    """
+    Test if Sfc5xxxBufferReader continuously reads timestamped values without
+    losing any of them.
+    """
+    with Sfc5xxxBufferReader(device, Sfc5xxxScaling.NORMALIZED) as reader:
+        assert reader.is_running is True
+        time.sleep(2.0)
+        timestamps, values, index = reader.read()
+        assert reader.last_error is None
+    assert reader.is_running is False
+    assert reader.lost_values == 0
+    assert reader.read_count >= 1
+    assert reader.sampling_time > 0.0
+    assert index == reader.count
+    assert len(values) == len(timestamps) == index
+    assert len(values) > 0
+    for previous, current in zip(timestamps, timestamps[1:]):
+        assert current == pytest.approx(previous + reader.sampling_time)
+    timestamps, values, next_index = reader.read(index)
+    assert len(values) == len(timestamps) == 0
+    assert next_index == index
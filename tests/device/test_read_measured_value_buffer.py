@@ -47,3 +47,23 @@ def test_explicit_max_reads(device, scaling):
     assert result.remaining_values >= 0
     assert result.sampling_time >= 0.0
     assert len(result.values) >= 0
+
+
+@pytest.mark.needs_device
+@pytest.mark.parametrize("scaling", [
+    (Sfc5xxxScaling.NORMALIZED),
+    (Sfc5xxxScaling.PHYSICAL),
+    (Sfc5xxxScaling.USER_DEFINED),
+])
+def test_as_array(device, scaling):
+    """
+    Test read_measured_value_buffer() with passing the "as_array" parameter.
+    """
+    numpy = pytest.importorskip("numpy")
+    result = device.read_measured_value_buffer(scaling, as_array=True)
+    assert type(result) is Sfc5xxxReadBufferResponse
+    assert result.scaling == scaling
+    assert result.read_count >= 1
+    assert type(result.values) is numpy.ndarray
+    assert result.values.dtype == numpy.float32
+    assert result.values.ndim == 1
@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+# (c) Copyright 2020 Sensirion AG, Switzerland
+
+from __future__ import absolute_import, division, print_function
+from sensirion_shdlc_sfc5xxx import Sfc5xxxScaling
+from sensirion_shdlc_sfc5xxx.types import Sfc5xxxReadBufferResponse
+import pytest
+
+
+@pytest.mark.needs_device
+@pytest.mark.parametrize("scaling", [
+    (Sfc5xxxScaling.NORMALIZED),
+    (Sfc5xxxScaling.PHYSICAL),
+    (Sfc5xxxScaling.USER_DEFINED),
+])
+def test_default_max_reads(device, scaling):
+    """
+    Test stream_measured_value_buffer() without passing the "max_reads"
+    parameter.
+    """
+    frames = list(device.stream_measured_value_buffer(scaling))
+    assert len(frames) >= 1
+    for i, frame in enumerate(frames):
+        assert type(frame) is Sfc5xxxReadBufferResponse
+        assert frame.scaling == scaling
+        assert frame.read_count == i + 1
+        assert frame.lost_values >= 0
+        assert frame.remaining_values >= 0
+        assert frame.sampling_time >= 0.0
+        assert 0 <= len(frame.values) <= 60
+    assert frames[-1].remaining_values == 0
+
+
+@pytest.mark.needs_device
+@pytest.mark.parametrize("scaling", [
+    (Sfc5xxxScaling.NORMALIZED),
+    (Sfc5xxxScaling.PHYSICAL),
+    (Sfc5xxxScaling.USER_DEFINED),
+])
+def test_explicit_max_reads(device, scaling):
+    """
+    Test stream_measured_value_buffer() with passing the "max_reads"
+    parameter.
+    """
+    frames = list(device.stream_measured_value_buffer(scaling, 1))
+    assert len(frames) == 1
+    assert frames[0].read_count == 1
+    assert frames[0].lost_values >= 0
+    assert 0 <= len(frames[0].values) <= 60
@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+# (c) Copyright 2020 Sensirion AG, Switzerland
+
+from __future__ import absolute_import, division, print_function
+from sensirion_shdlc_driver import ShdlcConnection
+from sensirion_shdlc_driver.port import ShdlcPort
+from sensirion_shdlc_sfc5xxx import Sfc5xxxShdlcDevice, Sfc5xxxScaling
+from sensirion_shdlc_sfc5xxx.array_commands import \
+    Sfc5xxxCmdReadMeasuredValueBufferArray
+from struct import pack
+import pytest
+
+numpy = pytest.importorskip('numpy')
+
+
+def _frame(values, remaining_values, lost_values=0):
+    return pack(">IIf", lost_values, remaining_values, 0.01) + \
+        pack(">{}f".format(len(values)), *values)
+
+
+class BufferPort(ShdlcPort):
+    """
+    Port which answers every "read buffer" request with the next of the given
+    frames, repeating them endlessly.
+    """
+
+    def __init__(self, frames):
+        super(BufferPort, self).__init__()
+        self._frames = frames
+        self._index = 0
+
+    @property
+    def description(self):
+        return "BufferPort"
+
+    def transceive(self, slave_address, command_id, data, response_timeout):
+        frame = self._frames[self._index % len(self._frames)]
+        self._index += 1
+        return slave_address, command_id, 0, frame
+
+
+@pytest.fixture
+def values():
+    return [0.25 * i for i in range(90)]
+
+
+@pytest.fixture
+def device(values):
+    port = BufferPort([_frame(values[:60], 30, lost_values=2),
+                       _frame(values[60:], 0)])
+    return Sfc5xxxShdlcDevice(ShdlcConnection(port), 0)
+
+
+def test_interpret_response():
+    """
+    Test if the raw response is decoded to a read-only big-endian array.
+    """
+    lost, remaining, sampling_time, values = \
+        Sfc5xxxCmdReadMeasuredValueBufferArray.interpret_response(
+            _frame([0.5, -1.0, 2.25], 5, lost_values=3))
+    assert (lost, remaining) == (3, 5)
+    assert sampling_time == pytest.approx(0.01)
+    assert values.dtype == numpy.dtype('>f4')
+    assert values.tolist() == [0.5, -1.0, 2.25]
+    assert not values.flags.writeable
+    empty = Sfc5xxxCmdReadMeasuredValueBufferArray.interpret_response(
+        _frame([], 0))[3]
+    assert len(empty) == 0
+
+
+def test_read_buffer_as_array(device, values):
+    """
+    Test if reading several frames as array returns the same values as
+    reading them as list.
+    """
+    expected = device.read_measured_value_buffer(Sfc5xxxScaling.NORMALIZED)
+    response = device.read_measured_value_buffer(Sfc5xxxScaling.NORMALIZED,
+                                                 as_array=True)
+    assert list(expected.values) == values
+    assert response.read_count == expected.read_count == 2
+    assert response.lost_values == expected.lost_values == 2
+    assert response.remaining_values == 0
+    assert response.values.dtype == numpy.float32
+    assert response.values.dtype.isnative
+    assert response.values.flags.c_contiguous
+    assert response.values.tolist() == values
+
+
+def test_stream_buffer_as_array(device, values):
+    """
+    Test if every streamed frame is an array with the values of the frame.
+    """
+    frames = list(device.stream_measured_value_buffer(
+        Sfc5xxxScaling.NORMALIZED, as_array=True))
+    assert [f.values.tolist() for f in frames] == [values[:60], values[60:]]
+    assert all(isinstance(f.values, numpy.ndarray) for f in frames)
+
+
+def test_concatenate_arrays():
+    """
+    Test if frames are concatenated in order and converted to native
+    float32, also if some frames are empty.
+    """
+    chunks = [numpy.array([1.0, 2.0], dtype='>f4'),
+              numpy.array([], dtype='>f4'),
+              numpy.array([3.5], dtype='>f4')]
+    values = Sfc5xxxShdlcDevice._concatenate_arrays(chunks)
+    assert values.dtype == numpy.float32
+    assert values.dtype.isnative
+    assert values.tolist() == [1.0, 2.0, 3.5]
+    assert len(Sfc5xxxShdlcDevice._concatenate_arrays([])) == 0
@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+# (c) Copyright 2020 Sensirion AG, Switzerland
+
+from __future__ import absolute_import, division, print_function
+from sensirion_shdlc_sfc5xxx import Sfc5xxxScaling
+from struct import pack
+import threading
+import time
+import pytest
+
+asyncio = pytest.importorskip("asyncio")
+
+
+class FakeConnection(object):
+    """
+    Connection which returns fixed responses and records the executing
+    threads.
+    """
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+
+    def execute(self, slave_address, command):
+        with self.lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(self.delay)
+        with self.lock:
+            self.active -= 1
+        if command.id == 0x08:  # read measured value
+            data = pack(">f", 1.5)
+        elif command.id == 0x09:  # read measured value buffer
+            data = pack(">IIf", 0, 0, 0.01) + pack(">3f", 1.0, 2.0, 3.0)
+        else:
+            data = b""
+        return command.interpret_response(data), False
+
+
+def _run(factory):
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    try:
+        return loop.run_until_complete(factory())
+    finally:
+        asyncio.set_event_loop(None)
+        loop.close()
+
+
+def test_methods():
+    """
+    Test if all methods of the synchronous device are available as
+    coroutines.
+    """
+    from sensirion_shdlc_sfc5xxx import AsyncSfc5xxxShdlcDevice
+    from sensirion_shdlc_sfc5xxx.device import Sfc5xxxShdlcDevice
+    device = AsyncSfc5xxxShdlcDevice(FakeConnection(), 3)
+    assert device.slave_address == 3
+    assert isinstance(device.device, Sfc5xxxShdlcDevice)
+    for name in ["get_serial_number", "read_measured_value_buffer",
+                 "update_firmware", "get_calibration_fullscale"]:
+        assert asyncio.iscoroutinefunction(getattr(device, name))
+        assert getattr(device, name).__doc__ == \
+            getattr(Sfc5xxxShdlcDevice, name).__doc__
+    result = _run(lambda: device.read_measured_value(
+        Sfc5xxxScaling.PHYSICAL))
+    assert result == 1.5
+    result = _run(lambda: device.read_measured_value_buffer(
+        Sfc5xxxScaling.PHYSICAL))
+    assert result.values == (1.0, 2.0, 3.0)
+
+
+def test_stream():
+    """
+    Test if the flow value buffer can be streamed asynchronously.
+    """
+    from sensirion_shdlc_sfc5xxx import AsyncSfc5xxxShdlcDevice
+    device = AsyncSfc5xxxShdlcDevice(FakeConnection(), 0)
+    iterator = device.stream_measured_value_buffer(Sfc5xxxScaling.PHYSICAL)
+    assert iterator.__aiter__() is iterator
+    frame = _run(iterator.__anext__)
+    assert frame.values == (1.0, 2.0, 3.0)
+    with pytest.raises(StopAsyncIteration):
+        _run(iterator.__anext__)
+
+
+def test_serialization():
+    """
+    Test if commands on the same connection are serialized, while commands
+    on different connections are executed concurrently.
+    """
+    from sensirion_shdlc_sfc5xxx import AsyncSfc5xxxShdlcDevice
+    connections = [FakeConnection(0.05), FakeConnection(0.05)]
+    devices = [AsyncSfc5xxxShdlcDevice(connection, address)
+               for connection in connections for address in range(3)]
+    start = time.time()
+    results = _run(lambda: asyncio.gather(*[
+        device.read_measured_value(Sfc5xxxScaling.PHYSICAL)
+        for device in devices]))
+    duration = time.time() - start
+    assert results == [1.5] * 6
+    assert [c.max_active for c in connections] == [1, 1]
+    assert duration < 0.25
+
+
+def test_successive_loops():
+    """
+    Test if a connection can be used from successive event loops, also when
+    the commands have to wait for each other.
+    """
+    from sensirion_shdlc_sfc5xxx import AsyncSfc5xxxShdlcDevice
+    connection = FakeConnection(0.01)
+    devices = [AsyncSfc5xxxShdlcDevice(connection, address)
+               for address in range(2)]
+    for _ in range(2):
+        results = _run(lambda: asyncio.gather(*[
+            device.read_measured_value(Sfc5xxxScaling.PHYSICAL)
+            for device in devices]))
+        assert results == [1.5, 1.5]
+    assert connection.max_active == 1
+
+
+def test_cancel():
+    """
+    Test if the connection stays locked until a cancelled command has
+    finished.
+    """
+    from sensirion_shdlc_sfc5xxx import AsyncSfc5xxxShdlcDevice
+    connection = FakeConnection(0.1)
+    devices = [AsyncSfc5xxxShdlcDevice(connection, address)
+               for address in range(2)]
+
+    async def cancel_first():
+        first = asyncio.ensure_future(
+            devices[0].read_measured_value(Sfc5xxxScaling.PHYSICAL))
+        await asyncio.sleep(0.02)
+        first.cancel()
+        result = await devices[1].read_measured_value(
+            Sfc5xxxScaling.PHYSICAL)
+        return first.cancelled(), result
+
+    assert _run(cancel_first) == (True, 1.5)
+    assert connection.max_active == 1
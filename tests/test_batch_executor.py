@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+# (c) Copyright 2020 Sensirion AG, Switzerland
+
+from __future__ import absolute_import, division, print_function
+from sensirion_shdlc_driver import ShdlcConnection
+from sensirion_shdlc_sfc5xxx import Sfc5xxxShdlcDevice, \
+    Sfc5xxxSimulatorPort, Sfc5xxxBatchExecutor, Sfc5xxxMetrics
+from sensirion_shdlc_sfc5xxx.commands import Sfc5xxxCmdDeviceReset, \
+    Sfc5xxxCmdGetSerialNumber, Sfc5xxxCmdActivateCalibration
+from sensirion_shdlc_sfc5xxx.device_errors import \
+    Sfc5xxxInvalidCalibrationIndexError
+import pytest
+import time
+
+
+pytestmark = pytest.mark.parametrize('simulator_port', [2], indirect=True)
+
+
+@pytest.fixture
+def devices(simulator_port):
+    connection = ShdlcConnection(simulator_port)
+    return [Sfc5xxxShdlcDevice(connection, i) for i in range(2)]
+
+
+def test_execute(devices):
+    """
+    Test if the results are returned in the order the commands were added.
+    """
+    batch = Sfc5xxxBatchExecutor(devices[0].connection)
+    for device in devices:
+        batch.add(device, Sfc5xxxCmdGetSerialNumber())
+    assert len(batch) == 2
+    assert batch.execute() == ["21100123", "21100124"]
+    assert len(batch) == 0
+
+
+def test_post_processing_overlap(devices, simulator_port):
+    """
+    Test if commands for other devices are sent while a device is busy with
+    post processing, but the order of each device is kept.
+    """
+    batch = Sfc5xxxBatchExecutor(devices[0].connection)
+    batch.add(devices[0], Sfc5xxxCmdDeviceReset())
+    batch.add(devices[0], Sfc5xxxCmdGetSerialNumber())
+    batch.add(devices[1], Sfc5xxxCmdGetSerialNumber())
+    batch.add(devices[1], Sfc5xxxCmdGetSerialNumber())
+    assert batch.execute() == [None, "21100123", "21100124", "21100124"]
+    assert simulator_port.requests == \
+        [(0, 0xD3), (1, 0xD0), (1, 0xD0), (0, 0xD0)]
+
+
+def test_errors(devices):
+    """
+    Test if device errors are raised or returned.
+    """
+    batch = Sfc5xxxBatchExecutor(devices[0].connection)
+    batch.add(devices[0], Sfc5xxxCmdActivateCalibration(10))
+    batch.add(devices[1], Sfc5xxxCmdGetSerialNumber())
+    results = batch.execute(raise_errors=False)
+    assert isinstance(results[0], Sfc5xxxInvalidCalibrationIndexError)
+    assert results[1] == "21100124"
+    batch.add(devices[0], Sfc5xxxCmdActivateCalibration(10))
+    with pytest.raises(Sfc5xxxInvalidCalibrationIndexError):
+        batch.execute()
+    other = Sfc5xxxShdlcDevice(ShdlcConnection(Sfc5xxxSimulatorPort()), 0)
+    with pytest.raises(ValueError):
+        batch.add(other, Sfc5xxxCmdGetSerialNumber())
+    assert devices[0].get_serial_number() == "21100123"
+
+
+def test_error_post_processing(devices):
+    """
+    Test if the post processing of sent commands is waited for also if a
+    later command of the batch raises an error.
+    """
+    batch = Sfc5xxxBatchExecutor(devices[0].connection)
+    batch.add(devices[0], Sfc5xxxCmdDeviceReset())
+    batch.add(devices[1], Sfc5xxxCmdActivateCalibration(10))
+    start = time.time()
+    with pytest.raises(Sfc5xxxInvalidCalibrationIndexError):
+        batch.execute()
+    assert time.time() - start >= 0.45  # Reset takes 0.5 s
+
+
+def test_metrics(devices):
+    """
+    Test if the commands are recorded in the metrics of the devices.
+    """
+    metrics = Sfc5xxxMetrics()
+    devices[1].metrics = metrics
+    batch = Sfc5xxxBatchExecutor(devices[0].connection)
+    for device in devices:
+        batch.add(device, Sfc5xxxCmdGetSerialNumber())
+    assert batch.execute() == ["21100123", "21100124"]
+    commands = metrics.snapshot()['commands']
+    assert commands['Sfc5xxxCmdGetSerialNumber']['count'] == 1
@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+# (c) Copyright 2020 Sensirion AG, Switzerland
+
+from __future__ import absolute_import, division, print_function
+from sensirion_shdlc_driver import ShdlcConnection
+from sensirion_shdlc_sfc5xxx import Sfc5xxxShdlcDevice, Sfc5xxxScaling, \
+    Sfc5xxxSimulatedDevice, Sfc5xxxSimulatorPort, Sfc5xxxBufferReader
+from sensirion_shdlc_sfc5xxx.types import Sfc5xxxReadBufferResponse
+import pytest
+import time
+
+
+def response(values, lost_values=0, remaining_values=0):
+    return Sfc5xxxReadBufferResponse(Sfc5xxxScaling.NORMALIZED, 1,
+                                     lost_values, remaining_values, 0.01,
+                                     values)
+
+
+@pytest.fixture
+def reader():
+    # The responses are passed to _process() with the times of a fake clock,
+    # so the device is never used.
+    return Sfc5xxxBufferReader(None, Sfc5xxxScaling.NORMALIZED, capacity=64)
+
+
+def test_ring_wrap_around():
+    """
+    Test if the oldest samples are overwritten when the ring is full.
+    """
+    reader = Sfc5xxxBufferReader(None, Sfc5xxxScaling.NORMALIZED,
+                                 capacity=16)
+    for i in range(3):
+        reader._process(response([float(10 * i + j) for j in range(10)]),
+                        100.0 + 0.1 * i)
+    assert reader.count == 30
+    timestamps, values, index = reader.read()
+    assert index == 30
+    # The oldest slot might be overwritten while reading, thus it is skipped
+    assert values == [float(i) for i in range(15, 30)]
+    assert timestamps == pytest.approx([99.91 + 0.01 * i
+                                        for i in range(15, 30)])
+    assert reader.read(25)[1] == [float(i) for i in range(25, 30)]
+    assert reader.read(5)[1] == values  # Overwritten samples are skipped
+    assert reader.read(30) == ([], [], 30)
+
+
+def test_lost_values(reader):
+    """
+    Test if lost values are counted and skipped in the timestamps.
+    """
+    reader._process(response([0.0] * 10), 100.0)
+    reader._process(response([1.0] * 10, lost_values=5), 100.15)
+    reader._process(response([]), 100.2)
+    assert reader.lost_values == 5
+    assert reader.read_count == 3
+    assert reader.sampling_time == 0.01
+    timestamps = reader.read()[0]
+    assert timestamps[9] == pytest.approx(100.0)
+    assert timestamps[10] == pytest.approx(100.06)
+
+
+def test_timestamp_continuation(reader):
+    """
+    Test if the timestamps continue the previous ones despite jitter of the
+    receive time, considering the values remaining in the device.
+    """
+    calls = []
+    reader._callback = lambda r, t: calls.append(t)
+    reader._process(response([0.0] * 5, remaining_values=5), 100.0)
+    reader._process(response([1.0] * 5), 100.003)  # 3 ms jitter
+    reader._process(response([]), 100.1)
+    timestamps = reader.read()[0]
+    assert timestamps == pytest.approx([99.91 + 0.01 * i for i in range(10)])
+    assert calls == [pytest.approx(99.91), pytest.approx(99.96), None]
+
+
+def test_timestamp_resync(reader):
+    """
+    Test if the timestamps are resynchronized to the receive time if they
+    drifted away too far, also backwards.
+    """
+    reader._process(response([0.0] * 5), 100.0)
+    reader._process(response([1.0] * 5), 101.0)
+    reader._process(response([2.0] * 5), 100.5)
+    timestamps = reader.read()[0]
+    assert timestamps[5] == pytest.approx(100.96)
+    assert timestamps[10] == pytest.approx(100.46)
+
+
+def test_thread():
+    """
+    Test if the reader thread reads the buffer of a simulated device.
+    """
+    port = Sfc5xxxSimulatorPort()
+    port.add_device(Sfc5xxxSimulatedDevice(slave_address=0))
+    device = Sfc5xxxShdlcDevice(ShdlcConnection(port), 0)
+    time.sleep(0.1)  # Let the buffer fill
+    with Sfc5xxxBufferReader(device, Sfc5xxxScaling.NORMALIZED) as reader:
+        assert reader.is_running
+        time.sleep(0.2)
+    assert not reader.is_running
+    assert reader.last_error is None
+    timestamps, values, index = reader.read()
+    assert index == reader.count > 0
+    assert timestamps == sorted(timestamps)
+    with pytest.raises(ValueError):
+        Sfc5xxxBufferReader(device, Sfc5xxxScaling.NORMALIZED, capacity=0)
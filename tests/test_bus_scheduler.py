@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+# (c) Copyright 2020 Sensirion AG, Switzerland
+
+from __future__ import absolute_import, division, print_function
+from sensirion_shdlc_sfc5xxx import Sfc5xxxScaling
+from sensirion_shdlc_sfc5xxx.bus_scheduler import Sfc5xxxBusScheduler, \
+    Sfc5xxxJobPriority
+from sensirion_shdlc_sfc5xxx._clock import monotonic_time
+from sensirion_shdlc_sfc5xxx.types import Sfc5xxxReadBufferResponse
+import pytest
+import time
+
+
+class FakeDevice(object):
+    def __init__(self, slave_address):
+        self.slave_address = slave_address
+
+    def read_measured_value_buffer(self, scaling):
+        return Sfc5xxxReadBufferResponse(scaling, 1, 0, 0, 0.01, [0.0] * 60)
+
+
+def test_priority():
+    """
+    Test if jobs with higher priority are executed first.
+    """
+    scheduler = Sfc5xxxBusScheduler()
+    device = FakeDevice(0)
+    executed = []
+    scheduler.submit(device, lambda d: executed.append("low"),
+                     priority=Sfc5xxxJobPriority.LOW)
+    scheduler.submit(device, lambda d: executed.append("normal"),
+                     priority=Sfc5xxxJobPriority.NORMAL)
+    scheduler.submit(device, lambda d: executed.append("high"))
+    while scheduler.run_once():
+        pass
+    assert executed == ["high", "normal", "low"]
+    assert len(scheduler.jobs) == 0
+
+
+def test_fairness():
+    """
+    Test if jobs of the same priority are distributed fairly across devices.
+    """
+    scheduler = Sfc5xxxBusScheduler()
+    devices = [FakeDevice(i) for i in range(3)]
+    executed = []
+    for device in devices:
+        for i in range(2):
+            scheduler.submit(device, lambda d: executed.append(d),
+                             priority=Sfc5xxxJobPriority.NORMAL)
+    while scheduler.run_once():
+        pass
+    assert executed == devices + devices
+
+
+def test_periodic():
+    """
+    Test if periodic jobs are rescheduled and report their rate.
+    """
+    scheduler = Sfc5xxxBusScheduler()
+    device = FakeDevice(3)
+    results = []
+    job = scheduler.add_periodic(
+        device, lambda d: 42, 0.02,
+        callback=lambda job, result, error: results.append((result, error)))
+    assert scheduler.run_once() is True
+    assert scheduler.run_once() is False  # not due yet
+    assert scheduler.run_once(timeout=1.0) is True
+    assert results == [(42, None), (42, None)]
+    assert job.executions == 2
+    assert job.errors == 0
+    assert job.rate == pytest.approx(50.0, rel=0.5)
+    assert list(scheduler.get_rates().keys()) == [3]
+    scheduler.remove(job)
+    assert len(scheduler.jobs) == 0
+    with pytest.raises(ValueError):
+        scheduler.add_periodic(device, lambda d: None, 0.0)
+
+
+def test_error():
+    """
+    Test if exceptions raised by jobs are reported to the callback.
+    """
+    scheduler = Sfc5xxxBusScheduler()
+    errors = []
+
+    def fail(device):
+        raise IOError("failed")
+
+    job = scheduler.submit(FakeDevice(0), fail,
+                           callback=lambda j, r, e: errors.append(e))
+    assert scheduler.run_once() is True
+    assert job.errors == 1
+    assert type(errors[0]) is IOError
+
+
+def test_callback_error():
+    """
+    Test if exceptions raised by callbacks don't stop the scheduler.
+    """
+    scheduler = Sfc5xxxBusScheduler()
+    executed = []
+
+    def fail(job, result, error):
+        raise ValueError("callback failed")
+
+    scheduler.add_periodic(FakeDevice(0), lambda d: executed.append(d), 0.01,
+                           callback=fail)
+    with scheduler:
+        time.sleep(0.1)
+        assert scheduler.is_running
+    assert len(executed) > 1
+
+
+def test_buffer_reader():
+    """
+    Test if buffer read jobs are scheduled by the poll scheduler.
+    """
+    scheduler = Sfc5xxxBusScheduler()
+    responses = []
+    job = scheduler.add_buffer_reader(
+        FakeDevice(0), Sfc5xxxScaling.PHYSICAL,
+        callback=lambda j, r, e: responses.append(r))
+    assert job.priority == Sfc5xxxJobPriority.LOW
+    assert scheduler.run_once() is True
+    assert len(responses[0].values) == 60
+    assert job.due_time == pytest.approx(monotonic_time() + 0.6, abs=0.1)
+
+
+def test_thread():
+    """
+    Test if the scheduler thread executes submitted jobs.
+    """
+    executed = []
+    with Sfc5xxxBusScheduler() as scheduler:
+        assert scheduler.is_running is True
+        scheduler.submit(FakeDevice(0), lambda d: executed.append(d))
+        for i in range(100):
+            if executed:
+                break
+            time.sleep(0.01)
+    assert scheduler.is_running is False
+    assert len(executed) == 1
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+# (c) Copyright 2020 Sensirion AG, Switzerland
+
+from __future__ import absolute_import, division, print_function
+from sensirion_shdlc_driver import ShdlcConnection
+from sensirion_shdlc_sfc5xxx import Sfc5xxxCachedShdlcDevice, \
+    Sfc5xxxMediumUnit
+import pytest
+
+
+def test_identity_cached(simulator_port):
+    """
+    Test if identity information is read only once.
+    """
+    device = Sfc5xxxCachedShdlcDevice(ShdlcConnection(simulator_port), 0)
+    for _ in range(3):
+        assert device.get_serial_number() == "21100123"
+        assert device.get_product_type(as_int=True) == 0x20000
+        device.get_version()
+    assert len(simulator_port.requests) == 3
+
+
+def test_identity_persisted(simulator_port, tmpdir):
+    """
+    Test if identity information is loaded from the cache file without any
+    communication if the serial number is known.
+    """
+    path = str(tmpdir.join("cache.json"))
+    device = Sfc5xxxCachedShdlcDevice(ShdlcConnection(simulator_port), 0,
+                                      cache_file=path)
+    name = device.get_product_name()
+    version = device.get_version()
+    # serial number is the cache key
+    assert simulator_port.requests[0] == (0, 0xD0)
+    simulator_port.clear_requests()
+    device = Sfc5xxxCachedShdlcDevice(ShdlcConnection(simulator_port), 0,
+                                      cache_file=path,
+                                      serial_number="21100123")
+    assert device.get_product_name() == name
+    assert device.get_version().firmware.minor == version.firmware.minor
+    assert device.get_serial_number() == "21100123"
+    assert simulator_port.requests == []
+    device = Sfc5xxxCachedShdlcDevice(ShdlcConnection(simulator_port), 0,
+                                      cache_file=path)
+    assert device.get_product_name() == name
+    assert simulator_port.requests == [(0, 0xD0)]  # only the serial number
+
+
+def test_state_invalidation(simulator_port):
+    """
+    Test if calibration and unit information is invalidated by the
+    corresponding setters.
+    """
+    device = Sfc5xxxCachedShdlcDevice(ShdlcConnection(simulator_port), 0)
+    assert device.get_current_gas_description() == "N2"
+    assert device.get_current_fullscale() == 20.0
+    count = len(simulator_port.requests)
+    device.get_current_gas_description()
+    device.get_current_fullscale()
+    assert len(simulator_port.requests) == count
+    device.activate_calibration(2)
+    assert device.get_current_gas_description() == "Ar"
+    assert device.get_current_fullscale() == 5000.0
+    device.set_user_defined_medium_unit(Sfc5xxxMediumUnit.from_int(-3, 1, 4))
+    assert device.get_user_defined_fullscale() == pytest.approx(5000.0)
+    device.set_user_defined_medium_unit(Sfc5xxxMediumUnit.from_int(0, 1, 4))
+    assert device.get_user_defined_fullscale() == pytest.approx(5.0)
+    device.device_reset()
+    count = len(simulator_port.requests)
+    device.get_current_gas_unit()
+    assert len(simulator_port.requests) == count + 1
@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+# (c) Copyright 2020 Sensirion AG, Switzerland
+
+from __future__ import absolute_import, division, print_function
+from sensirion_shdlc_driver import ShdlcConnection
+from sensirion_shdlc_sfc5xxx import Sfc5xxxShdlcDevice, \
+    Sfc5xxxCalibrationCache
+import pytest
+
+
+@pytest.fixture
+def device(simulator_port):
+    return Sfc5xxxShdlcDevice(ShdlcConnection(simulator_port), 0)
+
+
+def test_read_calibration_catalog(device):
+    """
+    Test if all valid calibrations are read without a cache.
+    """
+    calibrations = device.read_calibration_catalog()
+    assert [c.index for c in calibrations] == [0, 1, 2, 3]
+    assert calibrations[2].gas_description == "Ar"
+    assert str(calibrations[3].unit) == "sccm"
+    assert calibrations[0].fullscale == 20.0
+    assert calibrations[0].initial_conditions.company == "Sensirion"
+
+
+def test_read_calibration_catalog_cached(device, simulator_port, tmpdir):
+    """
+    Test if a cached catalog is equal to the one read from the device and
+    is loaded by reading only the serial number.
+    """
+    cache = Sfc5xxxCalibrationCache(str(tmpdir))
+    calibrations = device.read_calibration_catalog(cache=cache)
+    assert tmpdir.join("21100123.json").check()
+    simulator_port.clear_requests()
+    assert device.read_calibration_catalog(cache=cache) == calibrations
+    assert simulator_port.requests == [(0, 0xD0)]  # get serial number
+    assert Sfc5xxxCalibrationCache(str(tmpdir)).load("21100123") == \
+        calibrations
+    simulator_port.clear_requests()
+    device.read_calibration_catalog(cache=cache, refresh=True)
+    assert len(simulator_port.requests) > 1
+
+
+def test_calibration_cache_invalid(tmpdir):
+    """
+    Test if missing and invalid cache files are ignored, and if the cache
+    can be cleared.
+    """
+    cache = Sfc5xxxCalibrationCache(str(tmpdir.join("sub")))
+    assert cache.load("123") is None
+    cache.store("123", [])
+    assert cache.load("123") == []
+    tmpdir.join("sub", "123.json").write("{")
+    assert cache.load("123") is None
+    cache.store("456", [])
+    cache.clear()
+    assert cache.load("456") is None
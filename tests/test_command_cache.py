@@ -0,0 +1,32 @@
+# -*- coding: utf-8 -*-
+# (c) Copyright 2020 Sensirion AG, Switzerland
+
+from __future__ import absolute_import, division, print_function
+from sensirion_shdlc_sfc5xxx import Sfc5xxxScaling
+from sensirion_shdlc_sfc5xxx.commands import Sfc5xxxCmdReadMeasuredValue, \
+    Sfc5xxxCmdGetSerialNumber
+from sensirion_shdlc_sfc5xxx.device import _get_command
+
+
+def test_same_arguments():
+    """
+    Test if the same command object is returned for the same arguments.
+    """
+    cmd = _get_command(Sfc5xxxCmdGetSerialNumber)
+    assert _get_command(Sfc5xxxCmdGetSerialNumber) is cmd
+    cmd = _get_command(Sfc5xxxCmdReadMeasuredValue,
+                       int(Sfc5xxxScaling.PHYSICAL))
+    assert _get_command(Sfc5xxxCmdReadMeasuredValue,
+                        int(Sfc5xxxScaling.PHYSICAL)) is cmd
+
+
+def test_different_arguments():
+    """
+    Test if different arguments result in different command objects.
+    """
+    normalized = _get_command(Sfc5xxxCmdReadMeasuredValue,
+                              int(Sfc5xxxScaling.NORMALIZED))
+    physical = _get_command(Sfc5xxxCmdReadMeasuredValue,
+                            int(Sfc5xxxScaling.PHYSICAL))
+    assert normalized.data == b"\x00"
+    assert physical.data == b"\x01"
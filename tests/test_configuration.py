@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+# (c) Copyright 2020 Sensirion AG, Switzerland
+
+from __future__ import absolute_import, division, print_function
+from sensirion_shdlc_driver import ShdlcConnection
+from sensirion_shdlc_sfc5xxx import Sfc5xxxShdlcDevice, \
+    Sfc5xxxSimulatedDevice, Sfc5xxxSimulatorPort, Sfc5xxxConfiguration, \
+    Sfc5xxxMediumUnit, Sfc5xxxValveInputSource
+import json
+import pytest
+
+
+@pytest.fixture
+def device():
+    port = Sfc5xxxSimulatorPort()
+    port.add_device(Sfc5xxxSimulatedDevice())
+    return Sfc5xxxShdlcDevice(ShdlcConnection(port), 0)
+
+
+def test_serialization(device):
+    """
+    Test if a configuration read from a device can be serialized as JSON.
+    """
+    configuration = device.get_configuration()
+    assert configuration.active_calibration is None
+    assert configuration.slave_address == 0
+    assert configuration.baudrate == 115200
+    data = json.loads(json.dumps(configuration.to_dict()))
+    assert Sfc5xxxConfiguration.from_dict(data) == configuration
+    with pytest.raises(ValueError):
+        Sfc5xxxConfiguration.from_dict({'foo': 1})
+
+
+def test_diff():
+    """
+    Test if only differing settings are reported, in the order they need to
+    be applied.
+    """
+    current = Sfc5xxxConfiguration(user_controller_gain=1.0,
+                                   reply_delay=50, baudrate=115200,
+                                   slave_address=0)
+    target = Sfc5xxxConfiguration(user_controller_gain=1.0,
+                                  baudrate=19200, slave_address=3,
+                                  active_calibration=2)
+    assert list(current.diff(target).items()) == [
+        ('active_calibration', (None, 2)),
+        ('slave_address', (0, 3)),
+        ('baudrate', (115200, 19200)),
+    ]
+    # Compared with float32 precision as read from the device
+    current.user_controller_gain = 1.100000023841858
+    assert not current.diff(Sfc5xxxConfiguration(user_controller_gain=1.1))
+
+
+def test_apply(device):
+    """
+    Test if a configuration is applied with the minimum number of writes.
+    """
+    target = Sfc5xxxConfiguration(
+        user_defined_medium_unit=Sfc5xxxMediumUnit.from_int(-3, 1, 4),
+        user_controller_gain=1.7,
+        valve_input_source=Sfc5xxxValveInputSource.FORCE_CLOSED,
+        slave_address=4)
+    changed = device.apply_configuration(target)
+    assert changed == ['user_defined_medium_unit', 'user_controller_gain',
+                       'valve_input_source', 'slave_address']
+    assert device.slave_address == 4
+    configuration = device.get_configuration()
+    assert configuration.user_controller_gain == pytest.approx(1.7)
+    assert not configuration.diff(target)
+    assert device.apply_configuration(target) == []
+
+
+def test_apply_communication_settings(device):
+    """
+    Test if slave address and baudrate can only be changed together if the
+    driver is updated.
+    """
+    target = Sfc5xxxConfiguration(reply_delay=20, slave_address=4,
+                                  baudrate=19200)
+    with pytest.raises(ValueError):
+        device.apply_configuration(target, update_driver=False)
+    assert device.get_reply_delay() != 20  # nothing written
+    assert device.apply_configuration(target)[-2:] == \
+        ['slave_address', 'baudrate']
+    assert device.slave_address == 4
+    assert device.get_baudrate() == 19200
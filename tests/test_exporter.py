@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+# (c) Copyright 2020 Sensirion AG, Switzerland
+
+from __future__ import absolute_import, division, print_function
+from sensirion_shdlc_driver import ShdlcConnection
+from sensirion_shdlc_sfc5xxx import Sfc5xxxShdlcDevice, \
+    Sfc5xxxMetricsExporter
+from sensirion_shdlc_sfc5xxx.exporter import CONTENT_TYPE
+import pytest
+import time
+
+try:
+    from urllib.request import urlopen
+    from urllib.error import HTTPError
+except ImportError:  # Python 2
+    from urllib2 import urlopen, HTTPError
+
+
+pytestmark = pytest.mark.parametrize('simulator_port', [2], indirect=True)
+
+
+@pytest.fixture
+def devices(simulator_port):
+    connection = ShdlcConnection(simulator_port)
+    return [Sfc5xxxShdlcDevice(connection, i) for i in range(2)]
+
+
+def test_render_before_poll(devices):
+    """
+    Test if nothing but the device state is rendered before the first poll.
+    """
+    text = Sfc5xxxMetricsExporter(devices).render()
+    assert 'sfc5xxx_up{device="0"} 0\n' in text
+    assert 'sfc5xxx_poll_errors_total{device="1"} 0\n' in text
+    assert 'sfc5xxx_measured_value' not in text
+    assert text.endswith('# EOF\n')
+
+
+def test_poll_and_render(devices):
+    """
+    Test if the polled values and the command metrics are rendered.
+    """
+    exporter = Sfc5xxxMetricsExporter({'n2': devices[0], 'o2': devices[1]})
+    exporter.poll()
+    text = exporter.render()
+    assert 'sfc5xxx_up{device="n2"} 1\n' in text
+    assert 'sfc5xxx_setpoint{device="o2"} 0.0\n' in text
+    assert 'sfc5xxx_device_status{device="n2"} 0\n' in text
+    assert 'sfc5xxx_device_info{device="o2",serial_number="21100124",' \
+        'gas="N2",unit="slm"} 1\n' in text
+    assert 'sfc5xxx_command_total{command="Sfc5xxxCmdGetSetpoint"} 2\n' \
+        in text
+    assert 'sfc5xxx_command_latency_seconds_count' \
+        '{command="Sfc5xxxCmdGetSetpoint"} 2\n' in text
+    assert '# TYPE sfc5xxx_command_latency_seconds histogram\n' in text
+    assert devices[0].metrics is exporter.metrics
+
+
+def test_identity_read_once(devices, simulator_port):
+    """
+    Test if the identity is read only on the first poll, and all other
+    values are read on every poll.
+    """
+    exporter = Sfc5xxxMetricsExporter(devices)
+    exporter.poll()
+    first = len(simulator_port.requests)
+    exporter.poll()
+    assert len(simulator_port.requests) - first == 2 * 4
+
+
+def test_failed_poll(devices, simulator_port):
+    """
+    Test if a device without response is reported as down and its values
+    are omitted.
+    """
+    simulator_port.remove_device([d for d in simulator_port.devices
+                                  if d.slave_address == 1][0])
+    exporter = Sfc5xxxMetricsExporter(devices)
+    exporter.poll()
+    text = exporter.render()
+    assert 'sfc5xxx_up{device="0"} 1\n' in text
+    assert 'sfc5xxx_up{device="1"} 0\n' in text
+    assert 'sfc5xxx_poll_errors_total{device="1"} 1\n' in text
+    assert 'sfc5xxx_measured_value{device="1"}' not in text
+    assert 'sfc5xxx_command_timeouts_total' \
+        '{command="Sfc5xxxCmdReadMeasuredValue"} 1\n' in text
+
+
+def test_scrape_without_bus_traffic(devices, simulator_port):
+    """
+    Test if the metrics are served over HTTP without causing communication
+    with the devices.
+    """
+    with Sfc5xxxMetricsExporter(devices, period=60.0, port=0) as exporter:
+        host, tcp_port = exporter.server_address[:2]
+        url = 'http://{}:{}/metrics'.format(host, tcp_port)
+        for _ in range(100):  # Wait for the first poll
+            if 'sfc5xxx_up{device="1"} 1' in exporter.render():
+                break
+            time.sleep(0.01)
+        requests = len(simulator_port.requests)
+        for _ in range(3):
+            response = urlopen(url)
+            assert response.info()['Content-Type'] == CONTENT_TYPE
+            assert response.read().decode('utf-8').endswith('# EOF\n')
+        assert len(simulator_port.requests) == requests
+        with pytest.raises(HTTPError):
+            urlopen('http://{}:{}/other'.format(host, tcp_port))
+    assert exporter.server_address is None
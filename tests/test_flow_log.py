@@ -0,0 +1,194 @@
+# -*- coding: utf-8 -*-
+# (c) Copyright 2020 Sensirion AG, Switzerland
+
+from __future__ import absolute_import, division, print_function
+from sensirion_shdlc_driver import ShdlcConnection
+from sensirion_shdlc_sfc5xxx import Sfc5xxxShdlcDevice, Sfc5xxxScaling, \
+    Sfc5xxxSimulatedDevice, Sfc5xxxSimulatorPort, Sfc5xxxFlowLogWriter, \
+    Sfc5xxxFlowLogReader, Sfc5xxxFlowLogger
+import pytest
+import time
+
+T0 = 1600000000.0
+
+
+@pytest.fixture
+def log_file(tmpdir):
+    """
+    A log with two devices, 100 samples each, written in chunks of 32
+    samples. Device "a" lost 5 values before sample 50.
+    """
+    file_path = str(tmpdir.join('flow.log'))
+    with Sfc5xxxFlowLogWriter(file_path, chunk_size=32) as writer:
+        writer.add_device('a', Sfc5xxxScaling.PHYSICAL, 'sccm')
+        writer.add_device('b', Sfc5xxxScaling.NORMALIZED, '')
+        for i in range(0, 100, 10):
+            lost = 5 if i == 50 else 0
+            offset = 0.05 if i >= 50 else 0.0
+            writer.write('a', T0 + offset + i * 0.01, 0.01,
+                         [float(i + j) for j in range(10)], lost)
+            writer.write('b', T0 + i * 0.01, 0.01, [0.5] * 10)
+    return file_path
+
+
+def test_read_all(log_file):
+    """
+    Test if all samples and the metadata are read.
+    """
+    with Sfc5xxxFlowLogReader(log_file) as reader:
+        assert list(reader.devices) == ['a', 'b']
+        assert reader.devices['a'] == dict(
+            scaling=Sfc5xxxScaling.PHYSICAL, unit='sccm')
+        assert reader.get_count('a') == 100
+        assert reader.get_time_range('b') == \
+            pytest.approx((T0, T0 + 0.99))
+        timestamps, values, gaps = reader.read('a')
+        assert values == [float(i) for i in range(100)]
+        assert timestamps[49] == pytest.approx(T0 + 0.49)
+        assert timestamps[50] == pytest.approx(T0 + 0.55)
+        assert gaps == [(pytest.approx(T0 + 0.55), 5)]
+        with pytest.raises(ValueError):
+            reader.read('c')
+
+
+def test_read_time_range(log_file):
+    """
+    Test if only the samples within the time range are returned.
+    """
+    with Sfc5xxxFlowLogReader(log_file) as reader:
+        timestamps, values, gaps = reader.read('a', T0 + 0.195, T0 + 0.405)
+        assert values == [float(i) for i in range(20, 41)]
+        assert gaps == []
+        timestamps, values, gaps = reader.read('a', start=T0 + 0.5)
+        assert values == [float(i) for i in range(50, 100)]
+        assert len(gaps) == 1
+        assert reader.read('b', end=T0) == ([], [], [])
+
+
+def test_count_time_range(log_file):
+    """
+    Test if the number of samples within a time range matches the samples
+    read.
+    """
+    with Sfc5xxxFlowLogReader(log_file) as reader:
+        for start, end in [(T0 + 0.195, T0 + 0.405), (T0 + 0.5, None),
+                           (None, T0), (T0 + 0.31, T0 + 0.32),
+                           (T0 + 2.0, None)]:
+            assert reader.get_count('a', start, end) == \
+                len(reader.read('a', start, end)[1])
+
+
+def test_iter_chunks(log_file):
+    """
+    Test if iterating over the chunks returns the same samples as reading.
+    """
+    numpy = pytest.importorskip('numpy')
+    with Sfc5xxxFlowLogReader(log_file) as reader:
+        chunks = list(reader.iter_chunks('a', T0 + 0.195, T0 + 0.605))
+        assert len(chunks) > 1
+        values = numpy.concatenate([chunk[1] for chunk in chunks])
+        assert values.tolist() == reader.read('a', T0 + 0.195, T0 + 0.605)[1]
+        assert sum([chunk[2] for chunk in chunks], []) == \
+            reader.read('a', T0 + 0.195, T0 + 0.605)[2]
+
+
+def test_backward_timestamps(tmpdir):
+    """
+    Test if samples starting before the last written sample are shifted, so
+    the timestamps in the log never go backwards.
+    """
+    file_path = str(tmpdir.join('flow.log'))
+    with Sfc5xxxFlowLogWriter(file_path, chunk_size=10) as writer:
+        writer.add_device('a', Sfc5xxxScaling.PHYSICAL, 'sccm')
+        writer.write('a', 10.0, 0.1, [float(i) for i in range(10)])
+        writer.write('a', 10.5, 0.1, [float(i) for i in range(10, 20)])
+    with Sfc5xxxFlowLogReader(file_path) as reader:
+        timestamps, values, _ = reader.read('a')
+        assert values == [float(i) for i in range(20)]
+        assert timestamps == pytest.approx([10.0 + i * 0.1
+                                            for i in range(20)])
+        assert reader.read('a', 10.55, 10.85)[1] == [6.0, 7.0, 8.0]
+        for start, end in [(10.55, 10.85), (10.95, 11.25), (10.5, None)]:
+            assert reader.get_count('a', start, end) == \
+                len(reader.read('a', start, end)[1])
+
+
+def test_read_arrays(log_file):
+    """
+    Test if the samples can be read as NumPy arrays.
+    """
+    numpy = pytest.importorskip('numpy')
+    with Sfc5xxxFlowLogReader(log_file) as reader:
+        timestamps, values, gaps = reader.read('a', T0 + 0.195, T0 + 0.405,
+                                               as_array=True)
+        assert values.dtype == numpy.float32
+        assert values.tolist() == [float(i) for i in range(20, 41)]
+        assert timestamps.tolist() == \
+            reader.read('a', T0 + 0.195, T0 + 0.405)[0]
+        assert len(reader.read('a', end=T0, as_array=True)[0]) == 0
+
+
+def test_read_unclosed(log_file):
+    """
+    Test if a log without index is read up to the last complete chunk.
+    """
+    with open(log_file, 'rb') as f:
+        data = f.read()
+    with Sfc5xxxFlowLogReader(log_file) as reader:
+        offset = max(chunk.offset for chunk in reader._chunks['b'])
+    with open(log_file, 'wb') as f:
+        f.write(data[:offset + 10])  # Truncated within last chunk of "b"
+    with Sfc5xxxFlowLogReader(log_file) as reader:
+        assert reader.get_count('a') == 100
+        assert reader.read('a')[0] == pytest.approx(
+            [T0 + i * 0.01 + (0.05 if i >= 50 else 0.0) for i in range(100)])
+        assert reader.get_count('b') == 80  # Chunks of 40, 40 and 20
+
+
+def test_invalid_file(tmpdir):
+    """
+    Test if files which are no flow logs are rejected.
+    """
+    file_path = tmpdir.join('invalid.log')
+    file_path.write_binary(b"no flow log")
+    with pytest.raises(IOError):
+        Sfc5xxxFlowLogReader(str(file_path))
+
+
+def test_writer_errors(tmpdir):
+    """
+    Test if writing to unknown devices or a closed log is rejected.
+    """
+    writer = Sfc5xxxFlowLogWriter(str(tmpdir.join('flow.log')))
+    writer.add_device('a', Sfc5xxxScaling.PHYSICAL, 'sccm')
+    with pytest.raises(ValueError):
+        writer.add_device('a', Sfc5xxxScaling.PHYSICAL, 'sccm')
+    with pytest.raises(ValueError):
+        writer.write('b', T0, 0.01, [1.0])
+    writer.close()
+    writer.close()
+    with pytest.raises(IOError):
+        writer.write('a', T0, 0.01, [1.0])
+
+
+def test_logger(tmpdir):
+    """
+    Test if the logger writes the buffered values of simulated devices.
+    """
+    port = Sfc5xxxSimulatorPort()
+    connection = ShdlcConnection(port)
+    devices = []
+    for address in range(2):
+        port.add_device(Sfc5xxxSimulatedDevice(slave_address=address))
+        devices.append(Sfc5xxxShdlcDevice(connection, address))
+    file_path = str(tmpdir.join('flow.log'))
+    time.sleep(0.1)  # Let the buffers fill
+    with Sfc5xxxFlowLogger(file_path, devices, flush_interval=0.05) as logger:
+        assert list(logger.readers) == ['0', '1']
+        time.sleep(0.3)
+    with Sfc5xxxFlowLogReader(file_path) as reader:
+        assert reader.devices['1']['unit'] == 'slm'
+        timestamps, values, gaps = reader.read('1')
+        assert len(values) > 0
+        assert timestamps == sorted(timestamps)
+        assert gaps == []
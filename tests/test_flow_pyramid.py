@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+# (c) Copyright 2020 Sensirion AG, Switzerland
+
+from __future__ import absolute_import, division, print_function
+from sensirion_shdlc_sfc5xxx import Sfc5xxxScaling, Sfc5xxxFlowLogWriter, \
+    Sfc5xxxFlowLogReader, Sfc5xxxFlowLogPyramid
+import os
+import pytest
+
+numpy = pytest.importorskip('numpy')
+
+T0 = 1600000000.0
+
+
+@pytest.fixture
+def log_file(tmpdir):
+    """
+    A log with 1000 samples (0..999) of device "a" in chunks of 100, and no
+    samples of device "b".
+    """
+    file_path = str(tmpdir.join('flow.log'))
+    with Sfc5xxxFlowLogWriter(file_path, chunk_size=100) as writer:
+        writer.add_device('a', Sfc5xxxScaling.PHYSICAL, 'sccm')
+        writer.add_device('b', Sfc5xxxScaling.PHYSICAL, 'sccm')
+        writer.write('a', T0, 0.01, [float(i) for i in range(1000)])
+    return file_path
+
+
+def test_levels(log_file):
+    """
+    Test if the levels aggregate the samples correctly.
+    """
+    with Sfc5xxxFlowLogReader(log_file) as reader:
+        pyramid = Sfc5xxxFlowLogPyramid(reader, factor=10, cache=False)
+        assert pyramid.get_levels('a') == 3  # 100, 10 and 1 bucket(s)
+        assert pyramid.get_levels('b') == 0
+        timestamps, minimums, maximums, means = pyramid.read(
+            'a', max_points=100)
+        assert len(timestamps) == 100
+        assert timestamps[1] == pytest.approx(T0 + 0.1)
+        assert minimums[1] == 10.0
+        assert maximums[1] == 19.0
+        assert means[1] == pytest.approx(14.5)
+        timestamps, minimums, maximums, means = pyramid.read(
+            'a', max_points=1)
+        assert (minimums[0], maximums[0], means[0]) == (0.0, 999.0, 499.5)
+        with pytest.raises(ValueError):
+            pyramid.read('c')
+
+
+def test_zoom(log_file):
+    """
+    Test if the finest level within the point limit is returned.
+    """
+    with Sfc5xxxFlowLogReader(log_file) as reader:
+        pyramid = Sfc5xxxFlowLogPyramid(reader, factor=10, cache=False)
+        # Raw samples
+        timestamps, minimums, maximums, means = pyramid.read(
+            'a', T0 + 1.0, T0 + 1.5, max_points=50)
+        assert minimums.tolist() == [float(i) for i in range(100, 150)]
+        assert (minimums == maximums).all()
+        # Buckets of 10 samples, including the one containing the start
+        timestamps, minimums, maximums, means = pyramid.read(
+            'a', T0 + 1.05, T0 + 5.0, max_points=50)
+        assert len(timestamps) == 40
+        assert minimums[0] == 100.0
+        assert pyramid.read('b')[0].tolist() == []
+
+
+def test_cache(log_file):
+    """
+    Test if the levels are stored in the cache file and reused.
+    """
+    with Sfc5xxxFlowLogReader(log_file) as reader:
+        pyramid = Sfc5xxxFlowLogPyramid(reader, factor=10)
+        expected = pyramid.read('a', max_points=100)
+    assert os.path.exists(log_file + '.pyramid')
+    with Sfc5xxxFlowLogReader(log_file) as reader:
+        cached = Sfc5xxxFlowLogPyramid(reader, factor=10)
+        assert cached._mmap is not None
+        for actual, wanted in zip(cached.read('a', max_points=100), expected):
+            assert actual.tolist() == wanted.tolist()
+        assert cached.get_levels('b') == 0
+        cached.close()
+        # Another factor doesn't match the cache
+        rebuilt = Sfc5xxxFlowLogPyramid(reader, factor=4)
+        assert rebuilt._mmap is None
+        assert rebuilt.get_levels('a') == 5
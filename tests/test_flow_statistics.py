@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+# (c) Copyright 2020 Sensirion AG, Switzerland
+
+from __future__ import absolute_import, division, print_function
+from sensirion_shdlc_driver import ShdlcConnection
+from sensirion_shdlc_sfc5xxx import Sfc5xxxShdlcDevice, Sfc5xxxScaling, \
+    Sfc5xxxSimulatedDevice, Sfc5xxxSimulatorPort, Sfc5xxxBufferReader, \
+    Sfc5xxxRunningStatistics, Sfc5xxxFlowStatistics
+from sensirion_shdlc_sfc5xxx.types import Sfc5xxxReadBufferResponse
+import pytest
+import time
+
+T0 = 1600000000.0
+
+
+def response(values, lost_values=0):
+    return Sfc5xxxReadBufferResponse(Sfc5xxxScaling.PHYSICAL, 1, lost_values,
+                                     0, 0.01, values)
+
+
+def test_running_statistics():
+    """
+    Test if values added one by one, in batches and merged give the same
+    statistics, also with a large offset.
+    """
+    values = [1000.0 + 0.01 * ((i * 7) % 11) for i in range(1000)]
+    mean = sum(values) / len(values)
+    variance = sum([(v - mean) ** 2 for v in values]) / (len(values) - 1)
+    single = Sfc5xxxRunningStatistics()
+    for value in values:
+        single.add(value)
+    batches = Sfc5xxxRunningStatistics()
+    merged = Sfc5xxxRunningStatistics()
+    for i in range(0, len(values), 300):
+        batches.add_values(values[i:i + 300])
+        part = Sfc5xxxRunningStatistics()
+        part.add_values(values[i:i + 300])
+        merged.merge(part)
+    for statistics in [single, batches, merged]:
+        assert statistics.count == 1000
+        assert statistics.mean == pytest.approx(mean, abs=1e-9)
+        assert statistics.variance == pytest.approx(variance, rel=1e-6)
+        assert (statistics.minimum, statistics.maximum) == \
+            (min(values), max(values))
+    single.reset()
+    assert (single.count, single.mean, single.std) == (0, None, 0.0)
+
+
+def test_decimation():
+    """
+    Test if a summary is published every "decimation" values, also when the
+    windows span responses.
+    """
+    summaries = []
+    statistics = Sfc5xxxFlowStatistics('a', decimation=25,
+                                       callback=summaries.append)
+    for i in range(0, 100, 10):
+        statistics.process(response([float(i + j) for j in range(10)],
+                                    5 if i == 50 else 0), T0 + i * 0.01)
+    assert len(summaries) == 4
+    assert summaries[1].to_dict() == dict(
+        name='a', start_time=pytest.approx(T0 + 0.25),
+        end_time=pytest.approx(T0 + 0.49), count=25, lost_values=0,
+        mean=37.0, std=pytest.approx(7.359, abs=1e-3), minimum=25.0,
+        maximum=49.0, settled=None)
+    assert summaries[2].lost_values == 5
+    assert statistics.last_summary is summaries[-1]
+    assert statistics.lost_values == 5
+    assert statistics.get_statistics().mean == 49.5
+    statistics.process(response([]), None)
+    statistics.reset()
+    assert statistics.get_statistics().count == 0
+    with pytest.raises(ValueError):
+        Sfc5xxxFlowStatistics(decimation=0)
+
+
+def test_settling():
+    """
+    Test if settling is detected around the target and at any value.
+    """
+    values = [0.0] * 50 + [10.0 + (i % 2) * 0.2 for i in range(250)]
+    for target in [None, 10.0]:
+        summaries = []
+        statistics = Sfc5xxxFlowStatistics(
+            decimation=50, settling_tolerance=0.5, settling_time=1.0,
+            target=target, callback=summaries.append)
+        statistics.process(response(values), T0)
+        # Within tolerance from the 50th value on, i.e. for 1 s at the 150th
+        assert [s.settled for s in summaries] == \
+            [False, False, False, True, True, True]
+        assert statistics.is_settled is True
+        statistics.set_target(5.0)
+        assert statistics.is_settled is False
+        statistics.process(response(values[-100:]), T0 + 3.0)
+        assert statistics.is_settled is False
+
+
+def test_buffer_reader():
+    """
+    Test if the statistics can be attached to a buffer reader.
+    """
+    port = Sfc5xxxSimulatorPort()
+    port.add_device(Sfc5xxxSimulatedDevice(slave_address=0))
+    device = Sfc5xxxShdlcDevice(ShdlcConnection(port), 0)
+    statistics = Sfc5xxxFlowStatistics(decimation=5)
+    time.sleep(0.1)  # Let the buffer fill
+    with Sfc5xxxBufferReader(device, Sfc5xxxScaling.PHYSICAL,
+                             callback=statistics.process) as reader:
+        time.sleep(0.2)
+    assert statistics.get_statistics().count == reader.count
+    assert statistics.last_summary.count == 5
@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+# (c) Copyright 2020 Sensirion AG, Switzerland
+
+from __future__ import absolute_import, division, print_function
+from sensirion_shdlc_driver.errors import ShdlcTimeoutError
+from sensirion_shdlc_sfc5xxx import Sfc5xxxShdlcDevice, Sfc5xxxScaling, \
+    Sfc5xxxSimulatedDevice, Sfc5xxxSimulatorPort, Sfc5xxxLatencyModel, \
+    Sfc5xxxAdaptiveConnection
+from sensirion_shdlc_sfc5xxx.commands import Sfc5xxxCmdReadMeasuredValue, \
+    Sfc5xxxCmdMeasureTemperature, \
+    Sfc5xxxCmdMeasureRawThermalConductivityWithClosedValve
+import pytest
+
+
+class TimeoutRecordingPort(Sfc5xxxSimulatorPort):
+    def __init__(self):
+        super(TimeoutRecordingPort, self).__init__()
+        self.timeouts = []
+        self.fail = False
+
+    def transceive(self, slave_address, command_id, data, response_timeout):
+        self.timeouts.append(response_timeout)
+        if self.fail:
+            raise ShdlcTimeoutError()
+        return super(TimeoutRecordingPort, self).transceive(
+            slave_address, command_id, data, response_timeout)
+
+
+def test_learned_timeout():
+    """
+    Test if the timeout is derived from the observed response times and
+    limited by the specified response time of the command.
+    """
+    model = Sfc5xxxLatencyModel(percentile=0.9, factor=2.0,
+                                minimum_timeout=0.0001, minimum_samples=10)
+    command = Sfc5xxxCmdReadMeasuredValue(Sfc5xxxScaling.PHYSICAL)
+    for i in range(9):
+        model.record(0, command, 0.0001 * (i + 1))
+    assert model.get_timeout(0, command) == command.max_response_time
+    model.record(0, command, 0.001)
+    assert model.is_learned(0, command)
+    assert model.get_timeout(0, command) == pytest.approx(0.0018)
+    assert model.get_timeout(1, command) == command.max_response_time
+    for _ in range(10):
+        model.record(0, command, 1.0)  # exceeds specified response time
+    assert model.get_timeout(0, command) == command.max_response_time
+    model.record_timeout(0, command)
+    assert not model.is_learned(0, command)
+    assert model.get_response_times(0, command) == []
+    with pytest.raises(ValueError):
+        Sfc5xxxLatencyModel(percentile=0.0)
+
+
+def test_subcommands():
+    """
+    Test if subcommands sharing the same command ID are learned separately.
+    """
+    model = Sfc5xxxLatencyModel(minimum_samples=10)
+    temperature = Sfc5xxxCmdMeasureTemperature()
+    conductivity = Sfc5xxxCmdMeasureRawThermalConductivityWithClosedValve()
+    assert temperature.id == conductivity.id
+    for _ in range(30):
+        model.record(0, temperature, 0.001)
+    assert model.is_learned(0, temperature)
+    assert not model.is_learned(0, conductivity)
+    assert model.get_timeout(0, conductivity) == 0.6
+    model.record_timeout(0, conductivity)
+    assert model.is_learned(0, temperature)
+
+
+def test_periodic_update(monkeypatch):
+    """
+    Test if the timeout is only recalculated every 16 records, also after
+    the window is full.
+    """
+    model = Sfc5xxxLatencyModel(window_size=32, minimum_samples=16)
+    calculations = []
+    calculate = model._calculate_timeout
+    monkeypatch.setattr(model, '_calculate_timeout', lambda samples: (
+        calculations.append(len(samples)), calculate(samples))[1])
+    command = Sfc5xxxCmdReadMeasuredValue(Sfc5xxxScaling.PHYSICAL)
+    for _ in range(32 + 160):
+        model.record(0, command, 0.001)
+    assert len(calculations) == 12
+
+
+def test_adaptive_connection():
+    """
+    Test if the connection uses the learned timeout and falls back to the
+    specified timeout after a timeout.
+    """
+    port = TimeoutRecordingPort()
+    port.add_device(Sfc5xxxSimulatedDevice())
+    model = Sfc5xxxLatencyModel(minimum_samples=5)
+    connection = Sfc5xxxAdaptiveConnection(port, model)
+    assert connection.latency_model is model
+    device = Sfc5xxxShdlcDevice(connection, 0)
+    for _ in range(10):
+        device.read_measured_value(Sfc5xxxScaling.PHYSICAL)
+    assert port.timeouts[0] == 0.005
+    assert port.timeouts[-1] < 0.005
+    port.fail = True
+    with pytest.raises(ShdlcTimeoutError):
+        device.read_measured_value(Sfc5xxxScaling.PHYSICAL)
+    with pytest.raises(ShdlcTimeoutError):
+        device.read_measured_value(Sfc5xxxScaling.PHYSICAL)
+    assert port.timeouts[-1] == 0.005
@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+# (c) Copyright 2020 Sensirion AG, Switzerland
+
+from __future__ import absolute_import, division, print_function
+from sensirion_shdlc_driver import ShdlcConnection
+from sensirion_shdlc_driver.errors import ShdlcTimeoutError
+from sensirion_shdlc_sfc5xxx import Sfc5xxxShdlcDevice, Sfc5xxxScaling, \
+    Sfc5xxxSimulatedDevice, Sfc5xxxSimulatorPort, Sfc5xxxMetrics
+from sensirion_shdlc_sfc5xxx.device_errors import \
+    Sfc5xxxInvalidCalibrationIndexError
+from sensirion_shdlc_sfc5xxx.metrics import _BUCKET_COUNT, _get_bucket, \
+    _get_bucket_upper_bound
+from threading import Thread
+import pytest
+
+
+@pytest.fixture
+def device():
+    port = Sfc5xxxSimulatorPort()
+    port.add_device(Sfc5xxxSimulatedDevice())
+    device = Sfc5xxxShdlcDevice(ShdlcConnection(port), 0)
+    device.metrics = Sfc5xxxMetrics()
+    return device
+
+
+@pytest.mark.parametrize("latency", [1e-7, 1e-6, 3.3e-6, 0.0042, 1.0, 1e4])
+def test_histogram_buckets(latency):
+    """
+    Test if latencies are sorted into buckets with the expected bounds.
+    """
+    index = _get_bucket(latency)
+    assert latency <= _get_bucket_upper_bound(index) or \
+        index == _BUCKET_COUNT - 1  # overflow bucket
+    if index > 0:
+        assert latency > _get_bucket_upper_bound(index - 1)
+
+
+def test_counters(device):
+    """
+    Test if calls, bytes and latencies are recorded per command class.
+    """
+    for _ in range(10):
+        device.read_measured_value(Sfc5xxxScaling.PHYSICAL)
+    device.get_serial_number()
+    snapshot = device.metrics.snapshot()
+    assert snapshot['duration'] >= 0.0
+    stats = snapshot['commands']['Sfc5xxxCmdReadMeasuredValue']
+    assert stats['count'] == 10
+    assert stats['request_bytes'] == 10 * (6 + 1)
+    assert stats['response_bytes'] == 10 * (7 + 4)
+    assert stats['timeouts'] == 0
+    assert stats['errors'] == {}
+    latency = stats['latency']
+    assert 0.0 < latency['p50'] <= latency['p99'] <= latency['max']
+    assert sum(count for _, count in stats['histogram']) == 10
+    assert snapshot['commands']['Sfc5xxxCmdGetSerialNumber']['count'] == 1
+    device.metrics.reset()
+    assert device.metrics.snapshot()['commands'] == {}
+
+
+def test_errors(device):
+    """
+    Test if device errors and timeouts are counted.
+    """
+    with pytest.raises(Sfc5xxxInvalidCalibrationIndexError):
+        device.activate_calibration(10)
+    device.connection.port.remove_device(device.connection.port.devices[0])
+    with pytest.raises(ShdlcTimeoutError):
+        device.activate_calibration(1)
+    stats = device.metrics.snapshot()['commands'][
+        'Sfc5xxxCmdActivateCalibration']
+    assert stats['count'] == 2
+    assert stats['errors'] == {'Sfc5xxxInvalidCalibrationIndexError': 1}
+    assert stats['timeouts'] == 1
+    assert stats['response_bytes'] == 7
+
+
+def test_threads(device):
+    """
+    Test if the counters of all threads are merged.
+    """
+    def run():
+        for _ in range(20):
+            device.get_serial_number()
+    threads = [Thread(target=run) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    stats = device.metrics.snapshot()['commands']['Sfc5xxxCmdGetSerialNumber']
+    assert stats['count'] == 80
+
+
+def test_terminated_threads(device):
+    """
+    Test if the counters of terminated threads are kept, but merged.
+    """
+    for _ in range(10):
+        thread = Thread(target=device.get_serial_number)
+        thread.start()
+        thread.join()
+    device.get_serial_number()
+    stats = device.metrics.snapshot()['commands']['Sfc5xxxCmdGetSerialNumber']
+    assert stats['count'] == 11
+    assert len(device.metrics._shards) == 1  # only the main thread
+
+
+def test_reset(device):
+    """
+    Test if threads which already recorded use new counters after a reset.
+    """
+    device.get_serial_number()
+    device.metrics.reset()
+    device.get_serial_number()
+    stats = device.metrics.snapshot()['commands']['Sfc5xxxCmdGetSerialNumber']
+    assert stats['count'] == 1
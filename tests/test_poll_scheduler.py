@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+# (c) Copyright 2020 Sensirion AG, Switzerland
+
+from __future__ import absolute_import, division, print_function
+from sensirion_shdlc_sfc5xxx import Sfc5xxxScaling
+from sensirion_shdlc_sfc5xxx.poll_scheduler import Sfc5xxxPollScheduler
+from sensirion_shdlc_sfc5xxx.types import Sfc5xxxReadBufferResponse
+import pytest
+import time
+
+
+def _response(values, remaining_values=0, lost_values=0,
+              sampling_time=0.01):
+    return Sfc5xxxReadBufferResponse(
+        Sfc5xxxScaling.PHYSICAL, 1, lost_values, remaining_values,
+        sampling_time, [0.0] * values)
+
+
+def test_initial_state():
+    """
+    Test if a new scheduler wants to poll immediately and assumes the
+    smallest buffer size.
+    """
+    scheduler = Sfc5xxxPollScheduler()
+    assert scheduler.buffer_size == 85
+    assert scheduler.target_fill_level == 60
+    assert scheduler.sampling_time is None
+    assert scheduler.get_delay() == 0.0
+
+
+def test_invalid_fill_ratio():
+    """
+    Test if an invalid fill ratio is rejected.
+    """
+    with pytest.raises(ValueError):
+        Sfc5xxxPollScheduler(fill_ratio=0.0)
+    with pytest.raises(ValueError):
+        Sfc5xxxPollScheduler(fill_ratio=1.5)
+
+
+def test_delay_until_full_frame():
+    """
+    Test if the next poll is scheduled when a full frame is available.
+    """
+    scheduler = Sfc5xxxPollScheduler()
+    delay = scheduler.update(_response(20, remaining_values=0), now=100.0)
+    assert delay == pytest.approx(0.6)
+    assert scheduler.next_poll_time == pytest.approx(100.6)
+    assert scheduler.get_delay(now=100.5) == pytest.approx(0.1)
+    assert scheduler.get_delay(now=101.0) == 0.0
+
+
+def test_duration_compensation():
+    """
+    Test if the communication duration is subtracted from the delay.
+    """
+    scheduler = Sfc5xxxPollScheduler()
+    delay = scheduler.update(_response(20), duration=0.1, now=0.0)
+    assert delay == pytest.approx(0.5)
+
+
+def test_delay_limits():
+    """
+    Test if the delay is limited to the configured interval range.
+    """
+    scheduler = Sfc5xxxPollScheduler(min_interval=0.01, max_interval=0.2)
+    assert scheduler.update(_response(20), now=0.0) == pytest.approx(0.2)
+    assert scheduler.update(_response(60, remaining_values=80),
+                            now=0.0) == pytest.approx(0.01)
+    scheduler = Sfc5xxxPollScheduler(max_interval=0.3)
+    assert scheduler.update(_response(0, sampling_time=0.0),
+                            now=0.0) == pytest.approx(0.3)
+
+
+def test_buffer_size_estimation():
+    """
+    Test if the buffer size is estimated from the observed fill levels.
+    """
+    scheduler = Sfc5xxxPollScheduler()
+    scheduler.update(_response(180, remaining_values=20))
+    assert scheduler.buffer_size == 200
+    assert scheduler.target_fill_level == 120
+    scheduler.update(_response(60, remaining_values=0))
+    assert scheduler.buffer_size == 200
+    scheduler.update(_response(150, remaining_values=0, lost_values=5))
+    assert scheduler.buffer_size == 150
+    scheduler.update(_response(300, remaining_values=0))
+    assert scheduler.buffer_size == 256
+    scheduler.update(_response(10, lost_values=1))
+    assert scheduler.buffer_size == 85
+
+
+def test_system_time_change(monkeypatch):
+    """
+    Test if the scheduler is not affected by changes of the system time.
+    """
+    scheduler = Sfc5xxxPollScheduler()
+    delay = scheduler.update(_response(20, remaining_values=0))
+    assert delay == pytest.approx(0.6)
+    wall_clock = time.time() - 3600.0
+    monkeypatch.setattr(time, 'time', lambda: wall_clock)
+    assert 0.0 < scheduler.get_delay() <= delay
@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+# (c) Copyright 2020 Sensirion AG, Switzerland
+
+from __future__ import absolute_import, division, print_function
+from sensirion_shdlc_driver import ShdlcConnection
+from sensirion_shdlc_driver.errors import ShdlcTimeoutError, \
+    ShdlcResponseError
+from sensirion_shdlc_sfc5xxx import Sfc5xxxShdlcDevice, Sfc5xxxScaling, \
+    Sfc5xxxSimulatedDevice, Sfc5xxxSimulatorPort, Sfc5xxxRecordingPort, \
+    Sfc5xxxReplayPort
+from sensirion_shdlc_sfc5xxx.recording import Sfc5xxxRecord, read_records, \
+    Sfc5xxxReplayedResponseError
+import pytest
+import time
+
+
+def record_session(file_path):
+    """
+    Record a session with some commands and a timeout.
+
+    :return: The results of the commands.
+    """
+    simulator = Sfc5xxxSimulatorPort()
+    simulator.add_device(Sfc5xxxSimulatedDevice(slave_address=0, seed=0))
+    with Sfc5xxxRecordingPort(simulator, file_path) as port:
+        connection = ShdlcConnection(port)
+        device = Sfc5xxxShdlcDevice(connection, 0)
+        results = replay_session(device)
+        with pytest.raises(ShdlcTimeoutError):
+            Sfc5xxxShdlcDevice(connection, 5).get_serial_number()
+    return results
+
+
+def replay_session(device):
+    return [
+        device.get_serial_number(),
+        device.read_measured_value(Sfc5xxxScaling.PHYSICAL),
+        device.set_setpoint_and_read_measured_value(
+            0.5, Sfc5xxxScaling.NORMALIZED),
+        device.read_measured_value_buffer(Sfc5xxxScaling.PHYSICAL,
+                                          max_reads=1).values,
+    ]
+
+
+@pytest.fixture
+def recording(tmpdir):
+    file_path = str(tmpdir.join('session.shdlc'))
+    return file_path, record_session(file_path)
+
+
+def test_read_records(recording):
+    """
+    Test if all transactions are recorded with increasing timestamps.
+    """
+    file_path, _ = recording
+    records = list(read_records(file_path))
+    assert [r.command_id for r in records] == [0xD0, 0x08, 0x03, 0x09, 0xD0]
+    assert [r.kind for r in records] == [Sfc5xxxRecord.RESPONSE] * 4 + \
+        [Sfc5xxxRecord.TIMEOUT]
+    assert records[0].response_data == b"21100123\x00"
+    assert records[4].slave_address == 5
+    timestamps = [r.timestamp for r in records]
+    assert timestamps == sorted(timestamps)
+    assert all(r.duration >= 0.0 for r in records)
+
+
+def test_replay(recording):
+    """
+    Test if the replayed session returns the recorded results.
+    """
+    file_path, results = recording
+    with Sfc5xxxReplayPort(file_path) as port:
+        assert port.bitrate == 115200
+        connection = ShdlcConnection(port)
+        device = Sfc5xxxShdlcDevice(connection, 0)
+        assert replay_session(device) == results
+        with pytest.raises(ShdlcTimeoutError):
+            Sfc5xxxShdlcDevice(connection, 5).get_serial_number()
+        assert port.replayed == 5
+        with pytest.raises(EOFError):
+            device.get_serial_number()
+        port.rewind()
+        assert replay_session(device) == results
+
+
+def test_replay_mismatch(recording):
+    """
+    Test if requests which differ from the recording are detected.
+    """
+    file_path, _ = recording
+    port = Sfc5xxxReplayPort(file_path)
+    device = Sfc5xxxShdlcDevice(ShdlcConnection(port), 0)
+    with pytest.raises(ValueError):
+        device.read_measured_value(Sfc5xxxScaling.PHYSICAL)
+    assert port.replayed == 0
+    assert device.get_serial_number() == "21100123"  # record not consumed
+    port = Sfc5xxxReplayPort(file_path, check_requests=False)
+    device = Sfc5xxxShdlcDevice(ShdlcConnection(port), 0)
+    assert device.get_product_name() == "21100123"
+
+
+def test_replay_realtime(recording):
+    """
+    Test if the recorded timing is replayed.
+    """
+    file_path, _ = recording
+    records = list(read_records(file_path))
+    span = records[-1].timestamp + records[-1].duration - records[0].timestamp
+    port = Sfc5xxxReplayPort(file_path, realtime=True)
+    device = Sfc5xxxShdlcDevice(ShdlcConnection(port), 0)
+    start = time.time()
+    replay_session(device)
+    with pytest.raises(ShdlcTimeoutError):
+        Sfc5xxxShdlcDevice(device.connection, 5).get_serial_number()
+    # Only the total time is guaranteed, single requests are not delayed
+    # if the replay is behind the recording
+    assert time.time() - start >= span - 0.001
+
+
+def test_replay_realtime_gaps(tmpdir):
+    """
+    Test if also the time between the recorded requests is replayed.
+    """
+    file_path = str(tmpdir.join('gaps.shdlc'))
+    simulator = Sfc5xxxSimulatorPort()
+    simulator.add_device(Sfc5xxxSimulatedDevice())
+    with Sfc5xxxRecordingPort(simulator, file_path) as port:
+        device = Sfc5xxxShdlcDevice(ShdlcConnection(port), 0)
+        device.get_serial_number()
+        time.sleep(0.2)
+        device.get_serial_number()
+    port = Sfc5xxxReplayPort(file_path, realtime=True)
+    device = Sfc5xxxShdlcDevice(ShdlcConnection(port), 0)
+    start = time.time()
+    device.get_serial_number()
+    device.get_serial_number()
+    assert time.time() - start >= 0.18
+    port.rewind()
+    device.get_serial_number()
+    time.sleep(0.3)  # behind the recording: no additional delay
+    start = time.time()
+    device.get_serial_number()
+    assert time.time() - start < 0.1
+
+
+class InvalidResponsePort(Sfc5xxxSimulatorPort):
+    def transceive(self, slave_address, command_id, data, response_timeout):
+        raise ShdlcResponseError("Wrong checksum.", b"\x7e\x00")
+
+
+def test_replay_response_error(tmpdir):
+    """
+    Test if invalid responses are replayed with the recorded message.
+    """
+    file_path = str(tmpdir.join('error.shdlc'))
+    with Sfc5xxxRecordingPort(InvalidResponsePort(), file_path) as port:
+        with pytest.raises(ShdlcResponseError) as recorded:
+            Sfc5xxxShdlcDevice(ShdlcConnection(port), 0).get_serial_number()
+    records = list(read_records(file_path))
+    assert records[0].kind == Sfc5xxxRecord.ERROR
+    assert records[0].error_message == str(recorded.value)
+    port = Sfc5xxxReplayPort(file_path)
+    with pytest.raises(ShdlcResponseError) as replayed:
+        Sfc5xxxShdlcDevice(ShdlcConnection(port), 0).get_serial_number()
+    assert isinstance(replayed.value, Sfc5xxxReplayedResponseError)
+    assert str(replayed.value) == str(recorded.value)
+
+
+def test_invalid_file(tmpdir, recording):
+    """
+    Test if invalid and truncated recordings are detected.
+    """
+    file_path, _ = recording
+    invalid = tmpdir.join('invalid.shdlc')
+    invalid.write_binary(b"no recording at all")
+    with pytest.raises(IOError):
+        Sfc5xxxReplayPort(str(invalid))
+    with open(file_path, 'rb') as f:
+        invalid.write_binary(f.read()[:-1])
+    with pytest.raises(IOError):
+        list(read_records(str(invalid)))
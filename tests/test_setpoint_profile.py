@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+# (c) Copyright 2020 Sensirion AG, Switzerland
+
+from __future__ import absolute_import, division, print_function
+from sensirion_shdlc_driver import ShdlcConnection
+from sensirion_shdlc_sfc5xxx import Sfc5xxxShdlcDevice, Sfc5xxxScaling, \
+    Sfc5xxxSimulatedDevice, Sfc5xxxSimulatorPort, Sfc5xxxSetpointProfile, \
+    Sfc5xxxProfileExecutor
+import math
+import pytest
+import time
+
+
+class SlowPort(Sfc5xxxSimulatorPort):
+    """
+    Simulator port which needs 35 ms for every transaction.
+    """
+
+    def transceive(self, slave_address, command_id, data, response_timeout):
+        time.sleep(0.035)
+        return super(SlowPort, self).transceive(
+            slave_address, command_id, data, response_timeout)
+
+
+def test_profile():
+    """
+    Test if the setpoints of steps, ramps and waveforms are calculated
+    correctly.
+    """
+    profile = Sfc5xxxSetpointProfile(start=1.0) \
+        .step(10.0, duration=1.0) \
+        .linear_ramp(20.0, duration=2.0) \
+        .exponential_ramp(0.0, duration=1.0, time_constant=0.5) \
+        .waveform(lambda t: math.sin(t), duration=math.pi)
+    assert profile.duration == pytest.approx(4.0 + math.pi)
+    assert profile.get_setpoint(-1.0) == 1.0
+    assert profile.get_setpoint(0.5) == 10.0
+    assert profile.get_setpoint(2.0) == pytest.approx(15.0)
+    assert profile.get_setpoint(3.5) == \
+        pytest.approx(20.0 - 20.0 * (1 - math.exp(-1)) / (1 - math.exp(-2)))
+    assert profile.get_setpoint(4.0 + math.pi / 2) == pytest.approx(1.0)
+    assert profile.get_setpoint(100.0) == pytest.approx(0.0)
+    scaled = profile.scaled(2.0, 1.0)
+    assert scaled.start_value == 3.0
+    assert scaled.get_setpoint(2.0) == pytest.approx(31.0)
+    with pytest.raises(ValueError):
+        profile.step(1.0, duration=-1.0)
+    with pytest.raises(ValueError):
+        profile.exponential_ramp(1.0, duration=1.0, time_constant=0.0)
+
+
+def test_executor():
+    """
+    Test if synchronized profiles are executed on simulated devices.
+    """
+    port = Sfc5xxxSimulatorPort()
+    connection = ShdlcConnection(port)
+    steps = []
+    executor = Sfc5xxxProfileExecutor(
+        Sfc5xxxScaling.NORMALIZED, period=0.02,
+        callback=lambda *args: steps.append(args))
+    profile = Sfc5xxxSetpointProfile().linear_ramp(1.0, duration=0.2)
+    for address in range(2):
+        port.add_device(Sfc5xxxSimulatedDevice(slave_address=address))
+        device = Sfc5xxxShdlcDevice(connection, address)
+        executor.add(device, profile.scaled(0.5 ** address))
+    with pytest.raises(ValueError):
+        executor.add(device, profile)
+    results = executor.run()
+    assert sorted(results) == ['0', '1']
+    assert len(steps) == len(results['0']) + len(results['1'])
+    assert executor.errors == 0
+    assert executor.latency > 0.0
+    for name, factor in [('0', 1.0), ('1', 0.5)]:
+        assert len(results[name]) + executor.skipped_steps <= 11
+        for elapsed, setpoint, flow in results[name]:
+            assert setpoint == pytest.approx(factor * elapsed / 0.2, abs=0.1)
+            assert isinstance(flow, float)
+        assert results[name][-1][1] == factor
+    assert Sfc5xxxShdlcDevice(connection, 1).get_setpoint(
+        Sfc5xxxScaling.NORMALIZED) == 0.5
+
+
+def test_executor_overdue():
+    """
+    Test if the end values of all profiles are sent even if the execution
+    falls behind and steps are skipped.
+    """
+    port = SlowPort()
+    connection = ShdlcConnection(port)
+    executor = Sfc5xxxProfileExecutor(Sfc5xxxScaling.NORMALIZED, period=0.02)
+    profiles = [Sfc5xxxSetpointProfile().linear_ramp(1.0, duration=0.2),
+                Sfc5xxxSetpointProfile(1.0).linear_ramp(0.0, duration=0.1)]
+    devices = []
+    for address, profile in enumerate(profiles):
+        port.add_device(Sfc5xxxSimulatedDevice(slave_address=address))
+        devices.append(Sfc5xxxShdlcDevice(connection, address))
+        executor.add(devices[-1], profile)
+    results = executor.run()
+    assert executor.skipped_steps > 0
+    assert results['0'][-1][1] == 1.0
+    assert results['1'][-1][1] == 0.0
+    assert [device.get_setpoint(Sfc5xxxScaling.NORMALIZED)
+            for device in devices] == [1.0, 0.0]
+
+
+def test_executor_end_value_error():
+    """
+    Test if the end value is sent again if it failed, and if the executor
+    gives up after three attempts.
+    """
+    port = Sfc5xxxSimulatorPort()
+    simulated_devices = [port.add_device(Sfc5xxxSimulatedDevice(
+        slave_address=address)) for address in range(2)]
+    connection = ShdlcConnection(port)
+    executor = Sfc5xxxProfileExecutor(Sfc5xxxScaling.NORMALIZED, period=0.01)
+    for address in range(2):
+        executor.add(Sfc5xxxShdlcDevice(connection, address),
+                     Sfc5xxxSetpointProfile().step(0.7, duration=0.0))
+    simulated_devices[0].inject_error(0x33, command_id=0x03, count=1)
+    simulated_devices[1].inject_error(0x33, command_id=0x03, count=5)
+    results = executor.run()
+    assert [flow is None for _, _, flow in results['0']] == [True, False]
+    assert [flow is None for _, _, flow in results['1']] == [True] * 3
+    assert executor.errors == 4
+    assert Sfc5xxxShdlcDevice(connection, 0).get_setpoint(
+        Sfc5xxxScaling.NORMALIZED) == pytest.approx(0.7)
+
+
+def test_executor_thread():
+    """
+    Test if the execution can be stopped.
+    """
+    port = Sfc5xxxSimulatorPort()
+    port.add_device(Sfc5xxxSimulatedDevice(slave_address=0))
+    device = Sfc5xxxShdlcDevice(ShdlcConnection(port), 0)
+    executor = Sfc5xxxProfileExecutor(Sfc5xxxScaling.NORMALIZED, period=0.01)
+    executor.add(device, Sfc5xxxSetpointProfile().step(0.5, duration=10.0),
+                 name='a')
+    with executor:
+        assert executor.is_running
+        assert executor.wait(0.1) is False
+    assert not executor.is_running
+    assert 0 < len(executor.results['a']) < 100
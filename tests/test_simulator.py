@@ -0,0 +1,195 @@
+# -*- coding: utf-8 -*-
+# (c) Copyright 2020 Sensirion AG, Switzerland
+
+from __future__ import absolute_import, division, print_function
+from sensirion_shdlc_driver import ShdlcConnection
+from sensirion_shdlc_driver.errors import ShdlcTimeoutError
+from sensirion_shdlc_sfc5xxx import Sfc5xxxShdlcDevice, Sfc5xxxScaling, \
+    Sfc5xxxValveInputSource, Sfc5xxxMediumUnit, Sfc5xxxUnitPrefix, \
+    Sfc5xxxUnit, Sfc5xxxUnitTimeBase, Sfc5xxxSimulatedDevice, \
+    Sfc5xxxSimulatorPort
+from sensirion_shdlc_sfc5xxx.device_errors import \
+    Sfc5xxxInvalidCalibrationIndexError, Sfc5xxxNvmAddressOutOfRangeError, \
+    Sfc5xxxFunctionalityNotSupportedError
+import pytest
+
+
+class FakeClock(object):
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def simulated_device(clock):
+    return Sfc5xxxSimulatedDevice(noise=0.0, clock=clock)
+
+
+@pytest.fixture
+def device(simulated_device):
+    port = Sfc5xxxSimulatorPort()
+    port.add_device(simulated_device)
+    return Sfc5xxxShdlcDevice(ShdlcConnection(port), 0)
+
+
+def test_device_information(device):
+    """
+    Test if the device information can be read.
+    """
+    assert device.get_product_type() == "00020000"
+    assert device.get_product_name().startswith("SFC")
+    assert device.get_serial_number() == "21100123"
+    version = device.get_version()
+    assert version.protocol.major == 1
+    assert version.firmware.minor >= 66
+
+
+def test_setpoint_and_flow(device, simulated_device, clock):
+    """
+    Test if the flow follows the setpoint in all scalings.
+    """
+    device.set_setpoint(10.0, Sfc5xxxScaling.PHYSICAL)
+    assert device.get_setpoint(Sfc5xxxScaling.NORMALIZED) == 0.5
+    assert device.read_measured_value(Sfc5xxxScaling.NORMALIZED) == 0.0
+    clock.now += 1.0
+    flow = device.read_measured_value(Sfc5xxxScaling.PHYSICAL)
+    assert flow == pytest.approx(10.0, abs=1e-3)
+    device.set_valve_input_source(Sfc5xxxValveInputSource.FORCE_CLOSED)
+    clock.now += 1.0
+    assert simulated_device.flow == pytest.approx(0.0, abs=1e-6)
+
+
+def test_measured_value_buffer(device, clock):
+    """
+    Test if the measured value buffer is filled with the sampling time and
+    reports lost values on overrun.
+    """
+    device.set_setpoint(1.0, Sfc5xxxScaling.NORMALIZED)
+    clock.now += 0.5  # 50 samples
+    response = device.read_measured_value_buffer(Sfc5xxxScaling.NORMALIZED)
+    assert len(response.values) == 50
+    assert response.lost_values == 0
+    assert response.sampling_time == pytest.approx(0.01)
+    assert response.values[0] < response.values[-1]
+    clock.now += 1.5  # 150 samples, buffer holds 100
+    response = device.read_measured_value_buffer(Sfc5xxxScaling.NORMALIZED)
+    assert len(response.values) == 100
+    assert response.lost_values == 50
+    assert response.read_count == 2
+
+
+def test_user_defined_unit(device):
+    """
+    Test if the user defined unit is used for the user defined scaling.
+    """
+    device.set_user_defined_medium_unit(Sfc5xxxMediumUnit(
+        Sfc5xxxUnitPrefix.MILLI, Sfc5xxxUnit.STANDARD_LITER,
+        Sfc5xxxUnitTimeBase.MINUTE))
+    assert device.get_user_defined_fullscale() == pytest.approx(20000.0)
+    device.set_user_defined_medium_unit(Sfc5xxxMediumUnit(
+        Sfc5xxxUnitPrefix.UNDEFINED, Sfc5xxxUnit.PERCENT,
+        Sfc5xxxUnitTimeBase.UNDEFINED))
+    device.set_setpoint(25.0, Sfc5xxxScaling.USER_DEFINED)
+    assert device.get_setpoint(Sfc5xxxScaling.PHYSICAL) == 5.0
+    device.set_user_defined_medium_unit(Sfc5xxxMediumUnit(
+        Sfc5xxxUnitPrefix.ONE, Sfc5xxxUnit.GRAM, Sfc5xxxUnitTimeBase.MINUTE))
+    with pytest.raises(Sfc5xxxFunctionalityNotSupportedError):
+        device.get_user_defined_fullscale()
+
+
+def test_calibrations(device):
+    """
+    Test calibration information and activation.
+    """
+    assert device.get_number_of_calibrations() == 20
+    assert device.get_calibration_validity(2) is True
+    assert device.get_calibration_validity(10) is False
+    assert device.get_calibration_gas_description(2) == "Ar"
+    conditions = device.get_calibration_initial_conditions(0)
+    assert conditions.company == "Sensirion"
+    device.activate_calibration(3)
+    assert device.get_current_gas_description() == "CO2"
+    assert str(device.get_current_gas_unit()) == "sccm"
+    with pytest.raises(Sfc5xxxInvalidCalibrationIndexError):
+        device.activate_calibration(10)
+
+
+def test_user_memory(device):
+    """
+    Test if the user memory can be written and read.
+    """
+    device.write_user_memory(10, b"hello")
+    assert device.read_user_memory(10, 5) == b"hello"
+    with pytest.raises(Sfc5xxxNvmAddressOutOfRangeError):
+        device.read_user_memory(120, 10)
+
+
+def test_reset(device):
+    """
+    Test if a device reset restores the volatile state only.
+    """
+    device.set_user_defined_valve_value(0.5)
+    device.set_user_controller_gain(2.0)
+    device.device_reset()
+    assert device.get_user_defined_valve_value() == 0.0
+    assert device.get_user_controller_gain() == 2.0
+    device.factory_reset()
+    assert device.get_user_controller_gain() == 1.0
+
+
+def test_injected_error(device, simulated_device):
+    """
+    Test if injected errors are returned by the device.
+    """
+    simulated_device.inject_error(0x33, command_id=0x08)
+    device.get_serial_number()
+    with pytest.raises(Sfc5xxxInvalidCalibrationIndexError):
+        device.read_measured_value(Sfc5xxxScaling.NORMALIZED)
+    device.read_measured_value(Sfc5xxxScaling.NORMALIZED)
+    assert device.read_device_status(clear=True) == (0, 0x33)
+
+
+def test_multiple_devices():
+    """
+    Test communication with several devices and address/baudrate changes.
+    """
+    port = Sfc5xxxSimulatorPort()
+    for address in range(3):
+        port.add_device(Sfc5xxxSimulatedDevice(
+            slave_address=address, serial_number=str(10000 + address)))
+    connection = ShdlcConnection(port)
+    devices = [Sfc5xxxShdlcDevice(connection, i) for i in range(3)]
+    assert [d.get_serial_number() for d in devices] == \
+        ["10000", "10001", "10002"]
+    devices[2].set_slave_address(5, update_driver=True)
+    assert devices[2].get_serial_number() == "10002"
+    devices[0].set_baudrate(19200, update_driver=True)
+    assert devices[0].get_baudrate() == 19200
+    with pytest.raises(ShdlcTimeoutError):
+        devices[1].get_serial_number()
+
+
+def test_record_requests():
+    """
+    Test if the port records the sent requests only if enabled.
+    """
+    port = Sfc5xxxSimulatorPort(record_requests=True)
+    port.add_device(Sfc5xxxSimulatedDevice())
+    device = Sfc5xxxShdlcDevice(ShdlcConnection(port), 0)
+    device.get_serial_number()
+    with pytest.raises(ShdlcTimeoutError):
+        Sfc5xxxShdlcDevice(ShdlcConnection(port), 3).get_serial_number()
+    assert port.requests == [(0, 0xD0), (3, 0xD0)]
+    port.clear_requests()
+    assert port.requests == []
+    port = Sfc5xxxSimulatorPort()
+    port.add_device(Sfc5xxxSimulatedDevice())
+    Sfc5xxxShdlcDevice(ShdlcConnection(port), 0).get_serial_number()
+    assert port.requests == []
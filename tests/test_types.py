@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+# (c) Copyright 2020 Sensirion AG, Switzerland
+
+from __future__ import absolute_import, division, print_function
+from sensirion_shdlc_sfc5xxx import Sfc5xxxScaling
+from sensirion_shdlc_sfc5xxx.types import Sfc5xxxCalibrationConditions, \
+    Sfc5xxxReadBufferResponse
+from datetime import datetime
+import pytest
+
+
+def create_conditions(temperature=20.0):
+    return Sfc5xxxCalibrationConditions(
+        "Sensirion", "Operator", datetime(2020, 1, 1), temperature, 2.0, 1.0,
+        True, 0.5, 0.1)
+
+
+def create_response(values):
+    return Sfc5xxxReadBufferResponse(Sfc5xxxScaling.NORMALIZED, 1, 0, 0,
+                                     0.01, values)
+
+
+def test_calibration_conditions():
+    """
+    Test if calibration conditions are immutable, compact and hashable.
+    """
+    conditions = create_conditions()
+    assert conditions.temperature == 20.0
+    assert conditions == create_conditions()
+    assert conditions != create_conditions(25.0)
+    assert len({conditions, create_conditions(), create_conditions(25.0)}) \
+        == 2
+    assert not hasattr(conditions, '__dict__')
+    with pytest.raises(AttributeError):
+        conditions.temperature = 25.0
+
+
+def test_read_buffer_response():
+    """
+    Test if buffer responses are immutable, compact and hashable.
+    """
+    response = create_response([1.0, 2.0])
+    assert response == create_response([1.0, 2.0])
+    assert response != create_response([1.0, 3.0])
+    assert response != create_response([1.0])
+    assert hash(response) == hash(create_response([1.0, 2.0]))
+    assert not hasattr(response, '__dict__')
+    with pytest.raises(AttributeError):
+        response.values = []
+    values = [1.0, 2.0]
+    response = create_response(values)
+    values.append(3.0)
+    assert response.values == (1.0, 2.0)
+    assert hash(response) == hash(create_response([1.0, 2.0]))
+
+
+def test_read_buffer_response_array():
+    """
+    Test if buffer responses containing NumPy arrays can be compared.
+    """
+    np = pytest.importorskip("numpy")
+    response = create_response(np.array([1.0, 2.0]))
+    assert response == create_response(np.array([1.0, 2.0]))
+    assert response != create_response(np.array([1.0, 3.0]))
+    assert hash(response) == hash(create_response([1.0, 2.0]))
+    with pytest.raises(ValueError):
+        response.values[0] = 3.0
+    values = np.array([1.0, 2.0])
+    response = create_response(values)
+    values[0] = 3.0  # The array of the caller is not frozen
+    assert not response.values.flags.writeable
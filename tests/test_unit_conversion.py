@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+# (c) Copyright 2020 Sensirion AG, Switzerland
+
+from __future__ import absolute_import, division, print_function
+from sensirion_shdlc_sfc5xxx import Sfc5xxxMediumUnit, Sfc5xxxUnitPrefix, \
+    Sfc5xxxUnit, Sfc5xxxUnitTimeBase
+from sensirion_shdlc_sfc5xxx.unit_conversion import convert_medium_unit, \
+    get_conversion_factor
+import pytest
+
+SLM = Sfc5xxxMediumUnit(Sfc5xxxUnitPrefix.ONE, Sfc5xxxUnit.STANDARD_LITER,
+                        Sfc5xxxUnitTimeBase.MINUTE)
+SCCM = Sfc5xxxMediumUnit(Sfc5xxxUnitPrefix.MILLI, Sfc5xxxUnit.STANDARD_LITER,
+                         Sfc5xxxUnitTimeBase.MINUTE)
+NLS = Sfc5xxxMediumUnit(Sfc5xxxUnitPrefix.ONE, Sfc5xxxUnit.NORM_LITER,
+                        Sfc5xxxUnitTimeBase.SECOND)
+LITER = Sfc5xxxMediumUnit(Sfc5xxxUnitPrefix.ONE, Sfc5xxxUnit.STANDARD_LITER,
+                          Sfc5xxxUnitTimeBase.NONE)
+PERCENT = Sfc5xxxMediumUnit(Sfc5xxxUnitPrefix.UNDEFINED, Sfc5xxxUnit.PERCENT,
+                            Sfc5xxxUnitTimeBase.UNDEFINED)
+
+
+@pytest.mark.parametrize("source,target,factor", [
+    (SLM, SCCM, 1000.0),
+    (SCCM, SLM, 0.001),
+    (SLM, SLM, 1.0),
+    (NLS, SLM, 60.0 * 293.15 / 273.15),
+])
+def test_conversion_factor(source, target, factor):
+    """
+    Test if the conversion factors are correct.
+    """
+    assert get_conversion_factor(source, target) == pytest.approx(factor)
+
+
+@pytest.mark.parametrize("source,target", [
+    (SLM, PERCENT),
+    (PERCENT, SLM),
+    (SLM, LITER),
+])
+def test_conversion_not_possible(source, target):
+    """
+    Test if a ValueError is raised for units which cannot be converted.
+    """
+    with pytest.raises(ValueError):
+        get_conversion_factor(source, target)
+
+
+def test_convert_values():
+    """
+    Test if single values and lists are converted.
+    """
+    assert convert_medium_unit(2.0, SLM, SCCM) == pytest.approx(2000.0)
+    assert convert_medium_unit([1.0, 2.0], SLM, SCCM) == \
+        pytest.approx([1000.0, 2000.0])
+    assert convert_medium_unit(iter([1.0]), SLM, SCCM) == \
+        pytest.approx([1000.0])
+
+
+def test_convert_array():
+    """
+    Test if NumPy arrays (e.g. read-only big-endian buffers) are converted.
+    """
+    np = pytest.importorskip("numpy")
+    values = np.frombuffer(b"\x3f\x80\x00\x00\x40\x00\x00\x00", dtype='>f4')
+    result = convert_medium_unit(values, SLM, SCCM)
+    assert isinstance(result, np.ndarray)
+    assert list(result) == pytest.approx([1000.0, 2000.0])
@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+# (c) Copyright 2020 Sensirion AG, Switzerland
+
+from __future__ import absolute_import, division, print_function
+from sensirion_shdlc_sfc5xxx import Sfc5xxxUnitPrefix, Sfc5xxxUnit, \
+    Sfc5xxxUnitTimeBase, Sfc5xxxMediumUnit
+import pytest
+
+
+@pytest.mark.parametrize("enum", [
+    Sfc5xxxUnitPrefix,
+    Sfc5xxxUnit,
+    Sfc5xxxUnitTimeBase,
+])
+def test_enum_from_int(enum):
+    """
+    Test if all enum items can be looked up by their integer value, and
+    invalid values are rejected.
+    """
+    for item in enum:
+        assert enum.from_int(item.value) is item
+    with pytest.raises(ValueError):
+        enum.from_int(-100)
+
+
+def test_medium_unit_from_int():
+    """
+    Test if medium units created from integers are cached and immutable.
+    """
+    unit = Sfc5xxxMediumUnit.from_int(-3, 1, 4)
+    assert unit.prefix == Sfc5xxxUnitPrefix.MILLI
+    assert unit.unit == Sfc5xxxUnit.STANDARD_LITER
+    assert unit.timebase == Sfc5xxxUnitTimeBase.MINUTE
+    assert str(unit) == "sccm"
+    assert Sfc5xxxMediumUnit.from_int(-3, 1, 4) is unit
+    with pytest.raises(AttributeError):
+        unit.prefix = Sfc5xxxUnitPrefix.ONE
+    with pytest.raises(ValueError):
+        Sfc5xxxMediumUnit.from_int(-3, 100, 4)
+
+
+def test_medium_unit_hashable():
+    """
+    Test if medium units can be used as dictionary keys and set members.
+    """
+    unit = Sfc5xxxMediumUnit(Sfc5xxxUnitPrefix.MILLI,
+                             Sfc5xxxUnit.STANDARD_LITER,
+                             Sfc5xxxUnitTimeBase.MINUTE)
+    assert unit == Sfc5xxxMediumUnit.from_int(-3, 1, 4)
+    assert not (unit != Sfc5xxxMediumUnit.from_int(-3, 1, 4))
+    assert unit != Sfc5xxxMediumUnit.from_int(0, 1, 4)
+    assert unit != "sccm"
+    assert {unit: 1}[Sfc5xxxMediumUnit.from_int(-3, 1, 4)] == 1
+    assert len({unit, Sfc5xxxMediumUnit.from_int(-3, 1, 4)}) == 1
+    assert not hasattr(unit, '__dict__')